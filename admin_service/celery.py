@@ -0,0 +1,14 @@
+"""
+تطبيق Celery لخدمة الأدمن - نائبك.كوم
+Celery application for Naebak Admin Service
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admin_service.settings')
+
+app = Celery('admin_service')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -5,8 +5,10 @@ Django settings for Naebak Admin Service.
 Generated by 'django-admin startproject' using Django 4.2.7.
 """
 
+import json
 import os
 from pathlib import Path
+from celery.schedules import crontab
 from decouple import config
 import dj_database_url
 
@@ -59,6 +61,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'complaints_admin.async_auth.AsyncJWTAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -152,6 +155,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # الترقيم بالمؤشر (KeysetPagination) يُحدد لكل عرض مرتب على (created_at, id)
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -181,8 +185,35 @@ JWT_SECRET_KEY = config('JWT_SECRET_KEY', default=SECRET_KEY)
 JWT_ALGORITHM = config('JWT_ALGORITHM', default='HS256')
 JWT_EXPIRATION_DELTA = config('JWT_EXPIRATION_DELTA', default=3600, cast=int)
 
+# JWKS - المفاتيح العامة لتوكينات RS256/ES256 الصادرة من خدمة المصادقة
+JWT_ASYMMETRIC_ALGORITHMS = config('JWT_ASYMMETRIC_ALGORITHMS', default='RS256,ES256', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+JWT_JWKS_URL = config('JWT_JWKS_URL', default='')
+JWT_JWKS_FILE = config('JWT_JWKS_FILE', default='')
+JWT_JWKS_REFRESH_INTERVAL = config('JWT_JWKS_REFRESH_INTERVAL', default=300, cast=int)
+JWT_JWKS_MIN_REFRESH_INTERVAL = config('JWT_JWKS_MIN_REFRESH_INTERVAL', default=30, cast=int)
+
+# إلغاء التوكينات - تغذية خدمة المصادقة أو ملف JSON محلي، مع مرشح Bloom لكل عامل
+JWT_REVOCATION_FEED_URL = config('JWT_REVOCATION_FEED_URL', default='')
+JWT_REVOCATION_FILE = config('JWT_REVOCATION_FILE', default='')
+JWT_REVOCATION_CAPACITY = config('JWT_REVOCATION_CAPACITY', default=100000, cast=int)
+JWT_REVOCATION_ERROR_RATE = config('JWT_REVOCATION_ERROR_RATE', default=0.001, cast=float)
+JWT_REVOCATION_REFRESH_INTERVAL = config('JWT_REVOCATION_REFRESH_INTERVAL', default=60, cast=int)
+JWT_REVOCATION_USE_REDIS = config('JWT_REVOCATION_USE_REDIS', default=False, cast=bool)
+
+# صلاحيات مجموعات الأدمن: {"group_name": ["app_label.codename", ...]}
+ADMIN_GROUP_PERMISSIONS = config('ADMIN_GROUP_PERMISSIONS', default='{}', cast=json.loads)
+
+# JWT Token Cache - تخزين التوكينات المُتحقق منها
+JWT_TOKEN_CACHE_SIZE = config('JWT_TOKEN_CACHE_SIZE', default=1024, cast=int)
+JWT_TOKEN_CACHE_TTL = config('JWT_TOKEN_CACHE_TTL', default=300, cast=int)
+JWT_TOKEN_CACHE_USE_REDIS = config('JWT_TOKEN_CACHE_USE_REDIS', default=False, cast=bool)
+JWT_NEGATIVE_CACHE_SIZE = config('JWT_NEGATIVE_CACHE_SIZE', default=4096, cast=int)
+JWT_NEGATIVE_CACHE_TTL = config('JWT_NEGATIVE_CACHE_TTL', default=30, cast=int)
+AUTH_VERIFY_LOCK_TIMEOUT = config('AUTH_VERIFY_LOCK_TIMEOUT', default=12.0, cast=float)
+
 # Redis Configuration
 REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+REDIS_SOCKET_TIMEOUT = config('REDIS_SOCKET_TIMEOUT', default=0.5, cast=float)
 
 # Celery Configuration
 CELERY_BROKER_URL = REDIS_URL
@@ -192,12 +223,98 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+# التصدير في طابور مستقل يخدمه عامل بـ --pool=solo: عمليات prefork خفية (daemon)
+# ولا تستطيع إنشاء مجمع عمليات رسم PDF (EXPORT_PDF_WORKERS)
+CELERY_TASK_ROUTES = {
+    'complaints_admin.tasks.process_complaint_export': {'queue': 'exports'},
+}
+CELERY_BEAT_SCHEDULE = {
+    'maintain-action-partitions': {
+        'task': 'complaints_admin.tasks.maintain_action_partitions',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'archive-old-actions': {
+        'task': 'complaints_admin.tasks.archive_old_actions',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'prune-leaderboard-periods': {
+        'task': 'complaints_admin.tasks.prune_leaderboard_periods',
+        'schedule': crontab(hour=4, minute=30),
+    },
+    'refresh-complaint-rollups': {
+        'task': 'complaints_admin.tasks.refresh_complaint_rollups',
+        'schedule': crontab(minute=5),
+    },
+    'resume-stalled-exports': {
+        'task': 'complaints_admin.tasks.resume_stalled_exports',
+        'schedule': crontab(minute='*/10'),
+    },
+}
+
+# تقسيم جدول إجراءات الأدمن (PostgreSQL) وسياسة الاحتفاظ
+ACTION_PARTITION_MONTHS_AHEAD = config('ACTION_PARTITION_MONTHS_AHEAD', default=3, cast=int)
+ACTION_RETENTION_MONTHS = config('ACTION_RETENTION_MONTHS', default=0, cast=int)
+ACTION_RETENTION_MODE = config('ACTION_RETENTION_MODE', default='detach')
+
+# حدود أيام صفوف الإحصائيات اليومية
+STATISTICS_TIME_ZONE = config('STATISTICS_TIME_ZONE', default='Africa/Cairo')
+# مدة صلاحية فهرس المجاميع التراكمية قبل التقاط تعديلات العمال الآخرين (بالثواني)
+STATISTICS_INDEX_REFRESH_INTERVAL = config('STATISTICS_INDEX_REFRESH_INTERVAL', default=30, cast=int)
+# نافذة إعادة قراءة الصفوف قبل آخر updated_at لالتقاط المعاملات المتأخرة في التأكيد (بالثواني)
+STATISTICS_INDEX_REFRESH_OVERLAP = config('STATISTICS_INDEX_REFRESH_OVERLAP', default=300, cast=int)
+
+# إعادة بناء الإحصائيات اليومية من سجل الإجراءات
+STATISTICS_REBUILD_SHARD_DAYS = config('STATISTICS_REBUILD_SHARD_DAYS', default=31, cast=int)
+STATISTICS_REBUILD_CHUNK_SIZE = config('STATISTICS_REBUILD_CHUNK_SIZE', default=20000, cast=int)
+STATISTICS_REBUILD_WORKERS = config('STATISTICS_REBUILD_WORKERS', default=4, cast=int)
+
+# لوحة صدارة النواب: الأرصدة في قاعدة البيانات، وRedis اختياري لتسريع القراءة
+LEADERBOARD_USE_REDIS = config('LEADERBOARD_USE_REDIS', default=False, cast=bool)
+LEADERBOARD_PERIOD_TTL_DAYS = config('LEADERBOARD_PERIOD_TTL_DAYS', default=400, cast=int)
+
+# تصدير الشكاوى: مصدر الصفوف (service أو local)، حجم الصفحة، والصفحات المحملة مسبقاً
+EXPORT_ROOT = config('EXPORT_ROOT', default=str(BASE_DIR / 'exports'))
+EXPORT_COMPLAINT_SOURCE = config('EXPORT_COMPLAINT_SOURCE', default='service')
+EXPORT_PAGE_SIZE = config('EXPORT_PAGE_SIZE', default=500, cast=int)
+EXPORT_PREFETCH_PAGES = config('EXPORT_PREFETCH_PAGES', default=4, cast=int)
+EXPORT_PROGRESS_EVERY = config('EXPORT_PROGRESS_EVERY', default=1000, cast=int)
+EXPORT_EXPIRY_HOURS = config('EXPORT_EXPIRY_HOURS', default=24, cast=int)
+# أقصى عمر لتصدير مكتمل يُعاد لطلب مطابق (تعديلات خدمة الشكاوى لا تظهر هنا)
+EXPORT_REUSE_WINDOW_MINUTES = config('EXPORT_REUSE_WINDOW_MINUTES', default=60, cast=int)
+# تصدير الفروق يعيد الشكاوى المعدلة في آخر N ثانية قبل علامة التصدير الأساس
+EXPORT_DELTA_OVERLAP_SECONDS = config('EXPORT_DELTA_OVERLAP_SECONDS', default=300, cast=int)
+# تصدير قيد التنفيذ بلا حفظ للتقدم طوال N دقيقة يُعاد تشغيله من نقطة استئنافه
+EXPORT_STALLED_MINUTES = config('EXPORT_STALLED_MINUTES', default=30, cast=int)
+# مرفقات تصدير ZIP: التنزيلات المتزامنة، وحد المرفق المحفوظ في الذاكرة قبل نقله لملف مؤقت
+EXPORT_ATTACHMENT_WORKERS = config('EXPORT_ATTACHMENT_WORKERS', default=4, cast=int)
+EXPORT_ATTACHMENT_SPOOL_BYTES = config('EXPORT_ATTACHMENT_SPOOL_BYTES', default=1024 * 1024, cast=int)
+# تقارير PDF: عمليات الرسم، الصفحات في كل جزء، ومسار خط TTF يدعم العربية (مثل Amiri أو Noto Naskh)
+EXPORT_PDF_WORKERS = config('EXPORT_PDF_WORKERS', default=4, cast=int)
+EXPORT_PDF_CHUNK_PAGES = config('EXPORT_PDF_CHUNK_PAGES', default=100, cast=int)
+EXPORT_PDF_FONT = config('EXPORT_PDF_FONT', default='')
+# روابط التحميل الموقَّعة، وبادئة الموقع الداخلي في nginx لتسليم الملف عبر X-Accel-Redirect (فارغة: Django يرسله)
+EXPORT_DOWNLOAD_SECRET = config('EXPORT_DOWNLOAD_SECRET', default=SECRET_KEY)
+EXPORT_DOWNLOAD_ACCEL_PREFIX = config('EXPORT_DOWNLOAD_ACCEL_PREFIX', default='')
+
+# تجميعات الإجراءات حسب الفترة والبُعد
+ROLLUP_CHUNK_SIZE = config('ROLLUP_CHUNK_SIZE', default=50000, cast=int)
+ROLLUP_REFRESH_HOURS = config('ROLLUP_REFRESH_HOURS', default=2, cast=int)
+
+# الأرشيف البارد لإجراءات الأدمن القديمة (0 يعطل الأرشفة)
+ACTION_ARCHIVE_AFTER_DAYS = config('ACTION_ARCHIVE_AFTER_DAYS', default=0, cast=int)
+ACTION_ARCHIVE_SEGMENT_ROWS = config('ACTION_ARCHIVE_SEGMENT_ROWS', default=100000, cast=int)
+ACTION_ARCHIVE_ROOT = config('ACTION_ARCHIVE_ROOT', default=str(BASE_DIR / 'archive'))
+# مسار فئة Django storage بديلة (مثل تخزين الكائنات)؛ فارغ = القرص المحلي
+ACTION_ARCHIVE_STORAGE = config('ACTION_ARCHIVE_STORAGE', default='')
 
 # External Services URLs
 AUTH_SERVICE_URL = config('AUTH_SERVICE_URL', default='http://localhost:8001')
+AUTH_SERVICE_TIMEOUT = config('AUTH_SERVICE_TIMEOUT', default=10.0, cast=float)
+AUTH_SERVICE_MAX_CONNECTIONS = config('AUTH_SERVICE_MAX_CONNECTIONS', default=100, cast=int)
 CONTENT_SERVICE_URL = config('CONTENT_SERVICE_URL', default='http://localhost:8002')
 MESSAGING_SERVICE_URL = config('MESSAGING_SERVICE_URL', default='http://localhost:8003')
 COMPLAINTS_SERVICE_URL = config('COMPLAINTS_SERVICE_URL', default='http://localhost:8004')
+COMPLAINTS_SERVICE_TIMEOUT = config('COMPLAINTS_SERVICE_TIMEOUT', default=30.0, cast=float)
 RATINGS_SERVICE_URL = config('RATINGS_SERVICE_URL', default='http://localhost:8005')
 STATISTICS_SERVICE_URL = config('STATISTICS_SERVICE_URL', default='http://localhost:8006')
 NOTIFICATIONS_SERVICE_URL = config('NOTIFICATIONS_SERVICE_URL', default='http://localhost:8007')
@@ -0,0 +1,94 @@
+"""
+قياس زمن تقرير PDF حسب عدد العمليات
+Benchmark: chunked PDF export rendering vs worker count
+
+Usage:
+    python -m benchmarks.bench_pdf_export [--complaints 50000] [--workers 1,2,4,8] [--chunk-pages 100]
+
+Renders the same synthetic export (Arabic titles, names and labels) with
+render_pdf at each worker count and reports wall time and speedup over one
+worker. Speedup is bounded by the cores available (os.cpu_count()) and by
+the serial merge step, which is timed separately on the last run.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admin_service.settings')
+django.setup()
+
+from complaints_admin import export_pdf  # noqa: E402
+from complaints_admin.export_pdf import PDF_FIELDS, render_pdf  # noqa: E402
+
+STATUSES = ['جديدة', 'قيد المراجعة', 'محالة للنائب', 'محلولة', 'مرفوضة']
+CATEGORIES = ['الطرق', 'المياه', 'الكهرباء', 'الصحة', 'التعليم', 'النظافة']
+GOVERNORATES = ['القاهرة', 'الجيزة', 'الإسكندرية', 'أسيوط', 'المنيا', 'سوهاج', 'الدقهلية']
+NAMES = ['أحمد محمد', 'سارة علي', 'محمود حسن', 'منى إبراهيم', 'خالد عبد الله', 'هدى سمير']
+
+
+def synthetic_rows(count):
+    rng = random.Random(11)
+    values = {
+        'status': STATUSES, 'category': CATEGORIES, 'governorate': GOVERNORATES,
+        'citizen_name': NAMES, 'assigned_to_representative_name': NAMES,
+        'priority_level': ['low', 'medium', 'high', 'urgent'],
+    }
+    rows = []
+    for n in range(count):
+        row = {
+            'title': f'شكوى بخصوص {rng.choice(CATEGORIES)} في {rng.choice(GOVERNORATES)} رقم {n}',
+            'complaint_id': f'COMP-{n:06d}',
+            'created_at': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00',
+            'last_action_at': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:30',
+        }
+        for field, choices in values.items():
+            row[field] = rng.choice(choices)
+        rows.append(tuple(row[field] for field in PDF_FIELDS))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--complaints', type=int, default=50000)
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--chunk-pages', type=int, default=100)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.complaints)
+    print(f'{args.complaints} complaints, {os.cpu_count()} cores, {args.chunk_pages} pages per chunk')
+    merge_seconds = []
+    original_writer = export_pdf.PdfWriter
+
+    class TimedWriter(original_writer):
+        def write(self, stream):
+            started = time.perf_counter()
+            result = super().write(stream)
+            merge_seconds.append(time.perf_counter() - started)
+            return result
+
+    export_pdf.PdfWriter = TimedWriter
+    baseline = None
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in [int(value) for value in args.workers.split(',')]:
+            path = os.path.join(directory, f'export-{workers}.pdf')
+            started = time.perf_counter()
+            pages = render_pdf(rows, path, 'تقرير الشكاوى', workers=workers, chunk_pages=args.chunk_pages)
+            seconds = time.perf_counter() - started
+            baseline = baseline or seconds
+            print(
+                f'{workers:>3} workers {seconds:8.2f} s  {pages} pages  '
+                f'{os.path.getsize(path) / 1e6:7.1f} MB  speedup {baseline / seconds:4.2f}x'
+            )
+    export_pdf.PdfWriter = original_writer
+    print(f'merge (serial part of the last run): {merge_seconds[-1]:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
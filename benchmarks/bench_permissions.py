@@ -0,0 +1,93 @@
+"""
+قياس تكلفة فحص صلاحيات الأدمن لكل طلب
+Microbenchmark: per-request permission-check cost of AdminUser
+
+Usage:
+    python -m benchmarks.bench_permissions [--permissions 300] [--repeat 20000]
+
+"before" is the previous list-based AdminUser (linear scans, one pass per
+permission in has_perms); "after" is the current frozenset/app-label index.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admin_service.settings')
+django.setup()
+
+from complaints_admin.authentication import AdminUser  # noqa: E402
+
+
+class ListAdminUser:
+    """نسخة الصلاحيات القديمة القائمة على القوائم (للمقارنة فقط)"""
+
+    def __init__(self, user_data):
+        self.is_superuser = user_data.get('is_superuser', False)
+        self.permissions = user_data.get('permissions', [])
+
+    def has_perm(self, perm):
+        return perm in self.permissions or self.is_superuser
+
+    def has_perms(self, perms):
+        return all(self.has_perm(perm) for perm in perms)
+
+    def has_module_perms(self, app_label):
+        return self.is_superuser or any(
+            perm.startswith(f'{app_label}.') for perm in self.permissions
+        )
+
+
+def build_payload(permission_count):
+    apps = ['complaints_admin', 'ratings_admin', 'content_admin', 'news_admin', 'banners_admin']
+    permissions = [
+        f'{apps[i % len(apps)]}.perm_{i}' for i in range(permission_count)
+    ]
+    return {
+        'user_id': 'ADMIN-BENCH',
+        'username': 'bench',
+        'user_type': 'admin',
+        'permissions': permissions,
+    }
+
+
+def simulate_request(user, permissions):
+    """فحوصات نموذجية لطلب واحد من لوحة التحكم"""
+    user.has_perm(permissions[-1])
+    user.has_perm('complaints_admin.missing_perm')
+    user.has_perms(permissions[-10:])
+    user.has_module_perms('banners_admin')
+    user.has_module_perms('settings_admin')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--permissions', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args()
+
+    payload = build_payload(args.permissions)
+    permissions = payload['permissions']
+    before = ListAdminUser(payload)
+    after = AdminUser(payload)
+
+    results = {}
+    for label, user in (('before (list)', before), ('after (frozenset)', after)):
+        seconds = min(timeit.repeat(
+            lambda: simulate_request(user, permissions), number=args.repeat, repeat=3
+        ))
+        results[label] = seconds / args.repeat * 1e6
+        print(f'{label:<20} {results[label]:8.2f} µs/request')
+
+    construct = min(timeit.repeat(lambda: AdminUser(payload), number=args.repeat, repeat=3))
+    print(f'{"AdminUser() build":<20} {construct / args.repeat * 1e6:8.2f} µs (cached group expansion)')
+    speedup = results['before (list)'] / results['after (frozenset)']
+    print(f'speedup: {speedup:.1f}x with {args.permissions} permissions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+قياس تكلفة إحصائيات نطاق تواريخ
+Benchmark: date-range statistics via ORM aggregate vs the cumulative index
+
+Usage:
+    python -m benchmarks.bench_statistics_range [--days 3650] [--repeat 200]
+
+Runs against a throwaway test database seeded with one ComplaintStatistics
+row per day. "before" is a SUM() aggregate over the range; "after" is
+StatisticsIndex.summary (two array lookups per counter once loaded).
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admin_service.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from complaints_admin.models import ComplaintStatistics  # noqa: E402
+from complaints_admin.statistics_index import SUM_FIELDS, StatisticsIndex  # noqa: E402
+
+
+def seed(days):
+    rng = random.Random(7)
+    first = date.today() - timedelta(days=days)
+    ComplaintStatistics.objects.bulk_create([
+        ComplaintStatistics(
+            date=first + timedelta(days=n),
+            total_complaints=n * 10,
+            new_complaints=rng.randrange(50),
+            assigned_complaints=rng.randrange(40),
+            resolved_complaints=rng.randrange(30),
+            rejected_complaints=rng.randrange(5),
+            pending_complaints=rng.randrange(200),
+            resolution_time_total=rng.random() * 100,
+            resolution_count=rng.randrange(30),
+        )
+        for n in range(days)
+    ], batch_size=1000)
+    return first
+
+
+def orm_range(start, end):
+    return ComplaintStatistics.objects.filter(date__gte=start, date__lte=end).aggregate(
+        **{field: Sum(field) for field in SUM_FIELDS}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=3650)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        first = seed(args.days)
+        start, end = first + timedelta(days=30), first + timedelta(days=args.days - 30)
+        index = StatisticsIndex(refresh_interval=3600)
+
+        load = min(timeit.repeat(index.load, number=1, repeat=3))
+        print(f'{"index load":<20} {load * 1e3:8.2f} ms ({args.days} days)')
+
+        results = {}
+        for label, func in (('before (SUM)', orm_range), ('after (index)', index.summary)):
+            seconds = min(timeit.repeat(lambda: func(start, end), number=args.repeat, repeat=3))
+            results[label] = seconds / args.repeat * 1e6
+            print(f'{label:<20} {results[label]:10.2f} µs/range')
+
+        speedup = results['before (SUM)'] / results['after (index)']
+        print(f'speedup: {speedup:.1f}x over {(end - start).days + 1} days')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
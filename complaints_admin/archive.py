@@ -0,0 +1,343 @@
+"""
+الأرشيف البارد لإجراءات الأدمن القديمة - خدمة الأدمن - نائبك.كوم
+Compressed columnar cold archive for old ComplaintAdminAction rows
+
+الإجراءات الأقدم من عمر محدد تُنقل من الجدول الحي إلى مقاطع ملفات عمودية
+مضغوطة في مخزن الأرشيف (قرص محلي أو تخزين كائنات عبر Django storage).
+
+بنية المقطع:
+    MAGIC | كتل الأعمدة | تذييل JSON مضغوط | طول التذييل (8 بايت) | MAGIC
+
+الصفوف مرتبة حسب (complaint_id, created_at, id) ومقسمة إلى مجموعات صفوف،
+وكل عمود في كل مجموعة كتلة zlib مستقلة. التذييل هو فهرس المقطع: مواقع الكتل،
+ونطاق التواريخ لكل مجموعة، ومجموعات الصفوف التي تحتوي كل شكوى. قراءة الخط
+الزمني لشكوى تقرأ التذييل ثم كتل مجموعاتها فقط. جدول الكتالوج يحمل مرشح Bloom
+لمعرفات الشكاوى في كل مقطع حتى لا يُفتح إلا المقطع المرشح.
+
+كل من يعيد البناء من السجل الكامل (الحالة الحالية، الإحصائيات اليومية، لوحة
+الصدارة) يقرأ عبر action_history التي تدمج المقاطع مع الجدول الحي، فالأرشفة
+لا تغير نتيجة أي إعادة بناء.
+"""
+
+import heapq
+import json
+import logging
+import struct
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.db.models.functions import Collate
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .bloom import BloomFilter
+from .models import ComplaintActionArchiveSegment, ComplaintAdminAction
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'NBKSEG1\n'
+FOOTER_TAIL = struct.Struct('>Q')
+ROW_GROUP_ROWS = 2048
+COMPRESSION_LEVEL = 6
+DELETE_BATCH_SIZE = 500
+
+COLUMNS = [field.attname for field in ComplaintAdminAction._meta.concrete_fields]
+DATETIME_COLUMNS = {'created_at', 'expected_resolution_date'}
+# أعمدة غير فارغة ومرتبة تقريباً: تخزين الفروق يقلل حجمها بعد الضغط
+DELTA_COLUMNS = {'id', 'created_at'}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def get_archive_storage():
+    """مخزن ملفات الأرشيف"""
+    if settings.ACTION_ARCHIVE_STORAGE:
+        return import_string(settings.ACTION_ARCHIVE_STORAGE)()
+    return FileSystemStorage(location=settings.ACTION_ARCHIVE_ROOT)
+
+
+def _to_micros(value):
+    if value is None:
+        return None
+    return (value - EPOCH) // MICROSECOND
+
+
+def _from_micros(value):
+    if value is None:
+        return None
+    return EPOCH + value * MICROSECOND
+
+
+def _encode_column(name, values):
+    if name in DATETIME_COLUMNS:
+        values = [_to_micros(value) for value in values]
+    if name in DELTA_COLUMNS:
+        values = [values[0]] + [b - a for a, b in zip(values, values[1:])]
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(raw, COMPRESSION_LEVEL)
+
+
+def _decode_column(name, block):
+    values = json.loads(zlib.decompress(block))
+    if name in DELTA_COLUMNS:
+        total = 0
+        for i, delta in enumerate(values):
+            total += delta
+            values[i] = total
+    if name in DATETIME_COLUMNS:
+        values = [_from_micros(value) for value in values]
+    return values
+
+
+def build_segment(actions):
+    """
+    بناء محتوى مقطع من قائمة إجراءات
+    Serialize ``actions`` into segment bytes. Returns ``(data, complaint_ids)``.
+    """
+    actions = sorted(actions, key=lambda a: (a.complaint_id, a.created_at, a.pk))
+    parts = [MAGIC]
+    offset = len(MAGIC)
+    row_groups = []
+    complaints = {}
+
+    for group_index, start in enumerate(range(0, len(actions), ROW_GROUP_ROWS)):
+        group = actions[start:start + ROW_GROUP_ROWS]
+        blocks = {}
+        for name in COLUMNS:
+            block = _encode_column(name, [getattr(action, name) for action in group])
+            blocks[name] = [offset, len(block)]
+            parts.append(block)
+            offset += len(block)
+        created = [action.created_at for action in group]
+        row_groups.append({
+            'rows': len(group),
+            'min_created_at': _to_micros(min(created)),
+            'max_created_at': _to_micros(max(created)),
+            'blocks': blocks,
+        })
+        for action in group:
+            groups = complaints.setdefault(action.complaint_id, [])
+            if not groups or groups[-1] != group_index:
+                groups.append(group_index)
+
+    footer = zlib.compress(json.dumps({
+        'version': 1,
+        'columns': COLUMNS,
+        'rows': len(actions),
+        'row_groups': row_groups,
+        'complaints': complaints,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), COMPRESSION_LEVEL)
+    parts.extend([footer, FOOTER_TAIL.pack(len(footer)), MAGIC])
+    return b''.join(parts), list(complaints)
+
+
+@lru_cache(maxsize=256)
+def read_footer(name):
+    """
+    قراءة فهرس المقطع (المقاطع لا تتغير بعد كتابتها)
+    Read and cache a segment's footer index
+    """
+    storage = get_archive_storage()
+    size = storage.size(name)
+    tail_size = FOOTER_TAIL.size + len(MAGIC)
+    with storage.open(name, 'rb') as f:
+        f.seek(size - tail_size)
+        tail = f.read(tail_size)
+        if tail[FOOTER_TAIL.size:] != MAGIC:
+            raise ValueError(f'Not an archive segment: {name}')
+        (footer_size,) = FOOTER_TAIL.unpack(tail[:FOOTER_TAIL.size])
+        f.seek(size - tail_size - footer_size)
+        return json.loads(zlib.decompress(f.read(footer_size)))
+
+
+@receiver(setting_changed)
+def _clear_footer_cache(setting, **kwargs):
+    if setting in ('ACTION_ARCHIVE_ROOT', 'ACTION_ARCHIVE_STORAGE'):
+        read_footer.cache_clear()
+
+
+def iter_segment_rows(name, complaint_ids=None, since=None, until=None):
+    """
+    صفوف مقطع بترتيبه (complaint_id, created_at, id) مع تصفية بالشكاوى والتاريخ
+    Yield matching rows of segment ``name`` as dicts, decoding one row group
+    at a time and only the groups the footer index points to.
+    """
+    footer = read_footer(name)
+    if complaint_ids is None:
+        group_indexes = range(len(footer['row_groups']))
+    else:
+        complaint_ids = set(complaint_ids)
+        group_indexes = sorted({
+            index for complaint_id in complaint_ids for index in footer['complaints'].get(complaint_id, [])
+        })
+
+    since_us, until_us = _to_micros(since), _to_micros(until)
+    storage = get_archive_storage()
+    with storage.open(name, 'rb') as f:
+        for index in group_indexes:
+            group = footer['row_groups'][index]
+            if since_us is not None and group['max_created_at'] < since_us:
+                continue
+            if until_us is not None and group['min_created_at'] >= until_us:
+                continue
+            columns = {}
+            for column in footer['columns']:
+                offset, length = group['blocks'][column]
+                f.seek(offset)
+                columns[column] = _decode_column(column, f.read(length))
+            for i in range(group['rows']):
+                row = {column: values[i] for column, values in columns.items()}
+                if complaint_ids is not None and row['complaint_id'] not in complaint_ids:
+                    continue
+                if since is not None and row['created_at'] < since:
+                    continue
+                if until is not None and row['created_at'] >= until:
+                    continue
+                yield row
+
+
+def read_segment_rows(name, complaint_id=None, since=None, until=None):
+    """
+    قراءة صفوف مقطع مع تصفية بالشكوى والتاريخ
+    Return matching rows of segment ``name`` as dicts
+    """
+    return list(iter_segment_rows(name, None if complaint_id is None else [complaint_id], since, until))
+
+
+def archive_segments(complaint_ids=None, since=None, until=None):
+    """مقاطع الأرشيف التي قد تحتوي إجراءات الشكاوى والفترة المطلوبة"""
+    segments = ComplaintActionArchiveSegment.objects.only('name', 'complaint_filter')
+    if since is not None:
+        segments = segments.filter(max_created_at__gte=since)
+    if until is not None:
+        segments = segments.filter(min_created_at__lt=until)
+    for segment in segments:
+        if complaint_ids is not None:
+            bloom = BloomFilter.from_bytes(segment.complaint_filter)
+            if not any(complaint_id in bloom for complaint_id in complaint_ids):
+                continue
+        yield segment
+
+
+def history_bounds():
+    """أقدم وأحدث إجراء في السجل كاملاً (المؤرشف والحي)"""
+    live = ComplaintAdminAction.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+    archived = ComplaintActionArchiveSegment.objects.aggregate(first=Min('min_created_at'), last=Max('max_created_at'))
+    firsts = [value for value in (live['first'], archived['first']) if value is not None]
+    lasts = [value for value in (live['last'], archived['last']) if value is not None]
+    return (min(firsts) if firsts else None), (max(lasts) if lasts else None)
+
+
+# ترتيب بايتات النص كترتيب str في بايثون، لكل نوع قاعدة بيانات
+BINARY_COLLATIONS = {'postgresql': 'C', 'sqlite': 'BINARY', 'mysql': 'utf8mb4_bin'}
+
+
+def complaint_order(using='default'):
+    """
+    ترتيب complaint_id في قاعدة البيانات مطابقاً لترتيب بايثون
+    ``complaint_id`` ordering under a binary collation, so database order
+    matches Python's ``str`` order whatever the column's collation is
+    """
+    collation = BINARY_COLLATIONS.get(connections[using].vendor)
+    return Collate('complaint_id', collation) if collation else 'complaint_id'
+
+
+def action_history(fields, complaint_ids=None, since=None, until=None, action_types=None, chunk_size=5000):
+    """
+    سجل الإجراءات الكامل: الأرشيف والجدول الحي مدموجين
+    Yield ``fields`` tuples of every action, archived or live, ordered by
+    ``(complaint_id, created_at, id)`` with ``complaint_id`` compared as
+    Python compares ``str``. Each segment is sorted that way in Python and
+    the live table under a binary collation, so the streams merge lazily.
+    """
+    live = ComplaintAdminAction.objects.order_by(complaint_order(), 'created_at', 'id')
+    if complaint_ids is not None:
+        live = live.filter(complaint_id__in=complaint_ids)
+    if since is not None:
+        live = live.filter(created_at__gte=since)
+    if until is not None:
+        live = live.filter(created_at__lt=until)
+    if action_types is not None:
+        live = live.filter(action_type__in=action_types)
+    streams = [live.values_list('complaint_id', 'created_at', 'id', *fields).iterator(chunk_size=chunk_size)]
+
+    def archived(name):
+        for row in iter_segment_rows(name, complaint_ids, since, until):
+            if action_types is None or row['action_type'] in action_types:
+                yield (row['complaint_id'], row['created_at'], row['id'], *[row[field] for field in fields])
+
+    streams.extend(archived(segment.name) for segment in archive_segments(complaint_ids, since, until))
+    for row in heapq.merge(*streams, key=lambda row: row[:3]):
+        yield row[3:]
+
+
+def archived_actions(complaint_id, since=None, until=None):
+    """
+    الإجراءات المؤرشفة لشكوى كنسخ غير محفوظة من ComplaintAdminAction
+    Archived actions of ``complaint_id``, oldest first, as unsaved instances
+    """
+    actions = []
+    for segment in archive_segments([complaint_id], since, until):
+        for row in iter_segment_rows(segment.name, [complaint_id], since, until):
+            actions.append(ComplaintAdminAction(**row))
+    actions.sort(key=lambda action: (action.created_at, action.pk))
+    return actions
+
+
+def archive_actions(older_than_days, segment_rows=None, now=None):
+    """
+    نقل الإجراءات الأقدم من older_than_days إلى مقاطع الأرشيف
+    Move actions older than ``older_than_days`` into archive segments, one
+    segment per ``segment_rows`` actions, oldest first. Each segment's
+    catalog row and the deletion of its live rows commit together.
+    Returns the created catalog rows.
+    """
+    segment_rows = segment_rows or settings.ACTION_ARCHIVE_SEGMENT_ROWS
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    storage = get_archive_storage()
+    created = []
+
+    while True:
+        actions = list(
+            ComplaintAdminAction.objects.filter(created_at__lt=cutoff)
+            .order_by('created_at', 'id')[:segment_rows]
+        )
+        if not actions:
+            break
+
+        data, complaint_ids = build_segment(actions)
+        first, last = actions[0].created_at, actions[-1].created_at
+        name = storage.save(
+            f'actions-{first:%Y%m%d}-{last:%Y%m%d}-{uuid.uuid4().hex[:12]}.seg',
+            ContentFile(data),
+        )
+        bloom = BloomFilter(len(complaint_ids), 0.01)
+        for complaint_id in complaint_ids:
+            bloom.add(complaint_id)
+
+        with transaction.atomic():
+            segment = ComplaintActionArchiveSegment.objects.create(
+                name=name,
+                row_count=len(actions),
+                size_bytes=len(data),
+                min_created_at=first,
+                max_created_at=last,
+                complaint_filter=bloom.to_bytes(),
+            )
+            ids = [action.pk for action in actions]
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                ComplaintAdminAction.objects.filter(pk__in=ids[start:start + DELETE_BATCH_SIZE]).delete()
+        logger.info(f"Archived {len(actions)} actions into {name} ({len(data)} bytes)")
+        created.append(segment)
+
+    return created
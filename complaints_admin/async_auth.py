@@ -0,0 +1,228 @@
+"""
+مسار المصادقة غير المتزامن لخدمة الأدمن - نائبك.كوم
+Async, non-blocking authentication path for the ASGI deployment
+
+تحت uvicorn يعمل كل عامل بحلقة أحداث واحدة، وأي طلب متزامن لخدمة المصادقة
+يوقف كل الاتصالات الأخرى على نفس العامل. هنا يتم التحقق عبر httpx.AsyncClient
+مشترك لكل حلقة أحداث، مع دمج الطلبات المتزامنة لنفس التوكين.
+"""
+
+import asyncio
+import logging
+import weakref
+
+import httpx
+import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework import exceptions
+
+from .authentication import AdminUser, ensure_not_revoked
+from .jwks import decode_token
+from .token_cache import get_negative_token_cache, get_token_cache, token_digest
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuthServiceClient:
+    """
+    عميل غير متزامن لخدمة المصادقة مع مجمع اتصالات
+    Pooled async client for the auth service verify endpoint
+    """
+
+    def __init__(self, transport=None):
+        self.client = httpx.AsyncClient(
+            base_url=settings.AUTH_SERVICE_URL,
+            timeout=settings.AUTH_SERVICE_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.AUTH_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AUTH_SERVICE_MAX_CONNECTIONS,
+            ),
+            transport=transport,
+        )
+        self.requests_sent = 0
+        self._inflight = {}
+
+    async def verify(self, token):
+        """
+        التحقق من التوكين مع دمج الطلبات المتزامنة
+        Return the auth-service user data for ``token``; concurrent callers
+        with the same token await a single request. If that request is
+        cancelled (its client disconnected), the waiting callers retry.
+        """
+        key = token_digest(token)
+        future = self._inflight.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # إلغاء هذا الطلب نفسه يُمرر؛ إلغاء الطلب القائد يعني إعادة المحاولة
+                if not future.cancelled():
+                    raise
+            return await self.verify(token)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            user_data = await self._verify_remote(token)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # تعليم الاستثناء كمُستلم حتى لو لم ينتظره أحد
+            future.exception()
+            raise
+        else:
+            future.set_result(user_data)
+        finally:
+            self._inflight.pop(key, None)
+        return user_data
+
+    async def aclose(self):
+        """إغلاق الاتصالات المفتوحة"""
+        await self.client.aclose()
+
+    async def _verify_remote(self, token):
+        self.requests_sent += 1
+        try:
+            response = await self.client.post(
+                '/api/v1/auth/verify-token/',
+                headers={'Authorization': f'Bearer {token}'},
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Auth service verification failed: {str(e)}")
+            raise exceptions.AuthenticationFailed('Authentication service unavailable.')
+
+        if response.status_code != 200:
+            await off_loop(reject)(token, 'Invalid token.')
+
+        try:
+            user_data = response.json()
+        except ValueError:
+            raise exceptions.AuthenticationFailed('Token verification failed.')
+
+        if user_data.get('user_type') != 'admin':
+            await off_loop(reject)(token, 'Access denied. Admin privileges required.')
+
+        await off_loop(get_token_cache().set)(token, user_data)
+        return user_data
+
+
+def off_loop(func):
+    """
+    تشغيل دالة متزامنة في خيط منفصل
+    Run ``func`` in a worker thread: the token caches may call Redis and the
+    first revocation check fetches the revocation feed over HTTP
+    """
+    return sync_to_async(func, thread_sensitive=False)
+
+
+def cached_credentials(token):
+    """نتيجة محفوظة للتوكين: الحمولة، أو رفع الرفض المحفوظ، أو None"""
+    cached_payload = get_token_cache().get(token)
+    if cached_payload is not None:
+        ensure_not_revoked(cached_payload, token)
+        return cached_payload
+    rejection = get_negative_token_cache().get(token)
+    if rejection is not None:
+        raise exceptions.AuthenticationFailed(rejection['detail'])
+    return None
+
+
+def accept_payload(payload, token):
+    """التحقق من الإلغاء ثم حفظ الحمولة"""
+    ensure_not_revoked(payload, token)
+    get_token_cache().set(token, payload)
+
+
+def reject(token, detail):
+    """تسجيل رفض التوكين في الذاكرة السلبية ثم رفع الخطأ"""
+    get_negative_token_cache().set(token, {'detail': detail})
+    raise exceptions.AuthenticationFailed(detail)
+
+
+# عميل واحد لكل حلقة أحداث: اتصالات httpx مرتبطة بالحلقة التي أنشأتها
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_auth_client():
+    """
+    عميل خدمة المصادقة الخاص بحلقة الأحداث الحالية
+    Return the auth-service client bound to the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncAuthServiceClient()
+        _clients[loop] = client
+    return client
+
+
+async def aauthenticate_credentials(token):
+    """
+    النسخة غير المتزامنة من JWTAuthentication.authenticate_credentials
+    Async counterpart of JWTAuthentication.authenticate_credentials
+    """
+    # لا استدعاء متزامن على الحلقة: الذاكرة المشتركة وقائمة الإلغاء قد تحتاج شبكة
+    cached_payload = await off_loop(cached_credentials)(token)
+    if cached_payload is not None:
+        return (AdminUser(cached_payload), token)
+
+    try:
+        # فك التشفير في خيط منفصل لأن تحديث مفاتيح JWKS قد يحتاج طلب شبكة
+        payload = await off_loop(decode_token)(token)
+    except jwt.ExpiredSignatureError:
+        raise exceptions.AuthenticationFailed('Token has expired.')
+    except jwt.InvalidTokenError:
+        user_data = await get_async_auth_client().verify(token)
+        return (AdminUser(user_data), token)
+    except Exception as e:
+        logger.error(f"JWT Authentication error: {str(e)}")
+        raise exceptions.AuthenticationFailed('Invalid token.')
+
+    if payload.get('user_type') != 'admin':
+        raise exceptions.AuthenticationFailed('Access denied. Admin privileges required.')
+
+    await off_loop(accept_payload)(payload, token)
+    return (AdminUser(payload), token)
+
+
+def get_bearer_token(request):
+    """استخراج توكين Bearer من الطلب إن كان الرأس سليماً"""
+    parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(parts) == 2 and parts[0].lower() == 'bearer':
+        return parts[1]
+    return None
+
+
+class AsyncJWTAuthenticationMiddleware:
+    """
+    وسيط يتحقق من التوكين قبل الوصول للعرض المتزامن
+    Authenticate bearer tokens on the event loop before DRF runs.
+
+    Under ASGI the result is attached to the request and reused by
+    JWTAuthentication, so the sync view thread never waits on the auth
+    service. Under WSGI the middleware is a no-op and the sync path applies.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        token = get_bearer_token(request)
+        if token:
+            try:
+                request._admin_auth = await aauthenticate_credentials(token)
+            except exceptions.AuthenticationFailed as e:
+                request._admin_auth_error = e
+        return await self.get_response(request)
@@ -7,19 +7,65 @@ import jwt
 import requests
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from rest_framework import authentication, exceptions
 from rest_framework.authentication import BaseAuthentication
 from datetime import datetime, timedelta
+from functools import lru_cache
 import logging
 
+from .jwks import decode_token
+from .revocation import is_token_revoked
+from .singleflight import get_verification_flight
+from .token_cache import get_negative_token_cache, get_token_cache, token_digest
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def resolve_permissions(permissions, groups):
+    """
+    توسيع صلاحيات المجموعات مرة واحدة لكل مجموعة صلاحيات
+    Expand group permissions once and index them by app label.
+
+    ``permissions`` and ``groups`` are tuples so the result can be cached;
+    every token carrying the same permission set reuses the same frozensets.
+    """
+    group_permissions = settings.ADMIN_GROUP_PERMISSIONS
+    expanded = set(permissions)
+    for group in groups:
+        expanded.update(group_permissions.get(group, ()))
+    app_labels = frozenset(perm.split('.', 1)[0] for perm in expanded if '.' in perm)
+    return frozenset(expanded), app_labels
+
+
+@receiver(setting_changed)
+def _clear_permission_cache(setting, **kwargs):
+    if setting == 'ADMIN_GROUP_PERMISSIONS':
+        resolve_permissions.cache_clear()
+
+
+def ensure_not_revoked(payload, token):
+    """
+    رفض التوكين الملغى
+    Raise AuthenticationFailed if the token appears in the revocation list
+    """
+    if is_token_revoked(payload, token):
+        raise exceptions.AuthenticationFailed('Token has been revoked.')
+
+
 class AdminUser:
     """
     فئة المستخدم الأدمن المخصصة
     Custom Admin User class for JWT authentication
     """
+    __slots__ = (
+        'id', 'username', 'email', 'first_name', 'last_name', 'user_type',
+        'is_active', 'is_staff', 'is_superuser', 'permissions', 'groups',
+        'app_labels',
+    )
+
     def __init__(self, user_data):
         self.id = user_data.get('user_id')
         self.username = user_data.get('username')
@@ -30,8 +76,11 @@ class AdminUser:
         self.is_active = user_data.get('is_active', True)
         self.is_staff = user_data.get('is_staff', True)
         self.is_superuser = user_data.get('is_superuser', False)
-        self.permissions = user_data.get('permissions', [])
-        self.groups = user_data.get('groups', [])
+        self.groups = tuple(user_data.get('groups') or ())
+        # صلاحيات مجمدة مع فهرس مسبق لأسماء التطبيقات للفحص في O(1)
+        self.permissions, self.app_labels = resolve_permissions(
+            tuple(user_data.get('permissions') or ()), self.groups
+        )
         
     def is_authenticated(self):
         return True
@@ -39,19 +88,17 @@ class AdminUser:
     def is_anonymous(self):
         return False
         
-    def has_perm(self, perm):
+    def has_perm(self, perm, obj=None):
         """التحقق من صلاحية معينة"""
-        return perm in self.permissions or self.is_superuser
+        return self.is_superuser or perm in self.permissions
         
-    def has_perms(self, perms):
+    def has_perms(self, perms, obj=None):
         """التحقق من عدة صلاحيات"""
-        return all(self.has_perm(perm) for perm in perms)
+        return self.is_superuser or self.permissions.issuperset(perms)
         
     def has_module_perms(self, app_label):
         """التحقق من صلاحيات تطبيق معين"""
-        return self.is_superuser or any(
-            perm.startswith(f'{app_label}.') for perm in self.permissions
-        )
+        return self.is_superuser or app_label in self.app_labels
         
     def get_full_name(self):
         """الحصول على الاسم الكامل"""
@@ -93,7 +140,15 @@ class JWTAuthentication(BaseAuthentication):
         except UnicodeError:
             msg = 'Invalid token header. Token string should not contain invalid characters.'
             raise exceptions.AuthenticationFailed(msg)
-            
+
+        # تحت ASGI يكون الوسيط غير المتزامن قد تحقق من التوكين مسبقاً
+        authenticated = getattr(request, '_admin_auth', None)
+        if authenticated is not None and authenticated[1] == token:
+            return authenticated
+        auth_error = getattr(request, '_admin_auth_error', None)
+        if auth_error is not None:
+            raise auth_error
+
         return self.authenticate_credentials(token)
         
     def authenticate_credentials(self, token):
@@ -101,13 +156,15 @@ class JWTAuthentication(BaseAuthentication):
         التحقق من صحة التوكين وإرجاع المستخدم
         Authenticate the token and return user
         """
+        # التوكينات التي تم التحقق منها مسبقاً لا تحتاج فك تشفير أو طلب شبكة
+        cached_payload = get_token_cache().get(token)
+        if cached_payload is not None:
+            ensure_not_revoked(cached_payload, token)
+            return (AdminUser(cached_payload), token)
+
         try:
-            # محاولة فك تشفير التوكين محلياً أولاً
-            payload = jwt.decode(
-                token, 
-                settings.JWT_SECRET_KEY, 
-                algorithms=[settings.JWT_ALGORITHM]
-            )
+            # محاولة فك تشفير التوكين محلياً أولاً (HMAC أو مفاتيح JWKS العامة)
+            payload = decode_token(token)
             
             # التحقق من انتهاء صلاحية التوكين
             exp_timestamp = payload.get('exp')
@@ -118,12 +175,18 @@ class JWTAuthentication(BaseAuthentication):
             user_type = payload.get('user_type')
             if user_type != 'admin':
                 raise exceptions.AuthenticationFailed('Access denied. Admin privileges required.')
+
+            # التحقق من عدم إلغاء التوكين (مرشح Bloom محلي)
+            ensure_not_revoked(payload, token)
                 
             # إنشاء كائن المستخدم
             user = AdminUser(payload)
+            get_token_cache().set(token, payload)
             
             return (user, token)
             
+        except exceptions.AuthenticationFailed:
+            raise
         except jwt.ExpiredSignatureError:
             raise exceptions.AuthenticationFailed('Token has expired.')
         except jwt.InvalidTokenError:
@@ -136,14 +199,32 @@ class JWTAuthentication(BaseAuthentication):
     def verify_with_auth_service(self, token):
         """
         التحقق من التوكين مع خدمة المصادقة
-        Verify token with authentication service
+        Verify token with authentication service.
+
+        Tokens recently rejected are answered from the negative cache, and
+        concurrent verifications of the same token share one remote call.
+        """
+        rejection = get_negative_token_cache().get(token)
+        if rejection is not None:
+            raise exceptions.AuthenticationFailed(rejection['detail'])
+
+        return get_verification_flight().do(
+            token_digest(token),
+            lambda: self._verify_remote(token),
+            poll=lambda: self._shared_verification_result(token),
+        )
+
+    def _verify_remote(self, token):
+        """
+        طلب التحقق الفعلي من خدمة المصادقة
+        Perform the remote verification call
         """
         try:
             auth_service_url = settings.AUTH_SERVICE_URL
             response = requests.post(
                 f"{auth_service_url}/api/v1/auth/verify-token/",
                 headers={'Authorization': f'Bearer {token}'},
-                timeout=10
+                timeout=settings.AUTH_SERVICE_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -151,19 +232,43 @@ class JWTAuthentication(BaseAuthentication):
                 
                 # التحقق من نوع المستخدم
                 if user_data.get('user_type') != 'admin':
-                    raise exceptions.AuthenticationFailed('Access denied. Admin privileges required.')
+                    self._reject(token, 'Access denied. Admin privileges required.')
                     
                 user = AdminUser(user_data)
+                get_token_cache().set(token, user_data)
                 return (user, token)
             else:
-                raise exceptions.AuthenticationFailed('Invalid token.')
+                self._reject(token, 'Invalid token.')
                 
+        except exceptions.AuthenticationFailed:
+            raise
         except requests.RequestException as e:
             logger.error(f"Auth service verification failed: {str(e)}")
             raise exceptions.AuthenticationFailed('Authentication service unavailable.')
         except Exception as e:
             logger.error(f"Token verification error: {str(e)}")
             raise exceptions.AuthenticationFailed('Token verification failed.')
+
+    def _reject(self, token, detail):
+        """
+        تسجيل رفض التوكين في الذاكرة السلبية ثم رفع الخطأ
+        Remember a definitive rejection so repeat attempts skip the auth service
+        """
+        get_negative_token_cache().set(token, {'detail': detail})
+        raise exceptions.AuthenticationFailed(detail)
+
+    def _shared_verification_result(self, token):
+        """
+        نتيجة التحقق التي نشرتها عملية أخرى عبر Redis، أو None
+        Result published by the worker holding the verification lock
+        """
+        payload = get_token_cache().get(token)
+        if payload is not None:
+            return (AdminUser(payload), token)
+        rejection = get_negative_token_cache().get(token)
+        if rejection is not None:
+            raise exceptions.AuthenticationFailed(rejection['detail'])
+        return None
             
     def authenticate_header(self, request):
         """
@@ -207,11 +312,7 @@ def decode_admin_token(token):
     Decode admin JWT token
     """
     try:
-        payload = jwt.decode(
-            token, 
-            settings.JWT_SECRET_KEY, 
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_token(token)
         return payload
     except jwt.ExpiredSignatureError:
         raise exceptions.AuthenticationFailed('Token has expired.')
@@ -228,16 +329,36 @@ class AdminPermissionMixin:
     def check_admin_permission(self, request, required_permission=None):
         """
         التحقق من صلاحيات الأدمن
-        Check admin permissions
+        Check admin permissions.
+
+        ``required_permission`` may be a single permission or an iterable of
+        permissions that must all be held.
         """
         if not hasattr(request, 'user') or not request.user.is_authenticated():
             raise exceptions.PermissionDenied('Authentication required.')
             
-        if request.user.user_type != 'admin':
+        user = request.user
+        if user.user_type != 'admin':
             raise exceptions.PermissionDenied('Admin privileges required.')
             
-        if required_permission and not request.user.has_perm(required_permission):
-            raise exceptions.PermissionDenied(f'Permission required: {required_permission}')
+        if required_permission and not user.is_superuser:
+            if isinstance(required_permission, str):
+                required_permission = (required_permission,)
+            missing = [perm for perm in required_permission if perm not in user.permissions]
+            if missing:
+                raise exceptions.PermissionDenied(f'Permission required: {", ".join(missing)}')
+            
+        return True
+
+    def check_module_permission(self, request, app_label):
+        """
+        التحقق من وجود أي صلاحية على تطبيق معين
+        Check the admin holds at least one permission in ``app_label``
+        """
+        self.check_admin_permission(request)
+        
+        if not request.user.has_module_perms(app_label):
+            raise exceptions.PermissionDenied(f'Permission required for: {app_label}')
             
         return True
         
@@ -252,3 +373,18 @@ class AdminPermissionMixin:
             raise exceptions.PermissionDenied('Superuser privileges required.')
             
         return True
+
+    # النسخ غير المتزامنة: الفحوصات كلها بحث في مجموعات داخل الذاكرة بدون
+    # قاعدة بيانات أو شبكة، لذا تُنفذ مباشرة على حلقة الأحداث دون خيط إضافي
+
+    async def acheck_admin_permission(self, request, required_permission=None):
+        """التحقق من صلاحيات الأدمن (غير متزامن)"""
+        return self.check_admin_permission(request, required_permission)
+
+    async def acheck_module_permission(self, request, app_label):
+        """التحقق من صلاحيات تطبيق معين (غير متزامن)"""
+        return self.check_module_permission(request, app_label)
+
+    async def acheck_superuser_permission(self, request):
+        """التحقق من صلاحيات المدير العام (غير متزامن)"""
+        return self.check_superuser_permission(request)
@@ -0,0 +1,64 @@
+"""
+مرشح Bloom المشترك - خدمة الأدمن - نائبك.كوم
+Compact Bloom filter shared by the revocation list and the action archive
+
+المرشح يجيب "غير موجود قطعاً" أو "ربما موجود" بحجم ثابت يُحدد من السعة
+المتوقعة ونسبة الإيجابيات الكاذبة، ويمكن تسلسله للتخزين في قاعدة البيانات.
+"""
+
+import hashlib
+import math
+import struct
+
+
+class BloomFilter:
+    """
+    مرشح Bloom بمصفوفة بتات مدمجة
+    Compact Bloom filter sized from expected capacity and false-positive rate
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # تجزئة مزدوجة: k موضع من بصمة واحدة
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        """إضافة عنصر للمرشح"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        """حجم المرشح بالبايت"""
+        return len(self._bits)
+
+    def to_bytes(self):
+        """تسلسل المرشح للتخزين"""
+        return struct.pack('>QHQ', self.size, self.hash_count, self.count) + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """استعادة مرشح مُسلسل بواسطة to_bytes"""
+        data = bytes(data)
+        header = struct.calcsize('>QHQ')
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hash_count, bloom.count = struct.unpack('>QHQ', data[:header])
+        bloom._bits = bytearray(data[header:])
+        return bloom
@@ -0,0 +1,171 @@
+"""
+روابط تحميل ملفات التصدير - خدمة الأدمن - نائبك.كوم
+Signed, self-expiring export download links
+
+الرابط يحمل اسم الملف ووقت انتهائه وتوقيع HMAC لهما، فالتحقق منه لا يحتاج
+قاعدة البيانات ولا خدمة المصادقة. الملف يُرسل عبر FileResponse (os.sendfile
+تحت gunicorn) أو يُسلَّم للخادم الأمامي بـ X-Accel-Redirect، مع دعم طلبات
+Range لاستئناف التحميل.
+"""
+
+import base64
+import hmac
+import os
+import re
+import time
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
+from django.utils.http import http_date
+
+# اسم ملف التصدير كما يكتبه export_path: <export_id>.<الامتداد>، ولا شيء غيره
+DOWNLOAD_NAME = re.compile(
+    r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.(csv|xlsx|pdf|zip)$'
+)
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+    'zip': 'application/zip',
+}
+SIGNATURE_SALT = 'complaints_admin.export_downloads'
+
+
+class RangeNotSatisfiable(Exception):
+    """مدى يبدأ بعد نهاية الملف"""
+
+
+def download_signature(name, expires):
+    """توقيع HMAC-SHA256 لاسم الملف ووقت الانتهاء (base64 للروابط)"""
+    digest = salted_hmac(
+        SIGNATURE_SALT, f'{name}:{expires}', secret=settings.EXPORT_DOWNLOAD_SECRET, algorithm='sha256'
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')
+
+
+def signed_download_url(file_path, expires_at):
+    """رابط تحميل موقَّع ينتهي في expires_at"""
+    name = os.path.basename(file_path)
+    expires = int(expires_at.timestamp())
+    url = reverse('complaint-export-download', args=[name])
+    return f'{url}?expires={expires}&signature={download_signature(name, expires)}'
+
+
+def check_signature(name, expires, signature):
+    """
+    صحة الرابط بدون قاعدة البيانات
+    Returns ``'invalid'``, ``'expired'`` or ``None`` for a usable link
+    """
+    if not DOWNLOAD_NAME.match(name) or not expires.isdigit():
+        return 'invalid'
+    if not hmac.compare_digest(download_signature(name, expires), signature):
+        return 'invalid'
+    if int(expires) < time.time():
+        return 'expired'
+    return None
+
+
+def parse_range(header, size):
+    """
+    المدى المطلوب (start, end) شاملاً، أو None لإرسال الملف كاملاً
+    Only a single ``bytes`` range is honoured; malformed or multi-range
+    headers are ignored (the whole file is sent), as RFC 9110 allows
+    """
+    if not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    if not (first or last).isdigit() or (first and last and not last.isdigit()):
+        return None
+    if not first:
+        # آخر N بايت
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+class FileRange:
+    """
+    نافذة قراءة على ملف مفتوح
+    Reads stop at the end of the range. ``fileno`` lets the WSGI file wrapper
+    sendfile() from the current offset, bounded by Content-Length
+    """
+
+    def __init__(self, handle, start, length):
+        handle.seek(start)
+        self.handle = handle
+        self.remaining = length
+
+    def fileno(self):
+        return self.handle.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
+
+
+def download_response(request, name):
+    """
+    استجابة تحميل ملف التصدير name
+    With EXPORT_DOWNLOAD_ACCEL_PREFIX the front proxy serves the file (and
+    its ranges) from an internal location; otherwise FileResponse streams it
+    """
+    extension = name.rsplit('.', 1)[1]
+    content_type = CONTENT_TYPES[extension]
+    file_name = f'complaints-{name}'
+    if settings.EXPORT_DOWNLOAD_ACCEL_PREFIX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{settings.EXPORT_DOWNLOAD_ACCEL_PREFIX.rstrip('/')}/{name}"
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        return response
+
+    try:
+        handle = open(os.path.join(settings.EXPORT_ROOT, name), 'rb')
+    except FileNotFoundError:
+        raise Http404('ملف التصدير غير موجود')
+    stat = os.fstat(handle.fileno())
+    size = stat.st_size
+    etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+    last_modified = http_date(stat.st_mtime)
+
+    byte_range = None
+    header = request.headers.get('Range', '')
+    # If-Range: المدى صالح فقط إن لم يتغير الملف منذ التحميل الجزئي
+    if header and request.headers.get('If-Range', etag) in (etag, last_modified):
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            handle.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(handle, start, end - start + 1), status=206, content_type=content_type,
+            as_attachment=True, filename=file_name,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(handle, content_type=content_type, as_attachment=True, filename=file_name)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response
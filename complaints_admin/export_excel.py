@@ -0,0 +1,130 @@
+"""
+تصدير الشكاوى إلى Excel - خدمة الأدمن - نائبك.كوم
+Write-only XLSX export with summary sheets
+
+ورقة الشكاوى تُكتب بوضع openpyxl للكتابة فقط: كل صف يُسلسل إلى ملف مؤقت فوراً
+ولا يُحتفظ بالخلايا في الذاكرة. أوراق الملخص (حسب الحالة والتصنيف والنائب
+والأولوية) تُحسب بـ pandas groupby على دفعات ثابتة الحجم من الصفوف المُصدرة
+وتُجمع تراكمياً، فالذاكرة محدودة بعدد القيم المختلفة لا بعدد الصفوف.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from .export_sources import EXPORT_COLUMNS, iter_export_rows
+
+SUMMARY_CHUNK_ROWS = 5000
+NOT_SET = 'غير محدد'
+
+# ورقة الملخص -> (عنوان العمود، دالة القيمة من الصف)
+SUMMARIES = {
+    'حسب الحالة': ('الحالة', lambda row: row.get('status')),
+    'حسب التصنيف': ('التصنيف', lambda row: row.get('category')),
+    'حسب النائب': (
+        'النائب',
+        lambda row: row.get('assigned_to_representative_name') or row.get('assigned_to_representative_id'),
+    ),
+    'حسب الأولوية': ('الأولوية', lambda row: row.get('priority_level')),
+}
+
+
+def excel_value(value):
+    """قيمة خلية مقبولة في Excel (بدون مناطق زمنية)"""
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+class SummaryAccumulator:
+    """
+    عدّ الصفوف حسب أبعاد الملخص على دفعات
+    Buffers the summary columns and folds each full chunk into running
+    pandas groupby counts
+    """
+
+    def __init__(self, chunk_rows=SUMMARY_CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+        self.buffer = []
+        self.counts = {name: pd.Series(dtype='int64') for name in SUMMARIES}
+        self.total = 0
+
+    def add(self, row):
+        self.buffer.append([value(row) for _, value in SUMMARIES.values()])
+        if len(self.buffer) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        frame = pd.DataFrame(self.buffer, columns=list(SUMMARIES)).fillna(NOT_SET).astype(str)
+        frame = frame.replace('', NOT_SET)
+        for name in SUMMARIES:
+            chunk = frame.groupby(name).size()
+            self.counts[name] = self.counts[name].add(chunk, fill_value=0).astype('int64')
+        self.total += len(frame)
+        self.buffer = []
+
+    def tables(self):
+        """(اسم الورقة، عنوان العمود، [(القيمة، العدد، النسبة)]) مرتبة تنازلياً"""
+        self.flush()
+        for name, (label, _) in SUMMARIES.items():
+            counts = self.counts[name].sort_values(ascending=False, kind='stable')
+            percentages = (counts / self.total * 100).round(2) if self.total else counts * 0.0
+            yield name, label, list(zip(counts.index, counts.tolist(), percentages.tolist()))
+
+
+def header_row(sheet, titles):
+    cells = []
+    for title in titles:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = Font(bold=True)
+        cells.append(cell)
+    return cells
+
+
+def write_excel(export, stream, progress=None):
+    """
+    كتابة مصنف التصدير في ملف ثنائي مفتوح
+    Write the complaints sheet row by row, then one summary sheet per dimension
+    """
+    workbook = Workbook(write_only=True)
+    try:
+        sheet = workbook.create_sheet('الشكاوى')
+        sheet.sheet_view.rightToLeft = True
+        sheet.append(header_row(sheet, EXPORT_COLUMNS))
+
+        summary = SummaryAccumulator()
+        for row in iter_export_rows(export, progress):
+            sheet.append([excel_value(row.get(column)) for column in EXPORT_COLUMNS])
+            summary.add(row)
+
+        for name, label, rows in summary.tables():
+            summary_sheet = workbook.create_sheet(name)
+            summary_sheet.sheet_view.rightToLeft = True
+            summary_sheet.append(header_row(summary_sheet, [label, 'عدد الشكاوى', 'النسبة %']))
+            for values in rows:
+                summary_sheet.append(list(values))
+            summary_sheet.append(
+                header_row(summary_sheet, ['الإجمالي', summary.total, 100.0 if summary.total else 0.0])
+            )
+    except Exception:
+        discard(workbook)
+        raise
+    workbook.save(stream)
+
+
+def discard(workbook):
+    """حذف الملفات المؤقتة لأوراق لم تُحفظ"""
+    for worksheet in workbook.worksheets:
+        if worksheet._writer is None:
+            continue
+        if not worksheet.closed:
+            worksheet.close()
+        worksheet._writer.cleanup()
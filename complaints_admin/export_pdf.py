@@ -0,0 +1,246 @@
+"""
+تصدير الشكاوى إلى PDF - خدمة الأدمن - نائبك.كوم
+Parallel chunked PDF export
+
+reportlab يرسم صفحة بعد صفحة في خيط واحد، لذا تُقسم الشكاوى إلى أجزاء بعدد
+صفحات ثابت يُرسم كل منها في ملف مستقل داخل مجمع عمليات، ثم تُدمج الأجزاء
+بالترتيب في ملف واحد. كل عامل يسجل الخط ويهيئ مشكّل النص العربي مرة واحدة
+عند بدئه، ونتائج التشكيل تُحفظ في ذاكرة مؤقتة لأن القيم (الحالة، التصنيف،
+المحافظة، أسماء النواب) تتكرر كثيراً. كل صفحة تحمل عدداً ثابتاً من الشكاوى،
+فرقم أول صفحة في كل جزء معروف قبل رسمه.
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, lru_cache
+
+import arabic_reshaper
+from bidi.algorithm import get_display
+from django.conf import settings
+from django.utils import timezone
+from pypdf import PdfWriter
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .export_sources import iter_export_rows
+
+logger = logging.getLogger(__name__)
+
+COMPLAINTS_PER_PAGE = 10
+MARGIN = 40
+LINE_HEIGHT = 14
+BLOCK_HEIGHT = 4 * LINE_HEIGHT + 12
+TITLE_LENGTH = 90
+ARABIC = re.compile('[\u0600-\u06ff\u0750-\u077f\ufb50-\ufdff\ufe70-\ufeff]')
+
+# (الحقل، العنوان) في أسطر كتلة الشكوى بعد العنوان، من اليمين لليسار
+BLOCK_LINES = [
+    [('complaint_id', 'رقم الشكوى'), ('status', 'الحالة'), ('category', 'التصنيف')],
+    [('governorate', 'المحافظة'), ('citizen_name', 'المواطن'), ('created_at', 'تاريخ الإنشاء')],
+    [('assigned_to_representative_name', 'النائب'), ('priority_level', 'الأولوية'),
+     ('last_action_at', 'آخر إجراء')],
+]
+PDF_FIELDS = ['title'] + [field for line in BLOCK_LINES for field, _ in line]
+
+
+def pdf_value(value):
+    """تمثيل نصي مختصر لقيمة في التقرير"""
+    if value is None or value == '':
+        return '-'
+    if hasattr(value, 'tzinfo') and hasattr(value, 'hour'):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def pdf_row(row):
+    """صف مختصر قابل للإرسال للعمال (نصوص فقط)"""
+    return tuple(pdf_value(row.get(field)) for field in PDF_FIELDS)
+
+
+class ArabicShaper(arabic_reshaper.ArabicReshaper):
+    """
+    مشكّل يبني تعبير الحروف المركبة مرة واحدة
+    The upstream property rebuilds the ligature regex from its config on
+    every reshape(), which dominates rendering time
+    """
+
+    @cached_property
+    def _ligatures_re(self):
+        return super()._ligatures_re
+
+
+class PdfRenderer:
+    """
+    راسم أجزاء التقرير
+    Draws complaint blocks with reportlab; the font is registered and the
+    Arabic shaper built once per renderer (one renderer per process)
+    """
+
+    def __init__(self, font_path=''):
+        self.font = 'Helvetica'
+        if font_path:
+            self.font = 'ExportFont'
+            if self.font not in pdfmetrics.getRegisteredFontNames():
+                pdfmetrics.registerFont(TTFont(self.font, font_path))
+        self.reshaper = ArabicShaper()
+        self.shape = lru_cache(maxsize=65536)(self._shape)
+
+    def _shape(self, text):
+        """ترتيب العرض وأشكال الحروف العربية المتصلة"""
+        if not ARABIC.search(text):
+            return text
+        return get_display(self.reshaper.reshape(text))
+
+    def render(self, rows, first_page, path, heading):
+        """رسم صفوف جزء في ملف PDF، يعيد عدد الصفحات"""
+        width, height = A4
+        pdf = canvas.Canvas(path, pagesize=A4, pageCompression=1)
+        column_width = (width - 2 * MARGIN) / 3
+        page = first_page
+        # جزء فارغ (تصدير بلا شكاوى) يُرسم صفحة عنوان واحدة
+        for start in range(0, max(len(rows), 1), COMPLAINTS_PER_PAGE):
+            pdf.setFont(self.font, 12)
+            pdf.drawRightString(width - MARGIN, height - MARGIN, self.shape(heading))
+            pdf.setFont(self.font, 8)
+            pdf.drawString(MARGIN, MARGIN / 2, str(page))
+            top = height - MARGIN - 2 * LINE_HEIGHT
+            for row in rows[start:start + COMPLAINTS_PER_PAGE]:
+                values = dict(zip(PDF_FIELDS, row))
+                pdf.setFont(self.font, 11)
+                pdf.drawRightString(width - MARGIN, top, self.shape(values['title'][:TITLE_LENGTH]))
+                pdf.setFont(self.font, 9)
+                for line_number, line in enumerate(BLOCK_LINES, start=1):
+                    y = top - line_number * LINE_HEIGHT
+                    for column, (field, label) in enumerate(line):
+                        pdf.drawRightString(
+                            width - MARGIN - column * column_width, y, self.shape(f'{label}: {values[field]}')
+                        )
+                pdf.line(MARGIN, top - BLOCK_HEIGHT + 10, width - MARGIN, top - BLOCK_HEIGHT + 10)
+                top -= BLOCK_HEIGHT
+            pdf.showPage()
+            page += 1
+        pdf.save()
+        return page - first_page
+
+
+_renderer = None
+
+
+def init_worker(font_path):
+    """تهيئة راسم العملية (مُهيئ مجمع العمليات)"""
+    global _renderer
+    _renderer = PdfRenderer(font_path)
+
+
+def render_chunk(rows, first_page, path, heading):
+    return _renderer.render(rows, first_page, path, heading)
+
+
+def chunk_rows_count(chunk_pages=None):
+    return max(1, chunk_pages or settings.EXPORT_PDF_CHUNK_PAGES) * COMPLAINTS_PER_PAGE
+
+
+def render_pdf(rows, path, heading, workers=1, chunk_pages=None, font_path=None, on_chunk=None):
+    """
+    رسم صفوف مختصرة (pdf_row) في ملف واحد
+    Render chunks of ``rows`` in ``workers`` processes (in this process
+    when 1), keeping at most two chunks per worker in flight, then merge
+    them into ``path``. ``on_chunk(rows, size)`` is called as chunks finish,
+    in order. Returns the number of pages.
+    """
+    font_path = settings.EXPORT_PDF_FONT if font_path is None else font_path
+    size = chunk_rows_count(chunk_pages)
+    if workers > 1 and multiprocessing.current_process().daemon:
+        # عمليات Celery (prefork) لا يمكنها إنشاء عمليات فرعية؛ طابور exports يُخدم بـ --pool=solo
+        logger.warning(
+            'PDF export running inside a daemon process; rendering serially '
+            '(run the exports queue with --pool=solo)'
+        )
+        workers = 1
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(path) or None) as directory:
+        parts = []
+
+        def chunks():
+            chunk, first_page = [], 1
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == size:
+                    yield chunk, first_page
+                    first_page += size // COMPLAINTS_PER_PAGE
+                    chunk = []
+            if chunk or first_page == 1:
+                yield chunk, first_page
+
+        def finished(chunk, part):
+            parts.append(part)
+            if on_chunk:
+                on_chunk(len(chunk), os.path.getsize(part))
+
+        if workers > 1:
+            # مع fork تُنشأ كل العمليات عند أول طلب، فننشئها قبل أن يبدأ مصدر الصفوف خيوطه
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                                     initargs=(font_path,)) as pool:
+                pool.submit(int).result()
+                pending = deque()
+                for index, (chunk, first_page) in enumerate(chunks()):
+                    part = os.path.join(directory, f'{index:06d}.pdf')
+                    pending.append((chunk, part, pool.submit(render_chunk, chunk, first_page, part, heading)))
+                    while len(pending) > workers * 2:
+                        chunk, part, future = pending.popleft()
+                        future.result()
+                        finished(chunk, part)
+                while pending:
+                    chunk, part, future = pending.popleft()
+                    future.result()
+                    finished(chunk, part)
+        else:
+            renderer = PdfRenderer(font_path)
+            for index, (chunk, first_page) in enumerate(chunks()):
+                part = os.path.join(directory, f'{index:06d}.pdf')
+                renderer.render(chunk, first_page, part, heading)
+                finished(chunk, part)
+
+        merged = PdfWriter()
+        for part in parts:
+            merged.append(part)
+        with open(path, 'wb') as stream:
+            merged.write(stream)
+        return len(merged.pages)
+
+
+def write_pdf(export, path, progress=None, workers=None):
+    """
+    كتابة تقرير PDF للتصدير في path
+    Rows are read in this process; chunks are rendered in
+    EXPORT_PDF_WORKERS processes and progress advances as each one finishes
+    """
+    workers = max(1, workers or settings.EXPORT_PDF_WORKERS)
+    heading = f'تقرير الشكاوى - {timezone.localtime():%Y-%m-%d}'
+
+    def on_chunk(rows, size):
+        if progress:
+            progress.bytes += size
+            progress.advance(rows)
+
+    try:
+        render_pdf(
+            (pdf_row(row) for row in iter_export_rows(export)), path, heading,
+            workers=workers, on_chunk=on_chunk,
+        )
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
@@ -0,0 +1,294 @@
+"""
+مصادر صفوف تصدير الشكاوى - خدمة الأدمن - نائبك.كوم
+Row sources for complaint exports
+
+المصدر الافتراضي هو خدمة الشكاوى: الصفحات تُجلب بالتوازي مع حد أقصى للصفحات
+المُحمّلة مسبقاً، وتُقرأ بالترتيب، لذا الذاكرة محدودة بعدد صفحات ثابت مهما كان
+حجم التصدير. كل صفحة تُكمَّل من جدول الحالة الحالية المحلي باستعلام واحد.
+المصدر المحلي يقرأ جدول الحالة الحالية مباشرة بمؤشر من جهة الخادم (iterator).
+كل مصدر يعرض موضع آخر صف أعاده (position) ويقبل موضعاً يبدأ بعده (start)،
+فالتصدير المتوقف يُستأنف من نقطة الاستئناف المحفوظة.
+
+تصدير الفروق (filter_criteria['since_export']) يقرأ فقط ما تغير بعد علامة
+التصدير الأساس: الشكاوى المعدلة في خدمة الشكاوى (updated_after) ثم الشكاوى
+التي تغيرت حالتها الإدارية محلياً (فهرس updated_at)، فالتكلفة تتبع حجم التغييرات.
+"""
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+
+from .models import ComplaintCurrentState
+
+logger = logging.getLogger(__name__)
+
+# أعمدة الملف بالترتيب: الحقول من خدمة الشكاوى ثم حالة الإدارة المحلية
+SERVICE_COLUMNS = [
+    'complaint_id', 'title', 'status', 'category', 'governorate', 'citizen_name', 'created_at',
+]
+STATE_COLUMNS = [
+    'last_action_type', 'last_action_at', 'assigned_to_representative_id',
+    'assigned_to_representative_name', 'priority_level', 'expected_resolution_date', 'action_count',
+]
+EXPORT_COLUMNS = SERVICE_COLUMNS + STATE_COLUMNS
+
+# معايير التصفية المدعومة محلياً -> شرط ORM على جدول الحالة
+LOCAL_FILTERS = {
+    'complaint_ids': 'complaint_id__in',
+    'priority_level': 'priority_level',
+    'assigned_to_representative_id': 'assigned_to_representative_id',
+    'last_action_type': 'last_action_type',
+    'date_from': 'last_action_at__gte',
+    'date_to': 'last_action_at__lt',
+}
+# مفاتيح داخلية في filter_criteria لا تُرسل لخدمة الشكاوى
+RESERVED_CRITERIA = {'source', 'since_export'}
+
+
+class ExportSourceError(Exception):
+    """فشل قراءة مصدر التصدير"""
+
+
+def state_rows(complaint_ids):
+    """حالة الإدارة المحلية لمجموعة شكاوى"""
+    rows = ComplaintCurrentState.objects.filter(complaint_id__in=complaint_ids).values(
+        'complaint_id', *STATE_COLUMNS
+    )
+    return {row['complaint_id']: row for row in rows}
+
+
+class ServiceComplaintSource:
+    """
+    صفحات خدمة الشكاوى مع تحميل مسبق محدود
+    Pages through the complaints service, keeping at most ``prefetch`` page
+    requests in flight and yielding rows strictly in page order. A position
+    is the page (number or cursor URL) and the last complaint read from it.
+    """
+    path = '/api/v1/complaints/'
+
+    def __init__(self, criteria=None, page_size=None, prefetch=None, timeout=None, retries=2, start=None):
+        self.criteria = {
+            key: value for key, value in (criteria or {}).items() if key not in RESERVED_CRITERIA
+        }
+        self.page_size = page_size or settings.EXPORT_PAGE_SIZE
+        self.prefetch = max(1, prefetch or settings.EXPORT_PREFETCH_PAGES)
+        self.timeout = timeout or settings.COMPLAINTS_SERVICE_TIMEOUT
+        self.retries = retries
+        self.url = settings.COMPLAINTS_SERVICE_URL.rstrip('/') + self.path
+        self.session = requests.Session()
+        self.count = None
+        self.start = start or {}
+        self.position = None
+
+    def fetch(self, page=None, url=None):
+        params = None if url else {**self.criteria, 'page': page, 'page_size': self.page_size}
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url or self.url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+            except requests.RequestException as e:
+                if attempt == self.retries:
+                    raise ExportSourceError(f'Complaints service page {page or url} failed: {str(e)}')
+                time.sleep(0.5 * (attempt + 1))
+
+    def pages(self):
+        """(مرجع الصفحة، صفوفها) بالترتيب بدءاً من صفحة الاستئناف"""
+        if self.start.get('url'):
+            first_ref = {'url': self.start['url']}
+            first = self.fetch(url=first_ref['url'])
+        else:
+            first_ref = {'page': self.start.get('page', 1)}
+            first = self.fetch(page=first_ref['page'])
+        self.count = first.get('count')
+        yield first_ref, first.get('results', [])
+        if self.count is None or 'url' in first_ref:
+            # ترقيم بالمؤشر فقط: لا يمكن التحميل المسبق المتوازي
+            next_url = first.get('next')
+            while next_url:
+                page = self.fetch(url=next_url)
+                yield {'url': next_url}, page.get('results', [])
+                next_url = page.get('next')
+            return
+
+        last_page = -(-self.count // self.page_size)
+        with ThreadPoolExecutor(max_workers=self.prefetch) as pool:
+            pending = deque()
+            next_page = first_ref['page'] + 1
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < self.prefetch:
+                    pending.append((next_page, pool.submit(self.fetch, page=next_page)))
+                    next_page += 1
+                number, future = pending.popleft()
+                yield {'page': number}, future.result().get('results', [])
+
+    def __iter__(self):
+        resume_after = self.start.get('complaint_id')
+        try:
+            for ref, page in self.pages():
+                complaints = [
+                    {**row, 'complaint_id': str(row.get('complaint_id') or row.get('id', ''))}
+                    for row in page
+                ]
+                if resume_after:
+                    # تخطي ما كُتب من صفحة الاستئناف (إن تغيرت الصفحة تُقرأ كاملة)
+                    ids = [row['complaint_id'] for row in complaints]
+                    if resume_after in ids:
+                        complaints = complaints[ids.index(resume_after) + 1:]
+                    resume_after = None
+                if not complaints:
+                    continue
+                states = state_rows([row['complaint_id'] for row in complaints])
+                for row in complaints:
+                    self.position = {**ref, 'complaint_id': row['complaint_id']}
+                    yield {**row, **states.get(row['complaint_id'], {})}
+        finally:
+            self.session.close()
+
+
+class LocalComplaintSource:
+    """
+    جدول الحالة الحالية المحلي بمؤشر من جهة الخادم
+    Streams ComplaintCurrentState rows with a server-side cursor
+    """
+
+    def __init__(self, criteria=None, chunk_size=None, since=None, start=None):
+        self.criteria = criteria or {}
+        self.chunk_size = chunk_size or settings.EXPORT_PAGE_SIZE
+        self.since = since
+        self.start = start or {}
+        self.count = None
+        self.position = None
+
+    def queryset(self):
+        filters = {
+            LOCAL_FILTERS[key]: value for key, value in self.criteria.items() if key in LOCAL_FILTERS
+        }
+        if self.since:
+            filters['updated_at__gte'] = self.since
+        if self.start.get('complaint_id'):
+            filters['complaint_id__gt'] = self.start['complaint_id']
+        return ComplaintCurrentState.objects.filter(**filters).order_by('complaint_id')
+
+    def __iter__(self):
+        rows = self.queryset().values('complaint_id', *STATE_COLUMNS)
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            self.position = {'complaint_id': row['complaint_id']}
+            yield row
+
+
+class DeltaComplaintSource:
+    """
+    الشكاوى المتغيرة منذ لحظة
+    Complaints the service reports as updated since ``since``, then the ones
+    whose local admin state changed since then, each complaint once
+    """
+
+    def __init__(self, criteria, since, batch_size=None, start=None):
+        self.criteria = criteria
+        self.since = since
+        self.batch_size = batch_size or settings.EXPORT_PAGE_SIZE
+        self.start = start or {}
+        self.count = None
+        self.position = None
+
+    def updated(self, start=None):
+        return ServiceComplaintSource({**self.criteria, 'updated_after': self.since.isoformat()}, start=start)
+
+    def locally_changed(self):
+        changed = ComplaintCurrentState.objects.filter(updated_at__gte=self.since).order_by('complaint_id')
+        ids = list(changed.values_list('complaint_id', flat=True))
+        if self.criteria.get('complaint_ids'):
+            wanted = set(self.criteria['complaint_ids'])
+            ids = [complaint_id for complaint_id in ids if complaint_id in wanted]
+        return ids
+
+    def __iter__(self):
+        phase = self.start.get('phase')
+        seen = set()
+        if phase:
+            # استئناف: كل معرفات المرحلة الأولى لازمة لتجنب تكرارها في الثانية
+            seen = {row['complaint_id'] for row in self.updated()}
+        if phase != 'local':
+            updated = self.updated(self.start if phase else None)
+            for row in updated:
+                seen.add(row['complaint_id'])
+                self.position = {'phase': 'service', **updated.position}
+                yield row
+        missing = [complaint_id for complaint_id in self.locally_changed() if complaint_id not in seen]
+        if phase == 'local':
+            missing = [complaint_id for complaint_id in missing if complaint_id > self.start['complaint_id']]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            for row in ServiceComplaintSource({**self.criteria, 'complaint_ids': batch}):
+                self.position = {'phase': 'local', 'complaint_id': row['complaint_id']}
+                yield row
+
+
+def delta_since(export):
+    """
+    بداية نافذة الفروق أو None لتصدير كامل
+    The baseline's watermark minus EXPORT_DELTA_OVERLAP_SECONDS, so changes
+    committed while the baseline was being read are repeated, not lost
+    """
+    baseline = export.baseline_export
+    if baseline is None or baseline.watermark_at is None:
+        return None
+    return baseline.watermark_at - timedelta(seconds=settings.EXPORT_DELTA_OVERLAP_SECONDS)
+
+
+def complaint_source(export, start=None):
+    """مصدر صفوف التصدير حسب filter_criteria['source'] أو الإعداد الافتراضي"""
+    criteria = export.filter_criteria or {}
+    source = criteria.get('source', settings.EXPORT_COMPLAINT_SOURCE)
+    since = delta_since(export)
+    if source == 'local':
+        return LocalComplaintSource(criteria, since=since, start=start)
+    if source == 'service':
+        if since:
+            return DeltaComplaintSource(criteria, since, start=start)
+        return ServiceComplaintSource(criteria, start=start)
+    raise ExportSourceError(f'Unknown export source: {source}')
+
+
+def export_manifest(export, **extra):
+    """وصف التصدير وعلاقته بالتصدير الأساس"""
+    baseline = export.baseline_export
+    since = delta_since(export)
+    return {
+        'export_id': str(export.export_id),
+        'export_format': export.export_format,
+        'filter_criteria': export.filter_criteria,
+        'mode': 'delta' if baseline else 'full',
+        'baseline_export_id': str(baseline.export_id) if baseline else None,
+        'changes_since': since.isoformat() if since else None,
+        'watermark_at': export.watermark_at.isoformat() if export.watermark_at else None,
+        'data_version': export.data_version,
+        'total_complaints': export.total_complaints,
+        **extra,
+    }
+
+
+def iter_positioned_rows(export, start=None):
+    """(الصف، موضعه) بالترتيب بدءاً بعد الموضع start"""
+    source = complaint_source(export, start)
+    for row in source:
+        yield row, source.position
+
+
+def iter_export_rows(export, progress=None):
+    """
+    صفوف التصدير مع تسجيل التقدم بعد كل صف
+    Rows after ``progress.start``; once the consumer asks for the next row
+    the previous one counts as written
+    """
+    for row, position in iter_positioned_rows(export, progress.start if progress else None):
+        yield row
+        if progress:
+            progress.position = position
+            progress.advance()
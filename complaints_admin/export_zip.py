@@ -0,0 +1,397 @@
+"""
+تصدير الشكاوى إلى ملف مضغوط - خدمة الأدمن - نائبك.كوم
+Incremental ZIP export with attachments
+
+كل مدخل يُكتب في الأرشيف على القرص فور جاهزيته ويُسجل في ملف journal بجانبه
+(الإزاحة والحجم و CRC)، فإن توقف التصدير يُستأنف من آخر مدخل مكتمل: يُقص
+الملف عند نهايته وتُعاد قراءة المدخلات السابقة دون تنزيلها مرة أخرى. مرفقات
+الشكاوى تُنزل بالتوازي بعدد عمال محدود ونافذة محدودة من الشكاوى، وكل مرفق
+يُكتب في ملف مؤقت (SpooledTemporaryFile) ثم يُنسخ إلى الأرشيف على دفعات، فلا
+يُحتفظ بأي مرفق كامل في الذاكرة. الوسائط المضغوطة أصلاً تُخزن بدون ضغط.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .export_sources import ExportSourceError, export_manifest, iter_positioned_rows
+
+logger = logging.getLogger(__name__)
+
+COPY_BUFFER = 64 * 1024
+
+# صيغ مضغوطة أصلاً: إعادة ضغطها تستهلك المعالج ولا توفر مساحة
+COMPRESSED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.mp4', '.mov', '.webm', '.mkv',
+    '.mp3', '.m4a', '.aac', '.ogg', '.opus', '.zip', '.gz', '.rar', '.7z', '.pdf',
+    '.docx', '.xlsx', '.pptx',
+}
+COMPRESSED_CONTENT_TYPES = {
+    'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/heic', 'application/pdf',
+    'application/zip', 'application/gzip', 'application/x-7z-compressed', 'application/vnd.rar',
+}
+
+
+def is_compressed(file_name, content_type=''):
+    """هل الملف مضغوط أصلاً (يُخزن بـ ZIP_STORED)"""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in COMPRESSED_CONTENT_TYPES or content_type.startswith(('video/', 'audio/')):
+        return True
+    return os.path.splitext(file_name or '')[1].lower() in COMPRESSED_EXTENSIONS
+
+
+def safe_name(value):
+    """اسم صالح كجزء من مسار داخل الأرشيف"""
+    value = re.sub(r'[\\/:*?"<>|\x00-\x1f]', '_', str(value)).strip(' .')
+    return value or '_'
+
+
+class ZipJournal:
+    """
+    سجل المدخلات المكتملة بجانب الأرشيف
+    One JSON line per finished entry with everything needed to rebuild its
+    central directory record
+    """
+
+    def __init__(self, archive_path):
+        self.path = f'{archive_path}.journal'
+        self.handle = None
+
+    def load(self, archive_size):
+        """المدخلات المكتملة التي ما زالت بياناتها كاملة في الملف"""
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # سطر مقطوع عند التوقف
+                    break
+                if entry['end'] > archive_size:
+                    break
+                entries.append(entry)
+        return entries
+
+    def open(self, entries):
+        # إعادة كتابة السجل بالمدخلات الصالحة فقط قبل الإلحاق به
+        self.handle = open(self.path, 'w', encoding='utf-8')
+        for entry in entries:
+            self.handle.write(json.dumps(entry) + '\n')
+        self.handle.flush()
+
+    def append(self, entry):
+        self.handle.write(json.dumps(entry) + '\n')
+        self.handle.flush()
+
+    def close(self):
+        if self.handle:
+            self.handle.close()
+            self.handle = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ZipBuilder:
+    """
+    كاتب أرشيف ZIP تدريجي قابل للاستئناف
+    Appends entries to an archive on disk, checkpointing each finished entry
+    so an interrupted build resumes after the last one
+    """
+
+    def __init__(self, path, progress=None):
+        self.path = path
+        self.progress = progress
+        self.journal = ZipJournal(path)
+        self.sizes = {}
+        self.fp = None
+        self.archive = None
+
+    def open(self):
+        """فتح الأرشيف واستعادة المدخلات المكتملة من تشغيل سابق"""
+        exists = os.path.exists(self.path)
+        entries = self.journal.load(os.path.getsize(self.path)) if exists else []
+        end = entries[-1]['end'] if entries else 0
+        self.fp = open(self.path, 'r+b' if exists else 'w+b')
+        self.fp.truncate(end)
+        self.fp.seek(end)
+        self.archive = zipfile.ZipFile(self.fp, 'w', allowZip64=True)
+        for entry in entries:
+            info = self.restore_info(entry)
+            self.archive.filelist.append(info)
+            self.archive.NameToInfo[info.filename] = info
+            self.sizes[info.filename] = info.file_size
+        self.journal.open(entries)
+        if entries:
+            logger.info(f"Resuming archive {self.path} after {len(entries)} entries")
+        return self
+
+    def __contains__(self, name):
+        return name in self.sizes
+
+    def write_bytes(self, name, data, compress=True):
+        info = self.new_info(name, len(data), compress)
+        with self.archive.open(info, 'w') as entry:
+            entry.write(data)
+        self.checkpoint(info)
+
+    def write_file(self, name, source, size, compress=True):
+        """نسخ ملف مفتوح إلى مدخل على دفعات"""
+        info = self.new_info(name, size, compress)
+        with self.archive.open(info, 'w') as entry:
+            shutil.copyfileobj(source, entry, COPY_BUFFER)
+        self.checkpoint(info)
+
+    def new_info(self, name, size, compress):
+        info = zipfile.ZipInfo(name, date_time=timezone.localtime().timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        info.external_attr = 0o644 << 16
+        # الحجم المتوقع يحدد الحاجة لترويسة ZIP64
+        info.file_size = size
+        return info
+
+    def checkpoint(self, info):
+        self.fp.flush()
+        self.journal.append({
+            'name': info.filename,
+            'offset': info.header_offset,
+            'end': self.fp.tell(),
+            'date_time': list(info.date_time),
+            'compress_type': info.compress_type,
+            'crc': info.CRC,
+            'compress_size': info.compress_size,
+            'file_size': info.file_size,
+            'flag_bits': info.flag_bits,
+            'external_attr': info.external_attr,
+        })
+        self.sizes[info.filename] = info.file_size
+        if self.progress:
+            self.progress.bytes = self.fp.tell()
+
+    @staticmethod
+    def restore_info(entry):
+        info = zipfile.ZipInfo(entry['name'], date_time=tuple(entry['date_time']))
+        info.header_offset = entry['offset']
+        info.compress_type = entry['compress_type']
+        info.CRC = entry['crc']
+        info.compress_size = entry['compress_size']
+        info.file_size = entry['file_size']
+        info.flag_bits = entry['flag_bits']
+        info.external_attr = entry['external_attr']
+        return info
+
+    def close(self):
+        """كتابة الفهرس المركزي وحذف السجل"""
+        self.archive.close()
+        self.fp.close()
+        self.journal.remove()
+
+    def suspend(self):
+        """إغلاق الملف بدون فهرس مركزي مع إبقاء السجل للاستئناف"""
+        # بدون fp لن يكتب ZipFile الفهرس المركزي عند جمعه
+        self.archive.fp = None
+        self.fp.close()
+        self.journal.close()
+
+
+class AttachmentFetcher:
+    """
+    قراءة مرفقات الشكاوى من خدمة الشكاوى
+    Lists and downloads complaint attachments; every thread keeps its own session
+    """
+    path = '/api/v1/complaints/{complaint_id}/attachments/'
+
+    def __init__(self, spool_bytes=None, timeout=None, retries=2):
+        self.spool_bytes = spool_bytes or settings.EXPORT_ATTACHMENT_SPOOL_BYTES
+        self.timeout = timeout or settings.COMPLAINTS_SERVICE_TIMEOUT
+        self.retries = retries
+        self.base_url = settings.COMPLAINTS_SERVICE_URL.rstrip('/')
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def request(self, url, stream=False):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url, timeout=self.timeout, stream=stream)
+                response.raise_for_status()
+                return response
+            except requests.RequestException as e:
+                if attempt == self.retries:
+                    raise ExportSourceError(f'Attachment request {url} failed: {str(e)}')
+                time.sleep(0.5 * (attempt + 1))
+
+    def attachments(self, row):
+        """مرفقات الشكوى: من الصف إن وُجدت، وإلا من الخدمة إن كان لها مرفقات"""
+        if isinstance(row.get('attachments'), list):
+            return row['attachments']
+        if not row.get('attachments_count'):
+            return []
+        url = self.base_url + self.path.format(complaint_id=row['complaint_id'])
+        body = self.request(url).json()
+        return body.get('results', []) if isinstance(body, dict) else body
+
+    def download(self, url):
+        """تنزيل مرفق إلى ملف مؤقت، يعيد (الملف، الحجم)"""
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes, dir=settings.EXPORT_ROOT)
+        try:
+            with self.request(urljoin(self.base_url + '/', url), stream=True) as response:
+                for chunk in response.iter_content(COPY_BUFFER):
+                    spool.write(chunk)
+            size = spool.tell()
+            spool.seek(0)
+            return spool, size
+        except Exception:
+            spool.close()
+            raise
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+
+
+def attachment_entry(complaint_dir, position, attachment):
+    """(المسار داخل الأرشيف، بيانات المرفق) لمرفق واحد"""
+    file_name = attachment.get('file_name') or attachment.get('name') or f'attachment-{position}'
+    key = attachment.get('id', position)
+    return f'{complaint_dir}/attachments/{safe_name(key)}-{safe_name(file_name)}', {
+        'id': attachment.get('id'),
+        'file_name': file_name,
+        'content_type': attachment.get('content_type', ''),
+        'url': attachment.get('file_url') or attachment.get('url'),
+    }
+
+
+def fetch_complaint(fetcher, builder, row):
+    """
+    تنزيل مرفقات شكوى (في عامل)
+    Returns ``[(name, metadata, spool, size)]``; spool is None for entries
+    already in the archive from an earlier run
+    """
+    complaint_dir = f"complaints/{safe_name(row['complaint_id'])}"
+    fetched = []
+    try:
+        for position, attachment in enumerate(fetcher.attachments(row), start=1):
+            name, metadata = attachment_entry(complaint_dir, position, attachment)
+            if name in builder or not metadata['url']:
+                fetched.append((name, metadata, None, None))
+                continue
+            spool, size = fetcher.download(metadata['url'])
+            fetched.append((name, metadata, spool, size))
+    except Exception:
+        for _, _, spool, _ in fetched:
+            if spool:
+                spool.close()
+        raise
+    return complaint_dir, fetched
+
+
+def write_complaint(builder, row, complaint_dir, fetched):
+    """كتابة مرفقات الشكوى ثم ملفها (آخراً: علامة اكتمال الشكوى)"""
+    documents = []
+    for name, metadata, spool, size in fetched:
+        if spool is not None:
+            try:
+                builder.write_file(
+                    name, spool, size, compress=not is_compressed(metadata['file_name'], metadata['content_type'])
+                )
+            finally:
+                spool.close()
+        if name in builder:
+            documents.append({**metadata, 'archive_path': name, 'size': builder.sizes[name]})
+    builder.write_bytes(
+        f'{complaint_dir}/complaint.json',
+        json.dumps({**row, 'attachments': documents}, ensure_ascii=False, cls=DjangoJSONEncoder, indent=2)
+        .encode('utf-8'),
+    )
+
+
+def write_zip(export, path, progress=None, workers=None):
+    """
+    بناء أرشيف التصدير في path (أو استئنافه)
+    One folder per complaint with ``complaint.json`` and its attachments,
+    plus a ``manifest.json``. On failure the partial archive and its journal
+    are kept so the next run resumes from the last finished entry; rows are
+    read again from ``progress.start`` (the checkpoint of the last complaint
+    written, in source order) when there is one.
+    """
+    workers = max(1, workers or settings.EXPORT_ATTACHMENT_WORKERS)
+    builder = ZipBuilder(path, progress).open()
+    fetcher = AttachmentFetcher()
+    complaints = progress.rows if progress else 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+
+            def drain(limit):
+                nonlocal complaints
+                while len(pending) > limit:
+                    row, position, future = pending.popleft()
+                    if future:
+                        write_complaint(builder, row, *future.result())
+                    # الشكوى مكتوبة بالكامل: موضعها نقطة استئناف صالحة
+                    complaints += 1
+                    if progress:
+                        progress.position = position
+                        progress.advance()
+
+            try:
+                for row, position in iter_positioned_rows(export, progress.start if progress else None):
+                    future = None
+                    if f"complaints/{safe_name(row['complaint_id'])}/complaint.json" not in builder:
+                        future = pool.submit(fetch_complaint, fetcher, builder, row)
+                    pending.append((row, position, future))
+                    # نافذة محدودة من الشكاوى قيد التنزيل
+                    drain(workers * 2)
+                drain(0)
+            finally:
+                for _, _, future in pending:
+                    if future:
+                        future.cancel()
+                for _, _, future in pending:
+                    if future and not future.cancelled() and future.exception() is None:
+                        for _, _, spool, _ in future.result()[1]:
+                            if spool:
+                                spool.close()
+
+        builder.write_bytes('manifest.json', json.dumps(export_manifest(
+            export,
+            generated_at=timezone.now().isoformat(),
+            total_complaints=complaints,
+            total_attachments=sum(1 for name in builder.sizes if '/attachments/' in name),
+        ), ensure_ascii=False, indent=2).encode('utf-8'))
+    except BaseException:
+        builder.suspend()
+        raise
+    finally:
+        fetcher.close()
+    builder.close()
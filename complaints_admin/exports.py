@@ -0,0 +1,363 @@
+"""
+تنفيذ تصدير الشكاوى - خدمة الأدمن - نائبك.كوم
+Complaint export pipeline
+
+الصفوف تُقرأ من مصدر متدفق وتُكتب صفاً صفاً إلى الملف أو إلى استجابة
+StreamingHttpResponse، فالذاكرة ثابتة مهما كان عدد الشكاوى. التقدم (العدد
+وحجم الملف) يُحفظ على سجل التصدير كل EXPORT_PROGRESS_EVERY صف، ومعه لتصديرات
+CSV و ZIP نقطة استئناف (موضع آخر شكوى مكتوبة وحجم الملف عندها) تبدأ منها
+إعادة التشغيل بدل الصف الأول.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .export_downloads import signed_download_url
+from .export_excel import write_excel
+from .export_pdf import write_pdf
+from .export_sources import EXPORT_COLUMNS, iter_export_rows
+from .export_zip import ZipJournal, write_zip
+from .models import ComplaintAdminAction, ComplaintExport, ComplaintExportRequest
+
+logger = logging.getLogger(__name__)
+
+FILE_EXTENSIONS = {'csv': 'csv', 'excel': 'xlsx', 'pdf': 'pdf', 'zip': 'zip'}
+
+
+IN_PROGRESS = ('pending', 'processing')
+# صيغ تُستأنف من نقطة الاستئناف (Excel يُجمَّع عند الحفظ و PDF يُدمج من أجزاء)
+RESUMABLE_FORMATS = ('csv', 'zip')
+
+
+def normalize_criteria(value):
+    """
+    شكل موحد لمعايير التصفية
+    Drop empty values, sort keys and treat scalar lists as sets, so criteria
+    that select the same complaints hash the same
+    """
+    if isinstance(value, dict):
+        normalized = {key: normalize_criteria(item) for key, item in value.items()}
+        return {key: normalized[key] for key in sorted(normalized) if normalized[key] not in (None, '', [], {})}
+    if isinstance(value, list):
+        items = [normalize_criteria(item) for item in value]
+        if all(isinstance(item, (str, int, float, bool)) for item in items):
+            return sorted(set(items), key=lambda item: (type(item).__name__, item))
+        return items
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def criteria_hash(export_format, criteria):
+    """بصمة SHA-256 للصيغة والمعايير الموحدة"""
+    canonical = json.dumps(
+        [export_format, normalize_criteria(criteria or {})], sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def data_version():
+    """إصدار البيانات المحلية: أكبر معرف إجراء أدمن"""
+    return ComplaintAdminAction.objects.aggregate(version=Max('id'))['version'] or 0
+
+
+def reading_started():
+    """حقول السجل عند بدء قراءة البيانات (للإعادة ولتصدير الفروق التالي)"""
+    return {
+        'status': 'processing', 'error_message': '', 'checkpoint': {},
+        'data_version': data_version(), 'watermark_at': timezone.now(),
+    }
+
+
+def reusable_export(digest):
+    """
+    تصدير يمكن إعادته بدل إنشاء جديد
+    An identical export still running, or the newest completed one that has
+    not expired, is younger than EXPORT_REUSE_WINDOW_MINUTES (the complaints
+    service's own edits are not visible here) and has seen every admin action
+    """
+    exports = ComplaintExport.objects.filter(criteria_hash=digest)
+    running = exports.filter(status__in=IN_PROGRESS).first()
+    if running:
+        return running
+    now = timezone.now()
+    completed = exports.filter(
+        status='completed',
+        expires_at__gt=now,
+        completed_at__gte=now - timedelta(minutes=settings.EXPORT_REUSE_WINDOW_MINUTES),
+        data_version__isnull=False,
+    ).order_by('-completed_at').first()
+    if completed and completed.data_version >= data_version() and os.path.exists(completed.file_path):
+        return completed
+    return None
+
+
+def share_export(export, admin_id, admin_name):
+    """
+    تسجيل إعادة التصدير لأدمن غير صاحبه ليظهر في قائمته
+    Record that ``export`` also answers ``admin_id``'s request
+    """
+    if admin_id and admin_id != export.admin_id:
+        ComplaintExportRequest.objects.get_or_create(
+            export=export, admin_id=admin_id, defaults={'admin_name': admin_name or ''},
+        )
+    return export
+
+
+def request_export(fields):
+    """
+    إنشاء طلب تصدير أو إعادة تصدير مطابق
+    Returns ``(export, created)``; only a created export needs processing.
+    A reused export is recorded for the requesting admin.
+    """
+    digest = criteria_hash(fields.get('export_format', 'zip'), fields.get('filter_criteria'))
+    existing = reusable_export(digest)
+    if existing:
+        return share_export(existing, fields.get('admin_id'), fields.get('admin_name')), False
+    since_export = (fields.get('filter_criteria') or {}).get('since_export')
+    if since_export:
+        fields = {**fields, 'baseline_export': ComplaintExport.objects.get(export_id=since_export)}
+    try:
+        with transaction.atomic():
+            return ComplaintExport.objects.create(**fields, criteria_hash=digest), True
+    except IntegrityError:
+        # طلب مطابق أُنشئ بين البحث والإنشاء
+        running = ComplaintExport.objects.filter(criteria_hash=digest, status__in=IN_PROGRESS).first()
+        if running is None:
+            raise
+        return share_export(running, fields.get('admin_id'), fields.get('admin_name')), False
+
+
+def export_path(export):
+    """مسار ملف التصدير على القرص"""
+    return os.path.join(
+        settings.EXPORT_ROOT, f'{export.export_id}.{FILE_EXTENSIONS[export.export_format]}'
+    )
+
+
+class ExportProgress:
+    """
+    حفظ تقدم التصدير على فترات
+    Persists the row count and the bytes written so far (kept current by
+    the writer) every ``every`` rows. A resumable export also saves, after
+    ``flush`` has made the bytes durable, a checkpoint taken at the last
+    ``advance``: the source position of the last written row, the row count
+    and the file offset right after that row.
+    """
+
+    def __init__(self, export, every=None, resumable=False):
+        self.export = export
+        self.every = every or settings.EXPORT_PROGRESS_EVERY
+        self.rows = 0
+        self.bytes = 0
+        self.resumable = resumable
+        # موضع البداية (استئناف) وموضع آخر صف مكتوب في المصدر
+        self.start = None
+        self.position = None
+        self.checkpoint = None
+        self.flush = None
+
+    def advance(self, rows=1):
+        self.rows += rows
+        if self.resumable and self.position is not None:
+            self.checkpoint = {'position': self.position, 'rows': self.rows, 'offset': self.bytes}
+        if self.rows % self.every < rows:
+            self.save()
+
+    def save(self, **fields):
+        fields['heartbeat_at'] = timezone.now()
+        if self.checkpoint and 'checkpoint' not in fields:
+            if self.flush:
+                self.flush()
+            fields['checkpoint'] = self.checkpoint
+        ComplaintExport.objects.filter(pk=self.export.pk).update(
+            total_complaints=self.rows, file_size=self.bytes, **fields
+        )
+        self.export.total_complaints = self.rows
+        self.export.file_size = self.bytes
+        for field, value in fields.items():
+            setattr(self.export, field, value)
+
+
+def csv_value(value):
+    """تمثيل القيمة في خلية CSV"""
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class LineBuffer:
+    """مخزن لسطر واحد يعيد ما كُتب فيه (لـ csv.writer المتدفق)"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(export, progress=None):
+    """
+    أسطر CSV مرمّزة بترتيب الكتابة
+    Yield encoded CSV chunks: a UTF-8 BOM (so spreadsheet apps read Arabic
+    correctly), the header, then one line per complaint. A resumed export
+    only appends the lines after its checkpoint.
+    """
+    writer = csv.writer(LineBuffer())
+    if not (progress and progress.start):
+        yield codecs.BOM_UTF8 + writer.writerow(EXPORT_COLUMNS).encode('utf-8')
+    for row in iter_export_rows(export, progress):
+        yield writer.writerow([csv_value(row.get(column)) for column in EXPORT_COLUMNS]).encode('utf-8')
+
+
+def write_csv(export, stream, progress=None):
+    """كتابة CSV التصدير في ملف ثنائي مفتوح"""
+    for chunk in iter_csv(export, progress):
+        stream.write(chunk)
+
+
+def stream_csv(export):
+    """
+    CSV التصدير لاستجابة StreamingHttpResponse
+    Generate the CSV for a streaming response; nothing is stored on disk.
+    A still pending export is taken over (the queued task then skips it)
+    and its progress recorded; otherwise the worker owns the record and the
+    stream only reads.
+    """
+    # pending -> processing لنفس الصف لا يتعارض مع قيد البصمة الفريد
+    owned = ComplaintExport.objects.filter(pk=export.pk, status='pending').update(
+        status='processing', heartbeat_at=timezone.now()
+    )
+    if not owned:
+        yield from iter_csv(export)
+        return
+
+    progress = ExportProgress(export)
+    progress.save(**reading_started())
+    try:
+        for chunk in iter_csv(export, progress):
+            progress.bytes += len(chunk)
+            yield chunk
+    except GeneratorExit:
+        # انقطاع العميل: لا يبقى السجل قيد التنفيذ فتنضم إليه الطلبات المطابقة
+        logger.warning(f"Streaming export {export.export_id} closed by the client")
+        progress.save(status='failed', error_message='Stream closed by the client')
+        raise
+    except Exception as e:
+        logger.error(f"Streaming export {export.export_id} failed: {str(e)}")
+        progress.save(status='failed', error_message=str(e))
+        raise
+    progress.save(status='completed', completed_at=timezone.now())
+
+
+class CountingWriter(io.RawIOBase):
+    """ملف يحسب البايتات المكتوبة لتقارير التقدم"""
+
+    def __init__(self, stream, progress):
+        self.stream = stream
+        self.progress = progress
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        written = self.stream.write(data)
+        self.progress.bytes += written
+        return written
+
+
+WRITERS = {
+    'csv': write_csv,
+    'excel': write_excel,
+}
+# كتّاب يكتبون الملف في مساره بأنفسهم (ZIP يبقي الملف الجزئي عند الفشل للاستئناف)
+FILE_WRITERS = {
+    'pdf': write_pdf,
+    'zip': write_zip,
+}
+
+
+def resume_point(export, path):
+    """
+    نقطة الاستئناف إن كان الملف الجزئي ما زال يحتويها
+    The saved checkpoint when the partial file still holds everything it
+    covers: the CSV is at least ``offset`` bytes long, or the ZIP journal
+    of finished entries is still next to the archive
+    """
+    checkpoint = export.checkpoint or {}
+    if export.export_format not in RESUMABLE_FORMATS or not checkpoint.get('position'):
+        return None
+    if export.export_format == 'zip':
+        usable = os.path.exists(ZipJournal(path).path)
+    else:
+        usable = os.path.exists(path) and os.path.getsize(path) >= checkpoint['offset']
+    return checkpoint if usable else None
+
+
+def run_export(export):
+    """
+    تنفيذ تصدير وحفظ الملف
+    Write ``export`` to EXPORT_ROOT, keeping status, count and size current.
+    A CSV or ZIP export with a usable checkpoint continues after it.
+    """
+    writer = WRITERS.get(export.export_format)
+    file_writer = FILE_WRITERS.get(export.export_format)
+    progress = ExportProgress(export, resumable=export.export_format in RESUMABLE_FORMATS)
+    if writer is None and file_writer is None:
+        progress.save(
+            status='failed', error_message=f'Export format {export.export_format} is not supported yet'
+        )
+        return export
+
+    path = export_path(export)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    checkpoint = resume_point(export, path)
+    if checkpoint:
+        # العلامة وإصدار البيانات يبقيان من بدء القراءة الأول
+        progress.start = progress.position = checkpoint['position']
+        progress.rows = checkpoint['rows']
+        progress.bytes = checkpoint['offset']
+        progress.checkpoint = checkpoint
+        logger.info(f"Resuming export {export.export_id} after {progress.rows} rows")
+        progress.save(status='processing', error_message='')
+    else:
+        progress.save(**reading_started())
+    try:
+        if file_writer:
+            file_writer(export, path, progress)
+        else:
+            with open(path, 'r+b' if checkpoint else 'wb') as stream:
+                # ما بعد نقطة الاستئناف كُتب بعد آخر حفظ لها فيُعاد
+                stream.truncate(progress.bytes)
+                stream.seek(progress.bytes)
+                progress.flush = stream.flush
+                try:
+                    writer(export, CountingWriter(stream, progress), progress)
+                finally:
+                    progress.flush = None
+        progress.bytes = os.path.getsize(path)
+        expires_at = timezone.now() + timedelta(hours=settings.EXPORT_EXPIRY_HOURS)
+        progress.save(
+            status='completed',
+            file_path=path,
+            download_url=signed_download_url(path, expires_at),
+            checkpoint={},
+            completed_at=timezone.now(),
+            expires_at=expires_at,
+        )
+    except Exception as e:
+        logger.error(f"Export {export.export_id} failed: {str(e)}")
+        progress.save(status='failed', error_message=str(e))
+        if not progress.resumable and file_writer is None and os.path.exists(path):
+            os.remove(path)
+    return export
@@ -0,0 +1,223 @@
+"""
+مجموعة المفاتيح العامة للتحقق من التوكينات - خدمة الأدمن - نائبك.كوم
+Cached public key set (JWKS) for asymmetric JWT verification
+
+توكينات RS256/ES256 الصادرة من خدمة المصادقة يتم التحقق منها محلياً بالمفتاح
+العام المطابق لـ kid. المجموعة تُحدَّث في الخلفية، وعند ظهور kid غير معروف
+(تدوير المفاتيح) يتم تحديث واحد محدود المعدل. ملف JWKS المحلي يُستخدم كبديل
+عند تعذر الوصول للخدمة وفي الاختبارات.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import jwt
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# نوع المفتاح المطلوب لكل عائلة خوارزميات
+ALGORITHM_KEY_TYPES = {
+    'RS': 'RSA',
+    'PS': 'RSA',
+    'ES': 'EC',
+    'Ed': 'OKP',
+}
+
+SigningKey = namedtuple('SigningKey', ['kid', 'key_type', 'key'])
+
+
+class JWKSKeySet:
+    """
+    مجموعة مفاتيح عامة مخزنة مع تحديث دوري
+    Locally cached JWKS keyed by ``kid`` with periodic background refresh
+    """
+
+    def __init__(self, url='', file_path='', refresh_interval=300,
+                 min_refresh_interval=30, timeout=5):
+        self.url = url
+        self.file_path = file_path
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys = {}
+        self._lock = threading.Lock()
+        self._last_attempt = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def get_signing_key(self, kid):
+        """
+        الحصول على المفتاح العام المطابق لـ kid أو None
+        Return the SigningKey for ``kid``; refresh once (rate limited) on unknown kid
+        """
+        if self._last_attempt is None:
+            self.refresh()
+
+        key = self._lookup(kid)
+        if key is None and self._may_refresh():
+            self.refresh()
+            key = self._lookup(kid)
+        return key
+
+    def refresh(self):
+        """
+        إعادة تحميل المفاتيح من الخدمة ثم من الملف المحلي
+        Reload keys from the JWKS URL, falling back to the local file
+        """
+        with self._lock:
+            self._last_attempt = time.monotonic()
+
+        data = self._fetch_remote()
+        if data is None:
+            data = self._read_file()
+        if data is None:
+            return False
+
+        keys = self._parse(data)
+        if not keys:
+            logger.warning("JWKS refresh returned no usable keys")
+            return False
+
+        with self._lock:
+            self._keys = keys
+        return True
+
+    def start_background_refresh(self):
+        """تشغيل خيط التحديث الدوري (مرة واحدة لكل عملية)"""
+        if self.refresh_interval <= 0 or not (self.url or self.file_path):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='jwks-refresh', daemon=True
+            )
+            self._thread.start()
+
+    def stop_background_refresh(self):
+        """إيقاف خيط التحديث"""
+        self._stop.set()
+
+    @property
+    def kids(self):
+        """معرفات المفاتيح المحملة حالياً"""
+        return set(self._keys)
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"JWKS background refresh failed: {str(e)}")
+
+    def _lookup(self, kid):
+        keys = self._keys
+        if kid is None and len(keys) == 1:
+            return next(iter(keys.values()))
+        return keys.get(kid)
+
+    def _may_refresh(self):
+        last = self._last_attempt
+        return last is None or time.monotonic() - last >= self.min_refresh_interval
+
+    def _fetch_remote(self):
+        if not self.url:
+            return None
+        try:
+            response = requests.get(self.url, timeout=self.timeout)
+            if response.status_code == 200:
+                return response.json()
+            logger.warning(f"JWKS endpoint returned {response.status_code}")
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"JWKS fetch failed: {str(e)}")
+        return None
+
+    def _read_file(self):
+        if not self.file_path:
+            return None
+        try:
+            with open(self.file_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"JWKS file read failed: {str(e)}")
+            return None
+
+    def _parse(self, data):
+        keys = {}
+        for key_data in data.get('keys', []):
+            key_type = key_data.get('kty')
+            # المفاتيح المتماثلة (oct) لا تُقبل من مجموعة مفاتيح عامة
+            if key_data.get('use', 'sig') != 'sig' or key_type not in ALGORITHM_KEY_TYPES.values():
+                continue
+            try:
+                jwk = jwt.PyJWK(key_data)
+            except jwt.PyJWTError as e:
+                logger.warning(f"Skipping unusable JWKS key {key_data.get('kid')}: {str(e)}")
+                continue
+            kid = key_data.get('kid')
+            keys[kid] = SigningKey(kid, key_type, jwk.key)
+        return keys
+
+
+_key_set = None
+_key_set_lock = threading.Lock()
+
+
+def get_key_set():
+    """
+    مجموعة المفاتيح الخاصة بالعملية الحالية
+    Return the per-process key set, starting its refresh thread on first use
+    """
+    global _key_set
+    if _key_set is None:
+        with _key_set_lock:
+            if _key_set is None:
+                _key_set = JWKSKeySet(
+                    url=settings.JWT_JWKS_URL,
+                    file_path=settings.JWT_JWKS_FILE,
+                    refresh_interval=settings.JWT_JWKS_REFRESH_INTERVAL,
+                    min_refresh_interval=settings.JWT_JWKS_MIN_REFRESH_INTERVAL,
+                )
+                _key_set.start_background_refresh()
+    return _key_set
+
+
+def reset_key_set():
+    """إعادة تهيئة مجموعة المفاتيح (للاختبارات)"""
+    global _key_set
+    with _key_set_lock:
+        if _key_set is not None:
+            _key_set.stop_background_refresh()
+        _key_set = None
+
+
+def decode_token(token):
+    """
+    فك تشفير التوكين محلياً حسب خوارزميته
+    Decode ``token`` locally: asymmetric algorithms use the JWKS key for the
+    token's ``kid``; everything else uses the shared HMAC secret.
+    Raises jwt.InvalidTokenError (or a subclass) when verification fails.
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get('alg')
+
+    if algorithm in settings.JWT_ASYMMETRIC_ALGORITHMS:
+        key = get_key_set().get_signing_key(header.get('kid'))
+        if key is None:
+            raise jwt.InvalidTokenError('Unknown signing key.')
+        # منع الخلط بين الخوارزميات: نوع المفتاح يجب أن يطابق الخوارزمية
+        if ALGORITHM_KEY_TYPES.get(algorithm[:2]) != key.key_type:
+            raise jwt.InvalidAlgorithmError('Token algorithm does not match signing key.')
+        return jwt.decode(token, key.key, algorithms=[algorithm])
+
+    return jwt.decode(
+        token,
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM]
+    )
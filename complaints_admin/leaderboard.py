@@ -0,0 +1,358 @@
+"""
+لوحة صدارة النواب - خدمة الأدمن - نائبك.كوم
+Representative leaderboard kept in sorted sets
+
+لكل مقياس (عدد الحلول، النقاط) ولكل نافذة (كل الوقت، الشهر، الأسبوع) مجموعة
+مرتبة يُضاف إليها عند تأكيد كل إجراء حل، فقراءة أعلى N أو ترتيب نائب لا
+تحتاج GROUP BY على سجل الإجراءات. النسخة الدائمة في جدول
+RepresentativeLeaderboardScore المشترك بين كل العمليات؛ Redis عند تفعيله نسخة
+أسرع للقراءة، ومع غيابه أو فشله تُقرأ النسخة من الجدول. القراءة لا تبني شيئاً
+من السجل: بعد النشر أو أي انحراف يُشغَّل rebuild_representative_leaderboard.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+import redis
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .archive import action_history
+from .models import RepresentativeLeaderboardScore
+from .redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('resolutions', 'score')
+WINDOWS = ('all', 'month', 'week')
+
+
+def period_of(window, moment):
+    """
+    معرف فترة النافذة التي تحتوي اللحظة
+    ``all``, ``YYYY-MM`` or ISO ``YYYY-Www`` in the statistics time zone
+    """
+    if window == 'all':
+        return 'all'
+    local = timezone.localtime(moment, ZoneInfo(settings.STATISTICS_TIME_ZONE))
+    if window == 'month':
+        return f'{local:%Y-%m}'
+    if window == 'week':
+        year, week, _ = local.isocalendar()
+        return f'{year}-W{week:02d}'
+    raise ValueError(f'Unknown leaderboard window: {window}')
+
+
+def resolution_increments(moment, score):
+    """(المقياس، النافذة، الفترة، الزيادة) لإجراء حل واحد"""
+    for window in WINDOWS:
+        period = period_of(window, moment)
+        yield 'resolutions', window, period, 1
+        yield 'score', window, period, score
+
+
+class DatabaseLeaderboardStore:
+    """
+    مجموعات مرتبة في جدول مشترك بين العمليات
+    Sorted sets in RepresentativeLeaderboardScore with Redis ZREVRANGE ordering
+    (score, then member, descending)
+    """
+
+    def _rows(self, key):
+        metric, window, period = key
+        return RepresentativeLeaderboardScore.objects.filter(metric=metric, window=window, period=period)
+
+    def increment(self, increments, names):
+        with transaction.atomic():
+            for key, member, amount in increments:
+                rows = self._rows(key).filter(representative_id=member)
+                # الاسم يُحدَّث مع الصف نفسه عبر المفتاح الفريد، دون مسح صفوف النائب في كل الفترات
+                changes = {'value': F('value') + amount}
+                if names.get(member):
+                    changes['representative_name'] = names[member]
+                if rows.update(**changes):
+                    continue
+                metric, window, period = key
+                try:
+                    with transaction.atomic():
+                        RepresentativeLeaderboardScore.objects.create(
+                            metric=metric, window=window, period=period, representative_id=member,
+                            representative_name=names.get(member, ''), value=amount,
+                        )
+                except IntegrityError:
+                    # عامل آخر أنشأ الصف للتو
+                    rows.update(**changes)
+
+    def replace_all(self, totals, names):
+        rows = [
+            RepresentativeLeaderboardScore(
+                metric=metric, window=window, period=period, representative_id=member,
+                representative_name=names.get(member, ''), value=value,
+            )
+            for (metric, window, period), members in totals.items()
+            for member, value in members.items()
+        ]
+        with transaction.atomic():
+            RepresentativeLeaderboardScore.objects.all().delete()
+            RepresentativeLeaderboardScore.objects.bulk_create(rows, batch_size=1000)
+
+    def prune(self, cutoffs):
+        deleted = 0
+        for window, period in cutoffs.items():
+            # معرفات الفترات (YYYY-MM و YYYY-Www) تُرتَّب نصياً بترتيبها الزمني
+            deleted += RepresentativeLeaderboardScore.objects.filter(
+                window=window, period__lt=period
+            ).delete()[0]
+        return deleted
+
+    def count(self, key):
+        return self._rows(key).count()
+
+    def top(self, key, offset, limit):
+        if limit <= 0:
+            return []
+        rows = self._rows(key).order_by('-value', '-representative_id')
+        return list(rows.values_list('representative_id', 'value')[offset:offset + limit])
+
+    def rank(self, key, member):
+        rows = self._rows(key)
+        score = rows.filter(representative_id=member).values_list('value', flat=True).first()
+        if score is None:
+            return None
+        ahead = rows.filter(Q(value__gt=score) | Q(value=score, representative_id__gt=member)).count()
+        return ahead, score
+
+    def names(self, members):
+        # لوحة كل الوقت تحوي كل نائب وتحمل آخر اسم له
+        found = dict(
+            self._rows(('resolutions', 'all', 'all')).filter(representative_id__in=members)
+            .exclude(representative_name='').values_list('representative_id', 'representative_name')
+        )
+        return {member: found.get(member, '') for member in members}
+
+
+class RedisLeaderboardStore:
+    """
+    مجموعات Redis المرتبة المشتركة بين العمليات
+    Sorted sets in Redis shared by every worker
+    """
+
+    def __init__(self, key_prefix, period_ttl):
+        self.key_prefix = key_prefix
+        self.names_key = f'{key_prefix}names'
+        self.period_ttl = period_ttl
+
+    def _key(self, key):
+        return self.key_prefix + ':'.join(key)
+
+    def increment(self, increments, names):
+        pipe = get_redis_client().pipeline(transaction=False)
+        for key, member, amount in increments:
+            pipe.zincrby(self._key(key), amount, member)
+            if key[1] != 'all':
+                pipe.expire(self._key(key), self.period_ttl)
+        if names:
+            pipe.hset(self.names_key, mapping=names)
+        pipe.execute()
+
+    def replace_all(self, totals, names):
+        client = get_redis_client()
+        pipe = client.pipeline(transaction=False)
+        live = set()
+        for key, members in totals.items():
+            redis_key = self._key(key)
+            live.add(redis_key)
+            # بناء مفتاح مؤقت ثم RENAME حتى لا تُقرأ مجموعة نصف مبنية
+            temporary = f'{redis_key}:rebuild'
+            pipe.delete(temporary)
+            if members:
+                pipe.zadd(temporary, members)
+                pipe.rename(temporary, redis_key)
+                if key[1] != 'all':
+                    pipe.expire(redis_key, self.period_ttl)
+        pipe.delete(self.names_key)
+        if names:
+            pipe.hset(self.names_key, mapping=names)
+        pipe.execute()
+        for stale in client.scan_iter(match=f'{self.key_prefix}*'):
+            stale = stale.decode() if isinstance(stale, bytes) else stale
+            if stale not in live and stale != self.names_key:
+                client.delete(stale)
+
+    def count(self, key):
+        return get_redis_client().zcard(self._key(key))
+
+    def top(self, key, offset, limit):
+        if limit <= 0:
+            return []
+        rows = get_redis_client().zrevrange(self._key(key), offset, offset + limit - 1, withscores=True)
+        return [(member.decode() if isinstance(member, bytes) else member, score) for member, score in rows]
+
+    def rank(self, key, member):
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.zrevrank(self._key(key), member)
+        pipe.zscore(self._key(key), member)
+        rank, score = pipe.execute()
+        return None if rank is None else (rank, score)
+
+    def names(self, members):
+        if not members:
+            return {}
+        values = get_redis_client().hmget(self.names_key, members)
+        return {
+            member: (value.decode() if isinstance(value, bytes) else value) or ''
+            for member, value in zip(members, values)
+        }
+
+
+class Leaderboard:
+    """
+    لوحة صدارة النواب في قاعدة البيانات مع Redis اختياري
+    Representative leaderboard stored in the database, read from Redis when enabled
+    """
+    key_prefix = 'naebak:admin:leaderboard:'
+
+    def __init__(self, use_redis=False, period_ttl=400 * 86400):
+        self.use_redis = use_redis
+        self.period_ttl = period_ttl
+        self.redis = RedisLeaderboardStore(self.key_prefix, period_ttl)
+        self.database = DatabaseLeaderboardStore()
+
+    def record_resolution(self, representative_id, representative_name, moment, score=1):
+        """
+        إضافة إجراء حل لرصيد النائب في كل النوافذ
+        Credit one resolution (and ``score`` points) to the representative
+        """
+        increments = [
+            ((metric, window, period), representative_id, amount)
+            for metric, window, period, amount in resolution_increments(moment, score)
+        ]
+        names = {representative_id: representative_name} if representative_name else {}
+        if self.use_redis:
+            try:
+                self.redis.increment(increments, names)
+            except redis.RedisError as e:
+                logger.warning(f"Leaderboard Redis update failed: {str(e)}")
+        # الجدول يُحدَّث دائماً ليبقى صالحاً للقراءة عند فشل Redis
+        self.database.increment(increments, names)
+
+    def top(self, metric, window, period, offset=0, limit=20):
+        """[(الترتيب، المعرف، الاسم، القيمة)] بدءاً من offset"""
+        rows = self._read('top', (metric, window, period), offset, limit)
+        names = self._read('names', [member for member, _ in rows])
+        return [
+            (offset + position + 1, member, names.get(member, ''), score)
+            for position, (member, score) in enumerate(rows)
+        ]
+
+    def count(self, metric, window, period):
+        return self._read('count', (metric, window, period))
+
+    def rank(self, representative_id, metric, window, period):
+        """(الترتيب من 1، القيمة) أو None إن لم يكن للنائب رصيد"""
+        found = self._read('rank', (metric, window, period), representative_id)
+        return None if found is None else (found[0] + 1, found[1])
+
+    def rebuild(self):
+        """
+        إعادة بناء كل المجموعات من سجل الإجراءات
+        Recompute every sorted set from action history and swap it in.
+        Returns the number of resolutions credited.
+        """
+        totals, names, credited = compute_totals()
+        if self.use_redis:
+            try:
+                self.redis.replace_all(totals, names)
+            except redis.RedisError as e:
+                logger.warning(f"Leaderboard Redis rebuild failed: {str(e)}")
+        self.database.replace_all(totals, names)
+        return credited
+
+    def prune_expired(self, now=None):
+        """
+        حذف لوحات الشهور والأسابيع الأقدم من مدة الاحتفاظ
+        Delete month and week boards older than the period TTL from the table.
+        Redis keys expire on their own. Returns the number of rows deleted.
+        """
+        cutoff = (now or timezone.now()) - timedelta(seconds=self.period_ttl)
+        return self.database.prune({window: period_of(window, cutoff) for window in WINDOWS if window != 'all'})
+
+    def _read(self, method, *args):
+        if self.use_redis:
+            try:
+                return getattr(self.redis, method)(*args)
+            except redis.RedisError as e:
+                logger.warning(f"Leaderboard Redis read failed, using database copy: {str(e)}")
+        return getattr(self.database, method)(*args)
+
+
+def compute_totals(chunk_size=5000):
+    """
+    حساب أرصدة كل المجموعات من سجل الإجراءات
+    Returns ``({(metric, window, period): {representative: value}}, names, resolutions)``
+    over the whole history, archived actions included.
+    A resolution is credited to the complaint's latest assignee, as on write.
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    names = {}
+    credited = 0
+    actions = action_history(
+        (
+            'complaint_id', 'action_type', 'assigned_to_representative_id',
+            'assigned_to_representative_name', 'created_at', 'representative_score_increase',
+        ),
+        action_types=['assigned', 'resolved'], chunk_size=chunk_size,
+    )
+    complaint, assignee = None, None
+    for complaint_id, action_type, representative_id, representative_name, created_at, score in actions:
+        if complaint_id != complaint:
+            complaint, assignee = complaint_id, None
+        if representative_id:
+            assignee = representative_id
+            if representative_name:
+                names[representative_id] = representative_name
+        if action_type == 'resolved' and assignee:
+            credited += 1
+            for metric, window, period, amount in resolution_increments(created_at, score):
+                totals[(metric, window, period)][assignee] += amount
+    return {key: dict(members) for key, members in totals.items()}, names, credited
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard():
+    """
+    لوحة الصدارة (كائن لكل عملية، والبيانات مشتركة)
+    Return the process-wide leaderboard handle
+    """
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                _leaderboard = Leaderboard(
+                    use_redis=settings.LEADERBOARD_USE_REDIS,
+                    period_ttl=settings.LEADERBOARD_PERIOD_TTL_DAYS * 86400,
+                )
+    return _leaderboard
+
+
+def reset_leaderboard():
+    """إعادة تهيئة لوحة الصدارة (للاختبارات)"""
+    global _leaderboard
+    with _leaderboard_lock:
+        _leaderboard = None
+
+
+def record_resolution(representative_id, representative_name, moment, score):
+    """تسجيل حل في لوحة الصدارة (يُستدعى بعد تأكيد المعاملة)"""
+    try:
+        get_leaderboard().record_resolution(representative_id, representative_name, moment, score)
+    except Exception as e:
+        logger.error(f"Error updating leaderboard: {str(e)}")
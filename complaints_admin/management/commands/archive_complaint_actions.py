@@ -0,0 +1,34 @@
+"""
+نقل إجراءات الأدمن القديمة إلى الأرشيف البارد
+Move old ComplaintAdminAction rows into compressed archive segments
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from complaints_admin.archive import archive_actions
+
+
+class Command(BaseCommand):
+    help = 'Archive admin actions older than a given age into compressed columnar segments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.ACTION_ARCHIVE_AFTER_DAYS,
+            help='Archive actions created more than this many days ago',
+        )
+        parser.add_argument(
+            '--segment-rows', type=int, default=settings.ACTION_ARCHIVE_SEGMENT_ROWS,
+            help='Maximum actions per segment file',
+        )
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] <= 0:
+            self.stdout.write('Archiving is disabled (older-than-days must be positive)')
+            return
+
+        segments = archive_actions(options['older_than_days'], options['segment_rows'])
+        for segment in segments:
+            self.stdout.write(f'{segment.name}: {segment.row_count} actions, {segment.size_bytes} bytes')
+        total = sum(segment.row_count for segment in segments)
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} actions into {len(segments)} segments'))
@@ -0,0 +1,49 @@
+"""
+صيانة أقسام جدول إجراءات الأدمن: إنشاء الأقسام القادمة وتطبيق الاحتفاظ
+Create upcoming ComplaintAdminAction partitions and apply the retention policy
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from complaints_admin.partitions import (
+    RETENTION_MODES, apply_retention, ensure_partitions, is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create future monthly partitions and detach or drop expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=settings.ACTION_PARTITION_MONTHS_AHEAD,
+            help='Future months to create partitions for',
+        )
+        parser.add_argument(
+            '--retain-months', type=int, default=settings.ACTION_RETENTION_MONTHS,
+            help='Months of actions to keep (0 keeps everything)',
+        )
+        parser.add_argument(
+            '--mode', choices=RETENTION_MODES, default=settings.ACTION_RETENTION_MODE,
+            help='detach keeps expired partitions as standalone tables, drop removes them',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        partitioned = is_partitioned()
+        if not partitioned:
+            self.stdout.write('ComplaintAdminAction is not partitioned on this database')
+
+        if not options['dry_run']:
+            for name in ensure_partitions(options['months_ahead']):
+                self.stdout.write(f'Created partition {name}')
+
+        result = apply_retention(
+            options['retain_months'], mode=options['mode'], dry_run=options['dry_run']
+        )
+        verb = 'Would apply' if options['dry_run'] else 'Applied'
+        for name in result.partitions:
+            self.stdout.write(f'{verb} retention ({options["mode"]}) to {name}')
+        if not partitioned:
+            self.stdout.write(f'{verb} retention ({options["mode"]}) to {result.actions} actions')
+        self.stdout.write(self.style.SUCCESS('Partition maintenance complete'))
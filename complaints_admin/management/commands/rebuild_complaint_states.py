@@ -0,0 +1,60 @@
+"""
+إعادة بناء جدول الحالة الحالية للشكاوى من سجل الإجراءات
+Rebuild ComplaintCurrentState from the full ComplaintAdminAction history,
+archived segments included
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from complaints_admin.archive import COLUMNS, action_history
+from complaints_admin.models import ComplaintAdminAction, ComplaintCurrentState
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-complaint current-state table from admin action history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Rows per read chunk and per bulk insert',
+        )
+        parser.add_argument(
+            '--complaint', action='append', dest='complaints', default=[],
+            help='Only rebuild these complaint IDs (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        complaints = options['complaints']
+
+        states = ComplaintCurrentState.objects.all()
+        if complaints:
+            states = states.filter(complaint_id__in=complaints)
+        history = action_history(COLUMNS, complaint_ids=complaints or None, chunk_size=batch_size)
+
+        rebuilt = 0
+        with transaction.atomic():
+            states.delete()
+            batch = []
+            state = None
+            # قراءة متدفقة مرتبة حسب الشكوى: حالة واحدة في الذاكرة في كل مرة
+            for values in history:
+                action = ComplaintAdminAction(**dict(zip(COLUMNS, values)))
+                if state is None or state.complaint_id != action.complaint_id:
+                    if state is not None:
+                        batch.append(state)
+                    state = ComplaintCurrentState(complaint_id=action.complaint_id, action_count=0)
+                state.apply(action)
+
+                if len(batch) >= batch_size:
+                    ComplaintCurrentState.objects.bulk_create(batch)
+                    rebuilt += len(batch)
+                    batch = []
+
+            if state is not None:
+                batch.append(state)
+            ComplaintCurrentState.objects.bulk_create(batch)
+            rebuilt += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} complaint states'))
@@ -0,0 +1,18 @@
+"""
+إعادة بناء لوحة صدارة النواب من سجل الإجراءات
+Rebuild the representative leaderboard sorted sets from ComplaintAdminAction history
+"""
+
+from django.core.management.base import BaseCommand
+
+from complaints_admin.leaderboard import get_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Recompute the all-time, monthly and weekly representative leaderboards from action history'
+
+    def handle(self, *args, **options):
+        board = get_leaderboard()
+        credited = board.rebuild()
+        target = 'the database and Redis' if board.use_redis else 'the database'
+        self.stdout.write(self.style.SUCCESS(f'Credited {credited} resolutions into {target}'))
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="complaintadminaction",
+            index=models.Index(
+                fields=["complaint_id", "-created_at"], name="caa_complaint_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="complaintadminaction",
+            index=models.Index(
+                fields=["admin_id", "-created_at"], name="caa_admin_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="complaintadminaction",
+            index=models.Index(
+                condition=models.Q(("assigned_to_representative_id__isnull", False)),
+                fields=["assigned_to_representative_id", "-created_at"],
+                name="caa_rep_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="complaintadminaction",
+            index=models.Index(
+                fields=["action_type", "-created_at"], name="caa_type_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="complaintadminaction",
+            index=models.Index(
+                fields=["priority_level", "-created_at"],
+                name="caa_priority_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="complaintexport",
+            index=models.Index(
+                fields=["status", "expires_at"], name="export_status_expires_idx"
+            ),
+        ),
+    ]
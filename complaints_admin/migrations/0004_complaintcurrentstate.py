@@ -0,0 +1,143 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0003_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComplaintCurrentState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "complaint_id",
+                    models.CharField(
+                        help_text="معرف الشكوى في خدمة الشكاوى",
+                        max_length=50,
+                        unique=True,
+                        verbose_name="معرف الشكوى",
+                    ),
+                ),
+                (
+                    "last_action_id",
+                    models.BigIntegerField(
+                        help_text="معرف آخر إجراء أدمن على الشكوى",
+                        verbose_name="معرف آخر إجراء",
+                    ),
+                ),
+                (
+                    "last_action_type",
+                    models.CharField(
+                        choices=[
+                            ("received", "تم الاستلام"),
+                            ("reviewed", "تمت المراجعة"),
+                            ("assigned", "تم الإسناد"),
+                            ("escalated", "تم التصعيد"),
+                            ("resolved", "تم الحل"),
+                            ("rejected", "تم الرفض"),
+                            ("archived", "تم الأرشفة"),
+                            ("reopened", "تم إعادة الفتح"),
+                        ],
+                        max_length=20,
+                        verbose_name="نوع آخر إجراء",
+                    ),
+                ),
+                (
+                    "last_action_at",
+                    models.DateTimeField(verbose_name="تاريخ آخر إجراء"),
+                ),
+                (
+                    "last_admin_id",
+                    models.CharField(max_length=50, verbose_name="معرف آخر أدمن"),
+                ),
+                (
+                    "assigned_to_representative_id",
+                    models.CharField(
+                        blank=True,
+                        max_length=50,
+                        null=True,
+                        verbose_name="معرف النائب المُسند إليه",
+                    ),
+                ),
+                (
+                    "assigned_to_representative_name",
+                    models.CharField(
+                        blank=True,
+                        max_length=100,
+                        verbose_name="اسم النائب المُسند إليه",
+                    ),
+                ),
+                (
+                    "priority_level",
+                    models.CharField(
+                        choices=[
+                            ("low", "منخفضة"),
+                            ("medium", "متوسطة"),
+                            ("high", "عالية"),
+                            ("urgent", "عاجلة"),
+                        ],
+                        default="medium",
+                        max_length=20,
+                        verbose_name="مستوى الأولوية",
+                    ),
+                ),
+                (
+                    "expected_resolution_date",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="تاريخ الحل المتوقع"
+                    ),
+                ),
+                (
+                    "action_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="عدد الإجراءات"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث"),
+                ),
+            ],
+            options={
+                "verbose_name": "الحالة الحالية للشكوى",
+                "verbose_name_plural": "الحالات الحالية للشكاوى",
+                "ordering": ["-last_action_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["-last_action_at", "-id"], name="ccs_last_action_idx"
+                    ),
+                    models.Index(
+                        condition=models.Q(
+                            ("assigned_to_representative_id__isnull", False)
+                        ),
+                        fields=[
+                            "assigned_to_representative_id",
+                            "-last_action_at",
+                            "-id",
+                        ],
+                        name="ccs_rep_last_action_idx",
+                    ),
+                    models.Index(
+                        fields=["priority_level", "-last_action_at", "-id"],
+                        name="ccs_priority_last_action_idx",
+                    ),
+                    models.Index(
+                        fields=["last_action_type", "-last_action_at", "-id"],
+                        name="ccs_type_last_action_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
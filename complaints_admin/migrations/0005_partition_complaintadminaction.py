@@ -0,0 +1,121 @@
+"""
+تحويل جدول إجراءات الأدمن إلى جدول مقسم حسب الشهر على PostgreSQL
+Convert ComplaintAdminAction to a monthly range-partitioned table on PostgreSQL.
+
+The primary key becomes (id, created_at) because PostgreSQL requires the
+partition key in every unique constraint; ids still come from one sequence.
+Other databases keep the plain table.
+"""
+
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import migrations
+from django.utils import timezone
+
+MONTHS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month):
+    end = add_months(month, 1)
+    return (
+        datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc),
+        datetime(end.year, end.month, 1, tzinfo=dt_timezone.utc),
+    )
+
+
+def partition_actions(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    model = apps.get_model('complaints_admin', 'ComplaintAdminAction')
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    legacy = f'{table}_legacy'
+    sequence = f'{table}_pid_seq'
+
+    for index in model._meta.indexes:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {qn(index.name)}')
+    schema_editor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+    schema_editor.execute(
+        f'ALTER TABLE {qn(legacy)} RENAME CONSTRAINT {qn(table + "_pkey")} TO {qn(legacy + "_pkey")}'
+    )
+
+    # التراجع عن الترحيل يُبقي التسلسل للجدول العادي، فقد يكون موجوداً
+    schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {qn(sequence)}')
+    schema_editor.execute(
+        f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) '
+        f'PARTITION BY RANGE (created_at)'
+    )
+    schema_editor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+    schema_editor.execute(f'ALTER SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id')
+    schema_editor.execute(
+        f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + "_pkey")} PRIMARY KEY (id, created_at)'
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(created_at) FROM {qn(legacy)}')
+        oldest = cursor.fetchone()[0] or timezone.now()
+    oldest = oldest.astimezone(dt_timezone.utc)
+    now = timezone.now().astimezone(dt_timezone.utc)
+
+    month = date(oldest.year, oldest.month, 1)
+    last = add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        start, end = month_bounds(month)
+        schema_editor.execute(
+            f'CREATE TABLE {qn(f"{table}_p{month:%Y_%m}")} PARTITION OF {qn(table)} '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = add_months(month, 1)
+    schema_editor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+
+    schema_editor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}')
+    schema_editor.execute(
+        f"SELECT setval('{sequence}', COALESCE((SELECT MAX(id) FROM {qn(table)}), 0) + 1, false)"
+    )
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+    schema_editor.execute(f'DROP TABLE {qn(legacy)}')
+
+
+def unpartition_actions(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    model = apps.get_model('complaints_admin', 'ComplaintAdminAction')
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    partitioned = f'{table}_partitioned'
+    sequence = f'{table}_pid_seq'
+
+    for index in model._meta.indexes:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {qn(index.name)}')
+    schema_editor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(partitioned)}')
+    schema_editor.execute(
+        f'ALTER TABLE {qn(partitioned)} RENAME CONSTRAINT {qn(table + "_pkey")} '
+        f'TO {qn(partitioned + "_pkey")}'
+    )
+    schema_editor.execute(f'CREATE TABLE {qn(table)} (LIKE {qn(partitioned)} INCLUDING DEFAULTS)')
+    schema_editor.execute(f'ALTER SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id')
+    schema_editor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + "_pkey")} PRIMARY KEY (id)')
+    schema_editor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(partitioned)}')
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+    schema_editor.execute(f'DROP TABLE {qn(partitioned)} CASCADE')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0004_complaintcurrentstate"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_actions, unpartition_actions),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0005_partition_complaintadminaction"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComplaintActionArchiveSegment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="اسم ملف المقطع في مخزن الأرشيف",
+                        max_length=100,
+                        unique=True,
+                        verbose_name="اسم المقطع",
+                    ),
+                ),
+                (
+                    "row_count",
+                    models.PositiveIntegerField(verbose_name="عدد الإجراءات"),
+                ),
+                ("size_bytes", models.BigIntegerField(verbose_name="حجم الملف (بايت)")),
+                ("min_created_at", models.DateTimeField(verbose_name="أقدم إجراء")),
+                ("max_created_at", models.DateTimeField(verbose_name="أحدث إجراء")),
+                (
+                    "complaint_filter",
+                    models.BinaryField(
+                        help_text="مرشح Bloom لمعرفات الشكاوى الموجودة في المقطع",
+                        verbose_name="مرشح معرفات الشكاوى",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="تاريخ الأرشفة"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "مقطع أرشيف الإجراءات",
+                "verbose_name_plural": "مقاطع أرشيف الإجراءات",
+                "ordering": ["min_created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0006_complaintactionarchivesegment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaintcurrentstate",
+            name="opened_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="تاريخ أول إجراء على الشكوى، يُستخدم لحساب وقت الحل",
+                null=True,
+                verbose_name="تاريخ أول إجراء",
+            ),
+        ),
+        migrations.AddField(
+            model_name="complaintstatistics",
+            name="resolution_count",
+            field=models.IntegerField(
+                default=0,
+                help_text="عدد تراكمي لحساب متوسط وقت الحل",
+                verbose_name="عدد حالات الحل المحسوبة",
+            ),
+        ),
+        migrations.AddField(
+            model_name="complaintstatistics",
+            name="resolution_time_total",
+            field=models.FloatField(
+                default=0.0,
+                help_text="مجموع تراكمي لحساب متوسط وقت الحل",
+                verbose_name="مجموع أوقات الحل (بالأيام)",
+            ),
+        ),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0007_statistics_running_resolution_time"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaintadminaction",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="تصنيف الشكوى عند الإجراء (يستمر للإجراءات التالية في التجميعات)",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="admin_actions",
+                to="complaints_admin.complaintcategory",
+                verbose_name="تصنيف الشكوى",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ComplaintRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "grain",
+                    models.CharField(
+                        choices=[
+                            ("hour", "ساعة"),
+                            ("day", "يوم"),
+                            ("week", "أسبوع"),
+                            ("month", "شهر"),
+                        ],
+                        max_length=10,
+                        verbose_name="الفترة",
+                    ),
+                ),
+                (
+                    "period_start",
+                    models.DateTimeField(
+                        help_text="بداية الفترة بتوقيت الإحصائيات",
+                        verbose_name="بداية الفترة",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("all", "الكل"),
+                            ("representative", "النائب"),
+                            ("category", "التصنيف"),
+                            ("priority", "الأولوية"),
+                            ("admin", "الأدمن"),
+                        ],
+                        max_length=20,
+                        verbose_name="البُعد",
+                    ),
+                ),
+                (
+                    "dimension_value",
+                    models.CharField(
+                        blank=True,
+                        help_text="معرف النائب أو التصنيف أو الأدمن أو مستوى الأولوية (فارغ للبُعد الكلي)",
+                        max_length=100,
+                        verbose_name="قيمة البُعد",
+                    ),
+                ),
+                (
+                    "total_actions",
+                    models.IntegerField(default=0, verbose_name="إجمالي الإجراءات"),
+                ),
+                (
+                    "received_count",
+                    models.IntegerField(default=0, verbose_name="تم الاستلام"),
+                ),
+                (
+                    "reviewed_count",
+                    models.IntegerField(default=0, verbose_name="تمت المراجعة"),
+                ),
+                (
+                    "assigned_count",
+                    models.IntegerField(default=0, verbose_name="تم الإسناد"),
+                ),
+                (
+                    "escalated_count",
+                    models.IntegerField(default=0, verbose_name="تم التصعيد"),
+                ),
+                (
+                    "resolved_count",
+                    models.IntegerField(default=0, verbose_name="تم الحل"),
+                ),
+                (
+                    "rejected_count",
+                    models.IntegerField(default=0, verbose_name="تم الرفض"),
+                ),
+                (
+                    "archived_count",
+                    models.IntegerField(default=0, verbose_name="تم الأرشفة"),
+                ),
+                (
+                    "reopened_count",
+                    models.IntegerField(default=0, verbose_name="تم إعادة الفتح"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث"),
+                ),
+            ],
+            options={
+                "verbose_name": "تجميع الإجراءات",
+                "verbose_name_plural": "تجميعات الإجراءات",
+                "ordering": ["grain", "dimension", "period_start"],
+                "indexes": [
+                    models.Index(
+                        fields=["grain", "period_start"], name="rollup_grain_period_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="complaintrollup",
+            constraint=models.UniqueConstraint(
+                fields=("grain", "dimension", "dimension_value", "period_start"),
+                name="rollup_unique_bucket",
+            ),
+        ),
+    ]
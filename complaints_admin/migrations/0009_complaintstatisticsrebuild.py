@@ -0,0 +1,167 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0008_complaintrollup_action_category"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComplaintStatisticsRebuild",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="تاريخ البداية")),
+                (
+                    "end_date",
+                    models.DateField(help_text="شامل", verbose_name="تاريخ النهاية"),
+                ),
+                ("shard_days", models.PositiveIntegerField(verbose_name="أيام كل جزء")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "في الانتظار"),
+                            ("processing", "جاري المعالجة"),
+                            ("completed", "مكتمل"),
+                            ("failed", "فشل"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="الحالة",
+                    ),
+                ),
+                (
+                    "baseline_total",
+                    models.IntegerField(
+                        default=0,
+                        help_text="إجمالي الشكاوى في آخر صف قبل تاريخ البداية",
+                        verbose_name="الإجمالي قبل البداية",
+                    ),
+                ),
+                (
+                    "baseline_pending",
+                    models.IntegerField(default=0, verbose_name="المعلق قبل البداية"),
+                ),
+                (
+                    "previous_end_total",
+                    models.IntegerField(
+                        default=0,
+                        help_text="قيمة اللقطة عند تاريخ النهاية قبل إعادة البناء لإزاحة الصفوف اللاحقة",
+                        verbose_name="الإجمالي السابق عند النهاية",
+                    ),
+                ),
+                (
+                    "previous_end_pending",
+                    models.IntegerField(
+                        default=0, verbose_name="المعلق السابق عند النهاية"
+                    ),
+                ),
+                (
+                    "error_message",
+                    models.TextField(blank=True, verbose_name="رسالة الخطأ"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="تاريخ الإنشاء"
+                    ),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="تاريخ الاكتمال"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "إعادة بناء الإحصائيات",
+                "verbose_name_plural": "عمليات إعادة بناء الإحصائيات",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ComplaintStatisticsRebuildShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="تاريخ البداية")),
+                (
+                    "end_date",
+                    models.DateField(help_text="شامل", verbose_name="تاريخ النهاية"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "في الانتظار"),
+                            ("computed", "محسوب"),
+                            ("finalized", "مكتمل"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="الحالة",
+                    ),
+                ),
+                (
+                    "total_delta",
+                    models.IntegerField(
+                        default=0,
+                        help_text="صافي تغير إجمالي الشكاوى خلال الجزء",
+                        verbose_name="تغير الإجمالي",
+                    ),
+                ),
+                (
+                    "pending_delta",
+                    models.IntegerField(default=0, verbose_name="تغير المعلق"),
+                ),
+                (
+                    "action_count",
+                    models.IntegerField(default=0, verbose_name="عدد الإجراءات"),
+                ),
+                (
+                    "days_written",
+                    models.IntegerField(default=0, verbose_name="الأيام المكتوبة"),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="تاريخ الحساب"
+                    ),
+                ),
+                (
+                    "rebuild",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shards",
+                        to="complaints_admin.complaintstatisticsrebuild",
+                        verbose_name="إعادة البناء",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "جزء إعادة بناء",
+                "verbose_name_plural": "أجزاء إعادة البناء",
+                "ordering": ["rebuild", "start_date"],
+                "unique_together": {("rebuild", "start_date")},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0009_complaintstatisticsrebuild"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaintrollup",
+            name="assign_latency_sketch",
+            field=models.BinaryField(
+                blank=True,
+                help_text="ملخص كمّيات قابل للدمج لثواني الوصول إلى أول إسناد",
+                null=True,
+                verbose_name="ملخص زمن الإسناد",
+            ),
+        ),
+        migrations.AddField(
+            model_name="complaintrollup",
+            name="resolve_latency_sketch",
+            field=models.BinaryField(
+                blank=True,
+                help_text="ملخص كمّيات قابل للدمج لثواني الوصول إلى الحل",
+                null=True,
+                verbose_name="ملخص زمن الحل",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:50
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0010_rollup_latency_sketches"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaintadminaction",
+            name="representative_score_increase",
+            field=models.PositiveSmallIntegerField(
+                default=1,
+                help_text="النقاط المضافة لرصيد النائب عند حل الشكوى",
+                validators=[django.core.validators.MaxValueValidator(10)],
+                verbose_name="زيادة نقاط النائب",
+            ),
+        ),
+    ]
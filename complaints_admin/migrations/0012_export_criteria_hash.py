@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0011_action_representative_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaintexport",
+            name="criteria_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="SHA-256 للصيغة ومعايير التصفية بعد توحيدها",
+                max_length=64,
+                verbose_name="بصمة المعايير",
+            ),
+        ),
+        migrations.AddField(
+            model_name="complaintexport",
+            name="data_version",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="أكبر معرف إجراء أدمن عند بدء قراءة البيانات",
+                null=True,
+                verbose_name="إصدار البيانات",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="complaintexport",
+            index=models.Index(
+                fields=["criteria_hash", "status", "-completed_at"],
+                name="export_hash_status_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="complaintexport",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("status__in", ["pending", "processing"]),
+                    models.Q(("criteria_hash", ""), _negated=True),
+                ),
+                fields=("criteria_hash",),
+                name="export_hash_in_progress_uniq",
+            ),
+        ),
+    ]
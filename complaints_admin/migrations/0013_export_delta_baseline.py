@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0012_export_criteria_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaintexport",
+            name="baseline_export",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="التصدير السابق الذي يحتوي هذا التصدير فروقه فقط",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="delta_exports",
+                to="complaints_admin.complaintexport",
+                verbose_name="التصدير الأساس",
+            ),
+        ),
+        migrations.AddField(
+            model_name="complaintexport",
+            name="watermark_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="وقت بدء قراءة البيانات؛ تصدير الفروق التالي يبدأ منه",
+                null=True,
+                verbose_name="علامة البيانات",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="complaintcurrentstate",
+            index=models.Index(fields=["updated_at"], name="ccs_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0013_export_delta_baseline"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaintexport",
+            name="checkpoint",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="موضع آخر شكوى مكتوبة وعدد الصفوف وحجم الملف الجزئي عندها",
+                verbose_name="نقطة الاستئناف",
+            ),
+        ),
+        migrations.AddField(
+            model_name="complaintexport",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="آخر حفظ للتقدم؛ التصدير المتوقف عن التقدم يُعاد تشغيله",
+                null=True,
+                verbose_name="آخر نبضة",
+            ),
+        ),
+    ]
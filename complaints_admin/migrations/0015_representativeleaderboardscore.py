@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0014_export_checkpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RepresentativeLeaderboardScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("metric", models.CharField(max_length=20, verbose_name="المقياس")),
+                ("window", models.CharField(max_length=10, verbose_name="النافذة")),
+                (
+                    "period",
+                    models.CharField(
+                        help_text="all أو YYYY-MM أو YYYY-Www بتوقيت الإحصائيات",
+                        max_length=10,
+                        verbose_name="الفترة",
+                    ),
+                ),
+                (
+                    "representative_id",
+                    models.CharField(max_length=50, verbose_name="معرف النائب"),
+                ),
+                (
+                    "representative_name",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="اسم النائب"
+                    ),
+                ),
+                ("value", models.BigIntegerField(default=0, verbose_name="القيمة")),
+            ],
+            options={
+                "verbose_name": "رصيد لوحة الصدارة",
+                "verbose_name_plural": "أرصدة لوحة الصدارة",
+                "indexes": [
+                    models.Index(
+                        fields=[
+                            "metric",
+                            "window",
+                            "period",
+                            "-value",
+                            "-representative_id",
+                        ],
+                        name="leaderboard_rank_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="representativeleaderboardscore",
+            constraint=models.UniqueConstraint(
+                fields=("metric", "window", "period", "representative_id"),
+                name="leaderboard_unique_member",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("complaints_admin", "0015_representativeleaderboardscore"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComplaintExportRequest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "admin_id",
+                    models.CharField(max_length=50, verbose_name="معرف الأدمن"),
+                ),
+                (
+                    "admin_name",
+                    models.CharField(max_length=100, verbose_name="اسم الأدمن"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الطلب"),
+                ),
+                (
+                    "export",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="requests",
+                        to="complaints_admin.complaintexport",
+                        verbose_name="التصدير",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "طلب تصدير مُعاد",
+                "verbose_name_plural": "طلبات التصدير المُعادة",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["admin_id", "export"], name="export_request_admin_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="complaintexportrequest",
+            constraint=models.UniqueConstraint(
+                fields=("export", "admin_id"), name="export_request_unique_admin"
+            ),
+        ),
+    ]
@@ -3,9 +3,12 @@
 Complaints Admin Models for Naebak Admin Service
 """
 
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.utils import timezone
-from django.core.validators import MinLengthValidator, MaxLengthValidator
+from zoneinfo import ZoneInfo
+from django.core.validators import MinLengthValidator, MaxLengthValidator, MaxValueValidator
 import uuid
 
 
@@ -114,16 +117,220 @@ class ComplaintAdminAction(models.Model):
         verbose_name="تاريخ الحل المتوقع",
         help_text="التاريخ المتوقع لحل الشكوى"
     )
+    category = models.ForeignKey(
+        ComplaintCategory,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='admin_actions',
+        verbose_name="تصنيف الشكوى",
+        help_text="تصنيف الشكوى عند الإجراء (يستمر للإجراءات التالية في التجميعات)"
+    )
+    representative_score_increase = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MaxValueValidator(10)],
+        verbose_name="زيادة نقاط النائب",
+        help_text="النقاط المضافة لرصيد النائب عند حل الشكوى"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإجراء")
     
     class Meta:
         verbose_name = "إجراء أدمن على الشكوى"
         verbose_name_plural = "إجراءات الأدمن على الشكاوى"
         ordering = ['-created_at']
+        indexes = [
+            # الترقيم بالمؤشر: كل الفهارس تنتهي بـ (created_at, id) كمفتاح ترتيب فريد
+            models.Index(fields=['-created_at', '-id'], name='caa_created_id_idx'),
+            # الخط الزمني للشكوى
+            models.Index(fields=['complaint_id', '-created_at', '-id'], name='caa_complaint_created_idx'),
+            # إجراءات أدمن معين
+            models.Index(fields=['admin_id', '-created_at', '-id'], name='caa_admin_created_idx'),
+            # الشكاوى المُسندة لنائب (الإجراءات غير المُسندة لا تدخل الفهرس)
+            models.Index(
+                fields=['assigned_to_representative_id', '-created_at', '-id'],
+                name='caa_rep_created_idx',
+                condition=models.Q(assigned_to_representative_id__isnull=False),
+            ),
+            models.Index(fields=['action_type', '-created_at', '-id'], name='caa_type_created_idx'),
+            models.Index(fields=['priority_level', '-created_at', '-id'], name='caa_priority_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.get_action_type_display()} - {self.complaint_id}"
 
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # تحديث الحالة الحالية للشكوى وإحصائيات اليوم في نفس المعاملة
+            if is_new:
+                state, was_open = ComplaintCurrentState.record_action(self)
+                ComplaintStatistics.record_action(self, state, was_open)
+                from .statistics_index import notify_statistics_changed
+                transaction.on_commit(notify_statistics_changed)
+                if self.action_type == 'resolved' and state.assigned_to_representative_id:
+                    from .leaderboard import record_resolution
+                    transaction.on_commit(lambda: record_resolution(
+                        state.assigned_to_representative_id,
+                        state.assigned_to_representative_name,
+                        self.created_at,
+                        self.representative_score_increase,
+                    ))
+
+
+class ComplaintCurrentState(models.Model):
+    """
+    الحالة الحالية لكل شكوى
+    Current state of each complaint, maintained from its admin actions
+    """
+    complaint_id = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name="معرف الشكوى",
+        help_text="معرف الشكوى في خدمة الشكاوى"
+    )
+    last_action_id = models.BigIntegerField(
+        verbose_name="معرف آخر إجراء",
+        help_text="معرف آخر إجراء أدمن على الشكوى"
+    )
+    last_action_type = models.CharField(
+        max_length=20,
+        choices=ComplaintAdminAction.ACTION_TYPES,
+        verbose_name="نوع آخر إجراء"
+    )
+    last_action_at = models.DateTimeField(verbose_name="تاريخ آخر إجراء")
+    opened_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="تاريخ أول إجراء",
+        help_text="تاريخ أول إجراء على الشكوى، يُستخدم لحساب وقت الحل"
+    )
+    last_admin_id = models.CharField(max_length=50, verbose_name="معرف آخر أدمن")
+    assigned_to_representative_id = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        verbose_name="معرف النائب المُسند إليه"
+    )
+    assigned_to_representative_name = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="اسم النائب المُسند إليه"
+    )
+    priority_level = models.CharField(
+        max_length=20,
+        choices=ComplaintAdminAction._meta.get_field('priority_level').choices,
+        default='medium',
+        verbose_name="مستوى الأولوية"
+    )
+    expected_resolution_date = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="تاريخ الحل المتوقع"
+    )
+    action_count = models.PositiveIntegerField(default=0, verbose_name="عدد الإجراءات")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+
+    class Meta:
+        verbose_name = "الحالة الحالية للشكوى"
+        verbose_name_plural = "الحالات الحالية للشكاوى"
+        ordering = ['-last_action_at']
+        indexes = [
+            models.Index(fields=['-last_action_at', '-id'], name='ccs_last_action_idx'),
+            models.Index(
+                fields=['assigned_to_representative_id', '-last_action_at', '-id'],
+                name='ccs_rep_last_action_idx',
+                condition=models.Q(assigned_to_representative_id__isnull=False),
+            ),
+            models.Index(fields=['priority_level', '-last_action_at', '-id'], name='ccs_priority_last_action_idx'),
+            models.Index(fields=['last_action_type', '-last_action_at', '-id'], name='ccs_type_last_action_idx'),
+            # صادرات الفروق: الشكاوى التي تغيرت حالتها بعد علامة تصدير سابق
+            models.Index(fields=['updated_at'], name='ccs_updated_idx'),
+        ]
+
+    CLOSED_ACTION_TYPES = ('resolved', 'rejected', 'archived')
+
+    def __str__(self):
+        return f"{self.complaint_id} - {self.get_last_action_type_display()}"
+
+    @property
+    def is_open(self):
+        """هل الشكوى ما زالت معلقة؟"""
+        return self.last_action_type not in self.CLOSED_ACTION_TYPES
+
+    def apply(self, action):
+        """
+        تطبيق إجراء على الحالة (بدون حفظ)
+        Fold ``action`` into this state. The assignee and expected resolution
+        date carry forward from earlier actions when the new action omits them.
+        """
+        if self.opened_at is None:
+            self.opened_at = action.created_at
+        self.last_action_id = action.pk
+        self.last_action_type = action.action_type
+        self.last_action_at = action.created_at
+        self.last_admin_id = action.admin_id
+        self.priority_level = action.priority_level
+        if action.assigned_to_representative_id:
+            self.assigned_to_representative_id = action.assigned_to_representative_id
+            self.assigned_to_representative_name = action.assigned_to_representative_name
+        if action.expected_resolution_date:
+            self.expected_resolution_date = action.expected_resolution_date
+        self.action_count += 1
+
+    @classmethod
+    def record_action(cls, action):
+        """
+        تحديث الحالة بعد إدراج إجراء جديد
+        Update the complaint's state row for a newly inserted action.
+        The row is locked so concurrent actions on one complaint serialize.
+        Returns ``(state, was_open)``.
+        """
+        state, created = cls.objects.select_for_update().get_or_create(
+            complaint_id=action.complaint_id,
+            defaults={
+                'last_action_id': action.pk,
+                'last_action_type': action.action_type,
+                'last_action_at': action.created_at,
+                'last_admin_id': action.admin_id,
+                'action_count': 0,
+            },
+        )
+        was_open = not created and state.is_open
+        state.apply(action)
+        state.save()
+        return state, was_open
+
+
+class ComplaintActionArchiveSegment(models.Model):
+    """
+    مقاطع أرشيف إجراءات الأدمن القديمة
+    Catalog of compressed columnar segments holding archived admin actions
+    """
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="اسم المقطع",
+        help_text="اسم ملف المقطع في مخزن الأرشيف"
+    )
+    row_count = models.PositiveIntegerField(verbose_name="عدد الإجراءات")
+    size_bytes = models.BigIntegerField(verbose_name="حجم الملف (بايت)")
+    min_created_at = models.DateTimeField(verbose_name="أقدم إجراء")
+    max_created_at = models.DateTimeField(verbose_name="أحدث إجراء")
+    complaint_filter = models.BinaryField(
+        verbose_name="مرشح معرفات الشكاوى",
+        help_text="مرشح Bloom لمعرفات الشكاوى الموجودة في المقطع"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الأرشفة")
+
+    class Meta:
+        verbose_name = "مقطع أرشيف الإجراءات"
+        verbose_name_plural = "مقاطع أرشيف الإجراءات"
+        ordering = ['min_created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.row_count})"
+
 
 class ComplaintStatistics(models.Model):
     """
@@ -170,6 +377,16 @@ class ComplaintStatistics(models.Model):
         verbose_name="متوسط وقت الحل (بالأيام)",
         help_text="متوسط الوقت المطلوب لحل الشكوى"
     )
+    resolution_time_total = models.FloatField(
+        default=0.0,
+        verbose_name="مجموع أوقات الحل (بالأيام)",
+        help_text="مجموع تراكمي لحساب متوسط وقت الحل"
+    )
+    resolution_count = models.IntegerField(
+        default=0,
+        verbose_name="عدد حالات الحل المحسوبة",
+        help_text="عدد تراكمي لحساب متوسط وقت الحل"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
     
@@ -182,6 +399,267 @@ class ComplaintStatistics(models.Model):
     def __str__(self):
         return f"إحصائيات {self.date}"
 
+    @staticmethod
+    def day_of(moment):
+        """تاريخ اليوم بحدود أيام توقيت الإحصائيات (القاهرة)"""
+        return timezone.localtime(moment, ZoneInfo(settings.STATISTICS_TIME_ZONE)).date()
+
+    @classmethod
+    def record_action(cls, action, state, was_open):
+        """
+        تحديث صف اليوم بعد إدراج إجراء جديد
+        Apply a new action to its day's row with a single UPDATE of F()
+        expressions. ``state`` is the complaint state after the action and
+        ``was_open`` whether the complaint was pending before it.
+
+        total_complaints and pending_complaints are end-of-day snapshots: a
+        new day's row starts from the previous row's values.
+        """
+        deltas = {}
+        if state.action_count == 1:
+            deltas['new_complaints'] = 1
+            deltas['total_complaints'] = 1
+        if action.action_type == 'assigned':
+            deltas['assigned_complaints'] = 1
+        elif action.action_type == 'resolved':
+            deltas['resolved_complaints'] = 1
+        elif action.action_type == 'rejected':
+            deltas['rejected_complaints'] = 1
+        pending_delta = int(state.is_open) - int(was_open)
+        if pending_delta:
+            deltas['pending_complaints'] = pending_delta
+
+        updates = {field: F(field) + delta for field, delta in deltas.items()}
+        if action.action_type == 'resolved' and state.opened_at is not None:
+            days = (action.created_at - state.opened_at).total_seconds() / 86400
+            # المتوسط يُحسب من القيم القديمة في نفس جملة UPDATE
+            updates['resolution_time_total'] = F('resolution_time_total') + days
+            updates['resolution_count'] = F('resolution_count') + 1
+            updates['average_resolution_time'] = (
+                (F('resolution_time_total') + days) / (F('resolution_count') + 1)
+            )
+        if not updates:
+            return
+
+        day = cls.day_of(action.created_at)
+        updates['updated_at'] = timezone.now()
+        if cls.objects.filter(date=day).update(**updates):
+            return
+
+        previous = cls.objects.filter(date__lt=day).order_by('-date').first()
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    date=day,
+                    total_complaints=previous.total_complaints if previous else 0,
+                    pending_complaints=previous.pending_complaints if previous else 0,
+                )
+        except IntegrityError:
+            # أنشأ طلب متزامن صف اليوم أولاً
+            pass
+        cls.objects.filter(date=day).update(**updates)
+
+
+class ComplaintStatisticsRebuild(models.Model):
+    """
+    عملية إعادة بناء الإحصائيات اليومية
+    A sharded rebuild of ComplaintStatistics over a date range
+    """
+    STATUS_CHOICES = [
+        ('pending', 'في الانتظار'),
+        ('processing', 'جاري المعالجة'),
+        ('completed', 'مكتمل'),
+        ('failed', 'فشل'),
+    ]
+
+    start_date = models.DateField(verbose_name="تاريخ البداية")
+    end_date = models.DateField(verbose_name="تاريخ النهاية", help_text="شامل")
+    shard_days = models.PositiveIntegerField(verbose_name="أيام كل جزء")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="الحالة"
+    )
+    baseline_total = models.IntegerField(
+        default=0,
+        verbose_name="الإجمالي قبل البداية",
+        help_text="إجمالي الشكاوى في آخر صف قبل تاريخ البداية"
+    )
+    baseline_pending = models.IntegerField(default=0, verbose_name="المعلق قبل البداية")
+    previous_end_total = models.IntegerField(
+        default=0,
+        verbose_name="الإجمالي السابق عند النهاية",
+        help_text="قيمة اللقطة عند تاريخ النهاية قبل إعادة البناء لإزاحة الصفوف اللاحقة"
+    )
+    previous_end_pending = models.IntegerField(default=0, verbose_name="المعلق السابق عند النهاية")
+    error_message = models.TextField(blank=True, verbose_name="رسالة الخطأ")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
+    completed_at = models.DateTimeField(blank=True, null=True, verbose_name="تاريخ الاكتمال")
+
+    class Meta:
+        verbose_name = "إعادة بناء الإحصائيات"
+        verbose_name_plural = "عمليات إعادة بناء الإحصائيات"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"إعادة بناء {self.start_date} - {self.end_date} ({self.get_status_display()})"
+
+
+class ComplaintStatisticsRebuildShard(models.Model):
+    """
+    جزء من نطاق إعادة البناء
+    One contiguous day range of a statistics rebuild
+    """
+    STATUS_CHOICES = [
+        ('pending', 'في الانتظار'),
+        ('computed', 'محسوب'),
+        ('finalized', 'مكتمل'),
+    ]
+
+    rebuild = models.ForeignKey(
+        ComplaintStatisticsRebuild,
+        on_delete=models.CASCADE,
+        related_name='shards',
+        verbose_name="إعادة البناء"
+    )
+    start_date = models.DateField(verbose_name="تاريخ البداية")
+    end_date = models.DateField(verbose_name="تاريخ النهاية", help_text="شامل")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="الحالة"
+    )
+    total_delta = models.IntegerField(
+        default=0,
+        verbose_name="تغير الإجمالي",
+        help_text="صافي تغير إجمالي الشكاوى خلال الجزء"
+    )
+    pending_delta = models.IntegerField(default=0, verbose_name="تغير المعلق")
+    action_count = models.IntegerField(default=0, verbose_name="عدد الإجراءات")
+    days_written = models.IntegerField(default=0, verbose_name="الأيام المكتوبة")
+    computed_at = models.DateTimeField(blank=True, null=True, verbose_name="تاريخ الحساب")
+
+    class Meta:
+        verbose_name = "جزء إعادة بناء"
+        verbose_name_plural = "أجزاء إعادة البناء"
+        ordering = ['rebuild', 'start_date']
+        unique_together = ['rebuild', 'start_date']
+
+    def __str__(self):
+        return f"{self.start_date} - {self.end_date} ({self.get_status_display()})"
+
+
+class ComplaintRollup(models.Model):
+    """
+    تجميعات الإجراءات حسب الفترة والبُعد
+    Action counts rolled up by time grain and dimension
+    """
+    GRAINS = [
+        ('hour', 'ساعة'),
+        ('day', 'يوم'),
+        ('week', 'أسبوع'),
+        ('month', 'شهر'),
+    ]
+    DIMENSIONS = [
+        ('all', 'الكل'),
+        ('representative', 'النائب'),
+        ('category', 'التصنيف'),
+        ('priority', 'الأولوية'),
+        ('admin', 'الأدمن'),
+    ]
+
+    grain = models.CharField(max_length=10, choices=GRAINS, verbose_name="الفترة")
+    period_start = models.DateTimeField(
+        verbose_name="بداية الفترة",
+        help_text="بداية الفترة بتوقيت الإحصائيات"
+    )
+    dimension = models.CharField(max_length=20, choices=DIMENSIONS, verbose_name="البُعد")
+    dimension_value = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="قيمة البُعد",
+        help_text="معرف النائب أو التصنيف أو الأدمن أو مستوى الأولوية (فارغ للبُعد الكلي)"
+    )
+    total_actions = models.IntegerField(default=0, verbose_name="إجمالي الإجراءات")
+    received_count = models.IntegerField(default=0, verbose_name="تم الاستلام")
+    reviewed_count = models.IntegerField(default=0, verbose_name="تمت المراجعة")
+    assigned_count = models.IntegerField(default=0, verbose_name="تم الإسناد")
+    escalated_count = models.IntegerField(default=0, verbose_name="تم التصعيد")
+    resolved_count = models.IntegerField(default=0, verbose_name="تم الحل")
+    rejected_count = models.IntegerField(default=0, verbose_name="تم الرفض")
+    archived_count = models.IntegerField(default=0, verbose_name="تم الأرشفة")
+    reopened_count = models.IntegerField(default=0, verbose_name="تم إعادة الفتح")
+    assign_latency_sketch = models.BinaryField(
+        blank=True,
+        null=True,
+        verbose_name="ملخص زمن الإسناد",
+        help_text="ملخص كمّيات قابل للدمج لثواني الوصول إلى أول إسناد"
+    )
+    resolve_latency_sketch = models.BinaryField(
+        blank=True,
+        null=True,
+        verbose_name="ملخص زمن الحل",
+        help_text="ملخص كمّيات قابل للدمج لثواني الوصول إلى الحل"
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+
+    class Meta:
+        verbose_name = "تجميع الإجراءات"
+        verbose_name_plural = "تجميعات الإجراءات"
+        ordering = ['grain', 'dimension', 'period_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['grain', 'dimension', 'dimension_value', 'period_start'],
+                name='rollup_unique_bucket',
+            ),
+        ]
+        indexes = [
+            # شرائح لوحات المتابعة: بُعد وقيمة ونطاق زمني
+            models.Index(fields=['grain', 'period_start'], name='rollup_grain_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_grain_display()} {self.period_start:%Y-%m-%d %H:%M} - {self.dimension}"
+
+
+class RepresentativeLeaderboardScore(models.Model):
+    """
+    أرصدة لوحة صدارة النواب
+    Shared copy of the leaderboard sorted sets, one row per representative per set
+    """
+    metric = models.CharField(max_length=20, verbose_name="المقياس")
+    window = models.CharField(max_length=10, verbose_name="النافذة")
+    period = models.CharField(
+        max_length=10,
+        verbose_name="الفترة",
+        help_text="all أو YYYY-MM أو YYYY-Www بتوقيت الإحصائيات"
+    )
+    representative_id = models.CharField(max_length=50, verbose_name="معرف النائب")
+    representative_name = models.CharField(max_length=100, blank=True, verbose_name="اسم النائب")
+    value = models.BigIntegerField(default=0, verbose_name="القيمة")
+
+    class Meta:
+        verbose_name = "رصيد لوحة الصدارة"
+        verbose_name_plural = "أرصدة لوحة الصدارة"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'window', 'period', 'representative_id'],
+                name='leaderboard_unique_member',
+            ),
+        ]
+        indexes = [
+            # ترتيب ZREVRANGE: القيمة ثم المعرف تنازلياً
+            models.Index(
+                fields=['metric', 'window', 'period', '-value', '-representative_id'],
+                name='leaderboard_rank_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric}:{self.window}:{self.period} - {self.representative_id} ({self.value})"
+
 
 class ComplaintExport(models.Model):
     """
@@ -269,6 +747,45 @@ class ComplaintExport(models.Model):
         verbose_name="رسالة الخطأ",
         help_text="رسالة الخطأ في حالة فشل التصدير"
     )
+    criteria_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name="بصمة المعايير",
+        help_text="SHA-256 للصيغة ومعايير التصفية بعد توحيدها"
+    )
+    data_version = models.BigIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="إصدار البيانات",
+        help_text="أكبر معرف إجراء أدمن عند بدء قراءة البيانات"
+    )
+    watermark_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="علامة البيانات",
+        help_text="وقت بدء قراءة البيانات؛ تصدير الفروق التالي يبدأ منه"
+    )
+    baseline_export = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='delta_exports',
+        verbose_name="التصدير الأساس",
+        help_text="التصدير السابق الذي يحتوي هذا التصدير فروقه فقط"
+    )
+    checkpoint = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="نقطة الاستئناف",
+        help_text="موضع آخر شكوى مكتوبة وعدد الصفوف وحجم الملف الجزئي عندها"
+    )
+    heartbeat_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="آخر نبضة",
+        help_text="آخر حفظ للتقدم؛ التصدير المتوقف عن التقدم يُعاد تشغيله"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الطلب")
     completed_at = models.DateTimeField(
         blank=True,
@@ -281,6 +798,23 @@ class ComplaintExport(models.Model):
         verbose_name = "تصدير الشكاوى"
         verbose_name_plural = "تصديرات الشكاوى"
         ordering = ['-created_at']
+        indexes = [
+            # تنظيف التصديرات المنتهية والبحث عن التصديرات المكتملة
+            models.Index(fields=['status', 'expires_at'], name='export_status_expires_idx'),
+            # قائمة التصديرات بالترقيم بالمؤشر
+            models.Index(fields=['admin_id', '-created_at', '-id'], name='export_admin_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='export_created_id_idx'),
+            # إعادة استخدام تصدير مكتمل بنفس البصمة
+            models.Index(fields=['criteria_hash', 'status', '-completed_at'], name='export_hash_status_idx'),
+        ]
+        constraints = [
+            # تصدير واحد قيد التنفيذ لكل بصمة: الطلبات المطابقة تنضم إليه
+            models.UniqueConstraint(
+                fields=['criteria_hash'],
+                condition=models.Q(status__in=['pending', 'processing']) & ~models.Q(criteria_hash=''),
+                name='export_hash_in_progress_uniq',
+            ),
+        ]
         
     def __str__(self):
         return f"تصدير {self.export_id} - {self.get_status_display()}"
@@ -298,6 +832,37 @@ class ComplaintExport(models.Model):
         return round(self.file_size / (1024 * 1024), 2) if self.file_size else 0
 
 
+class ComplaintExportRequest(models.Model):
+    """
+    طلبات أدمن آخرين أُعيد لهم تصدير مطابق
+    Admins other than the owner whose request was answered by reusing this export
+    """
+    export = models.ForeignKey(
+        ComplaintExport,
+        on_delete=models.CASCADE,
+        related_name='requests',
+        verbose_name="التصدير"
+    )
+    admin_id = models.CharField(max_length=50, verbose_name="معرف الأدمن")
+    admin_name = models.CharField(max_length=100, verbose_name="اسم الأدمن")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الطلب")
+
+    class Meta:
+        verbose_name = "طلب تصدير مُعاد"
+        verbose_name_plural = "طلبات التصدير المُعادة"
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['export', 'admin_id'], name='export_request_unique_admin'),
+        ]
+        indexes = [
+            # قائمة تصديرات الأدمن تشمل ما أُعيد له
+            models.Index(fields=['admin_id', 'export'], name='export_request_admin_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.admin_id} - {self.export.export_id}"
+
+
 class ComplaintTemplate(models.Model):
     """
     قوالب الردود على الشكاوى
@@ -0,0 +1,200 @@
+"""
+ترقيم الصفحات لخدمة الأدمن - نائبك.كوم
+Pagination classes for Naebak Admin Service
+
+الترقيم بالمؤشر (keyset) على (created_at, id): كل صفحة استعلام نطاق على الفهرس
+بدون COUNT(*) وبدون OFFSET، فتكلفة الصفحة ثابتة مهما كان عمقها.
+الترقيم برقم الصفحة متاح اختيارياً للجداول الصغيرة.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    ترقيم بالمؤشر على (created_at, id) تنازلياً
+    Keyset pagination over (created_at, id), newest first, with opaque cursors
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    time_field = 'created_at'
+    tie_breaker_field = 'id'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        time_field = self.time_field
+        tie_field = self.tie_breaker_field
+        reverse = bool(cursor and cursor['reverse'])
+
+        if not isinstance(queryset, QuerySet):
+            return self.paginate_sequence(queryset, cursor)
+
+        if cursor is not None:
+            position, pk = cursor['position'], cursor['pk']
+            if reverse:
+                # الصفحة السابقة: العناصر الأحدث من أول عنصر في الصفحة الحالية
+                queryset = queryset.filter(
+                    Q(**{f'{time_field}__gte': position}),
+                    Q(**{f'{time_field}__gt': position}) | Q(**{f'{tie_field}__gt': pk}),
+                )
+            else:
+                # شرط time_field <= position يسمح باستخدام الفهرس كنطاق
+                queryset = queryset.filter(
+                    Q(**{f'{time_field}__lte': position}),
+                    Q(**{f'{time_field}__lt': position}) | Q(**{f'{tie_field}__lt': pk}),
+                )
+
+        if reverse:
+            queryset = queryset.order_by(time_field, tie_field)
+        else:
+            queryset = queryset.order_by(f'-{time_field}', f'-{tie_field}')
+
+        return self._set_page(list(queryset[:self.page_size + 1]), cursor)
+
+    def paginate_sequence(self, items, cursor):
+        """
+        ترقيم قائمة في الذاكرة بنفس قواعد المؤشر
+        Paginate an in-memory sequence (e.g. live rows merged with archived
+        history) with the same cursor semantics as a queryset.
+        """
+        def key(item):
+            return (getattr(item, self.time_field), getattr(item, self.tie_breaker_field))
+
+        reverse = bool(cursor and cursor['reverse'])
+        items = sorted(items, key=key, reverse=not reverse)
+        if cursor is not None:
+            position = (cursor['position'], cursor['pk'])
+            if reverse:
+                items = [item for item in items if key(item) > position]
+            else:
+                items = [item for item in items if key(item) < position]
+        return self._set_page(items[:self.page_size + 1], cursor)
+
+    def _set_page(self, results, cursor):
+        reverse = bool(cursor and cursor['reverse'])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        """ترميز موقع العنصر كمؤشر معتم داخل الرابط"""
+        position = getattr(instance, self.time_field)
+        pk = getattr(instance, self.tie_breaker_field)
+        raw = json.dumps([position.isoformat(), pk, int(reverse)], separators=(',', ':'))
+        token = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """فك ترميز المؤشر من الطلب أو None للصفحة الأولى"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            position, pk, reverse = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = parse_datetime(position)
+            if position is None or not isinstance(pk, int):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'pk': pk, 'reverse': bool(reverse)}
+
+
+class ComplaintStatePagination(KeysetPagination):
+    """
+    ترقيم الحالات الحالية حسب تاريخ آخر إجراء
+    Keyset pagination for complaint states, most recently active first
+    """
+    time_field = 'last_action_at'
+
+
+class RollupPagination(KeysetPagination):
+    """
+    ترقيم التجميعات حسب بداية الفترة
+    Keyset pagination for rollups, latest period first
+    """
+    time_field = 'period_start'
+
+
+class SmallTablePagination(PageNumberPagination):
+    """
+    ترقيم برقم الصفحة للجداول الصغيرة (اختياري)
+    Opt-in page-number pagination for small tables where a total count is cheap
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class LeaderboardPagination(LimitOffsetPagination):
+    """
+    ترقيم لوحة الصدارة بالإزاحة (المجموعات المرتبة تدعم الإزاحة بتكلفة لوغاريتمية)
+    Limit/offset pagination over a leaderboard sorted set
+    """
+    default_limit = 20
+    max_limit = 100
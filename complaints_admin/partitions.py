@@ -0,0 +1,191 @@
+"""
+تقسيم جدول إجراءات الأدمن حسب الشهر - خدمة الأدمن - نائبك.كوم
+Monthly range partitioning and retention for ComplaintAdminAction
+
+على PostgreSQL الجدول مقسم حسب created_at إلى قسم لكل شهر (حدود الشهور بتوقيت
+UTC) مع قسم افتراضي للقيم خارج النطاق. الأقسام المستقبلية تُنشأ مسبقاً، والأقسام
+القديمة تُفصل ثم تُحذف أو تُترك منفصلة للأرشفة. على قواعد البيانات الأخرى (SQLite
+في التطوير والاختبارات) الجدول عادي، والاحتفاظ يتم بحذف الصفوف القديمة.
+"""
+
+import logging
+import re
+from collections import namedtuple
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from .models import ComplaintAdminAction
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = ComplaintAdminAction._meta.db_table
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+PARTITION_PATTERN = re.compile(rf'^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+RETENTION_MODES = ('detach', 'drop')
+
+# نتيجة الاحتفاظ: الأقسام المفصولة أو المحذوفة، وعدد الإجراءات المحذوفة مباشرة (بدون تقسيم)
+RetentionResult = namedtuple('RetentionResult', ['partitions', 'actions'])
+
+
+def month_start(value):
+    """أول يوم في شهر التاريخ المعطى"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    """إضافة عدد من الشهور لأول يوم في شهر"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """اسم قسم الشهر"""
+    return f'{PARENT_TABLE}_p{month:%Y_%m}'
+
+
+def partition_bounds(month):
+    """حدود القسم [بداية الشهر، بداية الشهر التالي) بتوقيت UTC"""
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    end_month = add_months(month, 1)
+    end = datetime(end_month.year, end_month.month, 1, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def is_partitioned(using='default'):
+    """هل جدول الإجراءات مقسم على قاعدة البيانات الحالية؟"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_class WHERE relname = %s AND relkind = 'p'", [PARENT_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(using='default'):
+    """
+    أقسام الشهور المرفقة حالياً مرتبة من الأقدم
+    Return ``[(month, table_name), ...]`` for attached monthly partitions
+    """
+    if not is_partitioned(using):
+        return []
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def create_partition_sql(month, quote_name):
+    """جملة إنشاء قسم الشهر"""
+    start, end = partition_bounds(month)
+    return (
+        f'CREATE TABLE IF NOT EXISTS {quote_name(partition_name(month))} '
+        f'PARTITION OF {quote_name(PARENT_TABLE)} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def ensure_partitions(months_ahead=3, now=None, using='default'):
+    """
+    إنشاء أقسام الشهر الحالي والشهور القادمة إن لم تكن موجودة
+    Create partitions for the current month and ``months_ahead`` future
+    months. Returns the names of partitions that were created.
+    """
+    if not is_partitioned(using):
+        return []
+
+    connection = connections[using]
+    current = month_start(timezone.localtime(now or timezone.now(), dt_timezone.utc))
+    existing = {name for _, name in list_partitions(using)}
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) in existing:
+            continue
+        try:
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.execute(create_partition_sql(month, connection.ops.quote_name))
+        except DatabaseError as e:
+            # يحدث إذا كان القسم الافتراضي يحتوي صفوفاً في نطاق هذا الشهر
+            logger.error(f"Failed to create partition {partition_name(month)}: {str(e)}")
+            continue
+        created.append(partition_name(month))
+    return created
+
+
+def expired_partitions(retain_months, now=None, using='default'):
+    """الأقسام التي تقع بالكامل قبل فترة الاحتفاظ"""
+    cutoff = retention_cutoff(retain_months, now)
+    return [
+        (month, name) for month, name in list_partitions(using)
+        if partition_bounds(month)[1] <= cutoff
+    ]
+
+
+def retention_cutoff(retain_months, now=None):
+    """بداية أقدم شهر محتفظ به"""
+    current = month_start(timezone.localtime(now or timezone.now(), dt_timezone.utc))
+    return partition_bounds(add_months(current, -retain_months))[0]
+
+
+def apply_retention(retain_months, mode='detach', now=None, dry_run=False, using='default'):
+    """
+    تطبيق سياسة الاحتفاظ على الإجراءات القديمة
+    Detach (and with ``mode='drop'`` also drop) monthly partitions older than
+    ``retain_months``. Detached tables keep their data for archiving.
+
+    Without partitioning, ``mode='drop'`` deletes the old rows and
+    ``mode='detach'`` does nothing. Returns a ``RetentionResult`` of the
+    affected partition names and the number of rows deleted on the fallback
+    path.
+    """
+    if mode not in RETENTION_MODES:
+        raise ValueError(f'Unknown retention mode: {mode}')
+    if retain_months <= 0:
+        return RetentionResult([], 0)
+
+    if not is_partitioned(using):
+        if mode != 'drop':
+            return RetentionResult([], 0)
+        old_actions = ComplaintAdminAction.objects.using(using).filter(
+            created_at__lt=retention_cutoff(retain_months, now)
+        )
+        if dry_run:
+            return RetentionResult([], old_actions.count())
+        deleted, _ = old_actions.delete()
+        return RetentionResult([], deleted)
+
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    affected = []
+    for _, name in expired_partitions(retain_months, now, using):
+        affected.append(name)
+        if dry_run:
+            continue
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f'ALTER TABLE {quote_name(PARENT_TABLE)} DETACH PARTITION {quote_name(name)}'
+            )
+            if mode == 'drop':
+                cursor.execute(f'DROP TABLE {quote_name(name)}')
+        logger.info(f"Retention {mode}: {name}")
+    return RetentionResult(affected, 0)
@@ -0,0 +1,34 @@
+"""
+عميل Redis المشترك لخدمة الأدمن - نائبك.كوم
+Shared Redis client for Naebak Admin Service
+"""
+
+import logging
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis_client():
+    """
+    الحصول على عميل Redis مشترك لكل عملية
+    Return a process-wide Redis client built from REDIS_URL
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def reset_redis_client():
+    """إعادة تهيئة العميل (للاختبارات وبعد تفرع العمليات)"""
+    global _client
+    _client = None
@@ -0,0 +1,301 @@
+"""
+قائمة التوكينات الملغاة - خدمة الأدمن - نائبك.كوم
+Local token revocation check backed by a Redis-synchronized Bloom filter
+
+كل عامل يحتفظ بمرشح Bloom صغير لمعرفات التوكينات الملغاة (jti أو بصمة التوكين).
+عدم وجود المعرف في المرشح يعني قطعاً أن التوكين غير ملغى، لذا معظم الطلبات
+لا تحتاج أي بحث إضافي. فقط عند إصابة المرشح يتم البحث الدقيق (في Redis أو
+في القائمة المحلية). المرشح يُبنى من تغذية خدمة المصادقة (أو ملف JSON محلي)
+ويُحدَّث فورياً بين العمال عبر Redis pub/sub.
+"""
+
+import json
+import logging
+import threading
+import time
+
+import redis
+import requests
+from django.conf import settings
+
+from .bloom import BloomFilter
+from .redis_client import get_redis_client
+from .token_cache import token_digest
+
+logger = logging.getLogger(__name__)
+
+
+def revocation_id(payload, token):
+    """
+    معرف الإلغاء للتوكين: jti إن وُجد وإلا بصمة التوكين
+    Revocation key for a token: its ``jti`` claim, else its SHA-256 digest
+    """
+    return payload.get('jti') or token_digest(token)
+
+
+class RevocationList:
+    """
+    قائمة الإلغاء المحلية مع مزامنة Redis
+    Per-worker revocation list: Bloom filter in front of an exact store
+    """
+    channel = 'naebak:admin:revocations'
+    redis_key = 'naebak:admin:revoked-tokens'
+
+    def __init__(self, feed_url='', file_path='', capacity=100000, error_rate=0.001,
+                 refresh_interval=60, use_redis=False, timeout=5):
+        self.feed_url = feed_url
+        self.file_path = file_path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.use_redis = use_redis
+        self.timeout = timeout
+        self.filter_hits = 0
+        self.checks = 0
+        self._filter = BloomFilter(capacity, error_rate)
+        self._exact = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._threads = []
+        self._stop = threading.Event()
+
+    def is_revoked(self, rid):
+        """
+        هل التوكين ملغى؟ البحث الدقيق فقط عند إصابة المرشح
+        True if ``rid`` is revoked; only Bloom filter hits reach the exact store
+        """
+        if not self._loaded:
+            self.refresh()
+        self.checks += 1
+        if rid not in self._filter:
+            return False
+        self.filter_hits += 1
+        return self._exact_lookup(rid)
+
+    def revoke(self, rid, expires_at=None):
+        """
+        إلغاء توكين وإبلاغ باقي العمال
+        Revoke ``rid`` locally, record it in Redis and broadcast it
+        """
+        expires_at = expires_at or time.time() + settings.JWT_EXPIRATION_DELTA
+        self._add(rid, expires_at)
+        if not self.use_redis:
+            return
+        try:
+            client = get_redis_client()
+            pipe = client.pipeline()
+            pipe.zadd(self.redis_key, {rid: expires_at})
+            pipe.publish(self.channel, json.dumps({'jti': rid, 'exp': expires_at}))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Revocation broadcast failed: {str(e)}")
+
+    def refresh(self):
+        """
+        إعادة بناء المرشح من التغذية مع حذف الإدخالات المنتهية
+        Rebuild the filter from the feed and the shared Redis set, dropping expired entries
+        """
+        self._loaded = True
+        entries = self._fetch_feed()
+        if entries is None:
+            entries = self._read_file()
+        # المجموعة المشتركة في Redis تحمل إلغاءات العمال الآخرين قبل بدء هذا العامل
+        shared = self._read_shared()
+        if entries is None and shared is None:
+            return False
+
+        now = time.time()
+        with self._lock:
+            # الإلغاءات المحلية ورسائل pub/sub التي لم تصل للتغذية بعد تبقى
+            live = {rid: exp for rid, exp in self._exact.items() if exp > now}
+            for rid, exp in (entries or []) + (shared or []):
+                if exp > now:
+                    live[rid] = max(exp, live.get(rid, exp))
+            bloom = BloomFilter(max(self.capacity, len(live)), self.error_rate)
+            for rid in live:
+                bloom.add(rid)
+            self._filter = bloom
+            self._exact = live
+
+        if self.use_redis and live:
+            try:
+                client = get_redis_client()
+                pipe = client.pipeline()
+                pipe.zadd(self.redis_key, live)
+                pipe.zremrangebyscore(self.redis_key, '-inf', now)
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Revocation set sync failed: {str(e)}")
+        return True
+
+    def start_background_sync(self):
+        """تشغيل خيوط التحديث الدوري والاشتراك في قناة الإلغاء"""
+        if self._threads:
+            return
+        self._stop.clear()
+        if self.refresh_interval > 0 and (self.feed_url or self.file_path or self.use_redis):
+            self._threads.append(threading.Thread(
+                target=self._refresh_loop, name='revocation-refresh', daemon=True
+            ))
+        if self.use_redis:
+            self._threads.append(threading.Thread(
+                target=self._listen, name='revocation-listener', daemon=True
+            ))
+        for thread in self._threads:
+            thread.start()
+
+    def stop_background_sync(self):
+        """إيقاف خيوط المزامنة"""
+        self._stop.set()
+
+    def stats(self):
+        """إحصائيات المرشح"""
+        return {
+            'entries': len(self._filter),
+            'filter_bytes': self._filter.nbytes,
+            'hash_count': self._filter.hash_count,
+            'checks': self.checks,
+            'filter_hits': self.filter_hits,
+        }
+
+    def _add(self, rid, expires_at):
+        # النسخة المحلية تُحدَّث دائماً: رسالة pub/sub قد لا يرافقها zadd
+        with self._lock:
+            self._filter.add(rid)
+            self._exact[rid] = max(expires_at, self._exact.get(rid, expires_at))
+
+    def _exact_lookup(self, rid):
+        expires_at = self._exact.get(rid)
+        if expires_at is not None and expires_at > time.time():
+            return True
+        if not self.use_redis:
+            return False
+        try:
+            expires_at = get_redis_client().zscore(self.redis_key, rid)
+            return expires_at is not None and expires_at > time.time()
+        except redis.RedisError as e:
+            # عند تعذر البحث الدقيق لمعرف غير معروف محلياً نرفض بحذر
+            logger.warning(f"Revocation lookup failed: {str(e)}")
+            return expires_at is None
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Revocation refresh failed: {str(e)}")
+
+    def _listen(self):
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self._on_message(message['data'])
+            except redis.RedisError as e:
+                logger.warning(f"Revocation listener reconnecting: {str(e)}")
+                self._stop.wait(1.0)
+            finally:
+                # إغلاق الاشتراك القديم قبل إعادة الاتصال حتى لا تتسرب الاتصالات
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except redis.RedisError:
+                        pass
+
+    def _read_shared(self):
+        if not self.use_redis:
+            return None
+        try:
+            members = get_redis_client().zrangebyscore(self.redis_key, time.time(), '+inf', withscores=True)
+        except redis.RedisError as e:
+            logger.warning(f"Revocation set read failed: {str(e)}")
+            return None
+        return [
+            (rid.decode() if isinstance(rid, bytes) else rid, float(exp))
+            for rid, exp in members
+        ]
+
+    def _on_message(self, data):
+        try:
+            entry = json.loads(data)
+            self._add(entry['jti'], float(entry.get('exp') or time.time() + settings.JWT_EXPIRATION_DELTA))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed revocation message")
+
+    def _fetch_feed(self):
+        if not self.feed_url:
+            return None
+        try:
+            response = requests.get(self.feed_url, timeout=self.timeout)
+            if response.status_code == 200:
+                return self._parse(response.json())
+            logger.warning(f"Revocation feed returned {response.status_code}")
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Revocation feed fetch failed: {str(e)}")
+        return None
+
+    def _read_file(self):
+        if not self.file_path:
+            return None
+        try:
+            with open(self.file_path, encoding='utf-8') as f:
+                return self._parse(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Revocation file read failed: {str(e)}")
+            return None
+
+    def _parse(self, data):
+        """
+        صيغة التغذية: {"revoked": [{"jti": "...", "exp": 1700000000}, ...]}
+        Entries may carry ``token_digest`` instead of ``jti``.
+        """
+        default_exp = time.time() + settings.JWT_EXPIRATION_DELTA
+        entries = []
+        for entry in data.get('revoked', []):
+            rid = entry.get('jti') or entry.get('token_digest')
+            if rid:
+                entries.append((rid, float(entry.get('exp') or default_exp)))
+        return entries
+
+
+_revocation_list = None
+_revocation_list_lock = threading.Lock()
+
+
+def get_revocation_list():
+    """
+    قائمة الإلغاء الخاصة بالعملية الحالية
+    Return the per-process revocation list, starting its sync threads
+    """
+    global _revocation_list
+    if _revocation_list is None:
+        with _revocation_list_lock:
+            if _revocation_list is None:
+                _revocation_list = RevocationList(
+                    feed_url=settings.JWT_REVOCATION_FEED_URL,
+                    file_path=settings.JWT_REVOCATION_FILE,
+                    capacity=settings.JWT_REVOCATION_CAPACITY,
+                    error_rate=settings.JWT_REVOCATION_ERROR_RATE,
+                    refresh_interval=settings.JWT_REVOCATION_REFRESH_INTERVAL,
+                    use_redis=settings.JWT_REVOCATION_USE_REDIS,
+                )
+                _revocation_list.start_background_sync()
+    return _revocation_list
+
+
+def reset_revocation_list():
+    """إعادة تهيئة قائمة الإلغاء (للاختبارات)"""
+    global _revocation_list
+    with _revocation_list_lock:
+        if _revocation_list is not None:
+            _revocation_list.stop_background_sync()
+        _revocation_list = None
+
+
+def is_token_revoked(payload, token):
+    """هل التوكين ملغى؟"""
+    return get_revocation_list().is_revoked(revocation_id(payload, token))
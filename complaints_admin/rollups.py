@@ -0,0 +1,389 @@
+"""
+تجميعات الإجراءات متعددة الفترات والأبعاد - خدمة الأدمن - نائبك.كوم
+Multi-grain, multi-dimension rollups of ComplaintAdminAction
+
+التجميع الساعي يُحسب من الإجراءات الخام على دفعات باستخدام pandas، ثم تُشتق
+فترات اليوم والأسبوع والشهر من الصفوف الساعية المخزنة (العدادات قابلة للجمع).
+كل فترة تُستبدل بالكامل عند إعادة الحساب لذا الأمر آمن للتكرار.
+
+البُعد "النائب" يتبع آخر إسناد للشكوى حتى وقت الإجراء، والبُعد "التصنيف" يتبع
+آخر تصنيف مسجل للشكوى، حتى تُنسب إجراءات الحل للنائب المسؤول.
+
+كل صف يحمل أيضاً ملخصي كمّيات (QuantileSketch) لزمن الوصول إلى أول إسناد
+وإلى الحل منذ أول إجراء على الشكوى؛ الفترات الأكبر تدمج ملخصات الساعات.
+"""
+
+import logging
+from datetime import timedelta
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .archive import action_history, history_bounds
+from .models import ComplaintAdminAction, ComplaintRollup
+from .sketches import QuantileSketch, merge_sketches
+
+logger = logging.getLogger(__name__)
+
+ACTION_TYPES = [choice for choice, _ in ComplaintAdminAction.ACTION_TYPES]
+COUNTER_FIELDS = [f'{action_type}_count' for action_type in ACTION_TYPES]
+COARSE_GRAINS = ('day', 'week', 'month')
+
+# البُعد -> عمود الإطار (None للبُعد الكلي)
+DIMENSION_COLUMNS = {
+    'all': None,
+    'representative': 'representative',
+    'category': 'category',
+    'priority': 'priority_level',
+    'admin': 'admin_id',
+}
+# الأعمدة التي تستمر قيمتها من إجراءات الشكوى السابقة
+CARRIED_COLUMNS = {
+    'representative': 'assigned_to_representative_id',
+    'category': 'category_id',
+}
+SOURCE_COLUMNS = [
+    'complaint_id', 'created_at', 'action_type', 'admin_id', 'priority_level',
+    'assigned_to_representative_id', 'category_id',
+]
+BUCKET_KEYS = ['period_start', 'dimension', 'dimension_value']
+# عمود زمن الوصول (بالثواني) -> حقل الملخص
+LATENCY_COLUMNS = {
+    'assign_latency': 'assign_latency_sketch',
+    'resolve_latency': 'resolve_latency_sketch',
+}
+SKETCH_FIELDS = list(LATENCY_COLUMNS.values())
+DEFAULT_PERCENTILES = (50, 90, 99)
+SEED_BATCH_SIZE = 500
+
+
+def rollup_time_zone():
+    return ZoneInfo(settings.STATISTICS_TIME_ZONE)
+
+
+def local_floor(moment, grain):
+    """بداية الفترة المحلية التي تحتوي اللحظة (بدون منطقة زمنية)"""
+    local = timezone.localtime(moment, rollup_time_zone()).replace(tzinfo=None)
+    return bucket_starts(pd.Series([pd.Timestamp(local)]), grain).iloc[0].to_pydatetime()
+
+
+def bucket_starts(local_hours, grain):
+    """
+    بدايات الفترات لسلسلة أوقات محلية
+    Map naive local timestamps to the naive local start of their ``grain``
+    """
+    if grain == 'hour':
+        return local_hours.dt.floor('h')
+    days = local_hours.dt.normalize()
+    if grain == 'day':
+        return days
+    if grain == 'week':
+        # الأسبوع يبدأ الاثنين (ISO)
+        return days - pd.to_timedelta(days.dt.weekday, unit='D')
+    if grain == 'month':
+        return days.dt.to_period('M').dt.to_timestamp()
+    raise ValueError(f'Unknown grain: {grain}')
+
+
+def next_bucket(start, grain):
+    """بداية الفترة التالية (بدون منطقة زمنية)"""
+    if grain == 'hour':
+        return start + timedelta(hours=1)
+    if grain == 'day':
+        return start + timedelta(days=1)
+    if grain == 'week':
+        return start + timedelta(weeks=1)
+    month = start.month % 12 + 1
+    return start.replace(year=start.year + (start.month == 12), month=month)
+
+
+def to_aware(naive):
+    """تحويل وقت محلي بدون منطقة إلى وقت مع منطقة"""
+    return timezone.make_aware(naive, rollup_time_zone())
+
+
+def localize_series(local):
+    """تحويل سلسلة أوقات محلية إلى أوقات مع منطقة (الساعة المكررة تُدمج)"""
+    return local.dt.tz_localize(
+        rollup_time_zone(), ambiguous=np.ones(len(local), dtype=bool), nonexistent='shift_forward'
+    )
+
+
+def read_action_chunks(since, until, chunk_size):
+    """
+    قراءة الإجراءات (المؤرشفة والحية) على دفعات كإطارات pandas
+    Chunks follow ``action_history`` order: each complaint's actions are
+    consecutive and chronological, so values carry across chunk boundaries
+    """
+    rows = action_history(SOURCE_COLUMNS, since=since, until=until, chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield pd.DataFrame.from_records(chunk, columns=SOURCE_COLUMNS)
+
+
+class CarriedValues:
+    """
+    آخر قيمة معروفة لكل شكوى عبر الدفعات
+    Last known assignee/category per complaint, plus when it was opened and
+    whether it was ever assigned, seeded from history before the rollup
+    window the first time a complaint is seen.
+    """
+
+    def __init__(self, since):
+        self.since = since
+        self.values = {column: {} for column in CARRIED_COLUMNS}
+        self.opened = {}
+        self.assigned = set()
+        self.seeded = set()
+
+    def seed(self, complaint_ids):
+        missing = [cid for cid in complaint_ids if cid not in self.seeded]
+        sources = list(CARRIED_COLUMNS.values())
+        for start in range(0, len(missing), SEED_BATCH_SIZE):
+            batch = missing[start:start + SEED_BATCH_SIZE]
+            # السجل الكامل قبل النافذة، والأرشيف ضمنه، بترتيب زمني لكل شكوى
+            history = action_history(
+                ['complaint_id', 'created_at', 'action_type', *sources],
+                complaint_ids=batch, until=self.since,
+            )
+            for complaint_id, created_at, action_type, *values in history:
+                if complaint_id not in self.opened:
+                    self.opened[complaint_id] = pd.Timestamp(created_at).tz_convert('UTC')
+                if action_type == 'assigned':
+                    self.assigned.add(complaint_id)
+                # آخر قيمة غير فارغة هي الأحدث
+                for column, value in zip(CARRIED_COLUMNS, values):
+                    if value is not None:
+                        self.values[column][complaint_id] = value
+        self.seeded.update(missing)
+
+    def fill(self, frame):
+        """ملء القيم المستمرة داخل الدفعة ثم تحديث آخر القيم"""
+        self.seed(frame['complaint_id'].unique().tolist())
+        for column, source in CARRIED_COLUMNS.items():
+            values = frame[source].where(frame[source].notna() & (frame[source] != ''))
+            filled = values.groupby(frame['complaint_id']).ffill()
+            frame[column] = filled.fillna(frame['complaint_id'].map(self.values[column]))
+            last = values.dropna().groupby(frame['complaint_id']).last()
+            self.values[column].update(last.to_dict())
+        return self.latencies(frame)
+
+    def latencies(self, frame):
+        """زمن الوصول إلى أول إسناد وإلى كل حل منذ فتح الشكوى (بالثواني)"""
+        complaints = frame['complaint_id']
+        created = pd.to_datetime(frame['created_at'], utc=True)
+        first_seen = created.groupby(complaints).transform('min')
+        opened = pd.to_datetime(complaints.map(self.opened), utc=True).fillna(first_seen)
+        seconds = (created - opened).dt.total_seconds()
+
+        is_assign = frame['action_type'] == 'assigned'
+        first_assign = (
+            is_assign & ~complaints.isin(self.assigned)
+            & (is_assign.groupby(complaints).cumsum() == 1)
+        )
+        frame['assign_latency'] = seconds.where(first_assign)
+        frame['resolve_latency'] = seconds.where(frame['action_type'] == 'resolved')
+
+        for complaint_id, moment in first_seen.groupby(complaints).first().items():
+            self.opened.setdefault(complaint_id, moment)
+        self.assigned.update(complaints[is_assign])
+        return frame
+
+
+def aggregate_hourly(frame):
+    """
+    تجميع دفعة إجراءات إلى عدادات ساعية لكل بُعد
+    Returns the hourly counters and ``{sketch_field: {bucket: sketch}}``
+    """
+    local = frame['created_at'].pipe(pd.to_datetime, utc=True).dt.tz_convert(rollup_time_zone())
+    hours = bucket_starts(local.dt.tz_localize(None), 'hour')
+
+    parts = []
+    for dimension, column in DIMENSION_COLUMNS.items():
+        values = '' if column is None else frame[column]
+        part = pd.DataFrame({
+            'period_start': hours,
+            'dimension': dimension,
+            'dimension_value': values,
+            'action_type': frame['action_type'],
+            **{column: frame[column] for column in LATENCY_COLUMNS},
+        })
+        if column is not None:
+            part = part.dropna(subset=['dimension_value'])
+            part['dimension_value'] = part['dimension_value'].map(
+                lambda v: str(int(v)) if isinstance(v, float) else str(v)
+            )
+        parts.append(part)
+
+    long = pd.concat(parts, ignore_index=True)
+    counts = long.groupby(BUCKET_KEYS + ['action_type']).size().unstack('action_type', fill_value=0)
+    counts = counts.reindex(columns=ACTION_TYPES, fill_value=0)
+    counts.columns = COUNTER_FIELDS
+
+    sketches = {}
+    for column, field in LATENCY_COLUMNS.items():
+        latencies = long.dropna(subset=[column]).groupby(BUCKET_KEYS)[column]
+        sketches[field] = {
+            key: QuantileSketch().extend(values.to_numpy()) for key, values in latencies
+        }
+    return counts, sketches
+
+
+def merge_sketch_maps(target, source):
+    """دمج ملخصات دفعة في الملخصات المتراكمة"""
+    for field, buckets in source.items():
+        merged = target.setdefault(field, {})
+        for key, sketch in buckets.items():
+            if key in merged:
+                merged[key].merge(sketch)
+            else:
+                merged[key] = sketch
+    return target
+
+
+def coarsen(hourly, grain):
+    """اشتقاق فترة أكبر من العدادات الساعية"""
+    if hourly.empty:
+        return hourly
+    frame = hourly.reset_index()
+    frame['period_start'] = bucket_starts(frame['period_start'], grain)
+    return frame.groupby(BUCKET_KEYS)[COUNTER_FIELDS].sum()
+
+
+def coarsen_sketches(sketches, grain):
+    """دمج الملخصات الساعية في ملخصات الفترة الأكبر"""
+    coarse = {}
+    for field, buckets in sketches.items():
+        keys = list(buckets)
+        starts = bucket_starts(pd.Series([key[0] for key in keys], dtype='datetime64[ns]'), grain)
+        merged = coarse[field] = {}
+        for key, start in zip(keys, starts):
+            target = merged.setdefault((start, key[1], key[2]), QuantileSketch())
+            target.merge(buckets[key])
+    return coarse
+
+
+def write_rollups(counts, grain, start, end, sketches=None):
+    """
+    استبدال صفوف الفترة [start, end) بالعدادات المحسوبة
+    Replace all ``grain`` rows in the local window ``[start, end)``
+    """
+    sketches = sketches or {}
+    rows = []
+    if not counts.empty:
+        frame = counts.reset_index()
+        for field in SKETCH_FIELDS:
+            buckets = sketches.get(field, {})
+            frame[field] = [
+                buckets[key].to_bytes() if key in buckets else None
+                for key in zip(frame['period_start'], frame['dimension'], frame['dimension_value'])
+            ]
+        frame['period_start'] = localize_series(frame['period_start'])
+        frame['total_actions'] = frame[COUNTER_FIELDS].sum(axis=1)
+        for record in frame.to_dict('records'):
+            record['period_start'] = record['period_start'].to_pydatetime()
+            rows.append(ComplaintRollup(grain=grain, **{
+                key: (int(value) if isinstance(value, np.integer) else value)
+                for key, value in record.items()
+            }))
+
+    with transaction.atomic():
+        ComplaintRollup.objects.filter(
+            grain=grain, period_start__gte=to_aware(start), period_start__lt=to_aware(end)
+        ).delete()
+        ComplaintRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def read_hourly(start, end):
+    """قراءة الصفوف الساعية المخزنة بنفس شكل aggregate_hourly"""
+    rows = ComplaintRollup.objects.filter(
+        grain='hour', period_start__gte=to_aware(start), period_start__lt=to_aware(end)
+    ).values_list(*BUCKET_KEYS, *COUNTER_FIELDS, *SKETCH_FIELDS)
+    frame = pd.DataFrame.from_records(list(rows), columns=BUCKET_KEYS + COUNTER_FIELDS + SKETCH_FIELDS)
+    sketches = {field: {} for field in SKETCH_FIELDS}
+    if frame.empty:
+        return frame[BUCKET_KEYS + COUNTER_FIELDS].set_index(BUCKET_KEYS), sketches
+    frame['period_start'] = (
+        pd.to_datetime(frame['period_start'], utc=True)
+        .dt.tz_convert(rollup_time_zone()).dt.tz_localize(None)
+    )
+    for field in SKETCH_FIELDS:
+        present = frame.dropna(subset=[field])
+        for key, blob in zip(zip(*(present[column] for column in BUCKET_KEYS)), present[field]):
+            sketches[field][key] = QuantileSketch.from_bytes(blob)
+    return frame[BUCKET_KEYS + COUNTER_FIELDS].set_index(BUCKET_KEYS), sketches
+
+
+def backfill_rollups(since=None, until=None, chunk_size=None, progress=None):
+    """
+    إعادة حساب التجميعات للفترة [since, until)
+    Recompute hourly rollups from actions in ``[since, until)``, then derive
+    the day, week and month rollups of every period the window touches.
+    Defaults cover the whole action history, archived actions included.
+    Returns rows written per grain.
+    """
+    chunk_size = chunk_size or settings.ROLLUP_CHUNK_SIZE
+    if since is None or until is None:
+        first, last = history_bounds()
+        if first is None:
+            return {}
+        since = since or first
+        until = until or last + timedelta(microseconds=1)
+
+    hour_start = local_floor(since, 'hour')
+    hour_end = next_bucket(local_floor(until - timedelta(microseconds=1), 'hour'), 'hour')
+
+    carried = CarriedValues(to_aware(hour_start))
+    hourly = None
+    sketches = {}
+    processed = 0
+    for frame in read_action_chunks(to_aware(hour_start), to_aware(hour_end), chunk_size):
+        counts, chunk_sketches = aggregate_hourly(carried.fill(frame))
+        hourly = counts if hourly is None else hourly.add(counts, fill_value=0).astype(int)
+        merge_sketch_maps(sketches, chunk_sketches)
+        processed += len(frame)
+        if progress:
+            progress(processed)
+    if hourly is None:
+        hourly = pd.DataFrame(columns=COUNTER_FIELDS)
+
+    written = {'hour': write_rollups(hourly, 'hour', hour_start, hour_end, sketches)}
+    for grain in COARSE_GRAINS:
+        start = local_floor(to_aware(hour_start), grain)
+        end = next_bucket(local_floor(to_aware(hour_end) - timedelta(microseconds=1), grain), grain)
+        counts, hourly_sketches = read_hourly(start, end)
+        written[grain] = write_rollups(
+            coarsen(counts, grain), grain, start, end, coarsen_sketches(hourly_sketches, grain)
+        )
+    logger.info(f"Rolled up {processed} actions: {written}")
+    return written
+
+
+def latency_percentiles(rollups, percentiles=DEFAULT_PERCENTILES):
+    """
+    نسب زمن الإسناد والحل لمجموعة صفوف تجميع (بالساعات)
+    Merge the latency sketches of ``rollups`` and return count and
+    percentiles (in hours) for time-to-assign and time-to-resolve
+    """
+    blobs = {field: [] for field in SKETCH_FIELDS}
+    for row in rollups.values_list(*SKETCH_FIELDS):
+        for field, blob in zip(SKETCH_FIELDS, row):
+            blobs[field].append(blob)
+
+    result = {}
+    for field in SKETCH_FIELDS:
+        sketch = merge_sketches(blobs[field])
+        values = {}
+        for percentile in percentiles:
+            seconds = sketch.quantile(percentile / 100)
+            values[f'p{percentile:g}'] = round(seconds / 3600, 2) if seconds is not None else None
+        result[field.replace('_latency_sketch', '')] = {'count': sketch.count, **values}
+    return result
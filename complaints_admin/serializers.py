@@ -5,9 +5,10 @@ Complaints Admin Serializers for Naebak Admin Service
 
 from rest_framework import serializers
 from .models import (
-    ComplaintCategory, ComplaintAdminAction, ComplaintStatistics,
-    ComplaintExport, ComplaintTemplate
+    ComplaintCategory, ComplaintAdminAction, ComplaintCurrentState, ComplaintRollup,
+    ComplaintStatistics, ComplaintExport, ComplaintTemplate
 )
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
 from datetime import timedelta
 
@@ -58,6 +59,19 @@ class ComplaintAdminActionSerializer(serializers.ModelSerializer):
         return data
 
 
+class ComplaintCurrentStateSerializer(serializers.ModelSerializer):
+    """
+    Serializer للحالة الحالية للشكوى
+    """
+    last_action_type_display = serializers.CharField(source='get_last_action_type_display', read_only=True)
+    priority_level_display = serializers.CharField(source='get_priority_level_display', read_only=True)
+
+    class Meta:
+        model = ComplaintCurrentState
+        fields = '__all__'
+        read_only_fields = [field.name for field in ComplaintCurrentState._meta.fields]
+
+
 class ComplaintStatisticsSerializer(serializers.ModelSerializer):
     """
     Serializer لإحصائيات الشكاوى
@@ -83,6 +97,15 @@ class ComplaintStatisticsSerializer(serializers.ModelSerializer):
         return 0.0
 
 
+class ComplaintRollupSerializer(serializers.ModelSerializer):
+    """
+    Serializer لتجميعات الإجراءات
+    """
+    class Meta:
+        model = ComplaintRollup
+        exclude = ('id', 'assign_latency_sketch', 'resolve_latency_sketch')
+
+
 class ComplaintExportSerializer(serializers.ModelSerializer):
     """
     Serializer لتصدير الشكاوى
@@ -91,19 +114,32 @@ class ComplaintExportSerializer(serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     file_size_mb = serializers.ReadOnlyField()
     is_expired = serializers.ReadOnlyField()
+    baseline_export = serializers.SlugRelatedField(slug_field='export_id', read_only=True)
+    # أدمن آخرون أُعيد لهم هذا التصدير بدل إنشاء تصدير مطابق
+    shared_with = serializers.SlugRelatedField(source='requests', slug_field='admin_id', many=True, read_only=True)
     
     class Meta:
         model = ComplaintExport
         fields = '__all__'
         read_only_fields = (
             'export_id', 'status', 'file_path', 'file_size', 
-            'download_url', 'error_message', 'created_at', 'completed_at'
+            'download_url', 'error_message', 'created_at', 'completed_at',
+            'criteria_hash', 'data_version', 'watermark_at', 'checkpoint', 'heartbeat_at',
         )
         
     def validate_filter_criteria(self, value):
         """التحقق من معايير التصفية"""
         if not isinstance(value, dict):
             raise serializers.ValidationError("معايير التصفية يجب أن تكون كائن JSON")
+        if value.get('since_export'):
+            # تصدير فروق: الأساس تصدير مكتمل له علامة بيانات
+            try:
+                baseline = ComplaintExport.objects.filter(export_id=value['since_export']).first()
+            except DjangoValidationError:
+                baseline = None
+            if baseline is None or baseline.status != 'completed' or baseline.watermark_at is None:
+                raise serializers.ValidationError("since_export يجب أن يكون معرف تصدير مكتمل")
+            value = {**value, 'since_export': str(baseline.export_id)}
         return value
 
 
@@ -0,0 +1,176 @@
+"""
+دمج الطلبات المتزامنة المتطابقة - خدمة الأدمن - نائبك.كوم
+Single-flight call coalescing for Naebak Admin Service
+
+عند وصول عدة طلبات بنفس التوكين غير المعروف في نفس اللحظة، ينفذ طلب واحد فقط
+التحقق مع خدمة المصادقة وينتظر الباقي نتيجته: داخل العملية عبر threading.Event،
+وبين عمليات gunicorn عبر قفل Redis.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+import redis
+from django.conf import settings
+
+from .redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# حذف القفل فقط إذا كان ما زال مملوكاً لنا
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    """استدعاء جارٍ ينتظره باقي الطلبات"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    تنفيذ استدعاء واحد لكل مفتاح في نفس الوقت
+    Run at most one call per key at a time; concurrent callers share its outcome
+    """
+    redis_key_prefix = 'naebak:admin:flight:'
+
+    def __init__(self, lock_timeout=12.0, poll_interval=0.05, use_redis=False):
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.use_redis = use_redis
+        self.executed = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, poll=None):
+        """
+        تنفيذ fn مرة واحدة لكل مجموعة طلبات متزامنة بنفس المفتاح
+        Execute ``fn`` once for concurrent callers sharing ``key``.
+
+        ``poll`` is used by followers in other processes: it returns the
+        shared result (or raises the shared error) once the leader has
+        published it, and returns None while the result is not yet known.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, poll)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def stats(self):
+        """إحصائيات الدمج"""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
+    def _execute(self, fn):
+        with self._lock:
+            self.executed += 1
+        return fn()
+
+    def _run(self, key, fn, poll):
+        if not self.use_redis:
+            return self._execute(fn)
+
+        client = get_redis_client()
+        lock_key = self.redis_key_prefix + key
+        owner = uuid.uuid4().hex
+        try:
+            acquired = client.set(
+                lock_key, owner, nx=True, px=int(self.lock_timeout * 1000)
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight Redis lock unavailable: {str(e)}")
+            return self._execute(fn)
+
+        if acquired:
+            try:
+                return self._execute(fn)
+            finally:
+                try:
+                    client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, owner)
+                except redis.RedisError as e:
+                    logger.warning(f"Single-flight Redis unlock failed: {str(e)}")
+
+        # عملية أخرى تنفذ الاستدعاء: ننتظر نشر النتيجة أو تحرير القفل
+        with self._lock:
+            self.coalesced += 1
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            if poll is not None:
+                result = poll()
+                if result is not None:
+                    return result
+            try:
+                if not client.exists(lock_key):
+                    break
+            except redis.RedisError:
+                break
+
+        if poll is not None:
+            result = poll()
+            if result is not None:
+                return result
+        return self._execute(fn)
+
+
+_verification_flight = None
+_verification_flight_lock = threading.Lock()
+
+
+def get_verification_flight():
+    """
+    مجموعة الدمج الخاصة بالتحقق من التوكينات مع خدمة المصادقة
+    Return the per-process single-flight group for auth-service verification
+    """
+    global _verification_flight
+    if _verification_flight is None:
+        with _verification_flight_lock:
+            if _verification_flight is None:
+                _verification_flight = SingleFlight(
+                    lock_timeout=settings.AUTH_VERIFY_LOCK_TIMEOUT,
+                    use_redis=settings.JWT_TOKEN_CACHE_USE_REDIS,
+                )
+    return _verification_flight
+
+
+def reset_verification_flight():
+    """إعادة تهيئة مجموعة الدمج (للاختبارات)"""
+    global _verification_flight
+    with _verification_flight_lock:
+        _verification_flight = None
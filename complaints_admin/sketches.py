@@ -0,0 +1,137 @@
+"""
+ملخصات الكمّيات القابلة للدمج - خدمة الأدمن - نائبك.كوم
+Mergeable quantile sketches for latency percentiles
+
+الملخص من نوع DDSketch: كل قيمة تُعد في دلو لوغاريتمي بحيث يكون الخطأ
+النسبي لأي كمّية (p50, p90, p99) أقل من relative_accuracy. دمج ملخصين هو جمع
+عدادات الدلاء لذا النتيجة لا تعتمد على ترتيب الدمج، وعدد الدلاء محدود بـ
+max_bins (تُدمج أصغر الدلاء عند التجاوز) فالذاكرة ثابتة.
+"""
+
+import math
+import struct
+import zlib
+
+import numpy as np
+
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<BddqI')
+
+
+class QuantileSketch:
+    """
+    ملخص كمّيات بدقة نسبية ثابتة
+    Log-bucketed quantile sketch with bounded relative error
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1.0, max_bins=2048):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.bins = {}
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.bins.values())
+
+    def add(self, value, weight=1):
+        if value < self.min_value:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            self._collapse()
+
+    def extend(self, values):
+        """إضافة مصفوفة قيم دفعة واحدة"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        small = values < self.min_value
+        self.zero_count += int(small.sum())
+        keys, counts = np.unique(
+            np.ceil(np.log(values[~small]) / self._log_gamma).astype(np.int64), return_counts=True
+        )
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.bins[key] = self.bins.get(key, 0) + count
+        self._collapse()
+        return self
+
+    def merge(self, other):
+        """دمج ملخص آخر بنفس الدقة في هذا الملخص"""
+        if other.gamma != self.gamma or other.min_value != self.min_value:
+            raise ValueError('Cannot merge sketches with different accuracy')
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self._collapse()
+        return self
+
+    def quantile(self, q):
+        """
+        قيمة الكمّية q بين 0 و 1 (None لملخص فارغ)
+        Value at quantile ``q`` within ``relative_accuracy`` of the exact one
+        """
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+        keys = sorted(self.bins)
+        cumulative = np.cumsum([self.bins[key] for key in keys]) + self.zero_count
+        key = keys[int(np.searchsorted(cumulative, rank, side='right'))]
+        # منتصف الدلو بالمعنى النسبي
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantiles(self, qs):
+        return {q: self.quantile(q) for q in qs}
+
+    def to_bytes(self):
+        """تمثيل مضغوط: ترويسة ثم فروق المفاتيح والعدادات"""
+        keys = np.array(sorted(self.bins), dtype=np.int64)
+        counts = np.array([self.bins[key] for key in keys.tolist()], dtype=np.int64)
+        deltas = np.diff(keys, prepend=0)
+        body = zlib.compress(deltas.astype('<i4').tobytes() + counts.astype('<i8').tobytes())
+        return HEADER.pack(
+            FORMAT_VERSION, self.relative_accuracy, self.min_value, self.zero_count, len(keys)
+        ) + body
+
+    @classmethod
+    def from_bytes(cls, data, max_bins=2048):
+        version, accuracy, min_value, zero_count, size = HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported sketch version: {version}')
+        sketch = cls(accuracy, min_value, max_bins)
+        sketch.zero_count = zero_count
+        body = zlib.decompress(bytes(data[HEADER.size:]))
+        keys = np.cumsum(np.frombuffer(body[:4 * size], dtype='<i4').astype(np.int64))
+        counts = np.frombuffer(body[4 * size:], dtype='<i8')
+        sketch.bins = dict(zip(keys.tolist(), counts.tolist()))
+        return sketch
+
+    def _collapse(self):
+        if len(self.bins) <= self.max_bins:
+            return
+        # دمج أصغر الدلاء في الدلو الأكبر التالي يحافظ على دقة الذيل العلوي
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+
+def merge_sketches(blobs, **options):
+    """دمج ملخصات مخزنة (تُتجاهل القيم الفارغة)"""
+    merged = None
+    for blob in blobs:
+        if not blob:
+            continue
+        sketch = QuantileSketch.from_bytes(blob)
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged if merged is not None else QuantileSketch(**options)
@@ -0,0 +1,237 @@
+"""
+فهرس مجاميع تراكمية للإحصائيات اليومية - خدمة الأدمن - نائبك.كوم
+Per-worker cumulative-array index over ComplaintStatistics
+
+لكل عداد يومي مصفوفة مجاميع تراكمية (prefix sums) بيوم لكل خانة، فمجموع أي
+نطاق تواريخ هو فرق قيمتين: cumulative[end + 1] - cumulative[start].
+الفهرس يُحمَّل مرة لكل عملية ثم يُحدَّث تدريجياً: تغيّر يوم واحد يضيف الفرق
+للخانات التالية فقط. التحديث يتم عند كل تعديل محلي (بعد تأكيد المعاملة)
+ودورياً لالتقاط تعديلات العمال الآخرين عبر updated_at، مع نافذة تداخل لأن
+updated_at يُسجل قبل تأكيد المعاملة فقد يظهر صف بعد قراءة صفوف أحدث منه.
+"""
+
+import bisect
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+
+from .models import ComplaintStatistics
+
+# عدادات قابلة للجمع عبر الأيام
+SUM_FIELDS = (
+    'new_complaints', 'assigned_complaints', 'resolved_complaints', 'rejected_complaints',
+    'resolution_time_total', 'resolution_count',
+)
+# لقطات نهاية اليوم: قيمة النطاق هي قيمة آخر يوم فيه
+SNAPSHOT_FIELDS = ('total_complaints', 'pending_complaints')
+
+
+class StatisticsIndex:
+    """
+    فهرس المجاميع التراكمية
+    Dense per-day arrays with prefix sums for O(1) date-range totals
+    """
+
+    def __init__(self, refresh_interval=30, refresh_overlap=300):
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+        self.loaded = False
+        self.start = None
+        self.values = {}
+        self.cumulative = {}
+        self.snapshots = {}
+        self.row_days = []
+        self.last_updated = None
+        self.refreshed_at = 0.0
+        self._dirty = threading.Event()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.row_days)
+
+    def load(self):
+        """تحميل كل الصفوف وبناء المصفوفات"""
+        with self._lock:
+            self.start = None
+            self.values = {}
+            self.cumulative = {}
+            self.snapshots = {}
+            self.row_days = []
+            self.last_updated = None
+            self._dirty.clear()
+            self._apply(self._rows(ComplaintStatistics.objects.order_by('date')), rebuild=True)
+            # البناء الأولي بمجموع تراكمي واحد لكل عداد بدلاً من تحديث الخانات
+            for field in SUM_FIELDS:
+                if field in self.values:
+                    self.cumulative[field] = np.concatenate([[0.0], np.cumsum(self.values[field])])
+            self.refreshed_at = time.monotonic()
+            self.loaded = True
+
+    def refresh(self):
+        """تطبيق الصفوف التي تغيرت منذ آخر تحميل"""
+        with self._lock:
+            self._dirty.clear()
+            queryset = ComplaintStatistics.objects.all()
+            if self.last_updated is not None:
+                # إعادة تطبيق صفوف النافذة لا تغير شيئاً (الفرق صفر)، لكنها تلتقط
+                # معاملات أُكِّدت بعد آخر تحديث بتاريخ updated_at أقدم منه
+                queryset = queryset.filter(updated_at__gte=self.last_updated - self.refresh_overlap)
+            self._apply(self._rows(queryset))
+            self.refreshed_at = time.monotonic()
+
+    def mark_changed(self):
+        """تنبيه الفهرس بتعديل محلي ليُحدَّث قبل القراءة التالية"""
+        self._dirty.set()
+
+    def ensure_fresh(self):
+        if not self.loaded:
+            self.load()
+        elif self._dirty.is_set() or time.monotonic() - self.refreshed_at >= self.refresh_interval:
+            self.refresh()
+
+    def range_sum(self, field, start, end):
+        """
+        مجموع عداد على الأيام [start, end] شاملة
+        Sum of ``field`` over the inclusive date range ``[start, end]``
+        """
+        if self.start is None or end < start:
+            return 0
+        size = len(self.values[field])
+        i = min(max((start - self.start).days, 0), size)
+        j = min(max((end - self.start).days + 1, 0), size)
+        if j <= i:
+            return 0
+        cumulative = self.cumulative[field]
+        return cumulative[j] - cumulative[i]
+
+    def snapshot(self, field, day):
+        """قيمة لقطة في آخر يوم له صف حتى التاريخ المعطى"""
+        if self.start is None:
+            return 0
+        position = bisect.bisect_right(self.row_days, (day - self.start).days) - 1
+        if position < 0:
+            return 0
+        return self.snapshots[field][self.row_days[position]]
+
+    def summary(self, start, end):
+        """
+        ملخص نطاق تواريخ بنفس مفاتيح ComplaintStatisticsSerializer
+        Range totals and rates for ``[start, end]``. Counters are sums over
+        the range; total and pending complaints are as of ``end``.
+        """
+        with self._lock:
+            self.ensure_fresh()
+            result = {field: self.range_sum(field, start, end) for field in SUM_FIELDS}
+            for field in SNAPSHOT_FIELDS:
+                result[field] = self.snapshot(field, end)
+
+        for field in SUM_FIELDS + SNAPSHOT_FIELDS:
+            value = result[field]
+            result[field] = round(float(value), 4) if field == 'resolution_time_total' else int(value)
+        count = result['resolution_count']
+        result['average_resolution_time'] = (
+            round(result['resolution_time_total'] / count, 4) if count else 0.0
+        )
+        total = result['total_complaints']
+        result['resolution_rate'] = (
+            round((result['resolved_complaints'] / total) * 100, 2) if total > 0 else 0.0
+        )
+        result['rejection_rate'] = (
+            round((result['rejected_complaints'] / total) * 100, 2) if total > 0 else 0.0
+        )
+        result['start_date'] = start
+        result['end_date'] = end
+        return result
+
+    def _rows(self, queryset):
+        return queryset.values_list('date', 'updated_at', *SUM_FIELDS, *SNAPSHOT_FIELDS)
+
+    def _apply(self, rows, rebuild=False):
+        for row in rows:
+            day, updated_at = row[0], row[1]
+            index = self._slot(day)
+            for field, value in zip(SUM_FIELDS, row[2:2 + len(SUM_FIELDS)]):
+                delta = value - self.values[field][index]
+                if delta:
+                    self.values[field][index] = value
+                    if not rebuild:
+                        self.cumulative[field][index + 1:] += delta
+            for field, value in zip(SNAPSHOT_FIELDS, row[2 + len(SUM_FIELDS):]):
+                self.snapshots[field][index] = value
+            position = bisect.bisect_left(self.row_days, index)
+            if position == len(self.row_days) or self.row_days[position] != index:
+                self.row_days.insert(position, index)
+            if self.last_updated is None or updated_at > self.last_updated:
+                self.last_updated = updated_at
+
+    def _slot(self, day):
+        """موضع اليوم في المصفوفات مع توسيعها عند الحاجة"""
+        if self.start is None:
+            self.start = day
+            for field in SUM_FIELDS:
+                self.values[field] = np.zeros(0, dtype=np.float64)
+                self.cumulative[field] = np.zeros(1, dtype=np.float64)
+            for field in SNAPSHOT_FIELDS:
+                self.snapshots[field] = np.zeros(0, dtype=np.int64)
+
+        if day < self.start:
+            shift = (self.start - day).days
+            self.start = day
+            self.row_days = [index + shift for index in self.row_days]
+            for field in SUM_FIELDS:
+                self.values[field] = np.concatenate([np.zeros(shift), self.values[field]])
+                self.cumulative[field] = np.concatenate([np.zeros(shift), self.cumulative[field]])
+            for field in SNAPSHOT_FIELDS:
+                self.snapshots[field] = np.concatenate(
+                    [np.zeros(shift, dtype=np.int64), self.snapshots[field]]
+                )
+
+        index = (day - self.start).days
+        size = len(self.values[SUM_FIELDS[0]])
+        if index >= size:
+            grow = max(index + 1 - size, 32)
+            for field in SUM_FIELDS:
+                self.values[field] = np.concatenate([self.values[field], np.zeros(grow)])
+                self.cumulative[field] = np.concatenate(
+                    [self.cumulative[field], np.full(grow, self.cumulative[field][-1])]
+                )
+            for field in SNAPSHOT_FIELDS:
+                self.snapshots[field] = np.concatenate(
+                    [self.snapshots[field], np.zeros(grow, dtype=np.int64)]
+                )
+        return index
+
+
+_statistics_index = None
+_statistics_index_lock = threading.Lock()
+
+
+def get_statistics_index():
+    """
+    فهرس الإحصائيات الخاص بالعملية الحالية
+    Return the per-process statistics index
+    """
+    global _statistics_index
+    if _statistics_index is None:
+        with _statistics_index_lock:
+            if _statistics_index is None:
+                _statistics_index = StatisticsIndex(
+                    settings.STATISTICS_INDEX_REFRESH_INTERVAL, settings.STATISTICS_INDEX_REFRESH_OVERLAP,
+                )
+    return _statistics_index
+
+
+def reset_statistics_index():
+    """إعادة تهيئة الفهرس (للاختبارات)"""
+    global _statistics_index
+    with _statistics_index_lock:
+        _statistics_index = None
+
+
+def notify_statistics_changed():
+    """تنبيه فهرس العملية الحالية إن كان محملاً"""
+    if _statistics_index is not None:
+        _statistics_index.mark_changed()
@@ -0,0 +1,318 @@
+"""
+إعادة بناء الإحصائيات اليومية من سجل الإجراءات - خدمة الأدمن - نائبك.كوم
+Sharded, resumable rebuild of ComplaintStatistics from ComplaintAdminAction
+
+النطاق يُقسم إلى أجزاء أيام متتالية تُحسب بالتوازي (عمليات أو مهام Celery).
+كل جزء يقرأ إجراءات أيامه فقط مع بذرة لكل شكوى من تاريخها السابق (عدد
+الإجراءات، أول إجراء، هل كانت معلقة)، ويكتب صفوف أيامه دفعة واحدة
+(upsert). العدادات اليومية نهائية من أول مرة، أما اللقطات (الإجمالي والمعلق)
+فتُكتب نسبية لبداية الجزء ثم تُزاح في خطوة إنهاء متسلسلة قصيرة بعد اكتمال كل
+الأجزاء. حالة كل جزء محفوظة لذا يُستأنف البناء بعد أي انقطاع.
+
+كما في التحديث عند الكتابة، لقطات ما قبل البداية تؤخذ من آخر صف قبلها.
+الإجراءات تُقرأ من السجل الكامل (الأرشيف البارد والجدول الحي).
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time, timedelta
+from itertools import groupby, islice
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .archive import action_history, history_bounds
+from .models import (
+    ComplaintCurrentState, ComplaintStatistics,
+    ComplaintStatisticsRebuild, ComplaintStatisticsRebuildShard,
+)
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = (
+    'new_complaints', 'assigned_complaints', 'resolved_complaints', 'rejected_complaints',
+    'resolution_time_total', 'resolution_count',
+)
+SNAPSHOT_FIELDS = ('total_complaints', 'pending_complaints')
+UPSERT_FIELDS = COUNTER_FIELDS + SNAPSHOT_FIELDS + ('average_resolution_time', 'updated_at')
+# أنواع الإجراءات التي لها عداد يومي
+TYPE_COUNTERS = {
+    'assigned': 'assigned_complaints',
+    'resolved': 'resolved_complaints',
+    'rejected': 'rejected_complaints',
+}
+SEED_BATCH_SIZE = 500
+
+
+def statistics_time_zone():
+    return ZoneInfo(settings.STATISTICS_TIME_ZONE)
+
+
+def day_bounds(start_date, end_date):
+    """حدود [start_date, end_date] الشاملة كأوقات مع منطقة"""
+    zone = statistics_time_zone()
+    return (
+        timezone.make_aware(datetime.combine(start_date, time.min), zone),
+        timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), zone),
+    )
+
+
+def plan_rebuild(since=None, until=None, shard_days=None):
+    """
+    إنشاء عملية إعادة بناء وأجزائها
+    Create a rebuild of the inclusive day range ``[since, until]`` split into
+    ``shard_days``-long shards. Defaults cover the whole action history.
+    Returns None when there is nothing to rebuild.
+    """
+    shard_days = shard_days or settings.STATISTICS_REBUILD_SHARD_DAYS
+    if since is None or until is None:
+        first, last = history_bounds()
+        if first is None:
+            return None
+        since = since or ComplaintStatistics.day_of(first)
+        until = until or ComplaintStatistics.day_of(last)
+    if until < since:
+        return None
+
+    before = ComplaintStatistics.objects.filter(date__lt=since).order_by('-date').first()
+    at_end = ComplaintStatistics.objects.filter(date__lte=until).order_by('-date').first()
+    with transaction.atomic():
+        rebuild = ComplaintStatisticsRebuild.objects.create(
+            start_date=since,
+            end_date=until,
+            shard_days=shard_days,
+            baseline_total=before.total_complaints if before else 0,
+            baseline_pending=before.pending_complaints if before else 0,
+            previous_end_total=at_end.total_complaints if at_end else 0,
+            previous_end_pending=at_end.pending_complaints if at_end else 0,
+        )
+        shards = []
+        start = since
+        while start <= until:
+            end = min(start + timedelta(days=shard_days - 1), until)
+            shards.append(ComplaintStatisticsRebuildShard(rebuild=rebuild, start_date=start, end_date=end))
+            start = end + timedelta(days=1)
+        ComplaintStatisticsRebuildShard.objects.bulk_create(shards)
+    return rebuild
+
+
+def resumable_rebuild(since=None, until=None):
+    """آخر عملية غير مكتملة لنفس النطاق (أو لأي نطاق إن لم يُحدد)"""
+    rebuilds = ComplaintStatisticsRebuild.objects.exclude(status='completed')
+    if since is not None:
+        rebuilds = rebuilds.filter(start_date=since)
+    if until is not None:
+        rebuilds = rebuilds.filter(end_date=until)
+    return rebuilds.order_by('-created_at').first()
+
+
+def seed_states(complaint_ids, before):
+    """
+    حالة كل شكوى قبل بداية الجزء
+    ``{complaint_id: [action_count, opened_at, is_open]}`` from actions
+    before ``before``; complaints without earlier actions are omitted.
+    """
+    seeds = {}
+    for start in range(0, len(complaint_ids), SEED_BATCH_SIZE):
+        batch = complaint_ids[start:start + SEED_BATCH_SIZE]
+        history = action_history(('complaint_id', 'created_at', 'action_type'), complaint_ids=batch, until=before)
+        for complaint_id, created_at, action_type in history:
+            seed = seeds.get(complaint_id)
+            if seed is None:
+                seed = seeds[complaint_id] = [0, created_at, False]
+            seed[0] += 1
+            seed[2] = action_type not in ComplaintCurrentState.CLOSED_ACTION_TYPES
+    return seeds
+
+
+class ShardTotals:
+    """عدادات أيام جزء واحد بنفس قواعد ComplaintStatistics.record_action"""
+
+    def __init__(self):
+        self.days = {}
+        self.actions = 0
+        self.zone = statistics_time_zone()
+
+    def row(self, day):
+        row = self.days.get(day)
+        if row is None:
+            row = self.days[day] = dict.fromkeys(COUNTER_FIELDS + SNAPSHOT_FIELDS, 0)
+        return row
+
+    def fold(self, actions, seed):
+        """تطبيق إجراءات شكوى واحدة مرتبة زمنياً"""
+        count, opened_at, was_open = seed or (0, None, False)
+        for created_at, action_type in actions:
+            self.actions += 1
+            count += 1
+            if opened_at is None:
+                opened_at = created_at
+            is_open = action_type not in ComplaintCurrentState.CLOSED_ACTION_TYPES
+            deltas = {}
+            if count == 1:
+                deltas['new_complaints'] = deltas['total_complaints'] = 1
+            if action_type in TYPE_COUNTERS:
+                deltas[TYPE_COUNTERS[action_type]] = 1
+            if is_open != was_open:
+                deltas['pending_complaints'] = int(is_open) - int(was_open)
+            if action_type == 'resolved':
+                deltas['resolution_time_total'] = (created_at - opened_at).total_seconds() / 86400
+                deltas['resolution_count'] = 1
+            was_open = is_open
+            # إجراء بلا أي تغيير لا يُنشئ صفاً ليومه (كما عند الكتابة)
+            if deltas:
+                row = self.row(timezone.localtime(created_at, self.zone).date())
+                for field, delta in deltas.items():
+                    row[field] += delta
+
+
+def compute_shard(shard_id, chunk_size=None):
+    """
+    حساب جزء وكتابة صفوف أيامه
+    Compute one shard from its actions and upsert its day rows with
+    snapshots relative to the shard start. Safe to repeat.
+    """
+    chunk_size = chunk_size or settings.STATISTICS_REBUILD_CHUNK_SIZE
+    shard = ComplaintStatisticsRebuildShard.objects.get(pk=shard_id)
+    if shard.status != 'pending':
+        return shard
+    start, end = day_bounds(shard.start_date, shard.end_date)
+
+    rows = action_history(
+        ('complaint_id', 'created_at', 'action_type'), since=start, until=end, chunk_size=chunk_size
+    )
+    totals = ShardTotals()
+    complaints = groupby(rows, key=lambda row: row[0])
+    while True:
+        batch = [(cid, [row[1:] for row in group]) for cid, group in islice(complaints, SEED_BATCH_SIZE)]
+        if not batch:
+            break
+        seeds = seed_states([cid for cid, _ in batch], start)
+        for complaint_id, actions in batch:
+            totals.fold(actions, seeds.get(complaint_id))
+
+    existing = ComplaintStatistics.objects.filter(
+        date__gte=shard.start_date, date__lte=shard.end_date
+    ).values_list('date', flat=True)
+    # الأيام الموجودة بلا نشاط تُصفّر بدلاً من حذفها حتى يلتقطها فهرس الإحصائيات
+    for day in existing:
+        totals.row(day)
+
+    objects = []
+    running = dict.fromkeys(SNAPSHOT_FIELDS, 0)
+    for day in sorted(totals.days):
+        row = totals.days[day]
+        for field in SNAPSHOT_FIELDS:
+            running[field] += row[field]
+            row[field] = running[field]
+        count = row['resolution_count']
+        row['average_resolution_time'] = row['resolution_time_total'] / count if count else 0.0
+        objects.append(ComplaintStatistics(date=day, **row))
+
+    with transaction.atomic():
+        ComplaintStatistics.objects.bulk_create(
+            objects, batch_size=1000,
+            update_conflicts=True, unique_fields=['date'], update_fields=list(UPSERT_FIELDS),
+        )
+        shard.status = 'computed'
+        shard.total_delta = running['total_complaints']
+        shard.pending_delta = running['pending_complaints']
+        shard.action_count = totals.actions
+        shard.days_written = len(objects)
+        shard.computed_at = timezone.now()
+        shard.save()
+    return shard
+
+
+def finalize_rebuild(rebuild_id):
+    """
+    إزاحة لقطات الأجزاء إلى قيمها المطلقة
+    Shift each computed shard's relative snapshots by the baseline plus the
+    preceding shards' deltas, then shift rows after the range by the change
+    at its end. Each shard is finalized in its own transaction.
+    """
+    rebuild = ComplaintStatisticsRebuild.objects.get(pk=rebuild_id)
+    shards = list(rebuild.shards.order_by('start_date'))
+    if any(shard.status == 'pending' for shard in shards):
+        raise ValueError(f'Rebuild {rebuild.pk} has shards that are not computed yet')
+
+    total, pending = rebuild.baseline_total, rebuild.baseline_pending
+    for shard in shards:
+        if shard.status == 'computed':
+            with transaction.atomic():
+                ComplaintStatistics.objects.filter(
+                    date__gte=shard.start_date, date__lte=shard.end_date
+                ).update(
+                    total_complaints=F('total_complaints') + total,
+                    pending_complaints=F('pending_complaints') + pending,
+                    updated_at=timezone.now(),
+                )
+                shard.status = 'finalized'
+                shard.save(update_fields=['status'])
+        total += shard.total_delta
+        pending += shard.pending_delta
+
+    with transaction.atomic():
+        rebuild = ComplaintStatisticsRebuild.objects.select_for_update().get(pk=rebuild_id)
+        if rebuild.status != 'completed':
+            # الصفوف بعد النطاق مبنية على اللقطة القديمة عند نهايته
+            ComplaintStatistics.objects.filter(date__gt=rebuild.end_date).update(
+                total_complaints=F('total_complaints') + (total - rebuild.previous_end_total),
+                pending_complaints=F('pending_complaints') + (pending - rebuild.previous_end_pending),
+                updated_at=timezone.now(),
+            )
+            rebuild.status = 'completed'
+            rebuild.completed_at = timezone.now()
+            rebuild.save(update_fields=['status', 'completed_at'])
+    return rebuild
+
+
+def _compute_in_worker(shard_id, chunk_size):
+    close_old_connections()
+    shard = compute_shard(shard_id, chunk_size)
+    return shard.pk, shard.action_count, shard.days_written
+
+
+def run_rebuild(rebuild, workers=1, chunk_size=None, progress=None):
+    """
+    حساب الأجزاء المتبقية ثم الإنهاء
+    Compute every pending shard of ``rebuild`` (in ``workers`` processes when
+    more than one) and finalize it. ``progress(shard, done, total)`` is
+    called as shards complete.
+    """
+    shards = list(rebuild.shards.order_by('start_date'))
+    pending = [shard for shard in shards if shard.status == 'pending']
+    done = len(shards) - len(pending)
+    ComplaintStatisticsRebuild.objects.filter(pk=rebuild.pk).update(status='processing')
+    try:
+        if workers > 1 and len(pending) > 1:
+            # العمليات الفرعية تفتح اتصالاتها الخاصة بدلاً من مشاركة اتصال الأم
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                futures = {
+                    pool.submit(_compute_in_worker, shard.pk, chunk_size): shard for shard in pending
+                }
+                for future in as_completed(futures):
+                    future.result()
+                    done += 1
+                    if progress:
+                        progress(ComplaintStatisticsRebuildShard.objects.get(pk=futures[future].pk),
+                                 done, len(shards))
+        else:
+            for shard in pending:
+                shard = compute_shard(shard.pk, chunk_size)
+                done += 1
+                if progress:
+                    progress(shard, done, len(shards))
+        return finalize_rebuild(rebuild.pk)
+    except Exception as e:
+        logger.error(f"Statistics rebuild {rebuild.pk} failed: {str(e)}")
+        ComplaintStatisticsRebuild.objects.filter(pk=rebuild.pk).update(
+            status='failed', error_message=str(e)
+        )
+        raise
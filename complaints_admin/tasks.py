@@ -0,0 +1,151 @@
+"""
+مهام Celery لإدارة الشكاوى - خدمة الأدمن - نائبك.كوم
+Celery tasks for Complaints Admin
+"""
+
+import logging
+from datetime import timedelta
+
+from celery import chord, shared_task
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .archive import archive_actions
+from .exports import run_export
+from .leaderboard import get_leaderboard
+from .models import ComplaintExport
+from .partitions import apply_retention, ensure_partitions
+from .rollups import backfill_rollups
+from .statistics_rebuild import compute_shard, finalize_rebuild, plan_rebuild, resumable_rebuild
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def maintain_action_partitions():
+    """
+    إنشاء أقسام الشهور القادمة وتطبيق سياسة الاحتفاظ
+    Create upcoming action partitions and apply the retention policy
+    """
+    created = ensure_partitions(settings.ACTION_PARTITION_MONTHS_AHEAD)
+    retained = apply_retention(
+        settings.ACTION_RETENTION_MONTHS, mode=settings.ACTION_RETENTION_MODE
+    )
+    if created:
+        logger.info(f"Created action partitions: {', '.join(created)}")
+    return {'created': created, 'retained': retained.partitions, 'deleted_actions': retained.actions}
+
+
+@shared_task
+def archive_old_actions():
+    """
+    نقل الإجراءات القديمة إلى الأرشيف البارد
+    Archive actions older than ACTION_ARCHIVE_AFTER_DAYS
+    """
+    if settings.ACTION_ARCHIVE_AFTER_DAYS <= 0:
+        return {'segments': 0, 'actions': 0}
+    segments = archive_actions(settings.ACTION_ARCHIVE_AFTER_DAYS)
+    return {
+        'segments': len(segments),
+        'actions': sum(segment.row_count for segment in segments),
+    }
+
+
+@shared_task
+def prune_leaderboard_periods():
+    """
+    حذف لوحات الصدارة الشهرية والأسبوعية المنتهية
+    Delete month and week leaderboard rows older than LEADERBOARD_PERIOD_TTL_DAYS
+    """
+    return {'deleted': get_leaderboard().prune_expired()}
+
+
+@shared_task
+def refresh_complaint_rollups():
+    """
+    إعادة حساب تجميعات الساعات الأخيرة والفترات التي تحتويها
+    Recompute rollups for the trailing ROLLUP_REFRESH_HOURS
+    """
+    now = timezone.now()
+    return backfill_rollups(now - timedelta(hours=settings.ROLLUP_REFRESH_HOURS), now)
+
+
+@shared_task
+def rebuild_complaint_statistics(since=None, until=None, shard_days=None, resume=True):
+    """
+    إعادة بناء الإحصائيات اليومية كمجموعة مهام متوازية
+    Rebuild ComplaintStatistics for ``[since, until]`` (ISO dates) as a
+    chord: one task per shard, then a finalize callback. With ``resume`` an
+    unfinished rebuild of the same range continues from its pending shards.
+    """
+    since = parse_date(since) if since else None
+    until = parse_date(until) if until else None
+    rebuild = (resume and resumable_rebuild(since, until)) or plan_rebuild(since, until, shard_days)
+    if rebuild is None:
+        return None
+    pending = list(rebuild.shards.filter(status='pending').values_list('pk', flat=True))
+    rebuild.status = 'processing'
+    rebuild.save(update_fields=['status'])
+    if not pending:
+        finalize_statistics_rebuild.delay(rebuild.pk)
+    else:
+        chord(compute_statistics_shard.s(pk) for pk in pending)(
+            finalize_statistics_rebuild.si(rebuild.pk)
+        )
+    return rebuild.pk
+
+
+@shared_task(acks_late=True)
+def compute_statistics_shard(shard_id):
+    """حساب جزء واحد من إعادة البناء"""
+    shard = compute_shard(shard_id)
+    return {'shard': shard.pk, 'actions': shard.action_count, 'days': shard.days_written}
+
+
+@shared_task
+def finalize_statistics_rebuild(rebuild_id):
+    """إنهاء إعادة البناء بعد حساب كل الأجزاء"""
+    rebuild = finalize_rebuild(rebuild_id)
+    logger.info(f"Statistics rebuild {rebuild.pk} completed")
+    return rebuild.pk
+
+
+@shared_task
+def process_complaint_export(export_id):
+    """
+    تنفيذ طلب تصدير في الخلفية
+    Write a requested export file outside the web worker. The export is
+    claimed with a conditional update, so a duplicate delivery or a stream
+    that took it over first leaves it alone.
+    """
+    claimed = ComplaintExport.objects.filter(export_id=export_id, status='pending').update(
+        status='processing', heartbeat_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    export = run_export(ComplaintExport.objects.get(export_id=export_id))
+    return {'status': export.status, 'total_complaints': export.total_complaints}
+
+
+@shared_task
+def resume_stalled_exports():
+    """
+    إعادة جدولة التصديرات التي توقف تقدمها
+    Re-queue processing exports whose worker stopped saving progress for
+    EXPORT_STALLED_MINUTES (restart, lost task); CSV and ZIP exports
+    continue from their checkpoint
+    """
+    cutoff = timezone.now() - timedelta(minutes=settings.EXPORT_STALLED_MINUTES)
+    stalled = ComplaintExport.objects.filter(status='processing').filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, created_at__lt=cutoff)
+    )
+    requeued = []
+    for export in stalled:
+        # التحديث المشروط يمنع عاملين من إعادة جدولة نفس التصدير
+        if ComplaintExport.objects.filter(pk=export.pk, status='processing').update(status='pending'):
+            logger.warning(f"Export {export.export_id} stalled, resuming")
+            process_complaint_export.delay(str(export.export_id))
+            requeued.append(str(export.export_id))
+    return requeued
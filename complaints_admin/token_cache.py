@@ -0,0 +1,226 @@
+"""
+تخزين مؤقت للتوكينات المُتحقق منها - خدمة الأدمن - نائبك.كوم
+Verified token cache for Naebak Admin Service
+
+كل طلب يمر عبر JWTAuthentication، والتوكين نفسه يتكرر عشرات المرات في الثانية
+من لوحة التحكم. نحفظ بيانات التوكين بعد التحقق الأول في ذاكرة LRU محدودة
+(واختيارياً في Redis المشترك بين العمليات) حتى انتهاء صلاحيته.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+
+from .redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def token_digest(token):
+    """
+    بصمة التوكين المستخدمة كمفتاح للتخزين
+    SHA-256 digest of the raw token, so raw tokens are never stored as keys
+    """
+    if isinstance(token, str):
+        token = token.encode('utf-8')
+    return hashlib.sha256(token).hexdigest()
+
+
+class TokenCache:
+    """
+    ذاكرة LRU محدودة للتوكينات مع طبقة Redis اختيارية
+    Bounded LRU cache of verified token payloads with an optional Redis tier
+    """
+    redis_key_prefix = 'naebak:admin:token:'
+
+    def __init__(self, max_size=1024, ttl=300, use_redis=False, redis_key_prefix=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        if redis_key_prefix:
+            self.redis_key_prefix = redis_key_prefix
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expiry_for(self, payload, now):
+        """وقت الانتهاء: الأقرب بين مدة التخزين و exp الخاص بالتوكين"""
+        expires_at = now + self.ttl
+        exp = payload.get('exp')
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        return expires_at
+
+    def get(self, token):
+        """
+        إرجاع بيانات التوكين المخزنة أو None
+        Return the cached payload for ``token`` or None on a miss
+        """
+        key = token_digest(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+
+        payload = self._redis_get(key)
+        if payload is not None:
+            expires_at = self._expiry_for(payload, now)
+            if expires_at > now:
+                self._store(key, payload, expires_at)
+                with self._lock:
+                    self.hits += 1
+                    self.redis_hits += 1
+                return payload
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, token, payload):
+        """
+        تخزين بيانات توكين تم التحقق منه
+        Cache a verified payload until min(now + ttl, payload['exp'])
+        """
+        key = token_digest(token)
+        now = time.time()
+        expires_at = self._expiry_for(payload, now)
+        if expires_at <= now:
+            return
+
+        self._store(key, payload, expires_at)
+        self._redis_set(key, payload, expires_at - now)
+
+    def invalidate(self, token):
+        """حذف توكين من الذاكرة المحلية ومن Redis"""
+        key = token_digest(token)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.use_redis:
+            try:
+                get_redis_client().delete(self.redis_key_prefix + key)
+            except redis.RedisError as e:
+                logger.warning(f"Token cache Redis delete failed: {str(e)}")
+
+    def clear(self):
+        """تفريغ الذاكرة المحلية وتصفير العدادات"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.redis_hits = 0
+
+    def stats(self):
+        """
+        إحصائيات الاستخدام
+        Hit/miss counters for monitoring
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'redis_hits': self.redis_hits,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, payload, expires_at):
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _redis_get(self, key):
+        if not self.use_redis:
+            return None
+        try:
+            raw = get_redis_client().get(self.redis_key_prefix + key)
+        except redis.RedisError as e:
+            logger.warning(f"Token cache Redis read failed: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def _redis_set(self, key, payload, ttl):
+        if not self.use_redis:
+            return
+        try:
+            get_redis_client().set(
+                self.redis_key_prefix + key,
+                json.dumps(payload, default=str),
+                ex=max(1, int(ttl)),
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Token cache Redis write failed: {str(e)}")
+
+
+_token_cache = None
+_negative_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    """
+    الحصول على ذاكرة التوكينات الخاصة بالعملية الحالية
+    Return the per-process token cache configured from settings
+    """
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = TokenCache(
+                    max_size=settings.JWT_TOKEN_CACHE_SIZE,
+                    ttl=settings.JWT_TOKEN_CACHE_TTL,
+                    use_redis=settings.JWT_TOKEN_CACHE_USE_REDIS,
+                )
+    return _token_cache
+
+
+def get_negative_token_cache():
+    """
+    ذاكرة قصيرة المدى للتوكينات المرفوضة
+    Return the per-process cache of tokens rejected by the auth service
+    """
+    global _negative_token_cache
+    if _negative_token_cache is None:
+        with _token_cache_lock:
+            if _negative_token_cache is None:
+                _negative_token_cache = TokenCache(
+                    max_size=settings.JWT_NEGATIVE_CACHE_SIZE,
+                    ttl=settings.JWT_NEGATIVE_CACHE_TTL,
+                    use_redis=settings.JWT_TOKEN_CACHE_USE_REDIS,
+                    redis_key_prefix='naebak:admin:rejected-token:',
+                )
+    return _negative_token_cache
+
+
+def reset_token_cache():
+    """إعادة تهيئة الذاكرة (للاختبارات)"""
+    global _token_cache, _negative_token_cache
+    with _token_cache_lock:
+        _token_cache = None
+        _negative_token_cache = None
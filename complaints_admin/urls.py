@@ -0,0 +1,24 @@
+"""
+مسارات إدارة الشكاوى - خدمة الأدمن - نائبك.كوم
+Complaints Admin URLs for Naebak Admin Service
+"""
+
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+
+from . import views
+
+router = SimpleRouter()
+router.register('actions', views.ComplaintAdminActionViewSet, basename='complaint-action')
+router.register('states', views.ComplaintCurrentStateViewSet, basename='complaint-state')
+router.register('statistics', views.ComplaintStatisticsViewSet, basename='complaint-statistics')
+router.register('rollups', views.ComplaintRollupViewSet, basename='complaint-rollup')
+router.register('leaderboard', views.RepresentativeLeaderboardViewSet, basename='representative-leaderboard')
+router.register('export', views.ComplaintExportViewSet, basename='complaint-export')
+
+urlpatterns = [
+    # روابط موقَّعة بدون مصادقة؛ قبل مسارات الموجه
+    path('export/download/<str:name>/', views.ExportDownloadView.as_view(), name='complaint-export-download'),
+    path('', include(router.urls)),
+    path('<str:complaint_id>/timeline/', views.ComplaintTimelineView.as_view(), name='complaint-timeline'),
+]
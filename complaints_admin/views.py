@@ -1,3 +1,341 @@
-from django.shortcuts import render
+"""
+عروض إدارة الشكاوى - خدمة الأدمن - نائبك.كوم
+Complaints Admin Views for Naebak Admin Service
+"""
 
-# Create your views here.
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.http import Http404, HttpResponseForbidden, HttpResponseGone, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views import View
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .archive import archived_actions
+from .export_downloads import check_signature, download_response
+from .export_sources import export_manifest
+from .exports import IN_PROGRESS, request_export, share_export, stream_csv
+from .leaderboard import METRICS, WINDOWS, get_leaderboard, period_of
+from .models import (
+    ComplaintAdminAction, ComplaintCurrentState, ComplaintExport, ComplaintExportRequest, ComplaintRollup,
+    ComplaintStatistics,
+)
+from .pagination import (
+    ComplaintStatePagination, KeysetPagination, LeaderboardPagination, RollupPagination,
+    SmallTablePagination,
+)
+from .rollups import latency_percentiles
+from .serializers import (
+    ComplaintAdminActionSerializer, ComplaintCurrentStateSerializer, ComplaintExportSerializer,
+    ComplaintRollupSerializer, ComplaintStatisticsSerializer,
+)
+from .statistics_index import get_statistics_index
+from .tasks import process_complaint_export
+
+
+class ComplaintAdminActionViewSet(mixins.CreateModelMixin,
+                                  mixins.ListModelMixin,
+                                  mixins.RetrieveModelMixin,
+                                  viewsets.GenericViewSet):
+    """
+    إجراءات الأدمن على الشكاوى
+    Admin actions on complaints, newest first with cursor pagination
+    """
+    queryset = ComplaintAdminAction.objects.all()
+    serializer_class = ComplaintAdminActionSerializer
+    pagination_class = KeysetPagination
+    # الترتيب ثابت على (created_at, id) لذلك لا يوجد OrderingFilter
+    filter_backends = [DjangoFilterBackend]
+    # نطاق created_at يسمح لـ PostgreSQL بقراءة أقسام الشهور المعنية فقط
+    filterset_fields = {
+        'complaint_id': ['exact'],
+        'admin_id': ['exact'],
+        'action_type': ['exact'],
+        'priority_level': ['exact'],
+        'assigned_to_representative_id': ['exact'],
+        'created_at': ['gte', 'lt'],
+    }
+
+
+class ComplaintTimelineView(generics.ListAPIView):
+    """
+    الخط الزمني لشكوى واحدة
+    Timeline of admin actions for a single complaint
+    """
+    serializer_class = ComplaintAdminActionSerializer
+    pagination_class = KeysetPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        complaint_id = self.kwargs['complaint_id']
+        queryset = ComplaintAdminAction.objects.filter(complaint_id=complaint_id)
+        # دمج السجل المؤرشف عند الطلب فقط (?include_archived=true)
+        if self.request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes'):
+            return list(queryset) + archived_actions(complaint_id)
+        return queryset
+
+
+class ComplaintCurrentStateViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    الحالة الحالية للشكاوى: صف واحد لكل شكوى بدلاً من تجميع السجل
+    Current complaint states, one row per complaint
+    """
+    queryset = ComplaintCurrentState.objects.all()
+    serializer_class = ComplaintCurrentStateSerializer
+    pagination_class = ComplaintStatePagination
+    lookup_field = 'complaint_id'
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = [
+        'assigned_to_representative_id', 'priority_level', 'last_action_type', 'last_admin_id',
+    ]
+
+
+class ComplaintStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    الإحصائيات اليومية للشكاوى (تُحدَّث عند كل إجراء)
+    Daily complaint statistics, maintained at write time
+    """
+    queryset = ComplaintStatistics.objects.all()
+    serializer_class = ComplaintStatisticsSerializer
+    pagination_class = SmallTablePagination
+    lookup_field = 'date'
+    lookup_value_regex = r'\d{4}-\d{2}-\d{2}'
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {'date': ['gte', 'lte']}
+
+    @action(detail=False, url_path='range')
+    def date_range(self, request):
+        """
+        مجاميع ومعدلات نطاق تواريخ من فهرس المجاميع التراكمية
+        Totals and rates for ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive)
+        """
+        try:
+            start = parse_date(request.query_params.get('start', '') or '')
+            end = parse_date(request.query_params.get('end', '') or '')
+        except ValueError:
+            # صيغة صحيحة لتاريخ غير موجود مثل 2026-02-30
+            raise ValidationError({'start': 'تاريخ غير صالح'})
+        if start is None or end is None:
+            raise ValidationError({'start': 'start و end مطلوبان بصيغة YYYY-MM-DD'})
+        if end < start:
+            raise ValidationError({'end': 'تاريخ النهاية يجب أن يكون بعد تاريخ البداية'})
+        return Response(get_statistics_index().summary(start, end))
+
+    @action(detail=False)
+    def today(self, request):
+        """إحصائيات اليوم الحالي بتوقيت الإحصائيات"""
+        day = ComplaintStatistics.day_of(timezone.now())
+        statistics = ComplaintStatistics.objects.filter(date=day).first()
+        if statistics is None:
+            statistics = ComplaintStatistics(date=day)
+        return Response(self.get_serializer(statistics).data)
+
+
+class ComplaintRollupViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    تجميعات الإجراءات حسب الفترة والبُعد
+    Action rollups sliced by grain, dimension and period
+    """
+    queryset = ComplaintRollup.objects.all()
+    serializer_class = ComplaintRollupSerializer
+    pagination_class = RollupPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {
+        'grain': ['exact'],
+        'dimension': ['exact'],
+        'dimension_value': ['exact'],
+        'period_start': ['gte', 'lt'],
+    }
+
+    @action(detail=False)
+    def latency(self, request):
+        """
+        نسب زمن الإسناد والحل المدمجة من ملخصات الصفوف المصفاة
+        Time-to-assign/resolve percentiles (hours) merged from the sketches of
+        the filtered rows. ``grain`` defaults to day and ``dimension`` to all;
+        ``percentiles`` is a comma-separated list (default 50,90,99).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if 'grain' not in request.query_params:
+            queryset = queryset.filter(grain='day')
+        if 'dimension' not in request.query_params:
+            queryset = queryset.filter(dimension='all')
+        try:
+            percentiles = [
+                float(value) for value in request.query_params.get('percentiles', '50,90,99').split(',')
+            ]
+        except ValueError:
+            raise ValidationError({'percentiles': 'قائمة أرقام مفصولة بفواصل'})
+        if not percentiles or any(not 0 <= value <= 100 for value in percentiles):
+            raise ValidationError({'percentiles': 'القيم بين 0 و 100'})
+        return Response(latency_percentiles(queryset, percentiles))
+
+
+PERIOD_PATTERNS = {
+    'all': re.compile(r'^all$'),
+    'month': re.compile(r'^\d{4}-\d{2}$'),
+    'week': re.compile(r'^\d{4}-W\d{2}$'),
+}
+
+
+class LeaderboardEntries:
+    """شريحة من لوحة الصدارة بواجهة تكفي LimitOffsetPagination"""
+
+    def __init__(self, board, metric, window, period):
+        self.board = board
+        self.key = (metric, window, period)
+
+    def count(self):
+        return self.board.count(*self.key)
+
+    def __getitem__(self, window):
+        return self.board.top(*self.key, offset=window.start, limit=window.stop - window.start)
+
+
+class RepresentativeLeaderboardViewSet(viewsets.ViewSet):
+    """
+    لوحة صدارة النواب حسب عدد الحلول أو النقاط
+    Representative leaderboard: ?metric=resolutions|score&window=all|month|week&period=
+    """
+    pagination_class = LeaderboardPagination
+    lookup_value_regex = '[^/]+'
+
+    def get_board_key(self, request):
+        metric = request.query_params.get('metric', 'resolutions')
+        window = request.query_params.get('window', 'all')
+        if metric not in METRICS:
+            raise ValidationError({'metric': f'القيم المتاحة: {", ".join(METRICS)}'})
+        if window not in WINDOWS:
+            raise ValidationError({'window': f'القيم المتاحة: {", ".join(WINDOWS)}'})
+        period = request.query_params.get('period') or period_of(window, timezone.now())
+        if not PERIOD_PATTERNS[window].match(period):
+            raise ValidationError({'period': 'صيغة الفترة: all أو YYYY-MM أو YYYY-Www'})
+        return metric, window, period
+
+    def list(self, request):
+        metric, window, period = self.get_board_key(request)
+        paginator = self.pagination_class()
+        entries = LeaderboardEntries(get_leaderboard(), metric, window, period)
+        page = paginator.paginate_queryset(entries, request, view=self)
+        response = paginator.get_paginated_response([
+            {'rank': rank, 'representative_id': member, 'representative_name': name, 'value': value}
+            for rank, member, name, value in page
+        ])
+        response.data.update({'metric': metric, 'window': window, 'period': period})
+        return response
+
+    def retrieve(self, request, pk=None):
+        metric, window, period = self.get_board_key(request)
+        found = get_leaderboard().rank(pk, metric, window, period)
+        if found is None:
+            raise Http404
+        rank, value = found
+        return Response({
+            'representative_id': pk, 'rank': rank, 'value': value,
+            'metric': metric, 'window': window, 'period': period,
+        })
+
+
+class ComplaintExportViewSet(mixins.CreateModelMixin,
+                             mixins.ListModelMixin,
+                             mixins.RetrieveModelMixin,
+                             viewsets.GenericViewSet):
+    """
+    طلبات تصدير الشكاوى
+    Complaint export requests
+    """
+    queryset = ComplaintExport.objects.all()
+    serializer_class = ComplaintExportSerializer
+    pagination_class = KeysetPagination
+    lookup_field = 'export_id'
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'export_format']
+
+    def get_queryset(self):
+        queryset = super().get_queryset().prefetch_related('requests')
+        admin_id = self.request.query_params.get('admin_id')
+        if admin_id:
+            # تصديرات الأدمن وما أُعيد له من تصديرات مطابقة طلبها غيره
+            shared = ComplaintExportRequest.objects.filter(export=OuterRef('pk'), admin_id=admin_id)
+            queryset = queryset.filter(Q(admin_id=admin_id) | Q(Exists(shared)))
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        """
+        طلب تصدير؛ الطلب المطابق لتصدير جارٍ أو مكتمل حديث يعيده بدل إنشاء جديد
+        Create an export, or return an identical running or reusable one (200)
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        export, created = request_export(serializer.validated_data)
+        if created:
+            transaction.on_commit(lambda: process_complaint_export.delay(str(export.export_id)))
+        return Response(
+            self.get_serializer(export).data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, export_id=None):
+        """
+        إعادة تشغيل تصدير فاشل (CSV و ZIP يُستأنفان من نقطة الاستئناف)
+        Re-queue a failed export; CSV and ZIP exports resume from their checkpoint
+        """
+        export = self.get_object()
+        if export.status != 'failed':
+            raise ValidationError({'status': 'يمكن إعادة تشغيل التصديرات الفاشلة فقط'})
+        try:
+            with transaction.atomic():
+                ComplaintExport.objects.filter(pk=export.pk).update(status='pending', error_message='')
+        except IntegrityError:
+            # تصدير مطابق قيد التنفيذ: ينضم إليه الطلب
+            running = ComplaintExport.objects.get(criteria_hash=export.criteria_hash, status__in=IN_PROGRESS)
+            share_export(running, export.admin_id, export.admin_name)
+            return Response(self.get_serializer(running).data)
+        transaction.on_commit(lambda: process_complaint_export.delay(str(export.export_id)))
+        export.refresh_from_db()
+        return Response(self.get_serializer(export).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True)
+    def manifest(self, request, export_id=None):
+        """
+        وصف التصدير وعلامته والتصدير الأساس لتصدير الفروق
+        Export description, data watermark and baseline link
+        """
+        return Response(export_manifest(self.get_object()))
+
+    @action(detail=True)
+    def stream(self, request, export_id=None):
+        """
+        بث CSV التصدير مباشرة بدون ملف وسيط
+        Stream a CSV export row by row instead of waiting for the file; only
+        a still pending export's record is updated by the stream
+        """
+        export = self.get_object()
+        if export.export_format != 'csv':
+            raise ValidationError({'export_format': 'البث المباشر متاح لصيغة CSV فقط'})
+        response = StreamingHttpResponse(stream_csv(export), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="complaints-{export.export_id}.csv"'
+        return response
+
+
+class ExportDownloadView(View):
+    """
+    تحميل ملف تصدير برابط موقَّع
+    Serve an export file from its signed link; the signature and expiry in
+    the query string replace authentication, so no database query is made
+    """
+    http_method_names = ['get', 'head']
+
+    def get(self, request, name):
+        problem = check_signature(name, request.GET.get('expires', ''), request.GET.get('signature', ''))
+        if problem == 'expired':
+            return HttpResponseGone('انتهت صلاحية رابط التحميل')
+        if problem:
+            return HttpResponseForbidden('رابط التحميل غير صالح')
+        return download_response(request, name)
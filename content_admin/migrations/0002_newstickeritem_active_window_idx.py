@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("content_admin", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="newstickeritem",
+            index=models.Index(
+                fields=["is_active", "start_date", "end_date"],
+                name="ticker_active_window_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("content_admin", "0002_newstickeritem_active_window_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="newstickeritem",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="ticker_created_id_idx"
+            ),
+        ),
+    ]
@@ -62,6 +62,12 @@ class NewsTickerItem(models.Model):
         verbose_name = "خبر الشريط الإخباري"
         verbose_name_plural = "أخبار الشريط الإخباري"
         ordering = ['priority', '-created_at']
+        indexes = [
+            # الأخبار المعروضة حالياً في الشريط
+            models.Index(fields=['is_active', 'start_date', 'end_date'], name='ticker_active_window_idx'),
+            # قائمة الأخبار بالترقيم بالمؤشر
+            models.Index(fields=['-created_at', '-id'], name='ticker_created_id_idx'),
+        ]
         
     def __str__(self):
         return self.title
@@ -0,0 +1,27 @@
+"""
+Serializers لإدارة المحتوى - خدمة الأدمن - نائبك.كوم
+Content Admin Serializers for Naebak Admin Service
+"""
+
+from rest_framework import serializers
+from .models import NewsTickerItem
+
+
+class NewsTickerItemSerializer(serializers.ModelSerializer):
+    """
+    Serializer لعناصر الشريط الإخباري
+    """
+    class Meta:
+        model = NewsTickerItem
+        fields = '__all__'
+        read_only_fields = ('created_at', 'updated_at')
+
+    def validate(self, data):
+        """التحقق من صحة فترة العرض"""
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        if start_date and end_date and end_date <= start_date:
+            raise serializers.ValidationError({
+                'end_date': 'تاريخ النهاية يجب أن يكون بعد تاريخ البداية'
+            })
+        return data
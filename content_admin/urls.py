@@ -0,0 +1,16 @@
+"""
+مسارات إدارة المحتوى - خدمة الأدمن - نائبك.كوم
+Content Admin URLs for Naebak Admin Service
+"""
+
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+
+from . import views
+
+router = SimpleRouter()
+router.register('news', views.NewsTickerItemViewSet, basename='news-ticker')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -1,3 +1,23 @@
-from django.shortcuts import render
+"""
+عروض إدارة المحتوى - خدمة الأدمن - نائبك.كوم
+Content Admin Views for Naebak Admin Service
+"""
 
-# Create your views here.
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, viewsets
+
+from complaints_admin.pagination import KeysetPagination
+from .models import NewsTickerItem
+from .serializers import NewsTickerItemSerializer
+
+
+class NewsTickerItemViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    أخبار الشريط الإخباري (قراءة فقط)
+    News ticker items, newest first with cursor pagination
+    """
+    queryset = NewsTickerItem.objects.all()
+    serializer_class = NewsTickerItemSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['is_active']
@@ -0,0 +1,267 @@
+"""
+اختبارات الأرشيف البارد لإجراءات الأدمن
+Cold archive tests: segment format, archiving and timeline merge
+"""
+
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin import archive
+from complaints_admin.authentication import AdminUser
+from complaints_admin.bloom import BloomFilter
+from complaints_admin.leaderboard import compute_totals
+from complaints_admin.models import (
+    ComplaintActionArchiveSegment, ComplaintAdminAction, ComplaintCategory, ComplaintCurrentState,
+    ComplaintRollup, ComplaintStatistics,
+)
+from complaints_admin.rollups import backfill_rollups
+from complaints_admin.statistics_rebuild import plan_rebuild, run_rebuild
+
+
+class ArchiveTestCase(TestCase):
+    """إعداد مخزن أرشيف مؤقت"""
+
+    def setUp(self):
+        self.archive_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_root, ignore_errors=True)
+        override = override_settings(ACTION_ARCHIVE_ROOT=self.archive_root, ACTION_ARCHIVE_STORAGE='')
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def add_action(self, complaint_id, days_ago, **fields):
+        action = ComplaintAdminAction.objects.create(
+            complaint_id=complaint_id, admin_id='ADMIN-001', admin_name='أدمن',
+            action_type=fields.pop('action_type', 'reviewed'), **fields
+        )
+        created_at = timezone.now() - timedelta(days=days_ago, microseconds=action.pk)
+        ComplaintAdminAction.objects.filter(pk=action.pk).update(created_at=created_at)
+        action.created_at = created_at
+        return action
+
+
+class SegmentFormatTest(ArchiveTestCase):
+    """اختبارات بنية المقطع"""
+
+    def test_round_trip_with_row_groups(self):
+        """المقطع يعيد نفس القيم ويقرأ مجموعات الشكوى فقط"""
+        actions = [
+            self.add_action(
+                f'COMP-{i % 9:03d}', 400 + i,
+                notes='ملاحظة طويلة ' * (i % 3),
+                expected_resolution_date=timezone.now() if i % 4 == 0 else None,
+            )
+            for i in range(60)
+        ]
+        original_rows = archive.ROW_GROUP_ROWS
+        archive.ROW_GROUP_ROWS = 8
+        self.addCleanup(setattr, archive, 'ROW_GROUP_ROWS', original_rows)
+
+        data, complaint_ids = archive.build_segment(actions)
+        storage = archive.get_archive_storage()
+        name = storage.save('test.seg', archive.ContentFile(data))
+
+        footer = archive.read_footer(name)
+        self.assertEqual(footer['rows'], 60)
+        self.assertEqual(len(footer['row_groups']), 8)
+        self.assertEqual(sorted(complaint_ids), [f'COMP-{i:03d}' for i in range(9)])
+        # الصفوف مرتبة حسب الشكوى لذا كل شكوى في مجموعة أو اثنتين فقط
+        self.assertLessEqual(len(footer['complaints']['COMP-004']), 2)
+
+        rows = archive.read_segment_rows(name, 'COMP-004')
+        expected = sorted(
+            (a for a in actions if a.complaint_id == 'COMP-004'),
+            key=lambda a: (a.created_at, a.pk),
+        )
+        self.assertEqual([row['id'] for row in rows], [a.pk for a in expected])
+        for row, action in zip(rows, expected):
+            for column in archive.COLUMNS:
+                self.assertEqual(row[column], getattr(action, column), column)
+
+    def test_bloom_filter_serialization(self):
+        """تسلسل مرشح Bloom"""
+        bloom = BloomFilter(100, 0.01)
+        bloom.add('COMP-001')
+        restored = BloomFilter.from_bytes(bloom.to_bytes())
+        self.assertIn('COMP-001', restored)
+        self.assertNotIn('COMP-002', restored)
+        self.assertEqual(restored.count, 1)
+
+
+class ArchiveActionsTest(ArchiveTestCase):
+    """اختبارات نقل الإجراءات للأرشيف"""
+
+    def setUp(self):
+        super().setUp()
+        self.old = [self.add_action(f'COMP-{i % 3:03d}', 200 + i) for i in range(25)]
+        self.recent = [self.add_action(f'COMP-{i % 3:03d}', i) for i in range(5)]
+
+    def test_archive_moves_old_rows(self):
+        """الإجراءات القديمة تنتقل إلى مقاطع وتُحذف من الجدول الحي"""
+        out = StringIO()
+        call_command('archive_complaint_actions', older_than_days=90, segment_rows=10, stdout=out)
+
+        self.assertIn('Archived 25 actions into 3 segments', out.getvalue())
+        self.assertEqual(
+            sorted(ComplaintAdminAction.objects.values_list('id', flat=True)),
+            sorted(a.pk for a in self.recent),
+        )
+        segments = ComplaintActionArchiveSegment.objects.all()
+        self.assertEqual(sum(s.row_count for s in segments), 25)
+
+        history = archive.archived_actions('COMP-001')
+        expected = sorted(
+            (a for a in self.old if a.complaint_id == 'COMP-001'),
+            key=lambda a: (a.created_at, a.pk),
+        )
+        self.assertEqual([a.pk for a in history], [a.pk for a in expected])
+        self.assertEqual(history[0].get_action_type_display(), 'تمت المراجعة')
+
+    def test_archived_actions_date_range(self):
+        """تصفية السجل المؤرشف بالتاريخ"""
+        archive.archive_actions(90, segment_rows=100)
+        since = timezone.now() - timedelta(days=210)
+        history = archive.archived_actions('COMP-000', since=since)
+        self.assertTrue(history)
+        self.assertTrue(all(a.created_at >= since for a in history))
+
+    def test_timeline_merges_archive_on_request(self):
+        """الخط الزمني يدمج السجل المؤرشف عند الطلب"""
+        archive.archive_actions(90, segment_rows=10)
+        client = APIClient()
+        client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+
+        live = client.get('/api/v1/admin/complaints/COMP-002/timeline/')
+        self.assertEqual(
+            [item['id'] for item in live.data['results']],
+            [a.pk for a in sorted(self.recent, key=lambda a: a.created_at, reverse=True)
+             if a.complaint_id == 'COMP-002'],
+        )
+
+        ids, url = [], '/api/v1/admin/complaints/COMP-002/timeline/?include_archived=true&page_size=3'
+        while url:
+            response = client.get(url)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        everything = sorted(
+            (a for a in self.old + self.recent if a.complaint_id == 'COMP-002'),
+            key=lambda a: (a.created_at, a.pk), reverse=True,
+        )
+        self.assertEqual(ids, [a.pk for a in everything])
+
+
+class ArchivedHistoryRebuildTest(ArchiveTestCase):
+    """إعادة البناء من السجل الكامل لا تتأثر بالأرشفة"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            complaint_id = f'COMP-{i:03d}'
+            self.add_action(complaint_id, 300 - i)
+            self.add_action(
+                complaint_id, 250 - i, action_type='assigned',
+                assigned_to_representative_id=f'REP-{i % 2}', assigned_to_representative_name='نائب',
+            )
+            if i % 3:
+                self.add_action(complaint_id, 200 - i, action_type='resolved', representative_score_increase=5)
+        self.add_action('COMP-000', 3, action_type='resolved')
+        self.add_action('COMP-100', 2)
+
+    def rebuild_all(self):
+        call_command('rebuild_complaint_states', stdout=StringIO())
+        states = list(ComplaintCurrentState.objects.order_by('complaint_id').values_list(
+            'complaint_id', 'action_count', 'opened_at', 'last_action_id', 'assigned_to_representative_id',
+        ))
+        run_rebuild(plan_rebuild(shard_days=40))
+        statistics = list(ComplaintStatistics.objects.order_by('date').values_list(
+            'date', 'new_complaints', 'resolved_complaints', 'total_complaints', 'pending_complaints',
+            'resolution_count',
+        ))
+        return states, statistics, compute_totals()
+
+    def test_rebuilds_read_archived_actions(self):
+        before = self.rebuild_all()
+        self.assertEqual(before[2][2], 5)
+
+        archive.archive_actions(90, segment_rows=7)
+        self.assertEqual(ComplaintAdminAction.objects.count(), 2)
+        self.assertEqual(self.rebuild_all(), before)
+
+        call_command('rebuild_complaint_states', complaints=['COMP-001'], stdout=StringIO())
+        state = ComplaintCurrentState.objects.get(complaint_id='COMP-001')
+        self.assertEqual(state.action_count, 3)
+        self.assertEqual(state.last_action_type, 'resolved')
+
+
+class ActionHistoryOrderTest(ArchiveTestCase):
+    """ترتيب الدمج بين الأرشيف والجدول الحي"""
+
+    def test_complaints_stay_contiguous_with_mixed_case_ids(self):
+        complaint_ids = ['comp-b', 'COMP-a', 'Comp-c', 'ÉCOMP-d', 'COMP-10', 'COMP-9']
+        for complaint_id in complaint_ids:
+            self.add_action(complaint_id, 200)
+            self.add_action(complaint_id, 1)
+        archive.archive_actions(90)
+
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(archive.action_history(('complaint_id',)))
+        self.assertEqual([row[0] for row in rows], sorted(complaint_id for complaint_id in complaint_ids
+                                                          for _ in range(2)))
+        live_query = next(query['sql'] for query in queries if 'complaintadminaction' in query['sql'])
+        self.assertIn('COLLATE', live_query)
+
+
+class ArchivedRollupTest(ArchiveTestCase):
+    """تجميعات الإجراءات الحية بعد أرشفة بداية الشكوى"""
+
+    def setUp(self):
+        super().setUp()
+        self.category = ComplaintCategory.objects.create(name='طرق')
+        self.add_action('COMP-1', 200, action_type='received', category=self.category)
+        self.add_action(
+            'COMP-1', 150, action_type='assigned',
+            assigned_to_representative_id='REP-7', assigned_to_representative_name='نائب',
+        )
+        self.resolved = self.add_action('COMP-1', 1, action_type='resolved')
+        self.add_action('COMP-2', 1, action_type='received')
+
+    def resolved_rollups(self, grain='hour'):
+        return dict(
+            ComplaintRollup.objects.filter(grain=grain, resolved_count__gt=0)
+            .values_list('dimension', 'dimension_value')
+        )
+
+    def test_window_after_archive_keeps_carried_values(self):
+        archive.archive_actions(90)
+        self.assertEqual(ComplaintAdminAction.objects.count(), 2)
+
+        backfill_rollups(since=timezone.now() - timedelta(days=2), until=timezone.now())
+        self.assertEqual(self.resolved_rollups(), {
+            'all': '', 'representative': 'REP-7', 'category': str(self.category.pk),
+            'priority': 'medium', 'admin': 'ADMIN-001',
+        })
+
+    def test_full_backfill_matches_before_archive(self):
+        def snapshot():
+            return sorted(ComplaintRollup.objects.values_list(
+                'grain', 'period_start', 'dimension', 'dimension_value', 'total_actions',
+                'received_count', 'assigned_count', 'resolved_count',
+                'assign_latency_sketch', 'resolve_latency_sketch',
+            ))
+
+        backfill_rollups()
+        before = snapshot()
+        self.assertTrue(before)
+
+        archive.archive_actions(90)
+        ComplaintRollup.objects.all().delete()
+        backfill_rollups()
+        self.assertEqual(snapshot(), before)
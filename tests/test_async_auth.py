@@ -0,0 +1,123 @@
+"""
+اختبارات مسار المصادقة غير المتزامن
+Tests for the async authentication path
+"""
+
+import asyncio
+import threading
+from unittest import mock
+
+import httpx
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase
+from rest_framework import exceptions
+
+from complaints_admin.async_auth import (
+    AsyncAuthServiceClient, AsyncJWTAuthenticationMiddleware, aauthenticate_credentials
+)
+from complaints_admin.authentication import AdminPermissionMixin, JWTAuthentication, create_admin_token
+from complaints_admin.token_cache import reset_token_cache
+
+
+class AsyncAuthenticationTest(SimpleTestCase):
+    """اختبارات التحقق غير المتزامن"""
+
+    def setUp(self):
+        reset_token_cache()
+
+    def tearDown(self):
+        reset_token_cache()
+
+    def make_client(self, status_code=200, user_type='admin', delay=0):
+        async def handler(request):
+            await asyncio.sleep(delay)
+            return httpx.Response(status_code, json={
+                'user_id': 'ADMIN-300', 'username': 'async-admin', 'user_type': user_type,
+            })
+        return AsyncAuthServiceClient(transport=httpx.MockTransport(handler))
+
+    async def test_local_token_verified_without_remote_call(self):
+        """اختبار التحقق المحلي دون طلب شبكة"""
+        token = create_admin_token({'user_id': 'ADMIN-1', 'username': 'local', 'email': 'a@b.c'})
+        with mock.patch('complaints_admin.async_auth.get_async_auth_client') as get_client:
+            user, _ = await aauthenticate_credentials(token)
+        get_client.assert_not_called()
+        self.assertEqual(user.username, 'local')
+
+    async def test_blocking_cache_and_revocation_calls_leave_the_event_loop(self):
+        """اختبار أن الذاكرة وقائمة الإلغاء لا تعملان على خيط حلقة الأحداث"""
+        token = create_admin_token({'user_id': 'ADMIN-1', 'username': 'local', 'email': 'a@b.c'})
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def record(*args):
+            threads.append(threading.get_ident())
+            return False
+
+        with mock.patch('complaints_admin.authentication.is_token_revoked', side_effect=record):
+            await aauthenticate_credentials(token)
+            await aauthenticate_credentials(token)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    async def test_concurrent_remote_verifications_share_one_request(self):
+        """اختبار دمج التحقق المتزامن في طلب واحد"""
+        client = self.make_client(delay=0.05)
+        with mock.patch('complaints_admin.async_auth.get_async_auth_client', return_value=client):
+            results = await asyncio.gather(*[
+                aauthenticate_credentials('opaque-token') for _ in range(10)
+            ])
+        await client.aclose()
+
+        self.assertEqual(client.requests_sent, 1)
+        self.assertTrue(all(user.username == 'async-admin' for user, _ in results))
+
+    async def test_cancelled_leader_does_not_strand_followers(self):
+        """اختبار إلغاء الطلب القائد أثناء انتظار طلب آخر لنفس التوكين"""
+        client = self.make_client(delay=0.05)
+        leader = asyncio.create_task(client.verify('opaque-token'))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(client.verify('opaque-token'))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        user_data = await asyncio.wait_for(follower, timeout=2)
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        await client.aclose()
+
+        self.assertEqual(user_data['username'], 'async-admin')
+        self.assertEqual(client.requests_sent, 2)
+        self.assertEqual(client._inflight, {})
+
+    async def test_non_admin_rejected_and_negatively_cached(self):
+        """اختبار رفض غير الأدمن وتخزين الرفض"""
+        client = self.make_client(user_type='citizen')
+        with mock.patch('complaints_admin.async_auth.get_async_auth_client', return_value=client):
+            for _ in range(2):
+                with self.assertRaises(exceptions.AuthenticationFailed):
+                    await aauthenticate_credentials('citizen-token')
+        await client.aclose()
+
+        self.assertEqual(client.requests_sent, 1)
+
+    async def test_middleware_result_reused_by_drf_authentication(self):
+        """اختبار استخدام نتيجة الوسيط في JWTAuthentication"""
+        client = self.make_client()
+        captured = {}
+
+        async def get_response(request):
+            captured['request'] = request
+            return HttpResponse()
+
+        middleware = AsyncJWTAuthenticationMiddleware(get_response)
+        request = AsyncRequestFactory().get('/', headers={'Authorization': 'Bearer opaque-token'})
+        with mock.patch('complaints_admin.async_auth.get_async_auth_client', return_value=client):
+            await middleware(request)
+        await client.aclose()
+
+        with mock.patch.object(JWTAuthentication, 'authenticate_credentials') as sync_path:
+            user, token = JWTAuthentication().authenticate(captured['request'])
+        sync_path.assert_not_called()
+        self.assertEqual((user.username, token), ('async-admin', 'opaque-token'))
+        self.assertTrue(await AdminPermissionMixin().acheck_admin_permission(mock.Mock(user=user)))
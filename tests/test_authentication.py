@@ -0,0 +1,479 @@
+"""
+اختبارات نظام المصادقة JWT
+Tests for the admin JWT authentication path
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+import jwt
+import redis
+import requests
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework import exceptions
+
+from complaints_admin.authentication import (
+    AdminPermissionMixin, AdminUser, JWTAuthentication, create_admin_token
+)
+from complaints_admin.bloom import BloomFilter
+from complaints_admin.jwks import decode_token, get_key_set, reset_key_set
+from complaints_admin.revocation import RevocationList, get_revocation_list, reset_revocation_list
+from complaints_admin.singleflight import (
+    SingleFlight, get_verification_flight, reset_verification_flight
+)
+from complaints_admin.token_cache import TokenCache, reset_token_cache, token_digest
+
+
+def make_token(**overrides):
+    """إنشاء توكين أدمن للاختبار"""
+    user_data = {
+        'user_id': 'ADMIN-001',
+        'username': 'admin',
+        'email': 'admin@naebak.com',
+        'permissions': ['complaints_admin.view_complaintadminaction'],
+    }
+    user_data.update(overrides)
+    return create_admin_token(user_data)
+
+
+class FakeRedis:
+    """بديل بسيط لـ Redis في الذاكرة"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TokenCacheTest(SimpleTestCase):
+    """اختبارات ذاكرة التوكينات"""
+
+    def test_hit_and_miss_counters(self):
+        """اختبار عدادات الإصابة والإخفاق"""
+        cache = TokenCache(max_size=10, ttl=60)
+        self.assertIsNone(cache.get('token-a'))
+        cache.set('token-a', {'user_id': '1'})
+        self.assertEqual(cache.get('token-a'), {'user_id': '1'})
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_lru_eviction(self):
+        """اختبار حذف الأقدم استخداماً عند امتلاء الذاكرة"""
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', {'n': 1})
+        cache.set('b', {'n': 2})
+        cache.get('a')
+        cache.set('c', {'n': 3})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+    def test_entry_expires_with_token(self):
+        """اختبار أن الإدخال لا يتجاوز exp الخاص بالتوكين"""
+        cache = TokenCache(max_size=10, ttl=3600)
+        cache.set('expired', {'exp': time.time() - 1})
+        cache.set('short', {'exp': time.time() + 0.05})
+
+        self.assertIsNone(cache.get('expired'))
+        self.assertIsNotNone(cache.get('short'))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('short'))
+
+    def test_redis_tier_shared_between_caches(self):
+        """اختبار مشاركة التوكينات عبر Redis بين العمليات"""
+        fake = FakeRedis()
+        with mock.patch('complaints_admin.token_cache.get_redis_client', return_value=fake):
+            worker_a = TokenCache(max_size=10, ttl=60, use_redis=True)
+            worker_b = TokenCache(max_size=10, ttl=60, use_redis=True)
+            worker_a.set('shared', {'user_id': '7'})
+
+            self.assertIn(TokenCache.redis_key_prefix + token_digest('shared'), fake.data)
+            self.assertEqual(worker_b.get('shared'), {'user_id': '7'})
+            self.assertEqual(worker_b.stats()['redis_hits'], 1)
+
+
+class JWTAuthenticationCacheTest(SimpleTestCase):
+    """اختبارات استخدام الذاكرة في المصادقة"""
+
+    def setUp(self):
+        reset_token_cache()
+        self.auth = JWTAuthentication()
+
+    def tearDown(self):
+        reset_token_cache()
+
+    def test_repeat_request_skips_decode(self):
+        """اختبار أن الطلب المتكرر لا يعيد فك التشفير"""
+        token = make_token()
+        user, _ = self.auth.authenticate_credentials(token)
+        self.assertEqual(user.username, 'admin')
+
+        with mock.patch('complaints_admin.authentication.decode_token') as decode:
+            user, _ = self.auth.authenticate_credentials(token)
+            decode.assert_not_called()
+        self.assertEqual(user.id, 'ADMIN-001')
+
+    def test_remote_verification_is_cached(self):
+        """اختبار تخزين نتيجة التحقق من خدمة المصادقة"""
+        foreign_token = jwt.encode(
+            {'user_id': 'ADMIN-002', 'exp': datetime.utcnow() + timedelta(hours=1)},
+            'another-secret',
+            algorithm=settings.JWT_ALGORITHM,
+        )
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {
+            'user_id': 'ADMIN-002', 'username': 'remote', 'user_type': 'admin'
+        }
+
+        with mock.patch('complaints_admin.authentication.requests.post', return_value=response) as post:
+            self.auth.authenticate_credentials(foreign_token)
+            user, _ = self.auth.authenticate_credentials(foreign_token)
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(user.username, 'remote')
+
+
+class AuthServiceVerificationTest(SimpleTestCase):
+    """اختبارات دمج طلبات التحقق والذاكرة السلبية"""
+
+    def setUp(self):
+        reset_token_cache()
+        reset_verification_flight()
+        self.auth = JWTAuthentication()
+        self.token = 'not-a-valid-jwt'
+
+    def tearDown(self):
+        reset_token_cache()
+        reset_verification_flight()
+
+    def test_rejected_token_is_negatively_cached(self):
+        """اختبار أن التوكين المرفوض لا يُرسل مجدداً لخدمة المصادقة"""
+        response = mock.Mock(status_code=401)
+        with mock.patch('complaints_admin.authentication.requests.post', return_value=response) as post:
+            for _ in range(3):
+                with self.assertRaises(exceptions.AuthenticationFailed):
+                    self.auth.authenticate_credentials(self.token)
+
+        self.assertEqual(post.call_count, 1)
+
+    def test_unavailable_service_is_not_negatively_cached(self):
+        """اختبار أن تعطل الخدمة لا يُخزن كرفض"""
+        with mock.patch(
+            'complaints_admin.authentication.requests.post',
+            side_effect=requests.ConnectionError('down'),
+        ) as post:
+            for _ in range(2):
+                with self.assertRaises(exceptions.AuthenticationFailed):
+                    self.auth.authenticate_credentials(self.token)
+
+        self.assertEqual(post.call_count, 2)
+
+    def test_concurrent_verifications_are_coalesced(self):
+        """اختبار دمج الطلبات المتزامنة في طلب واحد"""
+        release = threading.Event()
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'user_id': 'ADMIN-009', 'username': 'burst', 'user_type': 'admin'}
+
+        def slow_post(*args, **kwargs):
+            release.wait(2)
+            return response
+
+        results = []
+        with mock.patch('complaints_admin.authentication.requests.post', side_effect=slow_post) as post:
+            threads = [
+                threading.Thread(target=lambda: results.append(self.auth.verify_with_auth_service(self.token)))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 2
+            while get_verification_flight().stats()['coalesced'] < 7 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(user.username == 'burst' for user, _ in results))
+
+
+class SingleFlightRedisTest(SimpleTestCase):
+    """اختبارات قفل Redis بين العمليات"""
+
+    def test_follower_uses_result_published_by_other_worker(self):
+        """اختبار انتظار النتيجة التي نشرتها عملية أخرى"""
+        fake = mock.Mock()
+        fake.set.return_value = False
+        fake.exists.return_value = True
+        published = iter([None, ('user', 'token')])
+        fn = mock.Mock()
+
+        with mock.patch('complaints_admin.singleflight.get_redis_client', return_value=fake):
+            flight = SingleFlight(lock_timeout=1, poll_interval=0.001, use_redis=True)
+            result = flight.do('key', fn, poll=lambda: next(published))
+
+        self.assertEqual(result, ('user', 'token'))
+        fn.assert_not_called()
+
+    def test_leader_releases_lock(self):
+        """اختبار تحرير القفل بعد التنفيذ"""
+        fake = mock.Mock()
+        fake.set.return_value = True
+
+        with mock.patch('complaints_admin.singleflight.get_redis_client', return_value=fake):
+            flight = SingleFlight(use_redis=True)
+            self.assertEqual(flight.do('key', lambda: 42), 42)
+
+        fake.eval.assert_called_once()
+
+
+class JWKSVerificationTest(SimpleTestCase):
+    """اختبارات التحقق المحلي بالمفاتيح العامة"""
+
+    def setUp(self):
+        reset_token_cache()
+        reset_key_set()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.jwks_path = os.path.join(self.tmpdir.name, 'jwks.json')
+        self.rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.ec_key = ec.generate_private_key(ec.SECP256R1())
+        self.write_jwks(
+            (jwt.algorithms.RSAAlgorithm, self.rsa_key, 'rsa-1'),
+            (jwt.algorithms.ECAlgorithm, self.ec_key, 'ec-1'),
+        )
+        self.settings_override = self.settings(
+            JWT_JWKS_URL='', JWT_JWKS_FILE=self.jwks_path, JWT_JWKS_REFRESH_INTERVAL=0,
+            JWT_JWKS_MIN_REFRESH_INTERVAL=0,
+        )
+        self.settings_override.enable()
+        self.auth = JWTAuthentication()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        reset_key_set()
+        reset_token_cache()
+        self.tmpdir.cleanup()
+
+    def write_jwks(self, *entries):
+        keys = []
+        for algorithm, private_key, kid in entries:
+            jwk = json.loads(algorithm.to_jwk(private_key.public_key()))
+            jwk.update({'kid': kid, 'use': 'sig'})
+            keys.append(jwk)
+        with open(self.jwks_path, 'w') as f:
+            json.dump({'keys': keys}, f)
+
+    def sign(self, private_key, algorithm, kid):
+        payload = {
+            'user_id': 'ADMIN-100', 'username': 'rsa-admin', 'user_type': 'admin',
+            'exp': datetime.utcnow() + timedelta(hours=1),
+        }
+        return jwt.encode(payload, private_key, algorithm=algorithm, headers={'kid': kid})
+
+    def test_rs256_and_es256_verified_without_network(self):
+        """اختبار التحقق من RS256 و ES256 دون طلب شبكة"""
+        with mock.patch('complaints_admin.authentication.requests.post') as post:
+            for token in (self.sign(self.rsa_key, 'RS256', 'rsa-1'), self.sign(self.ec_key, 'ES256', 'ec-1')):
+                user, _ = self.auth.authenticate_credentials(token)
+                self.assertEqual(user.username, 'rsa-admin')
+        post.assert_not_called()
+
+    def test_rotated_kid_triggers_refresh(self):
+        """اختبار تحميل المفتاح الجديد عند تدوير المفاتيح"""
+        decode_token(self.sign(self.rsa_key, 'RS256', 'rsa-1'))
+        rotated_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.write_jwks((jwt.algorithms.RSAAlgorithm, rotated_key, 'rsa-2'))
+
+        payload = decode_token(self.sign(rotated_key, 'RS256', 'rsa-2'))
+        self.assertEqual(payload['user_id'], 'ADMIN-100')
+        self.assertEqual(get_key_set().kids, {'rsa-2'})
+
+    def test_algorithm_must_match_key_type(self):
+        """اختبار رفض توكين تختلف خوارزميته عن نوع المفتاح"""
+        token = self.sign(self.ec_key, 'ES256', 'rsa-1')
+        with self.assertRaises(jwt.InvalidAlgorithmError):
+            decode_token(token)
+
+
+class AdminUserPermissionTest(SimpleTestCase):
+    """اختبارات صلاحيات المستخدم الأدمن"""
+
+    def make_user(self, **overrides):
+        user_data = {
+            'user_id': 'ADMIN-001',
+            'username': 'admin',
+            'user_type': 'admin',
+            'permissions': ['complaints_admin.view_complaintexport'],
+            'groups': ['moderators'],
+        }
+        user_data.update(overrides)
+        return AdminUser(user_data)
+
+    @override_settings(ADMIN_GROUP_PERMISSIONS={'moderators': ['content_admin.change_newstickeritem']})
+    def test_group_permissions_expanded(self):
+        """اختبار توسيع صلاحيات المجموعات وفهرس التطبيقات"""
+        user = self.make_user()
+        self.assertIsInstance(user.permissions, frozenset)
+        self.assertTrue(user.has_perm('content_admin.change_newstickeritem'))
+        self.assertTrue(user.has_perms([
+            'complaints_admin.view_complaintexport', 'content_admin.change_newstickeritem'
+        ]))
+        self.assertEqual(user.app_labels, {'complaints_admin', 'content_admin'})
+        self.assertTrue(user.has_module_perms('content_admin'))
+        self.assertFalse(user.has_module_perms('ratings_admin'))
+
+    def test_expansion_shared_between_tokens(self):
+        """اختبار إعادة استخدام الصلاحيات الموسعة لنفس مجموعة الصلاحيات"""
+        self.assertIs(self.make_user().permissions, self.make_user(user_id='ADMIN-002').permissions)
+
+    def test_superuser_and_slots(self):
+        """اختبار صلاحيات المدير العام وعدم قبول سمات إضافية"""
+        user = self.make_user(is_superuser=True, permissions=[])
+        self.assertTrue(user.has_perms(['ratings_admin.anything']))
+        self.assertTrue(user.has_module_perms('ratings_admin'))
+        with self.assertRaises(AttributeError):
+            user.extra = True
+
+    def test_check_admin_permission_lists_missing(self):
+        """اختبار رسالة الصلاحيات الناقصة في الخليط"""
+        request = mock.Mock(user=self.make_user())
+        mixin = AdminPermissionMixin()
+        self.assertTrue(mixin.check_admin_permission(request, 'complaints_admin.view_complaintexport'))
+        with self.assertRaisesMessage(exceptions.PermissionDenied, 'ratings_admin.change_x'):
+            mixin.check_admin_permission(
+                request, ['complaints_admin.view_complaintexport', 'ratings_admin.change_x']
+            )
+        with self.assertRaises(exceptions.PermissionDenied):
+            mixin.check_module_permission(request, 'ratings_admin')
+
+
+class RevocationTest(SimpleTestCase):
+    """اختبارات إلغاء التوكينات"""
+
+    def setUp(self):
+        reset_token_cache()
+        reset_revocation_list()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.feed_path = os.path.join(self.tmpdir.name, 'revoked.json')
+        self.write_feed([])
+        self.settings_override = self.settings(
+            JWT_REVOCATION_FEED_URL='', JWT_REVOCATION_FILE=self.feed_path,
+            JWT_REVOCATION_REFRESH_INTERVAL=0, JWT_REVOCATION_USE_REDIS=False,
+        )
+        self.settings_override.enable()
+        self.auth = JWTAuthentication()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        reset_revocation_list()
+        reset_token_cache()
+        self.tmpdir.cleanup()
+
+    def write_feed(self, jtis):
+        exp = time.time() + 3600
+        with open(self.feed_path, 'w') as f:
+            json.dump({'revoked': [{'jti': jti, 'exp': exp} for jti in jtis]}, f)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """اختبار عدم وجود سلبيات خاطئة ومعدل إيجابيات خاطئة منخفض"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_revoked_token_rejected_even_when_cached(self):
+        """اختبار رفض التوكين الملغى حتى لو كان في الذاكرة"""
+        token = create_admin_token({'user_id': 'ADMIN-1', 'username': 'a', 'email': 'a@b.c'})
+        self.auth.authenticate_credentials(token)
+
+        get_revocation_list().revoke(token_digest(token))
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'revoked'):
+            self.auth.authenticate_credentials(token)
+
+    def test_feed_file_loaded_and_misses_skip_exact_lookup(self):
+        """اختبار تحميل ملف الإلغاء وعدم البحث الدقيق عند عدم الإصابة"""
+        self.write_feed(['revoked-jti'])
+        revocations = get_revocation_list()
+        self.assertTrue(revocations.is_revoked('revoked-jti'))
+
+        with mock.patch.object(revocations, '_exact_lookup') as exact:
+            self.assertFalse(revocations.is_revoked('active-jti'))
+        exact.assert_not_called()
+
+    def test_broadcast_message_updates_other_worker(self):
+        """اختبار تحديث عامل آخر عبر رسالة pub/sub"""
+        worker = RevocationList(use_redis=False)
+        worker._on_message(json.dumps({'jti': 'from-peer', 'exp': time.time() + 60}))
+        self.assertTrue(worker.is_revoked('from-peer'))
+
+    def test_broadcast_message_honoured_in_redis_mode(self):
+        """رسالة pub/sub بدون إدخال في Redis تبقى ملغاة في العامل المستقبل"""
+        client = mock.Mock()
+        client.zscore.return_value = None
+        with mock.patch('complaints_admin.revocation.get_redis_client', return_value=client):
+            worker = RevocationList(use_redis=True)
+            worker._loaded = True
+            worker._on_message(json.dumps({'jti': 'from-peer', 'exp': time.time() + 60}))
+            worker._on_message(json.dumps({'jti': 'no-exp'}))
+            self.assertTrue(worker.is_revoked('from-peer'))
+            self.assertTrue(worker.is_revoked('no-exp'))
+
+    def test_refresh_keeps_revocations_missing_from_feed(self):
+        """التحديث من التغذية لا يُسقط الإلغاءات المحلية الأحدث منها"""
+        self.write_feed(['feed-jti'])
+        revocations = get_revocation_list()
+        revocations.revoke('local-jti')
+        revocations._on_message(json.dumps({'jti': 'peer-jti', 'exp': time.time() + 60}))
+        revocations.refresh()
+        self.assertTrue(all(revocations.is_revoked(rid) for rid in ('feed-jti', 'local-jti', 'peer-jti')))
+
+    def test_refresh_seeds_from_shared_redis_set(self):
+        """عامل جديد يرى الإلغاءات المسجلة في Redis من عمال آخرين"""
+        client = mock.Mock()
+        client.zrangebyscore.return_value = [(b'peer-jti', time.time() + 60)]
+        with mock.patch('complaints_admin.revocation.get_redis_client', return_value=client):
+            worker = RevocationList(use_redis=True)
+            worker.refresh()
+            client.zscore.side_effect = AssertionError('exact store must be local')
+            self.assertTrue(worker.is_revoked('peer-jti'))
+        self.assertEqual(client.zrangebyscore.call_args.args[0], RevocationList.redis_key)
+
+    def test_listener_closes_pubsub_on_reconnect(self):
+        """إغلاق الاشتراك القديم عند إعادة اتصال المستمع"""
+        worker = RevocationList(use_redis=True)
+        first, second = mock.Mock(), mock.Mock()
+        first.get_message.side_effect = redis.ConnectionError('lost')
+
+        def stop_after_reconnect(timeout):
+            worker.stop_background_sync()
+            return None
+        second.get_message.side_effect = stop_after_reconnect
+
+        client = mock.Mock()
+        client.pubsub.side_effect = [first, second]
+        with mock.patch('complaints_admin.revocation.get_redis_client', return_value=client), \
+                mock.patch.object(worker._stop, 'wait'):
+            worker._listen()
+        first.close.assert_called_once_with()
+        second.close.assert_called_once_with()
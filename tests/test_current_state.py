@@ -0,0 +1,110 @@
+"""
+اختبارات الحالة الحالية للشكاوى
+Current-state table tests: write-time maintenance and bulk rebuild
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.models import ComplaintAdminAction, ComplaintCurrentState
+
+
+def add_action(complaint_id, action_type, **fields):
+    """إضافة إجراء أدمن للاختبار"""
+    fields.setdefault('admin_id', 'ADMIN-001')
+    fields.setdefault('admin_name', 'أدمن')
+    return ComplaintAdminAction.objects.create(
+        complaint_id=complaint_id, action_type=action_type, **fields
+    )
+
+
+class ComplaintCurrentStateTest(TestCase):
+    """اختبارات تحديث الحالة عند إدراج الإجراءات"""
+
+    def test_state_follows_latest_action(self):
+        """الحالة تعكس آخر إجراء وعدد الإجراءات"""
+        expected = timezone.now() + timedelta(days=5)
+        add_action('COMP-001', 'received')
+        add_action(
+            'COMP-001', 'assigned', priority_level='high',
+            assigned_to_representative_id='REP-007',
+            assigned_to_representative_name='نائب',
+            expected_resolution_date=expected,
+        )
+        last = add_action('COMP-001', 'escalated', priority_level='urgent', admin_id='ADMIN-002')
+
+        state = ComplaintCurrentState.objects.get(complaint_id='COMP-001')
+        self.assertEqual(state.last_action_id, last.pk)
+        self.assertEqual(state.last_action_type, 'escalated')
+        self.assertEqual(state.last_admin_id, 'ADMIN-002')
+        self.assertEqual(state.priority_level, 'urgent')
+        self.assertEqual(state.action_count, 3)
+        # الإسناد وتاريخ الحل المتوقع يستمران من الإجراءات السابقة
+        self.assertEqual(state.assigned_to_representative_id, 'REP-007')
+        self.assertEqual(state.assigned_to_representative_name, 'نائب')
+        self.assertEqual(state.expected_resolution_date, expected)
+
+    def test_updating_action_does_not_recount(self):
+        """تعديل إجراء موجود لا يزيد العدد"""
+        action = add_action('COMP-002', 'received')
+        action.notes = 'ملاحظة'
+        action.save()
+        self.assertEqual(ComplaintCurrentState.objects.get(complaint_id='COMP-002').action_count, 1)
+
+    def test_insert_and_state_share_transaction(self):
+        """فشل تحديث الحالة يلغي إدراج الإجراء"""
+        with mock.patch.object(ComplaintCurrentState, 'save', side_effect=DatabaseError('boom')):
+            with self.assertRaises(DatabaseError):
+                add_action('COMP-003', 'received')
+        self.assertFalse(ComplaintAdminAction.objects.filter(complaint_id='COMP-003').exists())
+        self.assertFalse(ComplaintCurrentState.objects.filter(complaint_id='COMP-003').exists())
+
+    def test_rebuild_command(self):
+        """أمر إعادة البناء يطابق الحالة المحدثة أثناء الكتابة"""
+        for i in range(30):
+            add_action(
+                f'COMP-{i % 7:03d}', 'assigned' if i % 3 == 0 else 'reviewed',
+                assigned_to_representative_id=f'REP-{i:03d}' if i % 3 == 0 else None,
+                priority_level=['low', 'medium', 'high'][i % 3],
+            )
+        fields = (
+            'complaint_id', 'last_action_id', 'last_action_type', 'priority_level',
+            'assigned_to_representative_id', 'action_count',
+        )
+        live = list(ComplaintCurrentState.objects.order_by('complaint_id').values_list(*fields))
+
+        ComplaintCurrentState.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_complaint_states', batch_size=3, stdout=out)
+
+        rebuilt = list(ComplaintCurrentState.objects.order_by('complaint_id').values_list(*fields))
+        self.assertEqual(rebuilt, live)
+        self.assertIn('Rebuilt 7 complaint states', out.getvalue())
+
+    def test_state_endpoint_filters(self):
+        """نقطة الحالات تقرأ صفاً واحداً لكل شكوى"""
+        add_action('COMP-010', 'received')
+        add_action(
+            'COMP-010', 'assigned', assigned_to_representative_id='REP-001',
+            assigned_to_representative_name='نائب',
+        )
+        add_action('COMP-011', 'received')
+
+        client = APIClient()
+        client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+        response = client.get(
+            '/api/v1/admin/complaints/states/', {'assigned_to_representative_id': 'REP-001'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['complaint_id'] for item in response.data['results']], ['COMP-010']
+        )
+        self.assertEqual(response.data['results'][0]['action_count'], 2)
@@ -0,0 +1,116 @@
+"""
+اختبارات تصدير الفروق
+Delta export tests
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.exports import run_export
+from complaints_admin.models import ComplaintAdminAction, ComplaintCurrentState, ComplaintExport
+
+from .test_exports import ExportTestMixin, read_csv
+
+URL = '/api/v1/admin/complaints/export/'
+
+
+class FilteringComplaintsService:
+    """خدمة شكاوى وهمية تدعم updated_after و complaint_ids"""
+
+    def __init__(self, updated):
+        self.updated = updated
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append(params)
+        if 'updated_after' in params:
+            ids = self.updated
+        else:
+            ids = params['complaint_ids']
+        body = {'count': len(ids), 'results': [{'id': complaint_id, 'title': 'شكوى'} for complaint_id in ids]}
+        return mock.Mock(json=mock.Mock(return_value=body), raise_for_status=mock.Mock())
+
+    def close(self):
+        pass
+
+
+class DeltaExportTest(ExportTestMixin, TestCase):
+    """اختبارات تصدير الفروق منذ تصدير سابق"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+        patcher = mock.patch('complaints_admin.views.process_complaint_export.delay')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for complaint_id in ('COMP-1', 'COMP-2', 'COMP-3'):
+            self.act(complaint_id)
+
+    def act(self, complaint_id):
+        ComplaintAdminAction.objects.create(
+            complaint_id=complaint_id, admin_id='ADMIN-001', admin_name='أدمن', action_type='reviewed',
+        )
+
+    def post(self, criteria):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(URL, {
+                'admin_id': 'ADMIN-001', 'admin_name': 'أدمن', 'export_format': 'csv',
+                'filter_criteria': criteria,
+            }, format='json')
+
+    def baseline(self, criteria):
+        """تصدير كامل مكتمل، ثم إرجاع الزمن ليبدو أنه تم قبل ساعة"""
+        export = run_export(ComplaintExport.objects.get(export_id=self.post(criteria).data['export_id']))
+        hour_ago = timezone.now() - timedelta(hours=1)
+        ComplaintExport.objects.filter(pk=export.pk).update(watermark_at=hour_ago)
+        ComplaintCurrentState.objects.update(updated_at=hour_ago - timedelta(hours=1))
+        export.refresh_from_db()
+        return export
+
+    def test_local_delta_contains_only_changes(self):
+        baseline = self.baseline({'source': 'local'})
+        self.assertEqual(len(read_csv(baseline.file_path)), 4)
+        self.act('COMP-2')
+        self.act('COMP-4')
+
+        response = self.post({'source': 'local', 'since_export': str(baseline.export_id)})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['baseline_export'], baseline.export_id)
+        delta = run_export(ComplaintExport.objects.get(export_id=response.data['export_id']))
+
+        self.assertEqual(delta.status, 'completed')
+        self.assertEqual([row[0] for row in read_csv(delta.file_path)[1:]], ['COMP-2', 'COMP-4'])
+        manifest = self.client.get(f'{URL}{delta.export_id}/manifest/').data
+        self.assertEqual(manifest['mode'], 'delta')
+        self.assertEqual(manifest['baseline_export_id'], str(baseline.export_id))
+        self.assertEqual(manifest['total_complaints'], 2)
+        self.assertEqual(list(baseline.delta_exports.all()), [delta])
+
+    def test_service_delta_merges_remote_and_local_changes(self):
+        service = FilteringComplaintsService(updated=['COMP-9', 'COMP-2'])
+        baseline = self.baseline({'source': 'local'})
+        self.act('COMP-2')
+        self.act('COMP-3')
+
+        self.fake_service(service)
+        response = self.post({'source': 'service', 'since_export': str(baseline.export_id)})
+        delta = run_export(ComplaintExport.objects.get(export_id=response.data['export_id']))
+
+        self.assertEqual([row[0] for row in read_csv(delta.file_path)[1:]], ['COMP-9', 'COMP-2', 'COMP-3'])
+        since = baseline.watermark_at - timedelta(seconds=300)
+        self.assertEqual(service.requests[0]['updated_after'], since.isoformat())
+        self.assertEqual(service.requests[1]['complaint_ids'], ['COMP-3'])
+        self.assertNotIn('since_export', service.requests[0])
+
+    def test_baseline_must_be_completed(self):
+        pending = self.post({'source': 'local'})
+        for since_export in (pending.data['export_id'], 'not-a-uuid', '00000000-0000-0000-0000-000000000000'):
+            response = self.post({'source': 'local', 'since_export': since_export})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('filter_criteria', response.data)
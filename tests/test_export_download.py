@@ -0,0 +1,106 @@
+"""
+اختبارات تحميل ملفات التصدير بروابط موقَّعة
+Signed export download tests
+"""
+
+from datetime import timedelta
+
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+
+from complaints_admin.export_downloads import RangeNotSatisfiable, parse_range, signed_download_url
+from complaints_admin.exports import run_export
+from complaints_admin.models import ComplaintAdminAction
+
+from .test_exports import ExportTestMixin
+
+
+class ParseRangeTest(TestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=90-500', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+
+    def test_ignored_and_unsatisfiable_ranges(self):
+        for header in ('items=0-9', 'bytes=0-9,20-29', 'bytes=x-9', 'bytes=9-1', 'bytes=-'):
+            self.assertIsNone(parse_range(header, 100))
+        for header in ('bytes=100-', 'bytes=-0'):
+            with self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, 100)
+
+
+class ExportDownloadTest(ExportTestMixin, TestCase):
+    """تحميل ملف تصدير مكتمل"""
+
+    def setUp(self):
+        super().setUp()
+        for n in range(30):
+            ComplaintAdminAction.objects.create(
+                complaint_id=f'COMP-{n}', admin_id='ADMIN-001', admin_name='أدمن', action_type='reviewed',
+            )
+        self.export = run_export(self.create_export(source='local'))
+        self.export.refresh_from_db()
+        with open(self.export.file_path, 'rb') as handle:
+            self.content = handle.read()
+        # بدون رأس مصادقة: التوقيع يكفي
+        self.client = Client()
+
+    def get(self, url=None, **headers):
+        with self.assertNumQueries(0):
+            response = self.client.get(url or self.export.download_url, headers=headers)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_download(self):
+        self.assertTrue(self.export.download_url.startswith('/api/v1/admin/complaints/export/download/'))
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn(f'complaints-{self.export.export_id}.csv', response['Content-Disposition'])
+
+    def test_range_requests(self):
+        response, body = self.get(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[10:20])
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+
+        response, body = self.get(Range='bytes=-7', **{'If-Range': response['ETag']})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[-7:])
+
+        response, body = self.get(Range='bytes=10-19', **{'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+        response, _ = self.get(Range=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_tampered_or_expired_links_are_refused(self):
+        url = self.export.download_url
+        self.assertEqual(self.get(url[:-2] + 'AA')[0].status_code, 403)
+        self.assertEqual(self.get(url.replace('.csv', '.zip'))[0].status_code, 403)
+        self.assertEqual(self.get(url.split('?')[0])[0].status_code, 403)
+        expired = signed_download_url(self.export.file_path, timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.get(expired)[0].status_code, 410)
+        with override_settings(EXPORT_DOWNLOAD_SECRET='rotated'):
+            self.assertEqual(self.get()[0].status_code, 403)
+
+    def test_missing_file(self):
+        missing = signed_download_url(
+            f'{self.root}/00000000-0000-0000-0000-000000000000.csv', timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(self.get(missing)[0].status_code, 404)
+
+    @override_settings(EXPORT_DOWNLOAD_ACCEL_PREFIX='/protected-exports/')
+    def test_accel_redirect_hands_off_to_proxy(self):
+        response, body = self.get(Range='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-exports/{self.export.export_id}.csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
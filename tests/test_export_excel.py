@@ -0,0 +1,84 @@
+"""
+اختبارات تصدير Excel
+Write-only XLSX export tests
+"""
+
+import os
+from collections import Counter
+
+from django.test import TestCase
+from openpyxl import load_workbook
+
+from complaints_admin.export_excel import SUMMARIES, SummaryAccumulator
+from complaints_admin.export_sources import EXPORT_COLUMNS
+from complaints_admin.exports import run_export
+from complaints_admin.models import ComplaintAdminAction, ComplaintExport
+
+from .test_exports import ExportTestMixin, FakeComplaintsService
+
+
+class ExcelExportTest(ExportTestMixin, TestCase):
+    """اختبارات ملف Excel"""
+
+    def create_export(self, **criteria):
+        return ComplaintExport.objects.create(
+            admin_id='ADMIN-001', admin_name='أدمن', export_format='excel', filter_criteria=criteria,
+        )
+
+    def test_complaints_sheet_and_summaries(self):
+        """ورقة الشكاوى كاملة وأوراق الملخص تطابق العد المباشر"""
+        self.fake_service(FakeComplaintsService(total=130, page_size=25))
+        for n, (representative, priority) in enumerate([('REP-1', 'high'), ('REP-1', 'low'), ('REP-2', 'high')]):
+            ComplaintAdminAction.objects.create(
+                complaint_id=f'COMP-{n:05d}', admin_id='ADMIN-001', admin_name='أدمن',
+                action_type='assigned', assigned_to_representative_id=representative,
+                assigned_to_representative_name=f'نائب {representative}', priority_level=priority,
+            )
+        export = run_export(self.create_export())
+
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'completed')
+        self.assertEqual(export.total_complaints, 130)
+        self.assertTrue(export.file_path.endswith('.xlsx'))
+        self.assertEqual(export.file_size, os.path.getsize(export.file_path))
+
+        workbook = load_workbook(export.file_path, read_only=True)
+        self.assertEqual(workbook.sheetnames, ['الشكاوى', *SUMMARIES])
+        rows = list(workbook['الشكاوى'].values)
+        self.assertEqual(list(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual([row[0] for row in rows[1:]], [f'COMP-{n:05d}' for n in range(130)])
+        first = dict(zip(EXPORT_COLUMNS, rows[1]))
+        self.assertEqual(first['assigned_to_representative_id'], 'REP-1')
+        self.assertIsNotNone(first['last_action_at'])
+
+        representatives = {value: count for value, count, _ in list(workbook['حسب النائب'].values)[1:-1]}
+        self.assertEqual(representatives, {'غير محدد': 127, 'نائب REP-1': 2, 'نائب REP-2': 1})
+        priorities = list(workbook['حسب الأولوية'].values)
+        self.assertEqual(priorities[1][:2], ('غير محدد', 127))
+        self.assertEqual(dict((value, count) for value, count, _ in priorities[1:-1])['high'], 2)
+        self.assertEqual(priorities[-1][:2], ('الإجمالي', 130))
+        self.assertEqual(list(workbook['حسب الحالة'].values)[1], ('open', 130, 100))
+
+    def test_accumulator_matches_direct_count_across_chunks(self):
+        """العد على دفعات يساوي العد المباشر"""
+        rows = [
+            {'status': ['open', 'closed', None][n % 3], 'category': f'C{n % 7}', 'priority_level': 'low'}
+            for n in range(1000)
+        ]
+        summary = SummaryAccumulator(chunk_rows=64)
+        for row in rows:
+            summary.add(row)
+        tables = {name: rows for name, _, rows in summary.tables()}
+
+        self.assertEqual(summary.total, 1000)
+        expected = Counter(row['category'] for row in rows)
+        self.assertEqual({value: count for value, count, _ in tables['حسب التصنيف']}, expected)
+        statuses = {value: (count, share) for value, count, share in tables['حسب الحالة']}
+        self.assertEqual(statuses['open'], (334, 33.4))
+        self.assertEqual(statuses['غير محدد'][0], 333)
+
+    def test_failure_removes_partial_file(self):
+        self.fake_service(FakeComplaintsService(total=100, page_size=25, fail_page=3))
+        export = run_export(self.create_export())
+        self.assertEqual(export.status, 'failed')
+        self.assertEqual(os.listdir(self.root), [])
@@ -0,0 +1,101 @@
+"""
+اختبارات تصدير PDF
+Chunked PDF export tests
+"""
+
+import os
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from pypdf import PdfReader
+
+from admin_service.celery import app
+
+from complaints_admin.export_pdf import PDF_FIELDS, PdfRenderer, render_pdf
+from complaints_admin.exports import run_export
+from complaints_admin.models import ComplaintExport
+
+from .test_exports import ExportTestMixin, FakeComplaintsService
+
+
+def synthetic_rows(count):
+    return [
+        tuple(f'COMP-{n:05d}' if field == 'complaint_id' else f'{field} {n % 4}' for field in PDF_FIELDS)
+        for n in range(count)
+    ]
+
+
+@override_settings(EXPORT_PDF_CHUNK_PAGES=3, EXPORT_PDF_WORKERS=1)
+class PdfExportTest(ExportTestMixin, TestCase):
+    """اختبارات ملف PDF"""
+
+    def create_export(self, **criteria):
+        return ComplaintExport.objects.create(
+            admin_id='ADMIN-001', admin_name='أدمن', export_format='pdf', filter_criteria=criteria,
+        )
+
+    def test_chunks_merge_in_order(self):
+        """الأجزاء تُدمج بالترتيب وأرقام الصفحات متصلة"""
+        self.fake_service(FakeComplaintsService(total=125, page_size=25))
+        export = run_export(self.create_export())
+
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'completed')
+        self.assertEqual(export.total_complaints, 125)
+        self.assertEqual(export.file_size, os.path.getsize(export.file_path))
+        self.assertEqual(os.listdir(self.root), [os.path.basename(export.file_path)])
+
+        pages = PdfReader(export.file_path).pages
+        self.assertEqual(len(pages), 13)
+        texts = [page.extract_text() for page in pages]
+        self.assertIn('COMP-00000', texts[0])
+        self.assertIn('COMP-00039', texts[3])
+        self.assertIn('COMP-00124', texts[12])
+        self.assertIn('13', texts[12])
+
+    def test_parallel_matches_serial(self):
+        rows = synthetic_rows(95)
+        serial, parallel = os.path.join(self.root, 'serial.pdf'), os.path.join(self.root, 'parallel.pdf')
+        finished = []
+        self.assertEqual(render_pdf(rows, serial, 'تقرير', workers=1, chunk_pages=2), 10)
+        self.assertEqual(render_pdf(
+            iter(rows), parallel, 'تقرير', workers=2, chunk_pages=2,
+            on_chunk=lambda count, size: finished.append(count),
+        ), 10)
+        self.assertEqual(finished, [20, 20, 20, 20, 15])
+        self.assertEqual(
+            [page.extract_text() for page in PdfReader(serial).pages],
+            [page.extract_text() for page in PdfReader(parallel).pages],
+        )
+
+    def test_empty_export_has_title_page(self):
+        path = os.path.join(self.root, 'empty.pdf')
+        self.assertEqual(render_pdf([], path, 'تقرير'), 1)
+
+    def test_arabic_shaping_is_cached(self):
+        renderer = PdfRenderer()
+        shaped = renderer.shape('الحالة: open')
+        self.assertTrue(shaped.startswith('open'))
+        self.assertNotIn('الحالة', shaped)
+        self.assertEqual(renderer.shape('COMP-1'), 'COMP-1')
+        renderer.shape('الحالة: open')
+        self.assertEqual(renderer.shape.cache_info().hits, 1)
+
+
+class PdfWorkerPoolTest(ExportTestMixin, TestCase):
+    """التصدير في طابور عامل غير خفي"""
+
+    def test_exports_are_routed_to_export_queue(self):
+        route = app.amqp.router.route({}, 'complaints_admin.tasks.process_complaint_export')
+        self.assertEqual(route['queue'].name, 'exports')
+        route = app.amqp.router.route({}, 'complaints_admin.tasks.refresh_complaint_rollups')
+        self.assertEqual(route['queue'].name, 'celery')
+
+    def test_daemon_process_renders_serially(self):
+        path = os.path.join(self.root, 'daemon.pdf')
+        with mock.patch('complaints_admin.export_pdf.multiprocessing.current_process') as current, \
+                mock.patch('complaints_admin.export_pdf.ProcessPoolExecutor') as pool, \
+                self.assertLogs('complaints_admin.export_pdf', 'WARNING'):
+            current.return_value.daemon = True
+            self.assertEqual(render_pdf(synthetic_rows(30), path, 'تقرير', workers=2, chunk_pages=1), 3)
+        pool.assert_not_called()
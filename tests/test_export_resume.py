@@ -0,0 +1,115 @@
+"""
+اختبارات استئناف التصدير من نقطة الاستئناف
+Checkpointed export resume tests
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from complaints_admin.export_sources import EXPORT_COLUMNS, LocalComplaintSource
+from complaints_admin.exports import run_export
+from complaints_admin.models import ComplaintAdminAction, ComplaintExport
+from complaints_admin.tasks import resume_stalled_exports
+
+from .test_exports import ExportTestMixin, FakeComplaintsService, read_csv
+
+
+class CsvResumeTest(ExportTestMixin, TestCase):
+    """استئناف ملف CSV بعد فشل في منتصفه"""
+
+    def fail_then_resume(self, service):
+        self.fake_service(service)
+        with mock.patch('complaints_admin.export_sources.time.sleep'):
+            export = run_export(self.create_export())
+        self.assertEqual(export.status, 'failed')
+        failed = ComplaintExport.objects.get(pk=export.pk)
+        # بايتات صف كُتب بعد آخر نقطة استئناف
+        with open(f'{self.root}/{export.export_id}.csv', 'ab') as handle:
+            handle.write(b'COMP-partial,')
+
+        service.fail_page = None
+        service.requested.clear()
+        export = run_export(ComplaintExport.objects.get(pk=export.pk))
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'completed')
+        self.assertEqual(export.checkpoint, {})
+        self.assertEqual(export.watermark_at, failed.watermark_at)
+        return failed, export
+
+    def assert_complete_csv(self, export, total):
+        rows = read_csv(export.file_path)
+        self.assertEqual(rows[0], EXPORT_COLUMNS)
+        self.assertEqual([row[0] for row in rows[1:]], [f'COMP-{n:05d}' for n in range(total)])
+        self.assertEqual(export.total_complaints, total)
+
+    def test_resume_continues_from_checkpoint_page(self):
+        service = FakeComplaintsService(total=200, page_size=25, fail_page=4)
+        failed, export = self.fail_then_resume(service)
+
+        self.assertEqual(failed.checkpoint['position'], {'page': 3, 'complaint_id': 'COMP-00074'})
+        self.assertEqual(failed.checkpoint['rows'], 75)
+        self.assertEqual(sorted(service.requested), [3, 4, 5, 6, 7, 8])
+        self.assert_complete_csv(export, 200)
+
+    def test_resume_with_cursor_pagination(self):
+        service = FakeComplaintsService(total=120, page_size=25, with_count=False, fail_page=3)
+        failed, export = self.fail_then_resume(service)
+
+        self.assertEqual(failed.checkpoint['position']['url'], 'http://complaints/api/v1/complaints/?cursor=2')
+        self.assertEqual(service.requested, [2, 3, 4, 5])
+        self.assert_complete_csv(export, 120)
+
+    def test_missing_partial_file_restarts(self):
+        service = self.fake_service(FakeComplaintsService(total=100, page_size=25, fail_page=3))
+        with mock.patch('complaints_admin.export_sources.time.sleep'):
+            export = run_export(self.create_export())
+        export.refresh_from_db()
+        open(f'{self.root}/{export.export_id}.csv', 'w').close()
+
+        service.fail_page = None
+        service.requested.clear()
+        export = run_export(export)
+        self.assertEqual(sorted(service.requested), [1, 2, 3, 4])
+        self.assert_complete_csv(export, 100)
+
+
+class LocalSourceResumeTest(TestCase):
+    def test_local_source_starts_after_position(self):
+        for complaint_id in ('COMP-1', 'COMP-2', 'COMP-3'):
+            ComplaintAdminAction.objects.create(
+                complaint_id=complaint_id, admin_id='ADMIN-001', admin_name='أدمن', action_type='reviewed',
+            )
+        source = LocalComplaintSource(start={'complaint_id': 'COMP-1'})
+        self.assertEqual([row['complaint_id'] for row in source], ['COMP-2', 'COMP-3'])
+        self.assertEqual(source.position, {'complaint_id': 'COMP-3'})
+
+
+class StalledExportTest(TestCase):
+    """إعادة جدولة التصديرات المتوقفة"""
+
+    def create(self, status='processing', heartbeat=None, age=0):
+        export = ComplaintExport.objects.create(
+            admin_id='ADMIN-001', admin_name='أدمن', export_format='csv', status=status,
+            heartbeat_at=heartbeat,
+        )
+        ComplaintExport.objects.filter(pk=export.pk).update(created_at=timezone.now() - timedelta(minutes=age))
+        return export
+
+    @mock.patch('complaints_admin.tasks.process_complaint_export.delay')
+    def test_stalled_exports_are_requeued(self, delay):
+        now = timezone.now()
+        stalled = self.create(heartbeat=now - timedelta(minutes=31), age=120)
+        never_saved = self.create(age=45)
+        self.create(heartbeat=now - timedelta(minutes=5), age=120)
+        self.create(age=5)
+        self.create(status='failed', heartbeat=now - timedelta(hours=2), age=120)
+
+        requeued = resume_stalled_exports()
+
+        self.assertEqual(sorted(requeued), sorted([str(stalled.export_id), str(never_saved.export_id)]))
+        self.assertEqual(delay.call_count, 2)
+        self.assertEqual(ComplaintExport.objects.filter(status='pending').count(), 2)
+        self.assertEqual(resume_stalled_exports(), [])
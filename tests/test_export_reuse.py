@@ -0,0 +1,146 @@
+"""
+اختبارات إعادة استخدام التصديرات المطابقة
+Content-addressed export reuse tests
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.exports import criteria_hash, request_export, run_export
+from complaints_admin.models import ComplaintAdminAction, ComplaintExport, ComplaintExportRequest
+
+from .test_exports import ExportTestMixin
+
+URL = '/api/v1/admin/complaints/export/'
+
+
+class CriteriaHashTest(TestCase):
+    """اختبارات بصمة المعايير"""
+
+    def test_equivalent_criteria_hash_the_same(self):
+        self.assertEqual(
+            criteria_hash('csv', {'complaint_ids': ['B', 'A', 'A'], 'priority_level': ' high', 'date_to': None}),
+            criteria_hash('csv', {'priority_level': 'high', 'complaint_ids': ['A', 'B']}),
+        )
+        self.assertNotEqual(criteria_hash('csv', {}), criteria_hash('excel', {}))
+        self.assertNotEqual(
+            criteria_hash('csv', {'priority_level': 'high'}), criteria_hash('csv', {'priority_level': 'low'})
+        )
+
+
+class ExportReuseTest(ExportTestMixin, TestCase):
+    """اختبارات إعادة التصدير المطابق"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+        ComplaintAdminAction.objects.create(
+            complaint_id='COMP-1', admin_id='ADMIN-001', admin_name='أدمن', action_type='reviewed',
+        )
+        patcher = mock.patch('complaints_admin.views.process_complaint_export.delay')
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, criteria, export_format='csv', admin_id='ADMIN-002'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(URL, {
+                'admin_id': admin_id, 'admin_name': 'أدمن', 'export_format': export_format,
+                'filter_criteria': criteria,
+            }, format='json')
+
+    def complete(self, export_id):
+        return run_export(ComplaintExport.objects.get(export_id=export_id))
+
+    def test_completed_export_is_returned(self):
+        first = self.post({'source': 'local', 'complaint_ids': ['COMP-1', 'COMP-2']})
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(self.complete(first.data['export_id']).status, 'completed')
+
+        again = self.post({'complaint_ids': ['COMP-2', 'COMP-1'], 'source': 'local'})
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['export_id'], first.data['export_id'])
+        self.assertEqual(again.data['status'], 'completed')
+        self.assertEqual(self.delay.call_count, 1)
+        self.assertEqual(self.post({'source': 'local'}, export_format='excel').status_code, 201)
+
+    def test_reuse_is_listed_for_the_second_admin(self):
+        first = self.post({'source': 'local'})
+        self.complete(first.data['export_id'])
+        again = self.post({'source': 'local'}, admin_id='ADMIN-003')
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['export_id'], first.data['export_id'])
+        self.assertEqual(again.data['admin_id'], 'ADMIN-002')
+        self.assertEqual(again.data['shared_with'], ['ADMIN-003'])
+        # الطلب المكرر من نفس الأدمن لا يُسجل مرتين
+        self.post({'source': 'local'}, admin_id='ADMIN-003')
+        self.post({'source': 'local'})
+        self.assertEqual(ComplaintExportRequest.objects.count(), 1)
+
+        for admin_id in ('ADMIN-002', 'ADMIN-003'):
+            listed = self.client.get(URL, {'admin_id': admin_id}).data['results']
+            self.assertEqual([item['export_id'] for item in listed], [first.data['export_id']])
+        self.assertEqual(self.client.get(URL, {'admin_id': 'ADMIN-004'}).data['results'], [])
+
+    def test_new_admin_action_invalidates_reuse(self):
+        first = self.post({'source': 'local'})
+        self.complete(first.data['export_id'])
+        ComplaintAdminAction.objects.create(
+            complaint_id='COMP-2', admin_id='ADMIN-001', admin_name='أدمن', action_type='reviewed',
+        )
+        again = self.post({'source': 'local'})
+        self.assertEqual(again.status_code, 201)
+        self.assertNotEqual(again.data['export_id'], first.data['export_id'])
+
+    def test_expired_or_missing_file_is_not_reused(self):
+        first = self.complete(self.post({'source': 'local'}).data['export_id'])
+        ComplaintExport.objects.filter(pk=first.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.post({'source': 'local'}).status_code, 201)
+
+        second = ComplaintExport.objects.filter(status='pending').get()
+        self.complete(second.export_id)
+        ComplaintExport.objects.filter(pk=second.pk).update(file_path='/missing/export.csv')
+        self.assertEqual(self.post({'source': 'local'}).status_code, 201)
+
+    def test_identical_request_joins_running_export(self):
+        first = self.post({'source': 'local'})
+        again = self.post({'source': 'local'})
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['export_id'], first.data['export_id'])
+        self.assertEqual(ComplaintExport.objects.count(), 1)
+
+        # سباق: الطلبان لم يجدا تصديراً جارياً قبل الإنشاء
+        fields = {
+            'admin_id': 'ADMIN-003', 'admin_name': 'أدمن', 'export_format': 'csv',
+            'filter_criteria': {'source': 'local'},
+        }
+        with mock.patch('complaints_admin.exports.reusable_export', return_value=None):
+            export, created = request_export(fields)
+        self.assertFalse(created)
+        self.assertEqual(str(export.export_id), first.data['export_id'])
+        self.assertEqual(list(export.requests.values_list('admin_id', flat=True)), ['ADMIN-003'])
+
+    def test_one_running_export_per_hash(self):
+        digest = criteria_hash('csv', {})
+        ComplaintExport.objects.create(admin_id='A', admin_name='أ', export_format='csv', criteria_hash=digest)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ComplaintExport.objects.create(admin_id='B', admin_name='ب', export_format='csv', criteria_hash=digest)
+        ComplaintExport.objects.create(
+            admin_id='C', admin_name='ج', export_format='csv', criteria_hash=digest, status='failed',
+        )
+
+    def test_retry_joins_identical_running_export(self):
+        failed = self.post({'source': 'local'})
+        ComplaintExport.objects.filter(export_id=failed.data['export_id']).update(status='failed')
+        running = self.post({'source': 'local'})
+        self.assertEqual(running.status_code, 201)
+
+        response = self.client.post(f"{URL}{failed.data['export_id']}/retry/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['export_id'], running.data['export_id'])
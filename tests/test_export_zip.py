@@ -0,0 +1,212 @@
+"""
+اختبارات تصدير ZIP
+Incremental ZIP export tests against a local complaints service
+"""
+
+import json
+import os
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.export_zip import is_compressed
+from complaints_admin.exports import run_export
+from complaints_admin.models import ComplaintExport
+
+from .test_exports import ExportTestMixin
+
+
+def attachment_body(complaint, name):
+    return (f'{complaint}/{name} ' * 2000).encode('utf-8')
+
+
+class LocalComplaintsService:
+    """
+    خدمة شكاوى محلية عبر HTTP
+    Serves complaint pages, attachment lists and attachment files; every
+    third complaint has a photo and a text note
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.failing = set()
+        self.downloads = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                service.handle(self)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def complaint(self, n):
+        return {
+            'id': f'COMP-{n:04d}', 'title': f'شكوى {n}', 'status': 'open',
+            'attachments_count': 2 if n % 3 == 0 else 0,
+        }
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        parts = url.path.strip('/').split('/')
+        if url.path == '/api/v1/complaints/':
+            query = parse_qs(url.query)
+            page, size = int(query['page'][0]), int(query['page_size'][0])
+            results = [self.complaint(n) for n in range((page - 1) * size, min(page * size, self.total))]
+            return self.reply(request, json.dumps({'count': self.total, 'results': results}).encode())
+        if parts[-1] == 'attachments':
+            complaint = parts[-2]
+            return self.reply(request, json.dumps([
+                {'id': 1, 'file_name': 'صورة.jpg', 'content_type': 'image/jpeg',
+                 'file_url': f'/files/{complaint}/photo.jpg'},
+                {'id': 2, 'file_name': 'note.txt', 'content_type': 'text/plain',
+                 'file_url': f'/files/{complaint}/note.txt'},
+            ]).encode())
+        if parts[0] == 'files':
+            with self.lock:
+                self.downloads.append(url.path)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.01)
+            with self.lock:
+                self.in_flight -= 1
+            if url.path in self.failing:
+                request.send_response(503)
+                request.end_headers()
+                return
+            return self.reply(request, attachment_body(parts[1], parts[2]))
+        request.send_response(404)
+        request.end_headers()
+
+    def reply(self, request, body):
+        request.send_response(200)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+class ZipExportTest(ExportTestMixin, TestCase):
+    """اختبارات ملف ZIP"""
+
+    def setUp(self):
+        super().setUp()
+        self.service = LocalComplaintsService(total=60)
+        self.addCleanup(self.service.stop)
+        override = override_settings(COMPLAINTS_SERVICE_URL=self.service.url, EXPORT_ATTACHMENT_WORKERS=3)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch('complaints_admin.export_zip.time')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_export(self, **criteria):
+        return ComplaintExport.objects.create(
+            admin_id='ADMIN-001', admin_name='أدمن', export_format='zip', filter_criteria=criteria,
+        )
+
+    def test_archive_with_attachments(self):
+        """كل شكوى في مجلد مع مرفقاتها، والصور تُخزن بدون ضغط"""
+        export = run_export(self.create_export())
+
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'completed')
+        self.assertEqual(export.total_complaints, 60)
+        self.assertEqual(export.file_size, os.path.getsize(export.file_path))
+        self.assertFalse(os.path.exists(f'{export.file_path}.journal'))
+        self.assertGreater(self.service.max_in_flight, 1)
+        self.assertLessEqual(self.service.max_in_flight, 3)
+
+        with zipfile.ZipFile(export.file_path) as archive:
+            self.assertIsNone(archive.testzip())
+            names = archive.namelist()
+            self.assertEqual(sum(name.endswith('complaint.json') for name in names), 60)
+            photo = archive.getinfo('complaints/COMP-0003/attachments/1-صورة.jpg')
+            note = archive.getinfo('complaints/COMP-0003/attachments/2-note.txt')
+            self.assertEqual(photo.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(note.compress_type, zipfile.ZIP_DEFLATED)
+            self.assertLess(note.compress_size, note.file_size)
+            self.assertEqual(archive.read(note.filename), attachment_body('COMP-0003', 'note.txt'))
+
+            complaint = json.loads(archive.read('complaints/COMP-0003/complaint.json'))
+            self.assertEqual(
+                [document['archive_path'] for document in complaint['attachments']],
+                [photo.filename, note.filename],
+            )
+            self.assertEqual(complaint['attachments'][1]['size'], note.file_size)
+            manifest = json.loads(archive.read('manifest.json'))
+            self.assertEqual(manifest['total_complaints'], 60)
+            self.assertEqual(manifest['total_attachments'], 40)
+
+    def test_failed_export_resumes_after_last_entry(self):
+        """الاستئناف لا يعيد تنزيل المرفقات المكتوبة"""
+        self.service.failing.add('/files/COMP-0030/note.txt')
+        export = run_export(self.create_export())
+        self.assertEqual(export.status, 'failed')
+        path = os.path.join(self.root, f'{export.export_id}.zip')
+        self.assertTrue(os.path.exists(f'{path}.journal'))
+        # الشكاوى تُكتب بالترتيب فنقطة الاستئناف آخر شكوى قبل الفاشلة
+        export.refresh_from_db()
+        self.assertEqual(export.checkpoint['position'], {'page': 2, 'complaint_id': 'COMP-0029'})
+        self.assertEqual(export.checkpoint['rows'], 30)
+        downloaded = set(self.service.downloads)
+        self.assertIn('/files/COMP-0003/photo.jpg', downloaded)
+        # بايتات مدخل لم يكتمل عند التوقف
+        with open(path, 'ab') as handle:
+            handle.write(b'PK\x03\x04 interrupted entry')
+
+        self.service.failing.clear()
+        self.service.downloads.clear()
+        export = run_export(ComplaintExport.objects.get(pk=export.pk))
+
+        self.assertEqual(export.status, 'completed')
+        self.assertNotIn('/files/COMP-0003/photo.jpg', self.service.downloads)
+        self.assertIn('/files/COMP-0030/note.txt', self.service.downloads)
+        with zipfile.ZipFile(export.file_path) as archive:
+            self.assertIsNone(archive.testzip())
+            names = archive.namelist()
+            self.assertEqual(len(names), len(set(names)))
+            self.assertEqual(sum(name.endswith('complaint.json') for name in names), 60)
+            self.assertEqual(json.loads(archive.read('manifest.json'))['total_complaints'], 60)
+            self.assertEqual(
+                archive.read('complaints/COMP-0003/attachments/1-صورة.jpg'),
+                attachment_body('COMP-0003', 'photo.jpg'),
+            )
+
+    def test_compressed_media_detection(self):
+        self.assertTrue(is_compressed('clip.MP4'))
+        self.assertTrue(is_compressed('scan', 'application/pdf'))
+        self.assertTrue(is_compressed('voice', 'audio/ogg; codecs=opus'))
+        self.assertFalse(is_compressed('report.csv', 'text/csv'))
+
+    def test_retry_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+        export = self.create_export()
+        url = f'/api/v1/admin/complaints/export/{export.export_id}/retry/'
+        self.assertEqual(client.post(url).status_code, 400)
+
+        ComplaintExport.objects.filter(pk=export.pk).update(status='failed', error_message='timeout')
+        with mock.patch('complaints_admin.views.process_complaint_export.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post(url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        delay.assert_called_once_with(str(export.export_id))
@@ -0,0 +1,243 @@
+"""
+اختبارات تصدير الشكاوى
+Streaming complaint export tests
+"""
+
+import csv
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import requests
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin import export_sources
+from complaints_admin.export_sources import EXPORT_COLUMNS
+from complaints_admin.exports import run_export
+from complaints_admin.models import ComplaintAdminAction, ComplaintExport
+from complaints_admin.tasks import process_complaint_export
+
+
+class FakeComplaintsService:
+    """خدمة شكاوى وهمية بترقيم بالصفحات"""
+
+    def __init__(self, total, page_size, with_count=True, fail_page=None):
+        self.total = total
+        self.page_size = page_size
+        self.with_count = with_count
+        self.fail_page = fail_page
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        page = params['page'] if params else int(url.rsplit('=', 1)[1])
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.requested.append(page)
+        time.sleep(0.002)
+        with self.lock:
+            self.in_flight -= 1
+        if page == self.fail_page:
+            raise requests.ConnectionError('service down')
+        start = (page - 1) * self.page_size
+        results = [
+            {'id': f'COMP-{n:05d}', 'title': f'شكوى رقم {n}', 'status': 'open', 'governorate': 'القاهرة'}
+            for n in range(start, min(start + self.page_size, self.total))
+        ]
+        body = {'results': results}
+        if self.with_count:
+            body['count'] = self.total
+        elif start + self.page_size < self.total:
+            body['next'] = f'http://complaints/api/v1/complaints/?cursor={page + 1}'
+        return mock.Mock(json=mock.Mock(return_value=body), raise_for_status=mock.Mock())
+
+    def close(self):
+        pass
+
+
+def read_csv(path_or_bytes):
+    if isinstance(path_or_bytes, bytes):
+        text = path_or_bytes.decode('utf-8-sig')
+    else:
+        with open(path_or_bytes, encoding='utf-8-sig') as handle:
+            text = handle.read()
+    return list(csv.reader(io.StringIO(text)))
+
+
+class ExportTestMixin:
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        override = override_settings(
+            EXPORT_ROOT=self.root, EXPORT_PAGE_SIZE=25, EXPORT_PREFETCH_PAGES=3, EXPORT_PROGRESS_EVERY=40,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def create_export(self, **criteria):
+        return ComplaintExport.objects.create(
+            admin_id='ADMIN-001', admin_name='أدمن', export_format='csv', filter_criteria=criteria,
+        )
+
+    def fake_service(self, service):
+        patcher = mock.patch('complaints_admin.export_sources.requests.Session', return_value=service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return service
+
+
+class CsvExportTest(ExportTestMixin, TestCase):
+    """اختبارات ملف CSV"""
+
+    def test_service_pages_in_order_with_bounded_prefetch(self):
+        """الصفحات تُقرأ بالترتيب مع حد للطلبات المتزامنة"""
+        service = self.fake_service(FakeComplaintsService(total=230, page_size=25))
+        ComplaintAdminAction.objects.create(
+            complaint_id='COMP-00007', admin_id='ADMIN-001', admin_name='أدمن',
+            action_type='assigned', assigned_to_representative_id='REP-1',
+            assigned_to_representative_name='نائب',
+        )
+        export = run_export(self.create_export())
+
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'completed')
+        self.assertEqual(export.total_complaints, 230)
+        self.assertEqual(export.file_size, os.path.getsize(export.file_path))
+        self.assertIsNotNone(export.expires_at)
+
+        rows = read_csv(export.file_path)
+        self.assertEqual(rows[0], EXPORT_COLUMNS)
+        self.assertEqual([row[0] for row in rows[1:]], [f'COMP-{n:05d}' for n in range(230)])
+        seventh = dict(zip(EXPORT_COLUMNS, rows[8]))
+        self.assertEqual(seventh['assigned_to_representative_id'], 'REP-1')
+        self.assertEqual(seventh['title'], 'شكوى رقم 7')
+        self.assertEqual(sorted(service.requested), list(range(1, 11)))
+        self.assertLessEqual(service.max_in_flight, 3)
+
+    def test_cursor_pagination_fallback(self):
+        """خدمة بدون count تُقرأ بالتتابع عبر next"""
+        service = self.fake_service(FakeComplaintsService(total=60, page_size=25, with_count=False))
+        export = run_export(self.create_export())
+        self.assertEqual(export.total_complaints, 60)
+        self.assertEqual(service.requested, [1, 2, 3])
+
+    def test_service_failure_marks_failed(self):
+        """فشل صفحة يُفشل التصدير ويبقي الملف الجزئي حتى نقطة الاستئناف"""
+        self.fake_service(FakeComplaintsService(total=200, page_size=25, fail_page=4))
+        with mock.patch('complaints_admin.export_sources.time.sleep'):
+            export = run_export(self.create_export())
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'failed')
+        self.assertIn('page 4', export.error_message)
+        self.assertEqual(export.checkpoint['rows'], 75)
+        self.assertEqual(os.listdir(self.root), [f'{export.export_id}.csv'])
+
+    def test_local_source_with_filters(self):
+        """المصدر المحلي يقرأ جدول الحالة مع التصفية"""
+        for n in range(30):
+            ComplaintAdminAction.objects.create(
+                complaint_id=f'COMP-{n:03d}', admin_id='ADMIN-001', admin_name='أدمن',
+                action_type='received', priority_level='high' if n % 3 == 0 else 'low',
+            )
+        export = run_export(self.create_export(source='local', priority_level='high'))
+        rows = read_csv(export.file_path)
+        self.assertEqual(len(rows) - 1, 10)
+        self.assertEqual(export.total_complaints, 10)
+        self.assertTrue(all(dict(zip(EXPORT_COLUMNS, row))['priority_level'] == 'high' for row in rows[1:]))
+
+    def test_progress_is_saved_while_writing(self):
+        """العدد والحجم يُحفظان أثناء الكتابة"""
+        self.fake_service(FakeComplaintsService(total=100, page_size=25))
+        seen = []
+        original = export_sources.state_rows
+
+        def state_rows(complaint_ids):
+            # تُستدعى في خيط الكتابة مرة لكل صفحة
+            seen.append(ComplaintExport.objects.values_list('total_complaints', 'file_size').get())
+            return original(complaint_ids)
+
+        with mock.patch('complaints_admin.export_sources.state_rows', state_rows):
+            run_export(self.create_export())
+        self.assertIn((0, 0), seen)
+        self.assertTrue(any(count >= 40 and size > 0 for count, size in seen))
+
+    def test_unsupported_format(self):
+        export = self.create_export()
+        ComplaintExport.objects.filter(pk=export.pk).update(export_format='docx')
+        export = run_export(ComplaintExport.objects.get(pk=export.pk))
+        self.assertEqual(export.status, 'failed')
+
+
+class ExportEndpointTest(ExportTestMixin, TestCase):
+    """اختبارات نقاط التصدير"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+
+    def test_create_enqueues_task(self):
+        with mock.patch('complaints_admin.views.process_complaint_export.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/api/v1/admin/complaints/export/', {
+                    'admin_id': 'ADMIN-001', 'admin_name': 'أدمن', 'export_format': 'csv',
+                    'filter_criteria': {'source': 'local'},
+                }, format='json')
+        self.assertEqual(response.status_code, 201)
+        delay.assert_called_once_with(response.data['export_id'])
+
+    def test_stream(self):
+        """البث يرسل نفس محتوى الملف ويحدّث السجل"""
+        self.fake_service(FakeComplaintsService(total=75, page_size=25))
+        export = self.create_export()
+        response = self.client.get(f'/api/v1/admin/complaints/export/{export.export_id}/stream/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(read_csv(body)), 76)
+
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'completed')
+        self.assertEqual(export.total_complaints, 75)
+        self.assertEqual(export.file_size, len(body))
+        # البث امتلك السجل: المهمة المجدولة عند الإنشاء تتخطاه
+        self.assertIsNone(process_complaint_export(str(export.export_id)))
+
+    def test_task_claims_export_once(self):
+        """تسليم مكرر للمهمة لا يشغّل نفس التصدير مرتين"""
+        export = self.create_export(source='local')
+        with mock.patch('complaints_admin.tasks.run_export', side_effect=lambda export: export) as run:
+            process_complaint_export(str(export.export_id))
+            self.assertEqual(ComplaintExport.objects.get(pk=export.pk).status, 'processing')
+            self.assertIsNone(process_complaint_export(str(export.export_id)))
+        run.assert_called_once()
+        self.assertIsNone(process_complaint_export('00000000-0000-0000-0000-000000000000'))
+
+    def test_stream_of_worker_owned_export_is_read_only(self):
+        self.fake_service(FakeComplaintsService(total=30, page_size=25))
+        export = run_export(self.create_export())
+        export.refresh_from_db()
+        response = self.client.get(f'/api/v1/admin/complaints/export/{export.export_id}/stream/')
+        self.assertEqual(len(read_csv(b''.join(response.streaming_content))), 31)
+        unchanged = ComplaintExport.objects.get(pk=export.pk)
+        for field in ('status', 'data_version', 'watermark_at', 'file_size', 'completed_at'):
+            self.assertEqual(getattr(unchanged, field), getattr(export, field))
+
+    def test_stream_closed_by_client_fails_export(self):
+        self.fake_service(FakeComplaintsService(total=75, page_size=25))
+        export = self.create_export()
+        response = self.client.get(f'/api/v1/admin/complaints/export/{export.export_id}/stream/')
+        next(iter(response.streaming_content))
+        response.close()
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'failed')
+        self.assertIn('closed', export.error_message)
@@ -0,0 +1,174 @@
+"""
+اختبارات ملخصات الكمّيات لأزمنة الإسناد والحل
+Quantile sketch accuracy and rollup latency percentile tests
+"""
+
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from complaints_admin import archive
+from complaints_admin.authentication import AdminUser
+from complaints_admin.models import ComplaintAdminAction, ComplaintRollup
+from complaints_admin.rollups import backfill_rollups, latency_percentiles
+from complaints_admin.sketches import QuantileSketch, merge_sketches
+
+START = datetime(2026, 9, 1, tzinfo=dt_timezone.utc)
+
+
+def exact_quantile(values, q):
+    """الكمّية بنفس تعريف الرتبة المستخدم في الملخص"""
+    ordered = np.sort(values)
+    return ordered[int(np.floor(q * (len(ordered) - 1)))]
+
+
+class QuantileSketchTest(SimpleTestCase):
+    """اختبارات دقة الملخص ودمجه"""
+
+    def setUp(self):
+        self.values = np.random.default_rng(4).lognormal(mean=9, sigma=1.5, size=20000)
+
+    def test_relative_accuracy(self):
+        """الخطأ النسبي أقل من الدقة المطلوبة"""
+        sketch = QuantileSketch(relative_accuracy=0.01).extend(self.values)
+        for q in (0.5, 0.9, 0.99, 0.999):
+            exact = exact_quantile(self.values, q)
+            self.assertLessEqual(abs(sketch.quantile(q) - exact) / exact, 0.01, q)
+
+    def test_merge_matches_single_sketch(self):
+        """دمج ملخصات الأجزاء يساوي ملخص الكل"""
+        whole = QuantileSketch().extend(self.values)
+        parts = [QuantileSketch().extend(chunk) for chunk in np.array_split(self.values, 7)]
+        merged = merge_sketches(part.to_bytes() for part in parts)
+        self.assertEqual(merged.bins, whole.bins)
+        self.assertEqual(merged.count, len(self.values))
+
+    def test_round_trip_and_zero_bucket(self):
+        """الترميز المضغوط والقيم الأصغر من الحد الأدنى"""
+        sketch = QuantileSketch()
+        sketch.extend([0, 0.5, 3, 3600, 86400])
+        sketch.add(7200)
+        restored = QuantileSketch.from_bytes(sketch.to_bytes())
+        self.assertEqual(restored.bins, sketch.bins)
+        self.assertEqual(restored.zero_count, 2)
+        self.assertEqual(restored.quantile(0), 0.0)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+        self.assertLess(len(sketch.to_bytes()), 80)
+
+    def test_bounded_bins(self):
+        """عدد الدلاء محدود مع الحفاظ على الذيل العلوي"""
+        sketch = QuantileSketch(max_bins=64).extend(self.values)
+        self.assertLessEqual(len(sketch.bins), 64)
+        exact = exact_quantile(self.values, 0.99)
+        self.assertLessEqual(abs(sketch.quantile(0.99) - exact) / exact, 0.01)
+
+    def test_mismatched_accuracy(self):
+        with self.assertRaises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.05))
+
+
+class RollupLatencyTest(TestCase):
+    """اختبارات نسب أزمنة الإسناد والحل من التجميعات"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(8)
+        actions = []
+        cls.assign, cls.resolve = {}, {}
+        for n in range(120):
+            complaint = f'COMP-{n:03d}'
+            opened = START + timedelta(hours=rng.randrange(24 * 40))
+            representative = f'REP-{rng.randrange(3)}'
+            assigned_at = opened + timedelta(minutes=rng.randrange(1, 3000))
+            resolved_at = assigned_at + timedelta(hours=rng.randrange(1, 400))
+            timeline = [
+                (opened, 'received', None),
+                (assigned_at, 'assigned', representative),
+                # إعادة الإسناد لا تُحتسب كزمن إسناد
+                (assigned_at + timedelta(minutes=30), 'assigned', representative),
+                (resolved_at, 'resolved', None),
+            ]
+            for at, action_type, rep in timeline:
+                actions.append((at, ComplaintAdminAction(
+                    complaint_id=complaint, admin_id='ADMIN-001', admin_name='أدمن',
+                    action_type=action_type, assigned_to_representative_id=rep,
+                )))
+            cls.assign.setdefault(representative, []).append((assigned_at - opened).total_seconds())
+            cls.resolve.setdefault(representative, []).append((resolved_at - opened).total_seconds())
+        ComplaintAdminAction.objects.bulk_create([action for _, action in actions])
+        for at, action in actions:
+            ComplaintAdminAction.objects.filter(pk=action.pk).update(created_at=at)
+
+    def assertPercentiles(self, result, assign, resolve):
+        for key, values in (('assign', assign), ('resolve', resolve)):
+            self.assertEqual(result[key]['count'], len(values))
+            for percentile in (50, 90, 99):
+                exact = exact_quantile(np.array(values), percentile / 100) / 3600
+                self.assertAlmostEqual(result[key][f'p{percentile}'], exact, delta=exact * 0.011 + 0.01)
+
+    def test_percentiles_per_representative_and_grain(self):
+        """النسب من ملخصات أي فترة تطابق الحساب المباشر"""
+        backfill_rollups(chunk_size=53)
+        for grain in ('hour', 'day', 'month'):
+            rows = ComplaintRollup.objects.filter(grain=grain, dimension='all')
+            self.assertPercentiles(
+                latency_percentiles(rows),
+                sum(self.assign.values(), []), sum(self.resolve.values(), []),
+            )
+        rows = ComplaintRollup.objects.filter(
+            grain='week', dimension='representative', dimension_value='REP-1'
+        )
+        self.assertPercentiles(latency_percentiles(rows), self.assign['REP-1'], self.resolve['REP-1'])
+
+    def test_partial_refresh_keeps_opened_time(self):
+        """إعادة حساب نافذة متأخرة تأخذ وقت الفتح من التاريخ السابق"""
+        backfill_rollups(chunk_size=100)
+        since = START + timedelta(days=20)
+        backfill_rollups(since, since + timedelta(days=30), chunk_size=17)
+        rows = ComplaintRollup.objects.filter(grain='day', dimension='all')
+        self.assertPercentiles(
+            latency_percentiles(rows), sum(self.assign.values(), []), sum(self.resolve.values(), [])
+        )
+
+    def test_archived_opening_actions(self):
+        """أزمنة الوصول تُقاس من أول إجراء حتى لو كان مؤرشفاً"""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        with override_settings(ACTION_ARCHIVE_ROOT=root, ACTION_ARCHIVE_STORAGE=''):
+            cutoff = START + timedelta(days=20)
+            archive.archive_actions(0, segment_rows=150, now=cutoff)
+            self.assertFalse(ComplaintAdminAction.objects.filter(created_at__lt=cutoff).exists())
+            self.assertTrue(ComplaintAdminAction.objects.filter(action_type='received').exists())
+
+            backfill_rollups(chunk_size=53)
+            rows = ComplaintRollup.objects.filter(grain='month', dimension='all')
+            self.assertPercentiles(
+                latency_percentiles(rows), sum(self.assign.values(), []), sum(self.resolve.values(), [])
+            )
+
+            # نافذة حية فقط: وقت الفتح والإسناد الأول من الأرشيف
+            backfill_rollups(cutoff, cutoff + timedelta(days=60), chunk_size=17)
+            rows = ComplaintRollup.objects.filter(grain='day', dimension='representative', dimension_value='REP-0')
+            self.assertPercentiles(latency_percentiles(rows), self.assign['REP-0'], self.resolve['REP-0'])
+
+    def test_endpoint(self):
+        """نقطة النسب تدمج الصفوف المصفاة"""
+        backfill_rollups()
+        client = APIClient()
+        client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+        response = client.get('/api/v1/admin/complaints/rollups/latency/', {
+            'dimension': 'representative', 'dimension_value': 'REP-2', 'percentiles': '50,95',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['resolve']['count'], len(self.resolve['REP-2']))
+        self.assertEqual(set(response.data['assign']), {'count', 'p50', 'p95'})
+
+        listing = client.get('/api/v1/admin/complaints/rollups/', {'grain': 'day'})
+        self.assertNotIn('assign_latency_sketch', listing.data['results'][0])
+        bad = client.get('/api/v1/admin/complaints/rollups/latency/', {'percentiles': '50,x'})
+        self.assertEqual(bad.status_code, 400)
@@ -0,0 +1,289 @@
+"""
+اختبارات لوحة صدارة النواب
+Representative leaderboard tests (database store and a fake Redis)
+"""
+
+import fnmatch
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+import redis
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.leaderboard import Leaderboard, get_leaderboard, period_of, reset_leaderboard
+from complaints_admin.models import ComplaintAdminAction
+from complaints_admin.tasks import prune_leaderboard_periods
+
+START = datetime(2026, 9, 28, 9, 0, tzinfo=dt_timezone.utc)
+
+
+class FakeSortedSetRedis:
+    """بديل بسيط لمجموعات Redis المرتبة في الذاكرة"""
+
+    def __init__(self):
+        self.zsets = {}
+        self.hashes = {}
+        self.fail = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _check(self):
+        if self.fail:
+            raise redis.ConnectionError('down')
+
+    def zincrby(self, key, amount, member):
+        self._check()
+        zset = self.zsets.setdefault(key, {})
+        zset[member] = zset.get(member, 0) + amount
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.zsets.pop(key, None)
+        self.hashes.pop(key, None)
+
+    def rename(self, source, target):
+        self.zsets[target] = self.zsets.pop(source)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.zsets) + list(self.hashes) if fnmatch.fnmatch(key, match)]
+
+    def _ordered(self, key):
+        items = self.zsets.get(key, {}).items()
+        return sorted(((member, float(score)) for member, score in items),
+                      key=lambda item: (item[1], item[0]), reverse=True)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        self._check()
+        return [(member.encode(), score) for member, score in self._ordered(key)[start:end + 1]]
+
+    def zrevrank(self, key, member):
+        self._check()
+        members = [m for m, _ in self._ordered(key)]
+        return members.index(member) if member in members else None
+
+    def zscore(self, key, member):
+        value = self.zsets.get(key, {}).get(member)
+        return None if value is None else float(value)
+
+    def zcard(self, key):
+        self._check()
+        return len(self.zsets.get(key, {}))
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def hmget(self, key, members):
+        values = self.hashes.get(key, {})
+        return [values[m].encode() if m in values else None for m in members]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        self.client._check()
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def resolve(complaint_id, representative, at, score=1):
+    """إسناد شكوى لنائب ثم حلها"""
+    with mock.patch('django.utils.timezone.now', return_value=at - timedelta(hours=1)):
+        ComplaintAdminAction.objects.create(
+            complaint_id=complaint_id, action_type='assigned', admin_id='ADMIN-001',
+            admin_name='أدمن', assigned_to_representative_id=representative,
+            assigned_to_representative_name=f'النائب {representative}',
+        )
+    with mock.patch('django.utils.timezone.now', return_value=at):
+        ComplaintAdminAction.objects.create(
+            complaint_id=complaint_id, action_type='resolved', admin_id='ADMIN-001',
+            admin_name='أدمن', representative_score_increase=score,
+        )
+
+
+class LeaderboardTest(TestCase):
+    """اختبارات الترتيب والنوافذ وإعادة البناء"""
+
+    def setUp(self):
+        reset_leaderboard()
+        self.addCleanup(reset_leaderboard)
+
+    def seed(self):
+        rng = random.Random(2)
+        expected = Counter()
+        for n in range(60):
+            representative = f'REP-{rng.randrange(6)}'
+            score = rng.randrange(0, 5)
+            at = START + timedelta(days=rng.randrange(20), hours=rng.randrange(24))
+            with self.captureOnCommitCallbacks(execute=True):
+                resolve(f'COMP-{n:03d}', representative, at, score)
+            expected[('resolutions', representative)] += 1
+            expected[('score', representative)] += score
+        return expected
+
+    def assertBoardMatches(self, board, expected):
+        for metric in ('resolutions', 'score'):
+            rows = board.top(metric, 'all', 'all', 0, 100)
+            values = {member: value for _, member, _, value in rows}
+            wanted = {rep: value for (m, rep), value in expected.items() if m == metric and value}
+            self.assertEqual({k: v for k, v in values.items() if v}, wanted)
+            self.assertEqual([value for *_, value in rows], sorted(values.values(), reverse=True))
+
+    def test_updated_on_resolution(self):
+        """كل حل يحدّث النوافذ الثلاث"""
+        board = get_leaderboard()
+        self.assertEqual(board.count('resolutions', 'all', 'all'), 0)
+        expected = self.seed()
+        self.assertBoardMatches(board, expected)
+
+        monthly = Counter(
+            ComplaintAdminAction.objects.filter(
+                action_type='resolved', created_at__gte=datetime(2026, 9, 30, 21, 0, tzinfo=dt_timezone.utc),
+            ).values_list('complaint_id', flat=True)
+        )
+        october = board.top('resolutions', 'month', '2026-10', 0, 100)
+        self.assertEqual(sum(value for *_, value in october), sum(monthly.values()))
+        week = period_of('week', START)
+        self.assertEqual(week, '2026-W40')
+        self.assertTrue(board.top('resolutions', 'week', week, 0, 3))
+
+    def test_rank_and_names(self):
+        """ترتيب النائب واسمه"""
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve('COMP-1', 'REP-A', START)
+            resolve('COMP-2', 'REP-B', START)
+            resolve('COMP-3', 'REP-B', START)
+        board = get_leaderboard()
+        self.assertEqual(board.rank('REP-B', 'resolutions', 'all', 'all'), (1, 2))
+        self.assertEqual(board.rank('REP-A', 'resolutions', 'all', 'all'), (2, 1))
+        self.assertIsNone(board.rank('REP-Z', 'resolutions', 'all', 'all'))
+        self.assertEqual(board.top('resolutions', 'all', 'all', 0, 1)[0][2], 'النائب REP-B')
+
+    def test_shared_between_processes_without_history_scan(self):
+        """عمليات مختلفة ترى نفس الأرصدة، والقراءة لا تعيد الحساب من السجل"""
+        writer, reader = Leaderboard(), Leaderboard()
+        with mock.patch('complaints_admin.leaderboard.get_leaderboard', return_value=writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                resolve('COMP-1', 'REP-A', START, score=3)
+        with mock.patch('complaints_admin.leaderboard.compute_totals') as compute_totals:
+            self.assertEqual(reader.rank('REP-A', 'score', 'all', 'all'), (1, 3))
+            self.assertEqual(reader.top('resolutions', 'month', '2026-09'), [(1, 'REP-A', 'النائب REP-A', 1)])
+        compute_totals.assert_not_called()
+
+        # إعادة البناء تستبدل أرصدة منحرفة
+        writer.database.increment([(('score', 'all', 'all'), 'REP-A', 10)], {})
+        self.assertEqual(reader.rebuild(), 1)
+        self.assertEqual(writer.rank('REP-A', 'score', 'all', 'all'), (1, 3))
+
+    def test_rebuild_matches_incremental_with_redis(self):
+        """إعادة البناء في Redis تطابق التحديث التدريجي، مع رجوع للنسخة المحلية عند الفشل"""
+        fake = FakeSortedSetRedis()
+        with mock.patch('complaints_admin.leaderboard.get_redis_client', return_value=fake):
+            board = Leaderboard(use_redis=True)
+            with mock.patch('complaints_admin.leaderboard.get_leaderboard', return_value=board):
+                expected = self.seed()
+            self.assertBoardMatches(board, expected)
+            incremental = {key: dict(value) for key, value in fake.zsets.items()}
+
+            fake.zsets['naebak:admin:leaderboard:score:week:2020-W01'] = {'REP-OLD': 3}
+            fresh = Leaderboard(use_redis=True)
+            self.assertEqual(fresh.rebuild(), 60)
+            self.assertEqual(fake.zsets, incremental)
+
+            fake.fail = True
+            self.assertBoardMatches(fresh, expected)
+
+    def test_name_update_uses_board_key(self):
+        """تحديث الاسم يمر بالمفتاح الفريد للوحة لا بكل صفوف النائب"""
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve('COMP-1', 'REP-A', START)
+        board = Leaderboard()
+        with CaptureQueriesContext(connection) as queries:
+            board.database.increment([(('resolutions', 'all', 'all'), 'REP-A', 1)], {'REP-A': 'اسم جديد'})
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"metric"', updates[0])
+        self.assertEqual(board.top('resolutions', 'all', 'all')[0][2], 'اسم جديد')
+
+    def test_prune_expired_periods(self):
+        """حذف لوحات الفترات الأقدم من مدة الاحتفاظ مع إبقاء لوحة كل الوقت"""
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve('COMP-1', 'REP-A', START - timedelta(days=120))
+            resolve('COMP-2', 'REP-A', START)
+        board = Leaderboard(period_ttl=30 * 86400)
+        self.assertEqual(board.prune_expired(now=START + timedelta(days=1)), 4)
+        self.assertEqual(board.count('resolutions', 'month', period_of('month', START - timedelta(days=120))), 0)
+        self.assertEqual(board.count('resolutions', 'week', period_of('week', START - timedelta(days=120))), 0)
+        self.assertEqual(board.rank('REP-A', 'resolutions', 'month', '2026-09'), (1, 1))
+        self.assertEqual(board.rank('REP-A', 'resolutions', 'all', 'all'), (1, 2))
+
+        with mock.patch('complaints_admin.tasks.get_leaderboard', return_value=board):
+            self.assertEqual(prune_leaderboard_periods(), {'deleted': 0})
+
+
+class LeaderboardEndpointTest(TestCase):
+    """اختبارات نقاط لوحة الصدارة"""
+
+    def setUp(self):
+        reset_leaderboard()
+        self.addCleanup(reset_leaderboard)
+        self.client = APIClient()
+        self.client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(5):
+                resolve(f'COMP-{n}', f'REP-{n % 3}', START + timedelta(days=5), score=n)
+
+    def test_paginated_top(self):
+        response = self.client.get('/api/v1/admin/complaints/leaderboard/', {
+            'metric': 'resolutions', 'limit': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([row['rank'] for row in response.data['results']], [1, 2])
+        self.assertEqual(response.data['results'][0]['value'], 2)
+        self.assertIsNotNone(response.data['next'])
+
+        second = self.client.get(response.data['next'])
+        self.assertEqual([row['rank'] for row in second.data['results']], [3])
+
+    def test_rank_and_validation(self):
+        response = self.client.get('/api/v1/admin/complaints/leaderboard/REP-1/', {
+            'metric': 'score', 'window': 'month', 'period': '2026-10',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['value'], 1 + 4)
+        self.assertEqual(response.data['rank'], 1)
+        self.assertEqual(self.client.get('/api/v1/admin/complaints/leaderboard/REP-9/').status_code, 404)
+        self.assertEqual(
+            self.client.get('/api/v1/admin/complaints/leaderboard/', {'window': 'year'}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.get('/api/v1/admin/complaints/leaderboard/', {'window': 'week', 'period': '2026-10'}
+                            ).status_code, 400
+        )
+
+    @override_settings(LEADERBOARD_USE_REDIS=False)
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command('rebuild_representative_leaderboard', stdout=out)
+        self.assertIn('Credited 5 resolutions', out.getvalue())
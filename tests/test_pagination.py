@@ -0,0 +1,140 @@
+"""
+اختبارات الترقيم بالمؤشر
+Keyset pagination tests for action timelines, exports and the news ticker
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.models import ComplaintAdminAction, ComplaintExport
+from content_admin.models import NewsTickerItem
+
+
+def admin_client():
+    """عميل API بمستخدم أدمن"""
+    client = APIClient()
+    client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001', 'username': 'admin'}))
+    return client
+
+
+class ComplaintActionPaginationTest(TestCase):
+    """اختبارات ترقيم إجراءات الأدمن"""
+
+    @classmethod
+    def setUpTestData(cls):
+        ComplaintAdminAction.objects.bulk_create([
+            ComplaintAdminAction(
+                complaint_id='COMP-001' if i % 2 else 'COMP-002',
+                admin_id='ADMIN-001',
+                admin_name='أدمن',
+                action_type='note_added',
+            )
+            for i in range(45)
+        ])
+        # أوقات متكررة لاختبار كسر التعادل بالمعرف
+        base = timezone.now() - timedelta(days=1)
+        for action in ComplaintAdminAction.objects.all():
+            ComplaintAdminAction.objects.filter(pk=action.pk).update(
+                created_at=base + timedelta(minutes=action.pk // 4)
+            )
+        cls.expected = list(
+            ComplaintAdminAction.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.client = admin_client()
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_pages_cover_all_rows_in_order(self):
+        """كل الصفحات تغطي كل الصفوف بالترتيب دون تكرار"""
+        ids, pages = self.walk('/api/v1/admin/complaints/actions/?page_size=10')
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 5)
+
+    def test_first_page_has_no_previous(self):
+        """الصفحة الأولى بدون رابط سابق"""
+        response = self.client.get('/api/v1/admin/complaints/actions/')
+        self.assertIsNone(response.data['previous'])
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertNotIn('count', response.data)
+
+    def test_previous_link_returns_previous_page(self):
+        """الرابط السابق يعيد نفس الصفحة السابقة"""
+        first = self.client.get('/api/v1/admin/complaints/actions/?page_size=10')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in back.data['results']],
+            [item['id'] for item in first.data['results']],
+        )
+        self.assertIsNone(back.data['previous'])
+
+    def test_timeline_filters_by_complaint(self):
+        """الخط الزمني يقتصر على الشكوى المطلوبة"""
+        ids, _ = self.walk('/api/v1/admin/complaints/COMP-001/timeline/?page_size=7')
+        expected = list(
+            ComplaintAdminAction.objects.filter(complaint_id='COMP-001')
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_rows_inserted_between_pages_are_not_repeated(self):
+        """الإضافات الجديدة لا تُزيح الصفحات التالية"""
+        first = self.client.get('/api/v1/admin/complaints/actions/?page_size=10')
+        ComplaintAdminAction.objects.create(
+            complaint_id='COMP-003', admin_id='ADMIN-002', admin_name='أدمن', action_type='note_added'
+        )
+        second = self.client.get(first.data['next'])
+        self.assertEqual(
+            [item['id'] for item in second.data['results']], self.expected[10:20]
+        )
+
+    def test_invalid_cursor(self):
+        """المؤشر غير الصالح يعيد 404"""
+        response = self.client.get('/api/v1/admin/complaints/actions/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class ExportAndTickerPaginationTest(TestCase):
+    """اختبارات ترقيم التصديرات والشريط الإخباري"""
+
+    def setUp(self):
+        self.client = admin_client()
+
+    def test_export_list(self):
+        """قائمة التصديرات مرتبة من الأحدث"""
+        exports = [
+            ComplaintExport.objects.create(admin_id='ADMIN-001', admin_name='أدمن')
+            for _ in range(3)
+        ]
+        response = self.client.get('/api/v1/admin/complaints/export/?page_size=2')
+        self.assertEqual(
+            [item['export_id'] for item in response.data['results']],
+            [str(exports[2].export_id), str(exports[1].export_id)],
+        )
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'][0]['export_id'], str(exports[0].export_id))
+        self.assertIsNone(response.data['next'])
+
+    def test_ticker_list(self):
+        """قائمة أخبار الشريط"""
+        for i in range(5):
+            NewsTickerItem.objects.create(title=f'خبر {i}', created_by='أدمن')
+        response = self.client.get('/api/v1/admin/news/?page_size=3')
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
@@ -0,0 +1,201 @@
+"""
+اختبارات تقسيم جدول إجراءات الأدمن وسياسة الاحتفاظ
+Partitioning helper tests, the non-PostgreSQL retention fallback and the
+PostgreSQL-only partitioning migration
+"""
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from importlib import import_module
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from complaints_admin import partitions
+from complaints_admin.models import ComplaintAdminAction
+
+
+class PartitionHelpersTest(SimpleTestCase):
+    """اختبارات أسماء وحدود الأقسام"""
+
+    def test_add_months_across_years(self):
+        """جمع وطرح الشهور عبر السنوات"""
+        self.assertEqual(partitions.add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(partitions.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(partitions.add_months(date(2026, 1, 1), -24), date(2024, 1, 1))
+
+    def test_partition_name_and_bounds(self):
+        """اسم القسم وحدوده بتوقيت UTC"""
+        month = date(2026, 12, 1)
+        self.assertEqual(
+            partitions.partition_name(month), 'complaints_admin_complaintadminaction_p2026_12'
+        )
+        start, end = partitions.partition_bounds(month)
+        self.assertEqual(start, datetime(2026, 12, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(end, datetime(2027, 1, 1, tzinfo=dt_timezone.utc))
+
+    def test_create_partition_sql(self):
+        """جملة إنشاء القسم"""
+        sql = partitions.create_partition_sql(date(2026, 10, 1), lambda name: f'"{name}"')
+        self.assertEqual(
+            sql,
+            'CREATE TABLE IF NOT EXISTS "complaints_admin_complaintadminaction_p2026_10" '
+            'PARTITION OF "complaints_admin_complaintadminaction" '
+            "FOR VALUES FROM ('2026-10-01T00:00:00+00:00') TO ('2026-11-01T00:00:00+00:00')",
+        )
+
+    def test_expired_partitions(self):
+        """الأقسام الواقعة بالكامل قبل فترة الاحتفاظ"""
+        attached = [
+            (date(2026, m, 1), partitions.partition_name(date(2026, m, 1))) for m in range(1, 11)
+        ]
+        now = datetime(2026, 10, 18, tzinfo=dt_timezone.utc)
+        with mock.patch.object(partitions, 'list_partitions', return_value=attached):
+            expired = partitions.expired_partitions(6, now=now)
+        self.assertEqual([month for month, _ in expired], [date(2026, m, 1) for m in range(1, 4)])
+
+    def test_unknown_retention_mode(self):
+        """رفض وضع احتفاظ غير معروف"""
+        with self.assertRaises(ValueError):
+            partitions.apply_retention(6, mode='truncate')
+
+
+class RetentionFallbackTest(TestCase):
+    """اختبارات الاحتفاظ بدون تقسيم (SQLite)"""
+
+    def setUp(self):
+        now = timezone.now()
+        for months_ago in (0, 2, 13, 30):
+            action = ComplaintAdminAction.objects.create(
+                complaint_id=f'COMP-{months_ago:03d}', admin_id='ADMIN-001',
+                admin_name='أدمن', action_type='received',
+            )
+            ComplaintAdminAction.objects.filter(pk=action.pk).update(
+                created_at=now - timedelta(days=31 * months_ago)
+            )
+
+    def test_not_partitioned(self):
+        """لا أقسام على SQLite"""
+        self.assertFalse(partitions.is_partitioned())
+        self.assertEqual(partitions.ensure_partitions(3), [])
+
+    def test_drop_mode_deletes_old_rows(self):
+        """وضع الحذف يحذف الإجراءات الأقدم من فترة الاحتفاظ"""
+        self.assertEqual(partitions.apply_retention(12, mode='drop', dry_run=True), ([], 2))
+        self.assertEqual(ComplaintAdminAction.objects.count(), 4)
+
+        self.assertEqual(partitions.apply_retention(12, mode='drop'), ([], 2))
+        self.assertEqual(
+            sorted(ComplaintAdminAction.objects.values_list('complaint_id', flat=True)),
+            ['COMP-000', 'COMP-002'],
+        )
+
+    def test_detach_mode_keeps_rows(self):
+        """وضع الفصل لا يحذف شيئاً بدون تقسيم"""
+        self.assertEqual(partitions.apply_retention(12, mode='detach'), ([], 0))
+        self.assertEqual(partitions.apply_retention(0, mode='drop'), ([], 0))
+        self.assertEqual(ComplaintAdminAction.objects.count(), 4)
+
+    def test_command(self):
+        """أمر صيانة الأقسام"""
+        out = StringIO()
+        call_command('manage_action_partitions', retain_months=12, mode='drop', stdout=out)
+        self.assertIn('Applied retention (drop) to 2 actions', out.getvalue())
+        self.assertEqual(ComplaintAdminAction.objects.count(), 2)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Action partitioning is PostgreSQL only')
+class PartitionMigrationTest(TestCase):
+    """ترحيل 0005: تحويل الجدول إلى جدول مقسم والعودة منه"""
+
+    migration = import_module('complaints_admin.migrations.0005_partition_complaintadminaction')
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.created = {}
+        for months_ago in (0, 2, 13):
+            action = ComplaintAdminAction.objects.create(
+                complaint_id=f'COMP-{months_ago:03d}', admin_id='ADMIN-001',
+                admin_name='أدمن', action_type='received',
+            )
+            ComplaintAdminAction.objects.filter(pk=action.pk).update(
+                created_at=self.now - timedelta(days=31 * months_ago)
+            )
+            self.created[action.pk] = ComplaintAdminAction.objects.get(pk=action.pk).created_at
+
+    def run_migration(self, function):
+        # DDL على الجدول لا يُسمح به مع أحداث قيود مؤجلة معلقة في المعاملة
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        apps = MigrationLoader(connection).project_state().apps
+        with connection.schema_editor() as editor:
+            function(apps, editor)
+
+    def fetch(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def primary_key_columns(self):
+        return {row[0] for row in self.fetch(
+            """
+            SELECT attribute.attname FROM pg_index
+            JOIN pg_attribute attribute
+              ON attribute.attrelid = pg_index.indrelid AND attribute.attnum = ANY(pg_index.indkey)
+            WHERE pg_index.indrelid = %s::regclass AND pg_index.indisprimary
+            """,
+            [partitions.PARENT_TABLE],
+        )}
+
+    def test_migrated_table_is_partitioned(self):
+        """الجدول بعد الترحيلات مقسم ومفتاحه (id, created_at)"""
+        self.assertTrue(partitions.is_partitioned())
+        self.assertEqual(self.primary_key_columns(), {'id', 'created_at'})
+        current = partitions.month_start(self.now.astimezone(dt_timezone.utc))
+        months = [month for month, _ in partitions.list_partitions()]
+        self.assertIn(current, months)
+
+    def test_round_trip_keeps_rows_ids_and_routing(self):
+        """العودة إلى جدول عادي ثم التقسيم مجدداً بدون فقد صفوف"""
+        self.run_migration(self.migration.unpartition_actions)
+        self.assertFalse(partitions.is_partitioned())
+        self.assertEqual(self.primary_key_columns(), {'id'})
+        self.assertEqual(
+            dict(ComplaintAdminAction.objects.values_list('pk', 'created_at')), self.created
+        )
+
+        self.run_migration(self.migration.partition_actions)
+        self.assertTrue(partitions.is_partitioned())
+        self.assertEqual(self.primary_key_columns(), {'id', 'created_at'})
+        self.assertEqual(
+            dict(ComplaintAdminAction.objects.values_list('pk', 'created_at')), self.created
+        )
+
+        # أقسام متصلة من شهر أقدم إجراء حتى MONTHS_AHEAD بعد الشهر الحالي، وقسم افتراضي
+        oldest = partitions.month_start(min(self.created.values()).astimezone(dt_timezone.utc))
+        current = partitions.month_start(self.now.astimezone(dt_timezone.utc))
+        months = [month for month, _ in partitions.list_partitions()]
+        self.assertEqual(months[0], oldest)
+        self.assertEqual(months[-1], partitions.add_months(current, self.migration.MONTHS_AHEAD))
+        self.assertEqual(months, [partitions.add_months(oldest, n) for n in range(len(months))])
+        self.assertTrue(self.fetch(
+            'SELECT 1 FROM pg_class WHERE relname = %s AND relispartition', [partitions.DEFAULT_PARTITION]
+        ))
+
+        # كل صف في قسم شهره
+        placed = dict(self.fetch(
+            f'SELECT id, tableoid::regclass::text FROM {connection.ops.quote_name(partitions.PARENT_TABLE)}'
+        ))
+        for pk, created_at in self.created.items():
+            month = partitions.month_start(created_at.astimezone(dt_timezone.utc))
+            self.assertEqual(placed[pk].strip('"'), partitions.partition_name(month))
+
+        # المعرفات تستمر من التسلسل بعد أكبر معرف منقول
+        action = ComplaintAdminAction.objects.create(
+            complaint_id='COMP-NEW', admin_id='ADMIN-001', admin_name='أدمن', action_type='received',
+        )
+        self.assertGreater(action.pk, max(self.created))
@@ -0,0 +1,173 @@
+"""
+اختبارات خطط الاستعلامات للفهارس
+Query plan tests: hot queries must be served by their indexes
+
+البيانات تُزرع بحجم كبير ثم يُنفذ ANALYZE حتى يختار المخطط الفهارس كما في
+الإنتاج. أي حذف أو تعديل لفهرس يجعل هذه الاختبارات تفشل.
+Seed size is configurable with QUERY_PLAN_SEED_ROWS.
+"""
+
+import os
+import random
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from complaints_admin.models import ComplaintAdminAction, ComplaintExport
+from content_admin.models import NewsTickerItem
+
+SEED_ROWS = int(os.environ.get('QUERY_PLAN_SEED_ROWS', 20000))
+
+
+class QueryPlanTestCase(TestCase):
+    """أدوات مشتركة لفحص خطط الاستعلامات"""
+
+    def explain(self, queryset):
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name):
+        """التحقق من استخدام الفهرس المطلوب في خطة الاستعلام"""
+        plan = self.explain(queryset)
+        self.assertIn(index_name, plan, f"Expected {index_name} in plan:\n{plan}")
+        # PostgreSQL: "Seq Scan on <table>"، SQLite: "SCAN <table>" بدون فهرس
+        self.assertNotIn('Seq Scan', plan, f"Unexpected sequential scan:\n{plan}")
+        self.assertIsNone(
+            re.search(r'\bSCAN \S+\s*$', plan, re.MULTILINE),
+            f"Unexpected full table scan:\n{plan}",
+        )
+
+
+class ComplaintAdminActionPlanTest(QueryPlanTestCase):
+    """خطط استعلامات إجراءات الأدمن"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        action_types = [choice for choice, _ in ComplaintAdminAction.ACTION_TYPES]
+        priorities = ['low'] * 5 + ['medium'] * 4 + ['high', 'urgent']
+        ComplaintAdminAction.objects.bulk_create(
+            [
+                ComplaintAdminAction(
+                    complaint_id=f'COMP-{rng.randrange(SEED_ROWS // 10):06d}',
+                    admin_id=f'ADMIN-{rng.randrange(50):03d}',
+                    admin_name='أدمن',
+                    action_type=rng.choice(action_types),
+                    assigned_to_representative_id=(
+                        f'REP-{rng.randrange(200):03d}' if rng.random() < 0.3 else None
+                    ),
+                    priority_level=rng.choice(priorities),
+                )
+                for _ in range(SEED_ROWS)
+            ],
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_complaint_timeline(self):
+        """الخط الزمني لشكوى واحدة"""
+        self.assertUsesIndex(
+            ComplaintAdminAction.objects.filter(complaint_id='COMP-000042').order_by('-created_at'),
+            'caa_complaint_created_idx',
+        )
+
+    def test_complaint_timeline_keyset_page(self):
+        """صفحة تالية من الخط الزمني بالترقيم بالمؤشر"""
+        position = timezone.now()
+        self.assertUsesIndex(
+            ComplaintAdminAction.objects.filter(
+                Q(complaint_id='COMP-000042'),
+                Q(created_at__lte=position),
+                Q(created_at__lt=position) | Q(id__lt=500),
+            ).order_by('-created_at', '-id')[:21],
+            'caa_complaint_created_idx',
+        )
+
+    def test_admin_actions(self):
+        """إجراءات أدمن معين"""
+        self.assertUsesIndex(
+            ComplaintAdminAction.objects.filter(admin_id='ADMIN-007').order_by('-created_at')[:20],
+            'caa_admin_created_idx',
+        )
+
+    def test_representative_assignments(self):
+        """الشكاوى المُسندة لنائب"""
+        self.assertUsesIndex(
+            ComplaintAdminAction.objects.filter(
+                assigned_to_representative_id='REP-003'
+            ).order_by('-created_at')[:20],
+            'caa_rep_created_idx',
+        )
+
+    def test_actions_by_type(self):
+        """الإجراءات حسب النوع"""
+        self.assertUsesIndex(
+            ComplaintAdminAction.objects.filter(action_type='escalated').order_by('-created_at')[:20],
+            'caa_type_created_idx',
+        )
+
+    def test_actions_by_priority(self):
+        """الإجراءات حسب مستوى الأولوية"""
+        self.assertUsesIndex(
+            ComplaintAdminAction.objects.filter(priority_level='urgent').order_by('-created_at')[:20],
+            'caa_priority_created_idx',
+        )
+
+
+class ExportAndTickerPlanTest(QueryPlanTestCase):
+    """خطط استعلامات التصدير والشريط الإخباري"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(11)
+        now = timezone.now()
+        rows = SEED_ROWS // 4
+        statuses = ['completed'] * 6 + ['failed', 'pending', 'processing']
+        ComplaintExport.objects.bulk_create(
+            [
+                ComplaintExport(
+                    admin_id='ADMIN-001',
+                    admin_name='أدمن',
+                    status=rng.choice(statuses),
+                    expires_at=now + timedelta(hours=rng.randrange(-2000, 200)),
+                )
+                for _ in range(rows)
+            ],
+            batch_size=2000,
+        )
+        NewsTickerItem.objects.bulk_create(
+            [
+                NewsTickerItem(
+                    title=f'خبر {i}',
+                    created_by='أدمن',
+                    is_active=rng.random() < 0.05,
+                    start_date=now - timedelta(days=rng.randrange(1, 900)),
+                    end_date=now + timedelta(days=rng.randrange(-900, 30)),
+                )
+                for i in range(rows)
+            ],
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_expired_completed_exports(self):
+        """التصديرات المكتملة المنتهية الصلاحية"""
+        self.assertUsesIndex(
+            ComplaintExport.objects.filter(status='completed', expires_at__lt=timezone.now()),
+            'export_status_expires_idx',
+        )
+
+    def test_active_ticker_items(self):
+        """الأخبار المعروضة حالياً"""
+        now = timezone.now()
+        self.assertUsesIndex(
+            NewsTickerItem.objects.filter(is_active=True, start_date__lte=now).filter(
+                Q(end_date__isnull=True) | Q(end_date__gte=now)
+            ),
+            'ticker_active_window_idx',
+        )
@@ -0,0 +1,143 @@
+"""
+اختبارات تجميعات الإجراءات
+Rollup backfill tests against a straightforward per-row computation
+"""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.models import ComplaintAdminAction, ComplaintCategory, ComplaintRollup
+from complaints_admin.rollups import backfill_rollups
+
+CAIRO = ZoneInfo('Africa/Cairo')
+START = datetime(2026, 8, 20, tzinfo=dt_timezone.utc)
+
+
+class ComplaintRollupTest(TestCase):
+    """اختبارات حساب التجميعات"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(3)
+        cls.categories = [
+            ComplaintCategory.objects.create(name=f'تصنيف {i}') for i in range(3)
+        ]
+        actions = []
+        for n in range(400):
+            complaint = f'COMP-{rng.randrange(60):03d}'
+            action_type = rng.choice(['received', 'reviewed', 'assigned', 'resolved', 'escalated'])
+            actions.append(ComplaintAdminAction(
+                complaint_id=complaint,
+                admin_id=f'ADMIN-{rng.randrange(4)}',
+                admin_name='أدمن',
+                action_type=action_type,
+                priority_level=rng.choice(['low', 'medium', 'high']),
+                assigned_to_representative_id=(
+                    f'REP-{rng.randrange(5)}' if action_type == 'assigned' else None
+                ),
+                category=rng.choice(cls.categories) if action_type == 'received' else None,
+            ))
+        ComplaintAdminAction.objects.bulk_create(actions)
+        for action in ComplaintAdminAction.objects.all():
+            ComplaintAdminAction.objects.filter(pk=action.pk).update(
+                created_at=START + timedelta(minutes=211 * action.pk)
+            )
+
+    def expected(self, grain):
+        """حساب مرجعي إجراءً إجراءً"""
+        counts = Counter()
+        representative, category = {}, {}
+        for action in ComplaintAdminAction.objects.order_by('created_at', 'id'):
+            if action.assigned_to_representative_id:
+                representative[action.complaint_id] = action.assigned_to_representative_id
+            if action.category_id:
+                category[action.complaint_id] = str(action.category_id)
+            local = action.created_at.astimezone(CAIRO).replace(tzinfo=None)
+            if grain == 'hour':
+                start = local.replace(minute=0, second=0, microsecond=0)
+            else:
+                start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+                if grain == 'week':
+                    start -= timedelta(days=start.weekday())
+                elif grain == 'month':
+                    start = start.replace(day=1)
+            dimensions = {
+                'all': '', 'priority': action.priority_level, 'admin': action.admin_id,
+                'representative': representative.get(action.complaint_id),
+                'category': category.get(action.complaint_id),
+            }
+            for dimension, value in dimensions.items():
+                if value is not None:
+                    counts[(start, dimension, value, action.action_type)] += 1
+        return counts
+
+    def stored(self, grain):
+        counts = Counter()
+        for rollup in ComplaintRollup.objects.filter(grain=grain):
+            start = rollup.period_start.astimezone(CAIRO).replace(tzinfo=None)
+            for action_type, _ in ComplaintAdminAction.ACTION_TYPES:
+                value = getattr(rollup, f'{action_type}_count')
+                if value:
+                    counts[(start, rollup.dimension, rollup.dimension_value, action_type)] = value
+        return counts
+
+    def test_backfill_matches_reference(self):
+        """التجميعات تطابق الحساب المرجعي لكل الفترات والأبعاد"""
+        backfill_rollups(chunk_size=37)
+        for grain in ('hour', 'day', 'week', 'month'):
+            self.assertEqual(self.stored(grain), self.expected(grain), grain)
+
+    def test_totals(self):
+        """الإجمالي لكل بُعد يساوي عدد الإجراءات"""
+        backfill_rollups(chunk_size=100)
+        total = ComplaintRollup.objects.filter(grain='month', dimension='all').aggregate(
+            total=Sum('total_actions'))['total']
+        self.assertEqual(total, 400)
+        admin_total = ComplaintRollup.objects.filter(grain='day', dimension='admin').aggregate(
+            total=Sum('total_actions'))['total']
+        self.assertEqual(admin_total, 400)
+
+    def test_incremental_window_is_idempotent(self):
+        """إعادة حساب نافذة جزئية لا تغير النتيجة"""
+        backfill_rollups(chunk_size=50)
+        before = {grain: self.stored(grain) for grain in ('hour', 'day', 'week', 'month')}
+
+        since = START + timedelta(days=20, hours=5)
+        backfill_rollups(since, since + timedelta(days=3), chunk_size=11)
+        for grain, counts in before.items():
+            self.assertEqual(self.stored(grain), counts, grain)
+
+    def test_command_and_endpoint(self):
+        """أمر إعادة الحساب ونقطة القراءة"""
+        out = StringIO()
+        call_command('backfill_complaint_rollups', chunk_size=150, stdout=out)
+        self.assertIn('Aggregated 400 actions', out.getvalue())
+        self.assertIn('Rollups written:', out.getvalue())
+
+        client = APIClient()
+        client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+        response = client.get('/api/v1/admin/complaints/rollups/', {
+            'grain': 'month', 'dimension': 'priority', 'dimension_value': 'high',
+        })
+        self.assertEqual(response.status_code, 200)
+        expected = ComplaintAdminAction.objects.filter(priority_level='high').count()
+        self.assertEqual(sum(item['total_actions'] for item in response.data['results']), expected)
+        self.assertTrue(all(item['dimension'] == 'priority' for item in response.data['results']))
+
+    def test_empty_history(self):
+        """بدون إجراءات لا يُكتب شيء"""
+        ComplaintAdminAction.objects.all().delete()
+        self.assertEqual(backfill_rollups(), {})
+        self.assertEqual(
+            backfill_rollups(timezone.now() - timedelta(days=1), timezone.now())['hour'], 0
+        )
@@ -0,0 +1,114 @@
+"""
+اختبارات تحديث الإحصائيات اليومية عند الكتابة
+Write-time ComplaintStatistics maintenance tests
+"""
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.models import ComplaintAdminAction, ComplaintStatistics
+
+
+def add_action(complaint_id, action_type, at=None, **fields):
+    """إضافة إجراء أدمن في وقت محدد"""
+    fields.setdefault('admin_id', 'ADMIN-001')
+    fields.setdefault('admin_name', 'أدمن')
+    with mock.patch('django.utils.timezone.now', return_value=at or timezone.now()):
+        return ComplaintAdminAction.objects.create(
+            complaint_id=complaint_id, action_type=action_type, **fields
+        )
+
+
+class ComplaintStatisticsWriteTest(TestCase):
+    """اختبارات تحديث صف اليوم"""
+
+    def setUp(self):
+        self.morning = datetime(2026, 10, 18, 8, 0, tzinfo=dt_timezone.utc)
+
+    def test_counters(self):
+        """العدادات تعكس الإجراءات"""
+        add_action('COMP-001', 'received', self.morning)
+        add_action('COMP-002', 'received', self.morning)
+        add_action('COMP-001', 'assigned', self.morning, assigned_to_representative_id='REP-1',
+                   assigned_to_representative_name='نائب')
+        add_action('COMP-002', 'rejected', self.morning)
+
+        stats = ComplaintStatistics.objects.get(date=date(2026, 10, 18))
+        self.assertEqual(stats.new_complaints, 2)
+        self.assertEqual(stats.total_complaints, 2)
+        self.assertEqual(stats.assigned_complaints, 1)
+        self.assertEqual(stats.rejected_complaints, 1)
+        self.assertEqual(stats.pending_complaints, 1)
+
+    def test_running_average_resolution_time(self):
+        """متوسط وقت الحل من مجموع وعدد تراكميين"""
+        add_action('COMP-001', 'received', self.morning - timedelta(days=2))
+        add_action('COMP-002', 'received', self.morning - timedelta(days=4))
+        add_action('COMP-001', 'resolved', self.morning)
+        add_action('COMP-002', 'resolved', self.morning)
+
+        stats = ComplaintStatistics.objects.get(date=date(2026, 10, 18))
+        self.assertEqual(stats.resolved_complaints, 2)
+        self.assertEqual(stats.resolution_count, 2)
+        self.assertAlmostEqual(stats.resolution_time_total, 6.0)
+        self.assertAlmostEqual(stats.average_resolution_time, 3.0)
+
+    def test_cairo_day_boundaries(self):
+        """اليوم يتبع توقيت القاهرة وليس UTC"""
+        # 22:30 UTC يوم 17 = 00:30 (أو 01:30 صيفاً) بتوقيت القاهرة يوم 18
+        add_action('COMP-001', 'received', datetime(2026, 10, 17, 22, 30, tzinfo=dt_timezone.utc))
+        self.assertTrue(ComplaintStatistics.objects.filter(date=date(2026, 10, 18)).exists())
+        self.assertFalse(ComplaintStatistics.objects.filter(date=date(2026, 10, 17)).exists())
+
+    def test_snapshots_carry_forward(self):
+        """الإجمالي والمعلق يبدآن من صف اليوم السابق"""
+        add_action('COMP-001', 'received', self.morning - timedelta(days=1))
+        add_action('COMP-002', 'received', self.morning - timedelta(days=1))
+        add_action('COMP-001', 'resolved', self.morning)
+
+        stats = ComplaintStatistics.objects.get(date=date(2026, 10, 18))
+        self.assertEqual(stats.total_complaints, 2)
+        self.assertEqual(stats.new_complaints, 0)
+        self.assertEqual(stats.pending_complaints, 1)
+
+    def test_single_update_per_action(self):
+        """تحديث صف موجود يتم بجملة واحدة"""
+        add_action('COMP-001', 'received')
+        action = ComplaintAdminAction(
+            complaint_id='COMP-001', admin_id='ADMIN-001', admin_name='أدمن', action_type='assigned',
+            assigned_to_representative_id='REP-1', assigned_to_representative_name='نائب',
+        )
+        with self.assertNumQueries(1):
+            ComplaintStatistics.record_action(action, mock.Mock(action_count=2, is_open=True), True)
+
+
+class ComplaintStatisticsEndpointTest(TestCase):
+    """اختبارات نقطة الإحصائيات"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+
+    def test_today_and_by_date(self):
+        """قراءة إحصائيات اليوم وتاريخ محدد"""
+        add_action('COMP-001', 'received')
+        today = ComplaintStatistics.day_of(timezone.now())
+
+        response = self.client.get('/api/v1/admin/complaints/statistics/today/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['new_complaints'], 1)
+
+        response = self.client.get(f'/api/v1/admin/complaints/statistics/{today:%Y-%m-%d}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_complaints'], 1)
+
+    def test_today_without_row(self):
+        """اليوم بدون إجراءات يعيد أصفاراً"""
+        response = self.client.get('/api/v1/admin/complaints/statistics/today/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_complaints'], 0)
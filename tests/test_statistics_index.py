@@ -0,0 +1,181 @@
+"""
+اختبارات فهرس المجاميع التراكمية للإحصائيات
+Cumulative-array statistics index tests against ORM aggregates
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaints_admin.authentication import AdminUser
+from complaints_admin.models import ComplaintAdminAction, ComplaintStatistics
+from complaints_admin.statistics_index import (
+    SUM_FIELDS, StatisticsIndex, get_statistics_index, reset_statistics_index,
+)
+
+FIRST = date(2026, 6, 1)
+
+
+class StatisticsIndexTest(TestCase):
+    """اختبارات مجاميع النطاقات"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(5)
+        rows = []
+        for n in range(120):
+            # أيام بلا نشاط تبقى فجوات في الجدول
+            if n % 7 == 3:
+                continue
+            rows.append(ComplaintStatistics(
+                date=FIRST + timedelta(days=n),
+                total_complaints=n * 3,
+                new_complaints=rng.randrange(20),
+                assigned_complaints=rng.randrange(15),
+                resolved_complaints=rng.randrange(10),
+                rejected_complaints=rng.randrange(4),
+                pending_complaints=rng.randrange(50),
+                resolution_time_total=rng.random() * 40,
+                resolution_count=rng.randrange(10),
+            ))
+        ComplaintStatistics.objects.bulk_create(rows)
+
+    def setUp(self):
+        self.index = StatisticsIndex(refresh_interval=3600)
+
+    def orm_sum(self, start, end):
+        return ComplaintStatistics.objects.filter(date__gte=start, date__lte=end).aggregate(
+            **{field: Sum(field) for field in SUM_FIELDS}
+        )
+
+    def assertMatchesOrm(self, start, end):
+        summary = self.index.summary(start, end)
+        for field, value in self.orm_sum(start, end).items():
+            self.assertAlmostEqual(summary[field], value or 0, places=3, msg=f'{field} {start}..{end}')
+
+    def test_ranges_match_aggregate(self):
+        """مجاميع نطاقات عشوائية تطابق SUM في قاعدة البيانات"""
+        rng = random.Random(9)
+        for _ in range(40):
+            start = FIRST + timedelta(days=rng.randrange(-10, 130))
+            end = start + timedelta(days=rng.randrange(0, 60))
+            self.assertMatchesOrm(start, end)
+
+    def test_snapshot_uses_last_row_in_range(self):
+        """الإجمالي والمعلق من آخر يوم له صف حتى نهاية النطاق"""
+        gap = FIRST + timedelta(days=10)
+        summary = self.index.summary(FIRST, gap)
+        previous = ComplaintStatistics.objects.get(date=gap - timedelta(days=1))
+        self.assertEqual(summary['total_complaints'], previous.total_complaints)
+        self.assertEqual(summary['pending_complaints'], previous.pending_complaints)
+        self.assertEqual(self.index.summary(FIRST - timedelta(days=5), FIRST - timedelta(days=1))
+                         ['total_complaints'], 0)
+
+    def test_rates(self):
+        """معدلات الحل والرفض ومتوسط وقت الحل"""
+        start, end = FIRST + timedelta(days=20), FIRST + timedelta(days=40)
+        summary = self.index.summary(start, end)
+        expected = self.orm_sum(start, end)
+        total = ComplaintStatistics.objects.get(date=end).total_complaints
+        self.assertEqual(summary['resolution_rate'],
+                         round(expected['resolved_complaints'] / total * 100, 2))
+        self.assertEqual(summary['rejection_rate'],
+                         round(expected['rejected_complaints'] / total * 100, 2))
+        self.assertAlmostEqual(summary['average_resolution_time'],
+                               expected['resolution_time_total'] / expected['resolution_count'],
+                               places=3)
+
+    def test_refresh_applies_changes(self):
+        """تعديل يوم وإضافة أيام قبل وبعد المدى المحمل"""
+        self.index.load()
+        day = FIRST + timedelta(days=50)
+        ComplaintStatistics.objects.filter(date=day).update(
+            new_complaints=999, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        ComplaintStatistics.objects.create(date=FIRST + timedelta(days=200), new_complaints=7)
+        ComplaintStatistics.objects.create(date=FIRST - timedelta(days=40), new_complaints=11)
+        self.index.mark_changed()
+
+        self.assertMatchesOrm(FIRST - timedelta(days=60), FIRST + timedelta(days=300))
+        self.assertMatchesOrm(day, day)
+        self.assertMatchesOrm(FIRST + timedelta(days=150), FIRST + timedelta(days=250))
+        self.assertMatchesOrm(FIRST - timedelta(days=40), FIRST)
+
+    def test_refresh_catches_late_commits(self):
+        """صف أُكِّد بعد التحديث بتاريخ updated_at أقدم من آخر صف مقروء"""
+        self.index.load()
+        now = timezone.now()
+        ComplaintStatistics.objects.filter(date=FIRST).update(new_complaints=100, updated_at=now)
+        self.index.refresh()
+        late = FIRST + timedelta(days=1)
+        ComplaintStatistics.objects.filter(date=late).update(
+            new_complaints=200, updated_at=now - timedelta(seconds=60)
+        )
+        self.index.refresh()
+        self.assertMatchesOrm(FIRST, late)
+        self.assertEqual(self.index.summary(late, late)['new_complaints'], 200)
+
+    def test_stale_until_interval_or_change(self):
+        """بدون تنبيه يبقى الفهرس على حاله حتى انتهاء المهلة"""
+        self.index.load()
+        day = FIRST + timedelta(days=1)
+        before = self.index.summary(day, day)['new_complaints']
+        ComplaintStatistics.objects.filter(date=day).update(
+            new_complaints=before + 5, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(self.index.summary(day, day)['new_complaints'], before)
+        self.index.refresh_interval = 0
+        self.assertEqual(self.index.summary(day, day)['new_complaints'], before + 5)
+
+
+class StatisticsRangeEndpointTest(TestCase):
+    """اختبارات نقطة نطاق الإحصائيات"""
+
+    def setUp(self):
+        reset_statistics_index()
+        self.addCleanup(reset_statistics_index)
+        self.client = APIClient()
+        self.client.force_authenticate(user=AdminUser({'user_id': 'ADMIN-001'}))
+
+    def add_action(self, complaint_id, action_type, at):
+        with mock.patch('django.utils.timezone.now', return_value=at):
+            with self.captureOnCommitCallbacks(execute=True):
+                ComplaintAdminAction.objects.create(
+                    complaint_id=complaint_id, action_type=action_type,
+                    admin_id='ADMIN-001', admin_name='أدمن',
+                )
+
+    def test_range_follows_writes(self):
+        """الإجراءات الجديدة تظهر في النطاق فوراً"""
+        day = datetime(2026, 10, 10, 8, 0, tzinfo=dt_timezone.utc)
+        self.add_action('COMP-001', 'received', day)
+        params = {'start': '2026-10-01', 'end': '2026-10-31'}
+        response = self.client.get('/api/v1/admin/complaints/statistics/range/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['new_complaints'], 1)
+
+        self.add_action('COMP-002', 'received', day + timedelta(days=2))
+        self.add_action('COMP-001', 'resolved', day + timedelta(days=3))
+        response = self.client.get('/api/v1/admin/complaints/statistics/range/', params)
+        self.assertEqual(response.data['new_complaints'], 2)
+        self.assertEqual(response.data['resolved_complaints'], 1)
+        self.assertEqual(response.data['total_complaints'], 2)
+        self.assertEqual(response.data['resolution_rate'], 50.0)
+        self.assertTrue(get_statistics_index().loaded)
+
+    def test_invalid_dates(self):
+        """تواريخ ناقصة أو معكوسة"""
+        url = '/api/v1/admin/complaints/statistics/range/'
+        self.assertEqual(self.client.get(url, {'start': '2026-10-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': 'x', 'end': '2026-10-01'}).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {'start': '2026-02-01', 'end': '2026-02-30'}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.get(url, {'start': '2026-10-05', 'end': '2026-10-01'}).status_code, 400
+        )
@@ -0,0 +1,127 @@
+"""
+اختبارات إعادة بناء الإحصائيات اليومية
+Sharded ComplaintStatistics rebuild tests against write-time maintenance
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from admin_service.celery import app
+from complaints_admin.models import (
+    ComplaintAdminAction, ComplaintStatistics, ComplaintStatisticsRebuild,
+)
+from complaints_admin.statistics_rebuild import (
+    compute_shard, plan_rebuild, run_rebuild,
+)
+from complaints_admin.tasks import rebuild_complaint_statistics
+
+START = datetime(2026, 9, 1, 6, 0, tzinfo=dt_timezone.utc)
+FIELDS = (
+    'total_complaints', 'new_complaints', 'assigned_complaints', 'resolved_complaints',
+    'rejected_complaints', 'pending_complaints', 'resolution_count',
+)
+
+
+class StatisticsRebuildTest(TestCase):
+    """اختبارات إعادة البناء المجزأة"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(11)
+        moment = START
+        for _ in range(250):
+            moment += timedelta(minutes=rng.randrange(5, 300))
+            with mock.patch('django.utils.timezone.now', return_value=moment):
+                ComplaintAdminAction.objects.create(
+                    complaint_id=f'COMP-{rng.randrange(40):03d}',
+                    action_type=rng.choice(
+                        ['received', 'reviewed', 'assigned', 'resolved', 'rejected', 'reopened']
+                    ),
+                    admin_id='ADMIN-001',
+                    admin_name='أدمن',
+                )
+        cls.expected = cls.snapshot()
+
+    @staticmethod
+    def snapshot():
+        return {
+            row.date: tuple(getattr(row, field) for field in FIELDS)
+            + (round(row.resolution_time_total, 6), round(row.average_resolution_time, 6))
+            for row in ComplaintStatistics.objects.all()
+        }
+
+    def corrupt(self):
+        ComplaintStatistics.objects.filter(date__lt=date(2026, 9, 20)).update(
+            new_complaints=0, resolved_complaints=99, total_complaints=1, pending_complaints=-4,
+            resolution_time_total=0, average_resolution_time=0,
+        )
+
+    def test_full_rebuild_matches_write_time(self):
+        """إعادة بناء كل السجل تعيد نفس صفوف التحديث عند الكتابة"""
+        self.corrupt()
+        rebuild = plan_rebuild(shard_days=3)
+        self.assertGreater(rebuild.shards.count(), 3)
+        run_rebuild(rebuild)
+        self.assertEqual(self.snapshot(), self.expected)
+        rebuild.refresh_from_db()
+        self.assertEqual(rebuild.status, 'completed')
+        self.assertEqual(sum(s.action_count for s in rebuild.shards.all()), 250)
+
+    def test_partial_range_keeps_neighbours(self):
+        """إعادة بناء نطاق وسطي تصحح الصفوف بعده"""
+        since, until = date(2026, 9, 8), date(2026, 9, 19)
+        # خطأ في يوم داخل النطاق ينتقل لكل اللقطات اللاحقة
+        ComplaintStatistics.objects.filter(date__gte=date(2026, 9, 12)).update(
+            total_complaints=F('total_complaints') + 5, pending_complaints=F('pending_complaints') - 2
+        )
+        ComplaintStatistics.objects.filter(date=date(2026, 9, 12)).update(new_complaints=50)
+        run_rebuild(plan_rebuild(since, until, shard_days=4))
+        self.assertEqual(self.snapshot(), self.expected)
+
+    def test_resume_after_crash(self):
+        """الاستئناف يكمل الأجزاء المتبقية فقط"""
+        self.corrupt()
+        rebuild = plan_rebuild(shard_days=5)
+        first = rebuild.shards.order_by('start_date').first()
+        compute_shard(first.pk)
+        ComplaintStatisticsRebuild.objects.filter(pk=rebuild.pk).update(status='failed')
+
+        out = StringIO()
+        with mock.patch('complaints_admin.statistics_rebuild.compute_shard',
+                        wraps=compute_shard) as compute:
+            call_command('rebuild_complaint_statistics', workers=1, stdout=out)
+        self.assertIn(f'Resuming rebuild {rebuild.pk}', out.getvalue())
+        self.assertEqual(compute.call_count, rebuild.shards.count() - 1)
+        self.assertEqual(self.snapshot(), self.expected)
+
+    def test_repeat_is_idempotent(self):
+        """تكرار إعادة البناء لا يغير النتيجة"""
+        out = StringIO()
+        call_command('rebuild_complaint_statistics', workers=1, shard_days=7, stdout=out)
+        call_command('rebuild_complaint_statistics', workers=1, shard_days=2, stdout=out)
+        self.assertIn('Rebuilt statistics', out.getvalue())
+        self.assertEqual(self.snapshot(), self.expected)
+        self.assertEqual(ComplaintStatisticsRebuild.objects.filter(status='completed').count(), 2)
+
+    def test_celery_chord(self):
+        """المهمة تحسب الأجزاء كمجموعة ثم تنهي البناء"""
+        self.corrupt()
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, 'task_always_eager', False)
+        rebuild_id = rebuild_complaint_statistics.delay(shard_days=6).get()
+        self.assertEqual(ComplaintStatisticsRebuild.objects.get(pk=rebuild_id).status, 'completed')
+        self.assertEqual(self.snapshot(), self.expected)
+
+    def test_empty_history(self):
+        """بدون إجراءات لا توجد عملية"""
+        ComplaintAdminAction.objects.all().delete()
+        self.assertIsNone(plan_rebuild())
+        out = StringIO()
+        call_command('rebuild_complaint_statistics', stdout=out)
+        self.assertIn('No actions', out.getvalue())